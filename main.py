@@ -110,6 +110,7 @@ from lod_detector import LODDetector
 from file_handler import FileHandler
 from database import TextureDatabase
 from organizer import OrganizationEngine, ORGANIZATION_STYLES
+from core.sort_pipeline import SortPipeline, PipelineSettings
 
 # Import UI components
 PANDA_WIDGET_AVAILABLE = False
@@ -1236,7 +1237,8 @@ class TextureSorterMainWindow(QMainWindow):
         try:
             if UI_PANELS_AVAILABLE:
                 tooltip_manager = getattr(self, 'tooltip_manager', None)
-                self.file_browser_panel = FileBrowserPanelQt(config, tooltip_manager)
+                self.file_browser_panel = FileBrowserPanelQt(config, tooltip_manager,
+                                                             database=getattr(self, 'database', None))
                 browser_layout.addWidget(self.file_browser_panel)
                 # Wire file browser signals so selections update the main path fields
                 if hasattr(self.file_browser_panel, 'file_selected'):
@@ -1996,6 +1998,8 @@ class TextureSorterMainWindow(QMainWindow):
                 self._app_data_dir.mkdir(parents=True, exist_ok=True)
                 self.database = TextureDatabase(self._db_path)
                 logger.info("Texture database initialized at %s", self._db_path)
+                if getattr(self, 'file_browser_panel', None) is not None:
+                    self.file_browser_panel.database = self.database
             except Exception as _e:
                 logger.warning("Texture database unavailable: %s", _e)
                 self.database = None
@@ -2331,7 +2335,8 @@ class TextureSorterMainWindow(QMainWindow):
             # Initialize TextureAnalyzer — advanced per-file analysis
             try:
                 from features.texture_analysis import TextureAnalyzer
-                self.texture_analyzer = TextureAnalyzer()
+                from utils.analysis_cache import get_analysis_cache
+                self.texture_analyzer = TextureAnalyzer(analysis_cache=get_analysis_cache())
                 logger.info("TextureAnalyzer initialized")
             except Exception as e:
                 self.texture_analyzer = None
@@ -2534,9 +2539,6 @@ class TextureSorterMainWindow(QMainWindow):
     def perform_sorting(self, progress_callback, log_callback, check_cancelled):
         """Perform actual sorting (runs in worker thread)."""
         try:
-            import time as _time
-            from pathlib import Path
-
             # Create a manual restore point before destructive file operations
             try:
                 if self.backup_manager:
@@ -2581,160 +2583,70 @@ class TextureSorterMainWindow(QMainWindow):
                 except Exception:
                     pass
             
-            # Collect texture files
-            extensions = {'.dds', '.png', '.jpg', '.jpeg', '.tga', '.bmp', '.tif', '.tiff'}
-            files = []
-            
-            for ext in extensions:
-                files.extend(self.input_path.rglob(f'*{ext}'))
-            
-            total_files = len(files)
-            if total_files == 0:
+            # Classifier used by the pipeline's classify stage (runs on threads)
+            def _classify(file_path):
+                if use_ai and feature_extractor:
+                    try:
+                        return feature_extractor.classify_texture(str(file_path))
+                    except Exception:
+                        pass
+                return self._pattern_classify(file_path.name)
+
+            def _on_item(item):
+                if item.status == 'failed':
+                    log_callback(f"⚠️ Failed to move {item.path.name}: {item.error}")
+                # Record each finished texture in the statistics tracker
+                if not self.statistics_tracker:
+                    return
+                try:
+                    if item.status == 'failed':
+                        self.statistics_tracker.record_error('move_failed', item.error)
+                    else:
+                        self.statistics_tracker.record_file_processed(
+                            item.category, item.file_size, item.elapsed, success=True
+                        )
+                except Exception:
+                    pass
+
+            settings = PipelineSettings.from_config(
+                config,
+                run_analyzer=self.texture_analyzer is not None,
+                # OrganizationEngine copies; the flat fallback moves files
+                file_operation='copy' if self.organizer else 'move',
+                incremental=bool(config.get('sorting', 'incremental_rescan', default=False)),
+            )
+            pipeline = SortPipeline(
+                output_dir=self.output_path,
+                organizer=self.organizer,
+                classify_func=_classify,
+                lod_detector=self.lod_detector,
+                database=self.database,
+                settings=settings,
+            )
+            results = pipeline.run(
+                self.input_path,
+                progress_callback=progress_callback,
+                log_callback=log_callback,
+                check_cancelled=check_cancelled,
+                item_callback=_on_item,
+            )
+
+            if results['total'] == 0:
                 log_callback("⚠️ No texture files found in input directory")
                 return
-            
-            log_callback(f"📊 Found {total_files} texture files")
 
-            # Initialize statistics tracker for this operation
+            log_callback(f"📊 Found {results['total']} texture files")
             if self.statistics_tracker:
                 try:
-                    self.statistics_tracker.set_total_files(total_files)
+                    self.statistics_tracker.set_total_files(results['total'])
                 except Exception:
                     pass
-            
-            # Process and move files
-            moved_count = 0
-            failed_count = 0
-            
-            for idx, file_path in enumerate(files):
-                if check_cancelled():
-                    log_callback("⏹️ Operation cancelled by user")
-                    break
-                
-                # Classify texture
-                if use_ai and feature_extractor:
-                    try:
-                        category, confidence = feature_extractor.classify_texture(str(file_path))
-                    except Exception:
-                        category, confidence = self._pattern_classify(file_path.name)
-                else:
-                    category, confidence = self._pattern_classify(file_path.name)
+            for line in pipeline.format_stage_stats():
+                log_callback(f"   ⏱️ {line}")
 
-                # Detect LOD group/level for this file
-                lod_group = None
-                lod_level = None
-                if self.lod_detector:
-                    try:
-                        _lod = self.lod_detector.detect_lod_level(file_path.name)
-                        if _lod:
-                            lod_group = getattr(_lod, 'group', None)
-                            lod_level = getattr(_lod, 'level', None)
-                    except Exception:
-                        pass
+            moved_count = results['processed']
+            failed_count = results['failed']
 
-                # Run TextureAnalyzer on each file for richer DB metadata
-                _tex_analysis: dict = {}
-                if self.texture_analyzer and HAS_PIL:
-                    try:
-                        _tex_analysis = self.texture_analyzer.analyze(file_path)
-                        if _tex_analysis.get('has_alpha') is True:
-                            category = category if category != 'unknown' else 'alpha_textures'
-                    except Exception:
-                        pass
-
-                # Determine target folder via OrganizationEngine or flat fallback
-                if self.organizer:
-                    try:
-                        from organizer.organization_engine import TextureInfo as _TI
-                        try:
-                            _ti_size = file_path.stat().st_size
-                        except OSError:
-                            _ti_size = 0
-                        _ti = _TI(
-                            file_path=str(file_path),
-                            filename=file_path.name,
-                            category=category,
-                            confidence=confidence,
-                            lod_group=lod_group,
-                            lod_level=lod_level,
-                            file_size=_ti_size,
-                            format=file_path.suffix.lstrip('.').upper(),
-                        )
-                        _t0_org = _time.monotonic()
-                        _result = self.organizer.organize_textures([_ti])
-                        _elapsed_org = _time.monotonic() - _t0_org
-                        # organize_textures moves the file itself; skip our own rename below
-                        _org_moved = _result.get('processed', _result.get('moved', 0)) if isinstance(_result, dict) else 0
-                        if _org_moved:
-                            moved_count += 1
-                            progress_callback(idx + 1, total_files, f"Organised {file_path.name} → {category}")
-                            if self.statistics_tracker:
-                                try:
-                                    self.statistics_tracker.record_file_processed(
-                                        category, _ti.file_size, _elapsed_org, success=True
-                                    )
-                                except Exception:
-                                    pass
-                            self._index_texture_in_db(
-                                file_path, category, confidence, lod_group, lod_level
-                            )
-                            continue  # organizer already moved the file
-                        # fall through to manual move if organizer didn't move it
-                    except Exception as _oe:
-                        logger.debug("OrganizationEngine error: %s", _oe)
-
-                target_folder = self.output_path / category
-                target_folder.mkdir(parents=True, exist_ok=True)
-
-                # Move file
-                try:
-                    target_path = target_folder / file_path.name
-
-                    # Handle duplicate filenames
-                    if target_path.exists():
-                        base = target_path.stem
-                        ext = target_path.suffix
-                        counter = 1
-                        while target_path.exists():
-                            target_path = target_folder / f"{base}_{counter}{ext}"
-                            counter += 1
-
-                    _t0 = _time.monotonic()
-                    file_path.rename(target_path)
-                    _elapsed = _time.monotonic() - _t0
-                    moved_count += 1
-                    progress_callback(idx + 1, total_files, f"Moved {file_path.name} to {category}")
-                    # Index in database (best-effort; never raises)
-                    self._index_texture_in_db(
-                        file_path, category, confidence, lod_group, lod_level
-                    )
-                    # Record success in statistics tracker
-                    if self.statistics_tracker:
-                        try:
-                            _fsize = file_path.stat().st_size
-                        except OSError:
-                            _fsize = 0
-                        try:
-                            self.statistics_tracker.record_file_processed(
-                                category, _fsize, _elapsed, success=True
-                            )
-                        except Exception:
-                            pass
-                except Exception as e:
-                    failed_count += 1
-                    log_callback(f"⚠️ Failed to move {file_path.name}: {e}")
-                    progress_callback(idx + 1, total_files, f"Failed: {file_path.name}")
-                    self._index_texture_in_db(
-                        file_path, category, confidence, lod_group, lod_level,
-                        operation='sort', error=str(e)
-                    )
-                    # Record failure in statistics tracker
-                    if self.statistics_tracker:
-                        try:
-                            self.statistics_tracker.record_error('move_failed', str(e))
-                        except Exception:
-                            pass
-            
             # Report results
             log_callback(f"\n✅ Sorting completed!")
             log_callback(f"   Successfully moved: {moved_count} files")
@@ -2748,24 +2660,6 @@ class TextureSorterMainWindow(QMainWindow):
             log_callback(f"❌ Sorting failed: {str(e)}")
             log_callback(f"Traceback: {traceback.format_exc()}")
 
-    def _index_texture_in_db(self, file_path: 'Path', category: str,
-                             confidence: float, lod_group, lod_level,
-                             operation: str = 'sort', error: str = '') -> None:
-        """Index a processed texture in the SQLite database (best-effort, never raises)."""
-        if not self.database:
-            return
-        try:
-            self.database.add_texture(file_path, {
-                'category': category,
-                'confidence': confidence,
-                'lod_group': lod_group,
-                'lod_level': lod_level,
-            })
-            status = 'ok' if not error else 'error'
-            self.database.log_operation(operation, file_path, status, error)
-        except Exception as _e:
-            logger.debug("Database index error: %s", _e)
-
     def _pattern_classify(self, filename: str) -> tuple:
         """Fallback pattern-based classification."""
         filename_lower = filename.lower()
@@ -4191,4 +4085,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for the sort pipeline's process pools in frozen builds
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
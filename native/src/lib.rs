@@ -6,8 +6,14 @@
 //! - Batch parallel image processing via Rayon
 //! - Bitmap to SVG vector tracing (via vtracer)
 //!
-//! Built with PyO3 for seamless Python integration.
-
+//! Built with PyO3 for seamless Python integration. The ``*_array`` entry
+//! points read NumPy buffers in place, return NumPy arrays and release the
+//! GIL while they work.
+
+use numpy::{
+    IntoPyArray, PyArray1, PyArray2, PyArray3, PyArrayMethods, PyReadonlyArray3,
+    PyReadonlyArray4, PyUntypedArrayMethods,
+};
 use pyo3::prelude::*;
 use rayon::prelude::*;
 use vtracer::{convert, Config, ColorMode, Hierarchical, ColorImage};
@@ -182,6 +188,11 @@ fn perceptual_hash(data: &[u8], width: usize, height: usize) -> PyResult<u64> {
             "data length must equal width * height * 3 (RGB)",
         ));
     }
+    Ok(hash_pixels(data, width, height, 3))
+}
+
+/// Perceptual hash of validated pixel data with 3 (RGB) or 4 (RGBA) channels.
+fn hash_pixels(data: &[u8], width: usize, height: usize, channels: usize) -> u64 {
     // Down-sample to 8x8 grayscale using area averaging.
     let mut gray8x8 = [0.0f64; 64];
     let bw = width as f64 / 8.0;
@@ -196,7 +207,7 @@ fn perceptual_hash(data: &[u8], width: usize, height: usize) -> PyResult<u64> {
             let mut count = 0u64;
             for y in y0..y1 {
                 for x in x0..x1 {
-                    let off = (y * width + x) * 3;
+                    let off = (y * width + x) * channels;
                     let r = data[off] as f64;
                     let g = data[off + 1] as f64;
                     let b = data[off + 2] as f64;
@@ -215,7 +226,7 @@ fn perceptual_hash(data: &[u8], width: usize, height: usize) -> PyResult<u64> {
             hash |= 1u64 << i;
         }
     }
-    Ok(hash)
+    hash
 }
 
 /// Compute the Hamming distance between two 64-bit perceptual hashes.
@@ -273,11 +284,16 @@ fn color_histogram(
             "bins must be between 1 and 256",
         ));
     }
+    Ok(histogram_pixels(data, width, height, 3, bins))
+}
+
+/// Normalized histogram of validated pixel data (3 or 4 channels, alpha ignored).
+fn histogram_pixels(data: &[u8], width: usize, height: usize, channels: usize, bins: usize) -> Vec<f64> {
     let total_pixels = width * height;
     let mut hist = vec![0u64; 3 * bins];
     let bin_width = 256.0 / bins as f64;
     for i in 0..total_pixels {
-        let off = i * 3;
+        let off = i * channels;
         for c in 0..3 {
             let b = (data[off + c] as f64 / bin_width) as usize;
             let b = b.min(bins - 1);
@@ -285,8 +301,7 @@ fn color_histogram(
         }
     }
     let norm = total_pixels as f64;
-    let normalized: Vec<f64> = hist.iter().map(|&v| v as f64 / norm).collect();
-    Ok(normalized)
+    hist.iter().map(|&v| v as f64 / norm).collect()
 }
 
 /// Compute edge density of a grayscale image using a Sobel-like operator.
@@ -386,6 +401,18 @@ fn bitmap_to_svg(
             "data length must equal width * height * 3 (RGB)",
         ));
     }
+    trace_pixels(data, width, height, 3, threshold, mode)
+}
+
+/// Vector-trace validated pixel data with 3 or 4 channels (alpha ignored).
+fn trace_pixels(
+    data: &[u8],
+    width: usize,
+    height: usize,
+    channels: usize,
+    threshold: u8,
+    mode: &str,
+) -> PyResult<String> {
     if width == 0 || height == 0 {
         return Err(pyo3::exceptions::PyValueError::new_err(
             "width and height must be > 0",
@@ -395,7 +422,7 @@ fn bitmap_to_svg(
     // Convert RGB to RGBA (vtracer expects RGBA)
     let mut rgba_data: Vec<u8> = Vec::with_capacity(width * height * 4);
     for i in 0..width * height {
-        let offset = i * 3;
+        let offset = i * channels;
         rgba_data.push(data[offset]);     // R
         rgba_data.push(data[offset + 1]); // G
         rgba_data.push(data[offset + 2]); // B
@@ -531,6 +558,194 @@ fn batch_color_histogram(
     results.into_iter().collect()
 }
 
+// ---------------------------------------------------------------------------
+// Zero-copy NumPy entry points
+// ---------------------------------------------------------------------------
+
+/// One (H, W, C) image borrowed from a NumPy buffer.
+struct ImageView<'a> {
+    data: &'a [u8],
+    width: usize,
+    height: usize,
+    channels: usize,
+}
+
+/// A batch of uint8 images: one stacked ``(N, H, W, C)`` array or a list
+/// of C-contiguous ``(H, W, C)`` arrays. C must be 3 (RGB) or 4 (RGBA).
+#[derive(FromPyObject)]
+enum ImageBatch<'py> {
+    Stacked(PyReadonlyArray4<'py, u8>),
+    List(Vec<PyReadonlyArray3<'py, u8>>),
+}
+
+fn check_channels(channels: usize) -> PyResult<()> {
+    if channels != 3 && channels != 4 {
+        return Err(pyo3::exceptions::PyValueError::new_err(
+            "images must have 3 (RGB) or 4 (RGBA) channels",
+        ));
+    }
+    Ok(())
+}
+
+fn contiguous<'a>(data: Result<&'a [u8], numpy::NotContiguousError>) -> PyResult<&'a [u8]> {
+    data.map_err(|_| pyo3::exceptions::PyValueError::new_err("images must be C-contiguous"))
+}
+
+impl<'py> ImageBatch<'py> {
+    /// Borrow every image in place (no copies).
+    fn views(&self) -> PyResult<Vec<ImageView<'_>>> {
+        match self {
+            ImageBatch::Stacked(array) => {
+                let shape = array.shape();
+                let (n, height, width, channels) = (shape[0], shape[1], shape[2], shape[3]);
+                check_channels(channels)?;
+                let data = contiguous(array.as_slice())?;
+                let frame = height * width * channels;
+                Ok((0..n)
+                    .map(|i| ImageView {
+                        data: &data[i * frame..(i + 1) * frame],
+                        width,
+                        height,
+                        channels,
+                    })
+                    .collect())
+            }
+            ImageBatch::List(arrays) => arrays
+                .iter()
+                .map(|array| {
+                    let shape = array.shape();
+                    check_channels(shape[2])?;
+                    Ok(ImageView {
+                        data: contiguous(array.as_slice())?,
+                        width: shape[1],
+                        height: shape[0],
+                        channels: shape[2],
+                    })
+                })
+                .collect(),
+        }
+    }
+}
+
+/// Perceptual hashes of a batch of images, computed in parallel without
+/// copying the pixel data.
+///
+/// Parameters
+/// ----------
+/// images : np.ndarray | list[np.ndarray]
+///     Stacked ``(N, H, W, C)`` uint8 array or list of ``(H, W, C)`` arrays.
+///
+/// Returns
+/// -------
+/// np.ndarray
+///     ``uint64`` array of N hashes.
+#[pyfunction]
+fn batch_perceptual_hash_array<'py>(
+    py: Python<'py>,
+    images: ImageBatch<'py>,
+) -> PyResult<Bound<'py, PyArray1<u64>>> {
+    let views = images.views()?;
+    let hashes: Vec<u64> = py.allow_threads(|| {
+        views
+            .par_iter()
+            .map(|v| hash_pixels(v.data, v.width, v.height, v.channels))
+            .collect()
+    });
+    Ok(hashes.into_pyarray(py))
+}
+
+/// Color histograms of a batch of images, computed in parallel without
+/// copying the pixel data.
+///
+/// Parameters
+/// ----------
+/// images : np.ndarray | list[np.ndarray]
+///     Stacked ``(N, H, W, C)`` uint8 array or list of ``(H, W, C)`` arrays.
+/// bins : int, default 16
+///     Number of histogram bins per channel.
+///
+/// Returns
+/// -------
+/// np.ndarray
+///     ``(N, 3 * bins)`` float64 array of normalized histograms.
+#[pyfunction]
+#[pyo3(signature = (images, bins=16))]
+fn batch_color_histogram_array<'py>(
+    py: Python<'py>,
+    images: ImageBatch<'py>,
+    bins: usize,
+) -> PyResult<Bound<'py, PyArray2<f64>>> {
+    if bins == 0 || bins > 256 {
+        return Err(pyo3::exceptions::PyValueError::new_err(
+            "bins must be between 1 and 256",
+        ));
+    }
+    let views = images.views()?;
+    let n = views.len();
+    let flat: Vec<f64> = py.allow_threads(|| {
+        views
+            .par_iter()
+            .flat_map_iter(|v| histogram_pixels(v.data, v.width, v.height, v.channels, bins))
+            .collect()
+    });
+    flat.into_pyarray(py).reshape([n, 3 * bins])
+}
+
+/// Vector-trace a batch of images in parallel without copying the pixel data.
+///
+/// Parameters
+/// ----------
+/// images : np.ndarray | list[np.ndarray]
+///     Stacked ``(N, H, W, C)`` uint8 array or list of ``(H, W, C)`` arrays.
+/// threshold : int, optional
+///     Color difference threshold (default: 25).
+/// mode : str, optional
+///     Tracing mode (default: "color").
+///
+/// Returns
+/// -------
+/// list[str]
+///     Corresponding SVG strings.
+#[pyfunction]
+#[pyo3(signature = (images, threshold=25, mode="color"))]
+fn batch_bitmap_to_svg_array<'py>(
+    py: Python<'py>,
+    images: ImageBatch<'py>,
+    threshold: u8,
+    mode: &str,
+) -> PyResult<Vec<String>> {
+    let views = images.views()?;
+    py.allow_threads(|| {
+        views
+            .par_iter()
+            .map(|v| trace_pixels(v.data, v.width, v.height, v.channels, threshold, mode))
+            .collect()
+    })
+}
+
+/// Lanczos-3 upscale of an ``(H, W, C)`` uint8 array.
+///
+/// Reads the input buffer in place and hands the output buffer to NumPy
+/// without copying; the GIL is released while upscaling.
+///
+/// Returns
+/// -------
+/// np.ndarray
+///     ``(H * scale, W * scale, C)`` uint8 array.
+#[pyfunction]
+fn lanczos_upscale_array<'py>(
+    py: Python<'py>,
+    image: PyReadonlyArray3<'py, u8>,
+    scale: usize,
+) -> PyResult<Bound<'py, PyArray3<u8>>> {
+    let shape = image.shape();
+    let (height, width, channels) = (shape[0], shape[1], shape[2]);
+    let data = contiguous(image.as_slice())?;
+    let (out, new_w, new_h) =
+        py.allow_threads(|| lanczos_upscale(data, width, height, channels, scale))?;
+    out.into_pyarray(py).reshape([new_h, new_w, channels])
+}
+
 // ---------------------------------------------------------------------------
 // Python module
 // ---------------------------------------------------------------------------
@@ -558,5 +773,11 @@ fn texture_ops(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(batch_perceptual_hash, m)?)?;
     m.add_function(wrap_pyfunction!(batch_color_histogram, m)?)?;
 
+    // Zero-copy NumPy batch operations
+    m.add_function(wrap_pyfunction!(batch_perceptual_hash_array, m)?)?;
+    m.add_function(wrap_pyfunction!(batch_color_histogram_array, m)?)?;
+    m.add_function(wrap_pyfunction!(batch_bitmap_to_svg_array, m)?)?;
+    m.add_function(wrap_pyfunction!(lanczos_upscale_array, m)?)?;
+
     Ok(())
 }
@@ -95,10 +95,14 @@ class ModelManager:
         offline_model = None
         if config.get('offline_enabled', True):
             model_path = config.get('offline_model_path')
+            num_threads = config.get('offline_num_threads', 4)
+            batch_size = config.get('offline_batch_size', 32)
             if model_path:
-                offline_model = OfflineModel(Path(model_path))
+                offline_model = OfflineModel(Path(model_path), num_threads=num_threads,
+                                             batch_size=batch_size)
             else:
-                offline_model = create_default_model()
+                offline_model = create_default_model(num_threads=num_threads,
+                                                     batch_size=batch_size)
         
         # Create online model
         online_model = None
@@ -176,6 +180,15 @@ class ModelManager:
             except Exception as e:
                 logger.warning(f"Offline prediction failed: {e}")
         
+        return self._combine_predictions(online_predictions, offline_predictions, top_k)
+    
+    def _combine_predictions(
+        self,
+        online_predictions: List[Dict[str, float]],
+        offline_predictions: List[Dict[str, float]],
+        top_k: int
+    ) -> List[Dict[str, float]]:
+        """Blend or fall back between model outputs for one image and apply min_confidence."""
         # Blend predictions if both available
         if online_predictions and offline_predictions:
             with self._lock:
@@ -347,6 +360,9 @@ class ModelManager:
         """
         Batch prediction with fallback and blending.
         
+        The offline model runs batched inference over all images at once;
+        the online model is still queried per image.
+        
         Args:
             images: List of input images
             categories: Optional categories for online model
@@ -356,12 +372,39 @@ class ModelManager:
         Returns:
             List of prediction lists
         """
-        results = []
-        for image in images:
-            predictions = self.predict(image, categories, top_k, use_online)
-            results.append(predictions)
+        count = len(images)
+        with self._lock:
+            self._stats['total_predictions'] += count
+        
+        online_results: List[List[Dict[str, float]]] = [[] for _ in images]
+        offline_results: List[List[Dict[str, float]]] = [[] for _ in images]
+        
+        if use_online and self.online_model and self.online_model.is_enabled():
+            for i, image in enumerate(images):
+                try:
+                    online_results[i] = self.online_model.predict(
+                        image,
+                        categories or [],
+                        top_k=top_k
+                    )
+                except Exception as e:
+                    logger.warning(f"Online prediction failed: {e}")
+        
+        if self.offline_model and self.offline_model.is_loaded():
+            try:
+                logger.debug(f"Running offline batch prediction on {count} images")
+                offline_results = self.offline_model.predict_batch(images, top_k=top_k)
+            except Exception as e:
+                logger.warning(f"Offline batch prediction failed: {e}")
+        
+        with self._lock:
+            self._stats['online_predictions'] += sum(1 for p in online_results if p)
+            self._stats['offline_predictions'] += sum(1 for p in offline_results if p)
         
-        return results
+        return [
+            self._combine_predictions(online, offline, top_k)
+            for online, offline in zip(online_results, offline_results)
+        ]
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -34,22 +34,37 @@ class OfflineModel:
     
     Supports MobileNetV3-like models optimized for CPU inference.
     Thread-safe model loading and inference with confidence scoring.
+    
+    Batches are preprocessed into one (N, C, H, W) tensor and run in
+    micro-batches of ``batch_size``. The lock only guards loading and
+    unloading; ``InferenceSession.run`` is thread-safe, so concurrent
+    callers share the session.
     """
     
-    def __init__(self, model_path: Optional[Path] = None, num_threads: int = 4):
+    # ImageNet normalization (standard for most models), folded into a
+    # single multiply-subtract on uint8 pixels: (x / 255 - mean) / std
+    _MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32) if HAS_NUMPY else None
+    _STD = np.array([0.229, 0.224, 0.225], dtype=np.float32) if HAS_NUMPY else None
+    
+    def __init__(self, model_path: Optional[Path] = None, num_threads: int = 4,
+                 batch_size: int = 32):
         """
         Initialize the offline model.
         
         Args:
             model_path: Path to ONNX model file (.onnx)
             num_threads: Number of CPU threads for inference
+            batch_size: Maximum images per inference call (micro-batch size)
         """
         self.model_path = model_path
         self.num_threads = num_threads
+        self.batch_size = max(1, int(batch_size))
         self.session: Optional[ort.InferenceSession] = None
         self.input_name: Optional[str] = None
         self.output_name: Optional[str] = None
         self.input_shape: Optional[Tuple[int, ...]] = None
+        # Fixed batch dimension of the model input, or None when dynamic
+        self.fixed_batch: Optional[int] = None
         self.categories: List[str] = []
         self._lock = threading.Lock()
         self._loaded = False
@@ -92,6 +107,8 @@ class OfflineModel:
                 self.input_name = self.session.get_inputs()[0].name
                 self.output_name = self.session.get_outputs()[0].name
                 self.input_shape = self.session.get_inputs()[0].shape
+                batch_dim = self.input_shape[0] if self.input_shape else None
+                self.fixed_batch = batch_dim if isinstance(batch_dim, int) and batch_dim > 0 else None
                 
                 # Load categories from model metadata if available
                 metadata = self.session.get_modelmeta()
@@ -125,6 +142,31 @@ class OfflineModel:
         Returns:
             Preprocessed image tensor (N, C, H, W)
         """
+        return self.preprocess_batch([image])
+    
+    def preprocess_batch(self, images: List[np.ndarray]) -> np.ndarray:
+        """
+        Preprocess several images into one model input tensor.
+        
+        Images are resized one by one into a shared uint8 buffer; conversion,
+        normalization and the HWC -> CHW transpose run once over the batch.
+        
+        Args:
+            images: Input images as numpy arrays (H, W), (H, W, 3) or (H, W, 4)
+            
+        Returns:
+            Preprocessed image tensor (N, C, H, W)
+        """
+        return self._preprocess(images)[0]
+    
+    def _preprocess(self, images: List[np.ndarray],
+                    skip_errors: bool = False) -> Tuple[np.ndarray, List[int]]:
+        """
+        Build the input tensor, optionally leaving out images that fail.
+        
+        Returns:
+            Tuple of (tensor, indices of the images it contains)
+        """
         if not self.is_loaded() or self.input_shape is None:
             raise RuntimeError("Model not loaded")
         
@@ -132,41 +174,37 @@ class OfflineModel:
         target_h = self.input_shape[2] if len(self.input_shape) > 2 else 224
         target_w = self.input_shape[3] if len(self.input_shape) > 3 else 224
         
-        # Resize image
         from PIL import Image
-        if image.dtype == np.uint8:
-            img_pil = Image.fromarray(image)
-        else:
-            img_pil = Image.fromarray((image * 255).astype(np.uint8))
-        
-        img_resized = img_pil.resize((target_w, target_h), Image.Resampling.BILINEAR)
-        img_array = np.array(img_resized).astype(np.float32)
-        
-        # Normalize to [0, 1]
-        img_array = img_array / 255.0
-        
-        # ImageNet normalization (standard for most models)
-        mean = np.array([0.485, 0.456, 0.406], dtype=np.float32)
-        std = np.array([0.229, 0.224, 0.225], dtype=np.float32)
-        
-        if img_array.ndim == 2:
-            # Grayscale - convert to RGB
-            img_array = np.stack([img_array] * 3, axis=-1)
-        
-        if img_array.shape[2] == 4:
-            # RGBA - drop alpha channel
-            img_array = img_array[:, :, :3]
-        
-        # Normalize
-        img_array = (img_array - mean) / std
-        
-        # Convert HWC to CHW
-        img_array = np.transpose(img_array, (2, 0, 1))
+        batch = np.empty((len(images), target_h, target_w, 3), dtype=np.uint8)
+        valid: List[int] = []
+        for i, image in enumerate(images):
+            try:
+                if image.dtype != np.uint8:
+                    image = (image * 255).astype(np.uint8)
+                img_pil = Image.fromarray(image)
+                resized = np.asarray(img_pil.resize((target_w, target_h), Image.Resampling.BILINEAR))
+                if resized.ndim == 2:
+                    # Grayscale - broadcast to RGB
+                    batch[len(valid)] = resized[:, :, None]
+                else:
+                    # RGBA - drop alpha channel
+                    batch[len(valid)] = resized[:, :, :3]
+            except Exception as e:
+                if not skip_errors:
+                    raise
+                logger.error(f"Preprocessing failed: {e}", exc_info=True)
+                continue
+            valid.append(i)
+        batch = batch[:len(valid)]
         
-        # Add batch dimension
-        img_array = np.expand_dims(img_array, axis=0)
+        scale = 1.0 / (255.0 * self._STD)
+        offset = self._MEAN / self._STD
+        tensor = batch.astype(np.float32)
+        tensor *= scale
+        tensor -= offset
         
-        return img_array
+        # Convert NHWC to NCHW
+        return np.ascontiguousarray(tensor.transpose(0, 3, 1, 2)), valid
     
     def predict(self, image: np.ndarray, top_k: int = 5) -> List[Dict[str, float]]:
         """
@@ -184,47 +222,18 @@ class OfflineModel:
             logger.warning("Model not loaded, returning empty predictions")
             return []
         
-        try:
-            # Preprocess image
-            input_tensor = self.preprocess_image(image)
-            
-            # Run inference
-            with self._lock:
-                outputs = self.session.run(
-                    [self.output_name],
-                    {self.input_name: input_tensor}
-                )
-            
-            # Get predictions
-            logits = outputs[0][0]  # Remove batch dimension
-            
-            # Apply softmax
-            exp_logits = np.exp(logits - np.max(logits))
-            probabilities = exp_logits / np.sum(exp_logits)
-            
-            # Get top-k predictions
-            top_indices = np.argsort(probabilities)[-top_k:][::-1]
-            
-            predictions = []
-            for idx in top_indices:
-                category = self.categories[idx] if idx < len(self.categories) else f"class_{idx}"
-                confidence = float(probabilities[idx])
-                predictions.append({
-                    'category': category,
-                    'confidence': confidence
-                })
-            
-            logger.debug(f"Predictions: {predictions[:3]}")
-            return predictions
-            
-        except Exception as e:
-            logger.error(f"Prediction failed: {e}", exc_info=True)
-            return []
+        predictions = self.predict_batch([image], top_k)[0]
+        logger.debug(f"Predictions: {predictions[:3]}")
+        return predictions
     
     def predict_batch(self, images: List[np.ndarray], top_k: int = 5) -> List[List[Dict[str, float]]]:
         """
         Run batch inference on multiple images.
         
+        Images are processed in micro-batches of ``batch_size``. An image that
+        fails to preprocess gets an empty prediction list without affecting
+        the rest of its batch.
+        
         Args:
             images: List of input images
             top_k: Number of top predictions per image
@@ -232,9 +241,54 @@ class OfflineModel:
         Returns:
             List of prediction lists
         """
+        results: List[List[Dict[str, float]]] = [[] for _ in images]
+        # Snapshot the session so a concurrent unload() cannot swap it mid-run
+        session = self.session
+        if not self._loaded or session is None:
+            logger.warning("Model not loaded, returning empty predictions")
+            return results
+        
+        step = self.fixed_batch or self.batch_size
+        for start in range(0, len(images), step):
+            try:
+                tensor, valid = self._preprocess(images[start:start + step], skip_errors=True)
+                if not valid:
+                    continue
+                logits = self._run(session, tensor)
+            except Exception as e:
+                logger.error(f"Prediction failed: {e}", exc_info=True)
+                continue
+            for offset, predictions in zip(valid, self._top_k(logits, top_k)):
+                results[start + offset] = predictions
+        return results
+    
+    def _run(self, session: 'ort.InferenceSession', tensor: np.ndarray) -> np.ndarray:
+        """Run the session on a batch, padding to the model's fixed batch size if it has one"""
+        count = tensor.shape[0]
+        if self.fixed_batch is not None and count != self.fixed_batch:
+            padded = np.zeros((self.fixed_batch,) + tensor.shape[1:], dtype=tensor.dtype)
+            padded[:count] = tensor
+            tensor = padded
+        outputs = session.run([self.output_name], {self.input_name: tensor})
+        return outputs[0][:count]
+    
+    def _top_k(self, logits: np.ndarray, top_k: int) -> List[List[Dict[str, float]]]:
+        """Softmax over each row of logits and return the top-k categories per image"""
+        logits = logits.reshape(logits.shape[0], -1)
+        exp_logits = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probabilities = exp_logits / exp_logits.sum(axis=1, keepdims=True)
+        
+        top_indices = np.argsort(probabilities, axis=1)[:, -top_k:][:, ::-1]
+        
         results = []
-        for image in images:
-            predictions = self.predict(image, top_k)
+        for row, indices in zip(probabilities, top_indices):
+            predictions = []
+            for idx in indices:
+                category = self.categories[idx] if idx < len(self.categories) else f"class_{idx}"
+                predictions.append({
+                    'category': category,
+                    'confidence': float(row[idx])
+                })
             results.append(predictions)
         return results
     
@@ -251,7 +305,9 @@ class OfflineModel:
             'input_shape': self.input_shape,
             'num_categories': len(self.categories),
             'categories': self.categories,
-            'num_threads': self.num_threads
+            'num_threads': self.num_threads,
+            'batch_size': self.batch_size,
+            'fixed_batch': self.fixed_batch
         }
         
         if self.session:
@@ -302,10 +358,14 @@ def get_default_model_path() -> Optional[Path]:
     return None
 
 
-def create_default_model() -> Optional[OfflineModel]:
+def create_default_model(num_threads: int = 4, batch_size: int = 32) -> Optional[OfflineModel]:
     """
     Create offline model with default settings.
     
+    Args:
+        num_threads: Number of CPU threads for inference
+        batch_size: Maximum images per inference call
+    
     Returns:
         OfflineModel instance or None if no model available
     """
@@ -313,7 +373,7 @@ def create_default_model() -> Optional[OfflineModel]:
     
     if model_path:
         logger.info(f"Using default model: {model_path}")
-        return OfflineModel(model_path)
+        return OfflineModel(model_path, num_threads=num_threads, batch_size=batch_size)
     else:
         logger.info("No default model found. AI features will use rule-based fallback.")
         return None
@@ -1,5 +1,6 @@
 """Classifier module for texture classification"""
 from .categories import ALL_CATEGORIES, CATEGORY_GROUPS, get_category_names
 from .classifier_engine import TextureClassifier
+from .keyword_matcher import KeywordMatcher
 
-__all__ = ['ALL_CATEGORIES', 'CATEGORY_GROUPS', 'get_category_names', 'TextureClassifier']
+__all__ = ['ALL_CATEGORIES', 'CATEGORY_GROUPS', 'get_category_names', 'TextureClassifier', 'KeywordMatcher']
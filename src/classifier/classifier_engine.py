@@ -7,7 +7,6 @@ Automatically classifies textures into 50+ categories using:
 - Metadata examination
 """
 
-import re
 from pathlib import Path
 from typing import List, Tuple, Optional
 import logging
@@ -36,20 +35,18 @@ except ImportError:
     HAS_CV2 = False
     logger.debug("OpenCV not available - some features disabled")
 
-# Native Rust acceleration for feature extraction
 try:
-    from native_ops import (
-        edge_density as native_edge_density,
-        color_histogram as native_color_histogram,
-        NATIVE_AVAILABLE,
-    )
-except ImportError as e:
-    logger.debug(f"Native acceleration not available: {e}")
-    NATIVE_AVAILABLE = False
-    native_edge_density = None
-    native_color_histogram = None
+    from ..utils.analysis_cache import AnalysisCache, get_analysis_cache
+except ImportError:
+    try:
+        from utils.analysis_cache import AnalysisCache, get_analysis_cache
+    except ImportError:
+        AnalysisCache = None  # type: ignore[assignment,misc]
+        get_analysis_cache = None  # type: ignore[assignment]
 
 from .categories import ALL_CATEGORIES, get_category_info
+from .keyword_matcher import KeywordMatcher
+from .image_features import classify_features, extract_image_features, features_from_image
 
 
 class TextureClassifier:
@@ -58,15 +55,27 @@ class TextureClassifier:
     # Classification confidence thresholds
     HIGH_CONFIDENCE_THRESHOLD = 0.7  # Threshold for accepting filename-based classification
     
-    def __init__(self, config=None, model_manager=None, game_profile=None):
+    # Bump when the image heuristics change so persisted results are recomputed
+    CACHE_VERSION = "2"
+    
+    def __init__(self, config=None, model_manager=None, game_profile=None, analysis_cache=None):
         self.config = config
         self.categories = ALL_CATEGORIES
         self.classification_cache = {}
         self.model_manager = model_manager
         
+        # Persistent cache for the content-based steps (image analysis and AI
+        # predictions). Filename matching is cheap and path-dependent, so it
+        # always runs. Defaults to the shared cache when a config is given.
+        if analysis_cache is None and config is not None and get_analysis_cache is not None:
+            analysis_cache = get_analysis_cache()
+        self.analysis_cache = analysis_cache
+        
         # Game-specific texture profile (NEW)
         self.game_profile = game_profile or {}
         self.game_specific_keywords = self._load_game_keywords()
+        # Compiled filename keyword matcher (rebuilt when the profile changes)
+        self._keyword_matcher = None
         
         # Get AI preferences from config
         if config:
@@ -122,6 +131,7 @@ class TextureClassifier:
         """
         self.game_profile = game_profile
         self.game_specific_keywords = self._load_game_keywords()
+        self._keyword_matcher = None
         # Clear cache when profile changes
         self.classification_cache.clear()
     
@@ -145,6 +155,8 @@ class TextureClassifier:
         
         category = "unclassified"
         confidence = 0.0
+        # Pixels decoded for the AI model, reused by image analysis
+        decoded = []
         
         # Try AI model first if available and prefer_image_content is True
         if self.prefer_image_content and self.model_manager and use_image_analysis:
@@ -154,16 +166,9 @@ class TextureClassifier:
                     import logging
                     logging.debug(f"File not found for AI classification: {file_path}")
                 else:
-                    with Image.open(file_path) as img:
-                        if img.mode != 'RGB':
-                            img = img.convert('RGB')
-                        img_array = np.array(img)
-                    
-                    # Get predictions from AI model
-                    predictions = self.model_manager.predict(img_array, list(self.categories.keys()))
-                    if predictions and len(predictions) > 0:
-                        category = predictions[0]['category']
-                        confidence = predictions[0]['confidence']
+                    category, confidence = self._cached(
+                        file_path, self._model_cache_version(),
+                        lambda: self._classify_by_model(file_path, decoded))
             except Exception as e:
                 import logging
                 logging.debug(f"AI model prediction failed for {file_path}: {e}")
@@ -183,7 +188,9 @@ class TextureClassifier:
         
         # If confidence is still low and image analysis is enabled, try image analysis
         if confidence < self.HIGH_CONFIDENCE_THRESHOLD and use_image_analysis and HAS_PIL:
-            img_category, img_confidence = self._classify_by_image(file_path)
+            img_category, img_confidence = self._cached(
+                file_path, f'image:{self.CACHE_VERSION}',
+                lambda: self._classify_by_image(file_path, decoded[0] if decoded else None))
             if img_confidence > confidence:
                 category, confidence = img_category, img_confidence
         
@@ -192,252 +199,139 @@ class TextureClassifier:
         
         return category, confidence
     
-    def _classify_by_filename(self, file_path: Path) -> Tuple[str, float]:
-        """Classify based on filename patterns"""
-        filename = file_path.stem.lower()
-        best_match = "unclassified"
-        best_score = 0.0
-        
-        # Common video game texture naming conventions to strip before matching
-        # These prefixes/suffixes are used in game engines (Unreal, Unity, Source, etc.)
-        # Strip common prefixes like tex_, t_, mat_, m_ 
-        cleaned = re.sub(r'^(tex_|t_|mat_|m_|uv_|tx_)', '', filename)
-        # Strip common suffixes like _diffuse, _diff, _d, _col, _color, _albedo, _base
-        cleaned = re.sub(r'(_diffuse|_diff|_d|_col|_color|_albedo|_base|_basecolor|_bc|_tex)$', '', cleaned)
-        # Strip resolution suffixes like _512, _1024, _2k, _4k
-        cleaned = re.sub(r'(_\d+x\d+|_\d{3,4}|_[124]k)$', '', cleaned)
-        # Strip LOD suffixes like _lod0, _lod1
-        cleaned = re.sub(r'_lod\d+$', '', cleaned)
-        
-        # Names to check: both original and cleaned versions
-        names_to_check = {filename}
-        if cleaned != filename:
-            names_to_check.add(cleaned)
-        
-        # Also try splitting on underscores and numbers to match individual parts
-        # This helps with names like "char_head_skin_01" -> matches "head", "skin"
-        parts = re.split(r'[_\-\s]+', cleaned)
+    def _classify_by_model(self, file_path: Path, decoded: Optional[list] = None) -> Tuple[str, float]:
+        """
+        Classify with the AI model manager
         
-        # NEW: Check game-specific keywords first (higher priority)
-        if self.game_specific_keywords:
-            for keyword, category in self.game_specific_keywords.items():
-                if category:  # Only if mapped to a category
-                    for name in names_to_check:
-                        if keyword in name:
-                            # High confidence for game-specific matches
-                            score = 0.9
-                            if name.startswith(keyword):
-                                score = 1.0
-                            if score > best_score:
-                                best_score = score
-                                best_match = category
-                    
-                    # Check parts
-                    for part in parts:
-                        if part and keyword == part:
-                            score = 0.95
-                            if score > best_score:
-                                best_score = score
-                                best_match = category
+        Args:
+            file_path: Path to the texture file
+            decoded: Optional list the decoded RGB array is appended to, so
+                image analysis can reuse it
+        """
+        with Image.open(file_path) as img:
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            img_array = np.array(img)
+        if decoded is not None:
+            decoded.append(img_array)
         
-        # Check each category's keywords
-        for category_id, category_info in self.categories.items():
-            keywords = category_info.get("keywords", [])
-            for keyword in keywords:
-                kw_lower = keyword.lower()
-                
-                for name in names_to_check:
-                    if kw_lower in name:
-                        # Score based on keyword match length and position
-                        score = len(keyword) / max(len(name), 1)
-                        # Bonus for exact matches or start of filename
-                        if name.startswith(kw_lower):
-                            score += 0.2
-                        if name == kw_lower:
-                            score = 1.0
-                        
-                        if score > best_score:
-                            best_score = score
-                            best_match = category_id
-                
-                # Also check individual parts for matches
-                for part in parts:
-                    if part and kw_lower == part:
-                        # Exact part match is a strong signal
-                        score = 0.8
-                        if score > best_score:
-                            best_score = score
-                            best_match = category_id
-                    elif part and kw_lower in part and len(kw_lower) >= 3:
-                        score = len(keyword) / max(len(part), 1) * 0.7
-                        if score > best_score:
-                            best_score = score
-                            best_match = category_id
+        # Get predictions from AI model
+        predictions = self.model_manager.predict(img_array, list(self.categories.keys()))
+        if predictions and len(predictions) > 0:
+            return predictions[0]['category'], predictions[0]['confidence']
+        return "unclassified", 0.0
+    
+    def _model_cache_version(self) -> str:
+        """Cache version for AI predictions: model identity plus category set"""
+        model = getattr(self.model_manager, 'model_name', None) or type(self.model_manager).__name__
+        return f'model:{model}:{len(self.categories)}:{self.CACHE_VERSION}'
+    
+    def _cached(self, file_path: Path, version: str, compute) -> Tuple[str, float]:
+        """
+        Return a content-based classification from the persistent cache,
+        computing and storing it on a miss.
+        """
+        if self.analysis_cache is None:
+            return compute()
+        try:
+            digest = self.analysis_cache.file_digest(file_path)
+        except OSError:
+            return compute()
+        cached = self.analysis_cache.get(digest, AnalysisCache.CLASSIFICATION, version)
+        if cached is not None:
+            return cached[0], cached[1]
+        category, confidence = compute()
+        # Failed analyses report 0.0 confidence; don't persist those
+        if confidence > 0.0:
+            self.analysis_cache.put(digest, AnalysisCache.CLASSIFICATION,
+                                    [category, confidence], version)
+        return category, confidence
+    
+    def _classify_by_filename(self, file_path: Path) -> Tuple[str, float]:
+        """Classify based on filename patterns"""
+        return self._get_keyword_matcher().classify(file_path.stem)
+    
+    def classify_filenames(self, file_paths: List[Path]) -> List[Tuple[str, float]]:
+        """
+        Filename-only classification for many files at once.
         
-        # Normalize score to 0-1 range
-        confidence = min(1.0, best_score + 0.3)  # Add base confidence
+        Args:
+            file_paths: List of file paths to classify
         
-        return best_match, confidence
+        Returns:
+            List of (category, confidence) tuples in input order
+        """
+        return self._get_keyword_matcher().classify_batch([Path(p).stem for p in file_paths])
+    
+    def _get_keyword_matcher(self) -> KeywordMatcher:
+        """Keyword matcher for the current categories and game profile, built on first use"""
+        if self._keyword_matcher is None:
+            self._keyword_matcher = KeywordMatcher(self.categories, self.game_specific_keywords)
+        return self._keyword_matcher
     
-    def _classify_by_image(self, file_path: Path) -> Tuple[str, float]:
-        """Classify based on image analysis"""
+    def _classify_by_image(self, file_path: Path, img_array: Optional['np.ndarray'] = None) -> Tuple[str, float]:
+        """
+        Classify based on image analysis
+        
+        Args:
+            file_path: Path to the texture file
+            img_array: Already decoded RGB pixels, to avoid opening the file again
+        """
         if not HAS_PIL:
             return "unclassified", 0.0
         
         try:
-            # Load image
-            img = Image.open(file_path)
-            
-            # Convert to RGB if necessary
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Analyze image properties
-            width, height = img.size
-            aspect_ratio = width / height if height > 0 else 1.0
-            
-            # Get color histogram
-            histogram = img.histogram()
-            
-            # Analyze dominant colors
-            img_array = np.array(img)
-            avg_color = np.mean(img_array, axis=(0, 1))
-            color_std = np.std(img_array, axis=(0, 1))
-            
-            # Use native edge density when available for faster analysis
-            native_edge = None
-            if NATIVE_AVAILABLE:
-                try:
-                    native_edge = native_edge_density(img_array)
-                except Exception:
-                    pass
-            
-            # Simple heuristic-based classification
-            category = "unclassified"
-            confidence = 0.5
-            
-            # Check for UI elements (usually small, simple colors)
-            if width <= 256 and height <= 256 and self._is_simple_image(img_array):
-                category = "ui_elements"
-                confidence = 0.6
-                # Boost confidence if native edge density confirms sharp edges
-                if native_edge is not None and native_edge > 0.1:
-                    confidence = 0.65
-            
-            # Check for UV unwrapped textures / flattened character textures
-            elif self._is_uv_unwrap(img, img_array, width, height):
-                category = "person"
-                confidence = 0.65
-            
-            # Check for sky (blue dominant)
-            elif avg_color[2] > avg_color[0] * 1.3 and avg_color[2] > avg_color[1] * 1.3:
-                category = "sky"
-                confidence = 0.65
-            
-            # Check for skin tones (flesh-colored textures)
-            elif self._has_skin_tones(avg_color, color_std):
-                category = "skin1"
-                confidence = 0.6
-            
-            # Check for grass/plants (green dominant)
-            elif avg_color[1] > avg_color[0] * 1.2 and avg_color[1] > avg_color[2] * 1.2:
-                category = "grass"
-                confidence = 0.65
-            
-            # Check for dirt/ground (brown tones)
-            elif self._is_brown_tone(avg_color):
-                category = "dirt"
-                confidence = 0.6
-            
-            # Check for technical textures (patterns, symmetry)
-            elif self._has_technical_pattern(img_array):
-                category = "normal_maps"
-                confidence = 0.7
-            
-            # Check for metal/armor textures (gray tones with some variance)
-            elif self._is_metallic(avg_color, color_std):
-                category = "armor"
-                confidence = 0.55
-            
-            return category, confidence
-            
+            if img_array is not None:
+                features = features_from_image(Image.fromarray(img_array))
+            else:
+                features = extract_image_features(file_path)
+            return classify_features([features])[0]
         except Exception as e:
             logger.error(f"Error analyzing image {file_path}: {e}")
             return "unclassified", 0.0
     
-    def _is_simple_image(self, img_array: 'np.ndarray') -> bool:
-        """Check if image has simple/flat colors (typical of UI)"""
-        # Calculate color variance
-        variance = np.var(img_array)
-        return variance < 500  # Low variance = simple colors
-    
-    def _is_brown_tone(self, color: 'np.ndarray') -> bool:
-        """Check if color is brown-ish"""
-        r, g, b = color
-        # Brown is typically R>G>B with moderate values
-        return r > g and g > b and 50 < r < 200
-    
-    def _has_technical_pattern(self, img_array: 'np.ndarray') -> bool:
-        """Check if image has technical/normal map patterns"""
-        # Normal maps typically have purple/blue tones
-        avg_color = np.mean(img_array, axis=(0, 1))
-        # Check for bluish-purple dominant color
-        if avg_color[2] > 100 and avg_color[0] > 80 and avg_color[1] < 100:
-            return True
-        return False
-    
-    def _has_skin_tones(self, avg_color: 'np.ndarray', color_std: 'np.ndarray') -> bool:
-        """Check if image has skin/flesh tones typical of character textures"""
-        r, g, b = avg_color
-        # Skin tones: R > G > B, warm colors, moderate values
-        if r > g > b and r > 100 and g > 60 and b > 40:
-            # Check if the difference is moderate (not pure red)
-            if (r - b) < 100 and (r - g) < 60:
-                return True
-        return False
-    
-    def _is_uv_unwrap(self, img, img_array: 'np.ndarray', width: int, height: int) -> bool:
+    def classify_images(self, file_paths: List[Path]) -> List[Tuple[str, float]]:
         """
-        Detect UV unwrapped textures (flattened character/object maps).
-        These look like 'origami' - disjointed body parts laid out flat with
-        blank/transparent/black regions between them.
+        Image-analysis classification for many files, evaluated as one batch.
+        
+        Each file is decoded once at reduced size; results already in the
+        persistent cache are reused.
+        
+        Args:
+            file_paths: List of file paths to classify
+        
+        Returns:
+            List of (category, confidence) tuples in input order
         """
-        try:
-            # UV unwraps are usually square power-of-2 textures
-            if width != height:
-                return False
-            if width not in (64, 128, 256, 512, 1024, 2048, 4096):
-                return False
-            
-            # Check for significant dark/transparent regions (background of UV layout)
-            # Downsample for performance
-            small = img.resize((64, 64))
-            small_arr = np.array(small)
-            
-            # Count near-black pixels (UV layout background)
-            if small_arr.shape[2] >= 3:
-                brightness = np.mean(small_arr[:, :, :3], axis=2)
-                dark_ratio = np.sum(brightness < 20) / brightness.size
-                # UV unwraps typically have 15-70% dark background
-                if 0.15 < dark_ratio < 0.70:
-                    # Also check that non-dark regions have varied colors
-                    bright_pixels = small_arr[brightness >= 20]
-                    if len(bright_pixels) > 10:
-                        color_variance = np.var(bright_pixels[:, :3])
-                        if color_variance > 300:
-                            return True
-        except Exception:
-            pass
-        return False
-    
-    def _is_metallic(self, avg_color: 'np.ndarray', color_std: 'np.ndarray') -> bool:
-        """Check if image has metallic/gray tones typical of armor/metal textures"""
-        r, g, b = avg_color
-        # Metallic: all channels similar (grayish), moderate values
-        if abs(r - g) < 20 and abs(g - b) < 20 and abs(r - b) < 20:
-            if 80 < r < 200:  # Not too dark, not too bright
-                return True
-        return False
+        results: List[Tuple[str, float]] = [("unclassified", 0.0)] * len(file_paths)
+        if not HAS_PIL:
+            return results
+        
+        version = f'image:{self.CACHE_VERSION}'
+        pending = []  # (index, digest, features)
+        for i, file_path in enumerate(file_paths):
+            digest = None
+            if self.analysis_cache is not None:
+                try:
+                    digest = self.analysis_cache.file_digest(Path(file_path))
+                    cached = self.analysis_cache.get(digest, AnalysisCache.CLASSIFICATION, version)
+                    if cached is not None:
+                        results[i] = (cached[0], cached[1])
+                        continue
+                except OSError:
+                    digest = None
+            try:
+                pending.append((i, digest, extract_image_features(Path(file_path))))
+            except Exception as e:
+                logger.error(f"Error analyzing image {file_path}: {e}")
+        
+        classified = classify_features([features for _, _, features in pending])
+        for (i, digest, _), (category, confidence) in zip(pending, classified):
+            results[i] = (category, confidence)
+            if digest is not None:
+                self.analysis_cache.put(digest, AnalysisCache.CLASSIFICATION,
+                                        [category, confidence], version)
+        return results
     
     def batch_classify(self, file_paths: List[Path], use_image_analysis=True, 
                       progress_callback=None) -> dict:
@@ -0,0 +1,190 @@
+"""
+Image Feature Extraction
+Single-decode feature pass for the classifier's image heuristics. Each image
+is opened once and decoded at reduced size (JPEG DCT scaling via
+Image.draft, integer box reduction for other formats such as DDS); every
+statistic the heuristics need comes from that small array. Features for many
+images can be stacked so the heuristics run as array operations over the
+whole batch.
+"""
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+# Native Rust acceleration for edge density
+try:
+    from native_ops import edge_density as native_edge_density, NATIVE_AVAILABLE
+except ImportError:
+    NATIVE_AVAILABLE = False
+    native_edge_density = None
+
+# Longest side of the array the colour statistics are computed on. The only
+# variance-based check (UI elements) applies to images up to this size, so
+# for those the statistics are exact.
+STATS_SIZE = 256
+
+# Side of the square thumbnail used by the UV-layout check
+THUMBNAIL_SIZE = 64
+
+# Square power-of-two sizes UV unwraps are expected to use
+_UV_SIZES = (64, 128, 256, 512, 1024, 2048, 4096)
+
+# Heuristic outcomes in evaluation order: the first matching rule wins
+_RULES = (
+    ("ui_elements", 0.6),   # small, flat colours
+    ("person", 0.65),       # UV unwrap / flattened character texture
+    ("sky", 0.65),          # blue dominant
+    ("skin1", 0.6),         # flesh tones
+    ("grass", 0.65),        # green dominant
+    ("dirt", 0.6),          # brown tones
+    ("normal_maps", 0.7),   # bluish-purple technical maps
+    ("armor", 0.55),        # grey metallic tones
+)
+
+
+@dataclass
+class ImageFeatures:
+    """Everything the image heuristics look at, for one image."""
+    width: int
+    height: int
+    avg_color: 'np.ndarray'   # mean R, G, B
+    color_std: 'np.ndarray'   # per-channel standard deviation
+    variance: float           # variance over all channels
+    thumbnail: 'np.ndarray'   # THUMBNAIL_SIZE x THUMBNAIL_SIZE x 3 uint8
+    edge_density: Optional[float] = None
+
+
+def extract_image_features(file_path: Path) -> ImageFeatures:
+    """
+    Decode an image once at reduced size and compute its features.
+
+    Args:
+        file_path: Path to the image
+
+    Returns:
+        ImageFeatures for the image (width/height are the original size)
+    """
+    with Image.open(file_path) as img:
+        width, height = img.size
+        # Only JPEG implements draft; other formats ignore it
+        img.draft('RGB', (STATS_SIZE, STATS_SIZE))
+        return features_from_image(img, width, height)
+
+
+def features_from_image(img: 'Image.Image', width: Optional[int] = None,
+                        height: Optional[int] = None) -> ImageFeatures:
+    """
+    Compute features from an already opened or decoded image.
+
+    Args:
+        img: PIL image
+        width: Original width when ``img`` has already been reduced
+        height: Original height when ``img`` has already been reduced
+    """
+    if width is None or height is None:
+        width, height = img.size
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    factor = -(-max(img.size) // STATS_SIZE)
+    if factor > 1:
+        img = img.reduce(factor)
+
+    img_array = np.asarray(img)
+    thumbnail = np.asarray(img.resize((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.Resampling.BOX))
+
+    edge = None
+    # Edge density only refines the small-image (UI) rule, where the array
+    # is still full resolution
+    if NATIVE_AVAILABLE and width <= STATS_SIZE and height <= STATS_SIZE:
+        try:
+            edge = native_edge_density(np.ascontiguousarray(img_array))
+        except Exception:
+            pass
+
+    return ImageFeatures(
+        width=width,
+        height=height,
+        avg_color=img_array.mean(axis=(0, 1)),
+        color_std=img_array.std(axis=(0, 1)),
+        variance=float(img_array.var()),
+        thumbnail=thumbnail,
+        edge_density=edge,
+    )
+
+
+def classify_features(features: Sequence[ImageFeatures]) -> List[Tuple[str, float]]:
+    """
+    Evaluate the image heuristics for a batch of images at once.
+
+    Args:
+        features: Features from extract_image_features()
+
+    Returns:
+        List of (category_id, confidence) in input order; images matching
+        no rule are ("unclassified", 0.5)
+    """
+    if not features:
+        return []
+
+    width = np.array([f.width for f in features])
+    height = np.array([f.height for f in features])
+    r, g, b = np.stack([f.avg_color for f in features]).T
+    variance = np.array([f.variance for f in features])
+    edge = np.array([np.nan if f.edge_density is None else f.edge_density for f in features])
+
+    # UV layout: 15-70% near-black background (mean brightness < 20, i.e.
+    # channel sum < 60) with varied colours elsewhere
+    thumbs = np.stack([f.thumbnail for f in features])
+    dark = thumbs.sum(axis=3, dtype=np.uint16) < 60
+    dark_ratio = dark.mean(axis=(1, 2))
+    bright = ~dark
+    bright_count = bright.sum(axis=(1, 2))
+    weights = bright[..., None].astype(np.float32)
+    values = thumbs.astype(np.float32)
+    n_values = np.maximum(bright_count * 3, 1)
+    bright_mean = (values * weights).sum(axis=(1, 2, 3)) / n_values
+    deviation = values - bright_mean[:, None, None, None]
+    bright_var = (deviation * deviation * weights).sum(axis=(1, 2, 3)) / n_values
+
+    grey = (np.abs(r - g) < 20) & (np.abs(g - b) < 20) & (np.abs(r - b) < 20)
+    conditions = [
+        (width <= 256) & (height <= 256) & (variance < 500),
+        ((width == height) & np.isin(width, _UV_SIZES)
+         & (dark_ratio > 0.15) & (dark_ratio < 0.70)
+         & (bright_count > 10) & (bright_var > 300)),
+        (b > r * 1.3) & (b > g * 1.3),
+        ((r > g) & (g > b) & (r > 100) & (g > 60) & (b > 40)
+         & (r - b < 100) & (r - g < 60)),
+        (g > r * 1.2) & (g > b * 1.2),
+        (r > g) & (g > b) & (r > 50) & (r < 200),
+        (b > 100) & (r > 80) & (g < 100),
+        grey & (r > 80) & (r < 200),
+    ]
+    rule = np.select(conditions, np.arange(len(_RULES)), default=-1)
+    # Sharp edges (native edge density) boost the UI rule
+    ui_boost = (rule == 0) & (edge > 0.1)
+
+    results = []
+    for index, boost in zip(rule.tolist(), ui_boost.tolist()):
+        if index < 0:
+            results.append(("unclassified", 0.5))
+        else:
+            category, confidence = _RULES[index]
+            results.append((category, 0.65 if boost else confidence))
+    return results
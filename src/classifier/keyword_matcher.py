@@ -0,0 +1,261 @@
+"""
+Compiled Keyword Matcher
+Filename-based classification against the category keyword lists, compiled
+once into trie-shaped regular expressions instead of scanning every keyword
+for every file. Produces exactly the same categories and scores as the
+original per-keyword loop in TextureClassifier.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Naming-convention affixes stripped before matching (applied in this order)
+_PREFIX_RE = re.compile(r'^(tex_|t_|mat_|m_|uv_|tx_)')
+_MAP_SUFFIX_RE = re.compile(r'(_diffuse|_diff|_d|_col|_color|_albedo|_base|_basecolor|_bc|_tex)$')
+_RESOLUTION_SUFFIX_RE = re.compile(r'(_\d+x\d+|_\d{3,4}|_[124]k)$')
+_LOD_SUFFIX_RE = re.compile(r'_lod\d+$')
+_PART_SPLIT_RE = re.compile(r'[_\-\s]+')
+
+_PREFIXES = ('tex_', 't_', 'mat_', 'm_', 'uv_', 'tx_')
+_MAP_SUFFIXES = ('_diffuse', '_diff', '_d', '_col', '_color', '_albedo', '_base',
+                 '_basecolor', '_bc', '_tex')
+
+_END = ''
+_MISSING = object()
+
+
+def split_filename(stem: str) -> Tuple[str, str, List[str]]:
+    """
+    Normalise a filename stem for keyword matching.
+
+    Returns:
+        Tuple of (lower-cased stem, stem with naming affixes stripped, parts
+        of the stripped stem split on underscores, dashes and whitespace;
+        parts may include empty strings, which never match)
+    """
+    filename = stem.lower()
+    # Equivalent to the four re.sub calls in _PREFIX_RE.._LOD_SUFFIX_RE order,
+    # but with str checks first so most names never reach the regex engine
+    cleaned = filename
+    if filename.startswith(_PREFIXES):
+        # The prefixes are mutually exclusive, so the first hit is the match
+        cleaned = filename[len(next(p for p in _PREFIXES if filename.startswith(p))):]
+    if cleaned.endswith('\n'):
+        # ``$`` also matches before a trailing newline; leave that to re
+        cleaned = _MAP_SUFFIX_RE.sub('', cleaned)
+    elif cleaned.endswith(_MAP_SUFFIXES):
+        # The leftmost match is the longest suffix (e.g. _basecolor over _color)
+        cleaned = cleaned[:-max((len(s) for s in _MAP_SUFFIXES if cleaned.endswith(s)))]
+    last = cleaned[-1:]
+    if last.isdecimal() or last == 'k' or last == '\n':
+        cleaned = _RESOLUTION_SUFFIX_RE.sub('', cleaned)
+        if '_lod' in cleaned:
+            cleaned = _LOD_SUFFIX_RE.sub('', cleaned)
+    if cleaned.replace('_', '').isalnum():
+        # No dashes or whitespace: str.split gives the same non-empty parts
+        return filename, cleaned, cleaned.split('_')
+    return filename, cleaned, _PART_SPLIT_RE.split(cleaned)
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """
+    Build a regex matching any of ``words`` whose greedy match at a given
+    position is the longest word starting there.
+    """
+    root: dict = {}
+    for word in words:
+        node = root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[_END] = True
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child)
+                    for ch, child in sorted(node.items()) if ch != _END]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Optional continuation: greedy, so longer words are tried first
+        return '(?:' + body + ')?' if _END in node else body
+
+    return build(root)
+
+
+class KeywordMatcher:
+    """
+    Scores a filename against category keywords.
+
+    Scoring (identical to the original loop, first keyword wins ties):
+
+    - keyword found in the filename or stripped name: len(keyword)/len(name),
+      +0.2 if the name starts with it, 1.0 if it equals the name
+    - keyword equal to a name part: 0.8
+    - keyword (3+ chars) inside a part: len(keyword)/len(part) * 0.7
+    - game-profile keywords: 1.0 as a name prefix, 0.95 as a whole part,
+      0.9 anywhere in a name
+
+    Only the best candidate per scoring rule can win, so each rule reduces
+    to one query against a trie-shaped regex: an exact lookup, the longest
+    proper prefix, the longest keyword anywhere (skipped when it cannot beat
+    the best score so far) and a per-part result that is memoised because
+    parts repeat across a texture dump.
+
+    Example:
+        >>> matcher = KeywordMatcher(ALL_CATEGORIES)
+        >>> matcher.classify('tex_grass_01')
+        ('grass', 1.0)
+    """
+
+    # Distinct parts remembered before the memo is reset
+    _PART_CACHE_LIMIT = 100000
+
+    def __init__(self, categories: Dict[str, dict], game_keywords: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            categories: Category id -> info dict with a "keywords" list
+            game_keywords: Lower-cased game-profile keyword -> category id
+                (None categories are ignored), checked before categories
+        """
+        self.game_keywords = [(kw, cat) for kw, cat in (game_keywords or {}).items() if cat]
+        offset = len(self.game_keywords)
+
+        # keyword -> (tie-break index, category, original keyword length)
+        self._keywords: Dict[str, Tuple[int, str, int]] = {}
+        index = offset
+        for category_id, category_info in categories.items():
+            for keyword in category_info.get("keywords", []):
+                kw_lower = keyword.lower()
+                if kw_lower and kw_lower not in self._keywords:
+                    self._keywords[kw_lower] = (index, category_id, len(keyword))
+                index += 1
+        self._categories_by_index = {idx: cat for idx, cat, _ in self._keywords.values()}
+
+        trie = _trie_regex(self._keywords)
+        if trie:
+            # Longest keyword starting at every position (zero-width, so overlapping)
+            self._anywhere = re.compile('(?=(' + trie + '))')
+            # Longest keyword at the start that is not the whole name
+            self._proper_prefix = re.compile('(?:' + trie + r')(?!\Z)')
+        else:
+            self._anywhere = self._proper_prefix = None
+        self._max_keyword_len = max((len(kw) for kw in self._keywords), default=0)
+        # Digit-only parts (frame numbers, ids) can only hold digit-only keywords
+        self._digit_keywords = any(kw.isdigit() for kw in self._keywords)
+        self._part_cache: Dict[str, Optional[Tuple[float, int]]] = {}
+
+    def classify(self, stem: str) -> Tuple[str, float]:
+        """
+        Classify a filename stem.
+
+        Returns:
+            Tuple of (category_id or "unclassified", confidence)
+        """
+        filename, cleaned, parts = split_filename(stem)
+        names = (filename,) if cleaned == filename else (filename, cleaned)
+        best_score, best_index = 0.0, -1
+
+        if self.game_keywords:
+            best_score, best_index = self._score_game(names, parts)
+
+        # Cheap candidates first: memoised parts, exact names, name prefixes
+        part_cache = self._part_cache
+        for part in parts:
+            if not part:
+                continue
+            candidate = part_cache.get(part, _MISSING)
+            if candidate is _MISSING:
+                candidate = self._score_part(part)
+                if len(part_cache) >= self._PART_CACHE_LIMIT:
+                    part_cache.clear()
+                part_cache[part] = candidate
+            if candidate is not None:
+                score, index = candidate
+                if score > best_score or (score == best_score and index < best_index):
+                    best_score, best_index = score, index
+
+        keywords = self._keywords
+        for name in names:
+            if not name:
+                continue
+            exact = keywords.get(name)
+            if exact is not None and (1.0 > best_score or (1.0 == best_score and exact[0] < best_index)):
+                best_score, best_index = 1.0, exact[0]
+            match = self._proper_prefix.match(name) if self._proper_prefix else None
+            if match is not None:
+                idx, _, length = keywords[match.group()]
+                score = length / len(name) + 0.2
+                if score > best_score or (score == best_score and idx < best_index):
+                    best_score, best_index = score, idx
+
+        # Keywords anywhere in a name score len(keyword)/len(name); only scan
+        # when that could still reach the best score
+        for name in names:
+            if not name or self._anywhere is None:
+                continue
+            name_len = len(name)
+            if min(self._max_keyword_len, name_len) / name_len < best_score:
+                continue
+            found = self._anywhere.findall(name)
+            if not found:
+                continue
+            longest = max(map(len, found))
+            idx, _, length = min((keywords[kw] for kw in found if len(kw) == longest),
+                                 key=lambda entry: entry[0])
+            score = length / name_len
+            if score > best_score or (score == best_score and idx < best_index):
+                best_score, best_index = score, idx
+
+        # Normalize score to 0-1 range
+        confidence = min(1.0, best_score + 0.3)  # Add base confidence
+        if best_index < 0:
+            return "unclassified", confidence
+        return self._category_at(best_index), confidence
+
+    def classify_batch(self, stems: Iterable[str]) -> List[Tuple[str, float]]:
+        """Classify many filename stems; repeated stems are scored once."""
+        results: Dict[str, Tuple[str, float]] = {}
+        out = []
+        for stem in stems:
+            result = results.get(stem)
+            if result is None:
+                result = results[stem] = self.classify(stem)
+            out.append(result)
+        return out
+
+    def _category_at(self, index: int) -> str:
+        if index < len(self.game_keywords):
+            return self.game_keywords[index][1]
+        return self._categories_by_index[index]
+
+    def _score_part(self, part: str) -> Optional[Tuple[float, int]]:
+        """Best candidate for one name part (memoised by the caller)"""
+        exact = self._keywords.get(part)
+        if exact is not None:
+            # Exact part match is a strong signal
+            return 0.8, exact[0]
+        if self._anywhere is None or (part.isdigit() and not self._digit_keywords):
+            return None
+        best_len, best_idx = 0, -1
+        for kw in self._anywhere.findall(part):
+            if len(kw) < 3:
+                continue
+            idx, _, length = self._keywords[kw]
+            if length > best_len or (length == best_len and idx < best_idx):
+                best_len, best_idx = length, idx
+        if best_idx < 0:
+            return None
+        return best_len / len(part) * 0.7, best_idx
+
+    def _score_game(self, names: Tuple[str, ...], parts: List[str]) -> Tuple[float, int]:
+        """Best game-profile candidate (profiles are small, so scan directly)"""
+        best_score, best_index = 0.0, -1
+        for index, (keyword, _) in enumerate(self.game_keywords):
+            score = 0.0
+            for name in names:
+                if keyword in name:
+                    score = max(score, 1.0 if name.startswith(keyword) else 0.9)
+            if score < 0.95 and any(part and keyword == part for part in parts):
+                score = 0.95
+            if score > best_score:
+                best_score, best_index = score, index
+        return best_score, best_index
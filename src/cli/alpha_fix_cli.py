@@ -55,6 +55,10 @@ Examples:
   # Fix all images in directory
   python -m src.cli.alpha_fix_cli input_dir/ --output output_dir/ --preset ps2_three_level
 
+  # Fix a whole dump on 8 processes, resumable, with a JSON-lines log
+  python -m src.cli.alpha_fix_cli dump/ -r --overwrite --jobs 8 \\
+      --checkpoint fix.ckpt --results fix.jsonl
+
   # Analyze alpha colors without modification
   python -m src.cli.alpha_fix_cli image.png --analyze-only
 
@@ -132,6 +136,25 @@ Version: {APP_VERSION}
             help='Do not create backup when overwriting'
         )
         
+        parser.add_argument(
+            '--jobs', '-j',
+            type=int,
+            default=0,
+            help='Worker processes for directories (default: 0 = CPU count - 1)'
+        )
+        
+        parser.add_argument(
+            '--checkpoint',
+            type=str,
+            help='Checkpoint file; finished files listed there are skipped on re-runs'
+        )
+        
+        parser.add_argument(
+            '--results',
+            type=str,
+            help='Write one JSON result per line to this file as files finish'
+        )
+        
         # Analysis options
         parser.add_argument(
             '--analyze-only',
@@ -299,7 +322,8 @@ Version: {APP_VERSION}
             output_path=output_path,
             preset=preset,
             overwrite=args.overwrite,
-            backup=not args.no_backup
+            backup=not args.no_backup,
+            preserve_gradients=args.preserve_gradients
         )
         
         # Display results
@@ -368,31 +392,44 @@ Version: {APP_VERSION}
                 percentage = (100 * current // total) if total > 0 else 0
                 print(f"\rProgress: {current}/{total} ({percentage}%)", end='')
         
-        # Process batch
-        results = self.corrector.process_batch(
-            image_paths,
+        # Process batch, streaming results; the full list is only kept for
+        # a --report without a --results file
+        keep = [] if args.report and not args.results else None
+        summary = {'total': 0, 'successful': 0, 'modified': 0}
+        for result in self.corrector.iter_process_batch(
+            sorted(image_paths),
             output_dir=output_dir,
             preset=preset,
             preserve_structure=args.recursive,
             overwrite=args.overwrite,
             backup=not args.no_backup,
-            progress_callback=progress if not args.quiet else None
-        )
+            progress_callback=progress if not args.quiet else None,
+            jobs=args.jobs,
+            preserve_gradients=args.preserve_gradients,
+            checkpoint_path=Path(args.checkpoint) if args.checkpoint else None,
+            results_path=Path(args.results) if args.results else None
+        ):
+            summary['total'] += 1
+            summary['successful'] += bool(result['success'])
+            summary['modified'] += bool(result.get('modified'))
+            if keep is not None:
+                keep.append(result)
         
         if not args.quiet:
             print()  # New line after progress
         
         # Display summary
         if not args.quiet:
-            self._display_batch_summary(results)
+            self._display_batch_summary(summary)
         
         # Save report if requested
         if args.report:
-            self._save_report(results, Path(args.report))
+            self._save_report(keep, Path(args.report), summary,
+                              Path(args.results) if args.results else None)
         
         # Return success if at least one image was processed successfully
-        success_count = sum(1 for r in results if r['success'])
-        return 0 if success_count > 0 else 1
+        # (or everything was already done in an earlier run)
+        return 0 if summary['successful'] > 0 or summary['total'] == 0 else 1
     
     def _analyze_file(self, image_path: Path) -> int:
         """Analyze alpha colors in a single file."""
@@ -480,11 +517,11 @@ Version: {APP_VERSION}
             print(f"  Modified pixels: {stats['pixels_changed']:,} / {stats['total_pixels']:,} "
                   f"({stats['modification_ratio']:.1%})")
     
-    def _display_batch_summary(self, results: List[dict]) -> None:
-        """Display summary of batch processing."""
-        total = len(results)
-        successful = sum(1 for r in results if r['success'])
-        modified = sum(1 for r in results if r.get('modified'))
+    def _display_batch_summary(self, summary: dict) -> None:
+        """Display summary of batch processing (total/successful/modified counts)."""
+        total = summary['total']
+        successful = summary['successful']
+        modified = summary['modified']
         failed = total - successful
         
         print("\n" + "=" * 60)
@@ -503,17 +540,35 @@ Version: {APP_VERSION}
         
         print("=" * 60)
     
-    def _save_report(self, results: List[dict], report_path: Path) -> None:
-        """Save detailed processing report to JSON file."""
+    def _save_report(
+        self,
+        results: Optional[List[dict]],
+        report_path: Path,
+        summary: Optional[dict] = None,
+        results_path: Optional[Path] = None
+    ) -> None:
+        """
+        Save detailed processing report to JSON file.
+        
+        With a JSON-lines ``results_path`` the report references that file
+        instead of embedding every result.
+        """
         try:
+            if summary is None:
+                summary = {'total': len(results),
+                           'successful': sum(1 for r in results if r['success']),
+                           'modified': sum(1 for r in results if r.get('modified'))}
             report = {
-                'total': len(results),
-                'successful': sum(1 for r in results if r['success']),
-                'modified': sum(1 for r in results if r.get('modified')),
-                'failed': sum(1 for r in results if not r['success']),
+                'total': summary['total'],
+                'successful': summary['successful'],
+                'modified': summary['modified'],
+                'failed': summary['total'] - summary['successful'],
                 'stats': self.corrector.get_stats(),
-                'results': results
             }
+            if results is not None:
+                report['results'] = results
+            if results_path is not None:
+                report['results_file'] = str(results_path)
             
             report_path.parent.mkdir(parents=True, exist_ok=True)
             with open(report_path, 'w') as f:
@@ -7,7 +7,6 @@ Author: Dead On The Inside / JosephsDeadish
 import sys
 import argparse
 import logging
-import shutil
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 from datetime import datetime
@@ -111,6 +110,19 @@ Author: {APP_AUTHOR}
             help='Simulate processing without moving files'
         )
         
+        parser.add_argument(
+            '--jobs', '-j',
+            type=int,
+            default=0,
+            help='Worker processes per CPU-bound stage (default: from config / CPU count)'
+        )
+        
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only process files that are new or changed since the last indexed run'
+        )
+        
         parser.add_argument(
             '--no-backup',
             action='store_true',
@@ -293,13 +305,11 @@ Author: {APP_AUTHOR}
         
         try:
             # Import processing modules
-            from ..classifier import TextureClassifier
             from ..organizer import OrganizationEngine, ORGANIZATION_STYLES
             from ..file_handler import FileHandler
             
             # Initialize components
             logger.info("Initializing processing components...")
-            classifier = TextureClassifier(config=config)
             file_handler = FileHandler(config=config)
             
             # Map CLI style names to organization style classes
@@ -329,31 +339,20 @@ Author: {APP_AUTHOR}
                 dry_run=args.dry_run
             )
             
-            # Scan for textures
+            # Scan, classify and organise through the staged sort pipeline
             logger.info(f"Scanning for textures in {input_path}...")
-            texture_files = self._scan_textures(
+            results = self._process_textures(
                 input_path,
-                recursive=args.recursive
+                output_path,
+                organizer,
+                args
             )
             
-            if not texture_files:
+            if results['total'] == 0:
                 logger.warning("No texture files found")
                 return 0
             
-            total_files = len(texture_files)
-            logger.info(f"Found {total_files} texture files")
-            
-            if not args.quiet:
-                print(f"Found {total_files} texture files\n")
-            
-            # Process textures with progress display
-            results = self._process_textures(
-                texture_files,
-                output_path,
-                classifier,
-                organizer,
-                args
-            )
+            logger.info(f"Processed {results['total']} texture files")
             
             # Display summary
             if not args.quiet:
@@ -435,43 +434,60 @@ Author: {APP_AUTHOR}
         Returns:
             List of texture file paths
         """
-        extensions = {'.dds', '.png', '.jpg', '.jpeg', '.bmp', '.tga', '.tif', '.tiff'}
-        texture_files = []
+        from ..file_handler.scanner import scan_paths
         
-        if recursive:
-            for ext in extensions:
-                texture_files.extend(directory.rglob(f'*{ext}'))
-                texture_files.extend(directory.rglob(f'*{ext.upper()}'))
-        else:
-            for ext in extensions:
-                texture_files.extend(directory.glob(f'*{ext}'))
-                texture_files.extend(directory.glob(f'*{ext.upper()}'))
-        
-        return sorted(texture_files)
+        return scan_paths(directory, recursive=recursive)
     
     def _process_textures(
         self,
-        texture_files: List[Path],
+        input_path: Path,
         output_path: Path,
-        classifier: Any,
         organizer: Any,
         args: argparse.Namespace
     ) -> Dict[str, Any]:
         """
-        Process texture files with progress display.
+        Scan and process texture files through the sort pipeline.
         
         Args:
-            texture_files: List of texture files to process
+            input_path: Directory to scan
             output_path: Output directory
-            classifier: Texture classifier instance
             organizer: Organization engine instance
             args: CLI arguments
             
         Returns:
             Dictionary with processing results
         """
+        from ..core.sort_pipeline import SortPipeline, PipelineSettings
+        
+        settings = PipelineSettings.from_config(
+            config,
+            recursive=args.recursive,
+            dry_run=args.dry_run,
+            file_operation='copy',
+            # Re-running over the same output leaves already sorted files alone
+            on_existing='skip'
+        )
+        jobs = getattr(args, 'jobs', 0) or 0
+        if jobs > 0:
+            settings.decode_workers = jobs
+            settings.classify_workers = jobs
+        
+        database = None
+        if getattr(args, 'incremental', False):
+            from ..config import DATABASE_FILE
+            from ..database import TextureDatabase
+            settings.incremental = True
+            database = TextureDatabase(DATABASE_FILE)
+        
+        pipeline = SortPipeline(
+            output_dir=output_path,
+            organizer=organizer,
+            database=database,
+            settings=settings
+        )
+        
         results = {
-            'total': len(texture_files),
+            'total': 0,
             'processed': 0,
             'errors': 0,
             'skipped': 0,
@@ -488,61 +504,55 @@ Author: {APP_AUTHOR}
         except ImportError:
             use_tqdm = False
         
-        iterator = tqdm(texture_files, desc="Processing") if use_tqdm else texture_files
+        bar = tqdm(desc="Processing", unit="file") if use_tqdm else None
         
-        for idx, texture_file in enumerate(iterator, 1):
-            try:
-                # Process texture (simplified for CLI)
-                file_result = {
-                    'file': str(texture_file),
-                    'status': 'success',
-                    'category': 'unknown'
-                }
-                
-                if not args.dry_run:
-                    # Classify the texture
-                    # classify_texture() returns (category: str, confidence: float)
-                    if classifier is not None:
-                        try:
-                            category, confidence = classifier.classify_texture(texture_file)
-                            file_result['category'] = category or 'unclassified'
-                            file_result['confidence'] = confidence
-                        except Exception as classify_err:
-                            logger.debug(f"Classification failed for {texture_file}: {classify_err}")
-
-                    # Organise (move/copy) the texture into the output directory
-                    if organizer is not None:
-                        try:
-                            category = file_result.get('category', 'unclassified')
-                            dest_folder = output_path / category
-                            dest_folder.mkdir(parents=True, exist_ok=True)
-                            dest_file = dest_folder / texture_file.name
-                            if not dest_file.exists():
-                                shutil.copy2(texture_file, dest_file)
-                                file_result['destination'] = str(dest_file)
-                        except Exception as org_err:
-                            logger.debug(f"Organisation failed for {texture_file}: {org_err}")
-                
-                results['processed'] += 1
-                results['files'].append(file_result)
-                
-                # Update progress for percent display
-                if not use_tqdm and show_progress and args.progress == 'percent':
-                    progress = (idx / results['total']) * 100
-                    print(f"\rProgress: {progress:.1f}% ({idx}/{results['total']})", end='', flush=True)
-                    
-            except Exception as e:
-                logger.error(f"Error processing {texture_file}: {e}")
-                results['errors'] += 1
+        def on_progress(current: int, total: int, message: str) -> None:
+            if bar is not None:
+                bar.total = total
+                bar.update(1)
+            elif show_progress and args.progress == 'percent':
+                progress = (current / total) * 100 if total else 0.0
+                print(f"\rProgress: {progress:.1f}% ({current}/{total})", end='', flush=True)
+        
+        def on_item(item: Any) -> None:
+            if item.status == 'failed':
+                logger.error(f"Error processing {item.path}: {item.error}")
                 results['files'].append({
-                    'file': str(texture_file),
+                    'file': str(item.path),
                     'status': 'error',
-                    'error': str(e)
+                    'error': item.error
                 })
+                return
+            file_result = {
+                'file': str(item.path),
+                'status': 'skipped' if item.status == 'skipped' else 'success',
+                'category': item.category or 'unclassified',
+                'confidence': item.confidence
+            }
+            if item.status == 'success' and item.target is not None:
+                file_result['destination'] = str(item.target)
+            results['files'].append(file_result)
+        
+        try:
+            run = pipeline.run(
+                input_path,
+                progress_callback=on_progress,
+                item_callback=on_item
+            )
+        finally:
+            if bar is not None:
+                bar.close()
+            if database is not None:
+                database.close()
         
         if not use_tqdm and show_progress and args.progress == 'percent':
             print()  # New line after progress
         
+        results['total'] = run['total']
+        results['processed'] = run['processed']
+        results['errors'] = run['failed']
+        results['skipped'] = run['skipped']
+        results['stages'] = run['stages']
         results['end_time'] = datetime.now()
         results['duration'] = (results['end_time'] - results['start_time']).total_seconds()
         
@@ -563,6 +573,13 @@ Author: {APP_AUTHOR}
             success_rate = (results['processed'] / results['total']) * 100
             print(f"Success Rate:    {success_rate:.1f}%")
         
+        if results.get('stages'):
+            print("\nStage Throughput:")
+            for name, stats in results['stages'].items():
+                print(f"  {name:<9} {stats['processed']:>7} items  "
+                      f"{stats['items_per_second']:>8.1f}/s  "
+                      f"({stats['workers']} {stats['executor']} workers)")
+        
         print(f"{'=' * 60}\n")
     
     def _generate_report(self, results: Dict[str, Any], report_path: str) -> None:
@@ -585,6 +602,7 @@ Author: {APP_AUTHOR}
                     'skipped': results['skipped'],
                     'duration_seconds': results['duration']
                 },
+                'stages': results.get('stages', {}),
                 'files': results['files']
             }
             
@@ -142,6 +142,8 @@ class Config:
                 "max_threads": 4,
                 "memory_limit_mb": 2048,
                 "cache_size_mb": 512,
+                "analysis_cache_enabled": True,  # persist analysis results keyed by file content
+                "analysis_cache_mb": 256,
                 "enable_gpu": False,
                 "background_priority": "normal",
                 "batch_size": 100,
@@ -178,7 +180,8 @@ class Config:
                 "category_mappings": {},
                 "detect_lods": True,
                 "group_lods": True,
-                "detect_variants": True
+                "detect_variants": True,
+                "incremental_rescan": False  # skip files unchanged since the last indexed sort
             },
             
             # Logging & Debugging
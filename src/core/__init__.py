@@ -5,5 +5,7 @@ Threading, performance management, and engine coordination
 
 from .threading_manager import ThreadingManager
 from .performance_manager import PerformanceMode, PerformanceManager, OperationProfiler, ProfileResult
+from .sort_pipeline import SortPipeline, PipelineSettings, SortItem, StageStats
 
-__all__ = ['ThreadingManager', 'PerformanceMode', 'PerformanceManager', 'OperationProfiler', 'ProfileResult']
+__all__ = ['ThreadingManager', 'PerformanceMode', 'PerformanceManager', 'OperationProfiler', 'ProfileResult',
+           'SortPipeline', 'PipelineSettings', 'SortItem', 'StageStats']
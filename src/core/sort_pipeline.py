@@ -0,0 +1,752 @@
+"""
+Sort Pipeline for Game Texture Sorter.
+
+Headless, staged sorting engine shared by the Qt main window and the CLI.
+Each texture flows through a chain of stages connected by bounded queues:
+
+    scan -> decode -> classify -> analyze -> plan -> file ops -> index
+
+Every stage owns its own worker pool. CPU-bound stages (decode, analyze and
+the default classifier) run their work in a process pool; I/O-bound stages
+(file operations, database indexing) run on threads. Bounded queues give
+back-pressure so a fast scanner cannot flood memory on 150k+ texture dumps.
+
+Author: Dead On The Inside / JosephsDeadish
+"""
+
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+try:
+    from ..file_handler.scanner import TEXTURE_EXTENSIONS, scan_files
+    from ..database.manifest import ManifestDiff
+except ImportError:
+    from file_handler.scanner import TEXTURE_EXTENSIONS, scan_files  # type: ignore[no-redef]
+    from database.manifest import ManifestDiff  # type: ignore[no-redef]
+
+# Queue marker telling a stage that its upstream has finished
+_SENTINEL = object()
+
+
+@dataclass
+class SortItem:
+    """A single texture travelling through the pipeline."""
+    path: Path
+    file_size: int = 0
+    mtime: float = 0.0
+    inode: int = 0
+    width: int = 0
+    height: int = 0
+    format: str = ""
+    mode: str = ""
+    has_alpha: bool = False
+    is_corrupted: bool = False
+    category: str = "unclassified"
+    confidence: float = 0.0
+    lod_group: Optional[str] = None
+    lod_level: Optional[str] = None
+    hash: str = ""
+    target: Optional[Path] = None
+    elapsed: float = 0.0
+    status: str = "pending"
+    error: str = ""
+
+
+@dataclass
+class PipelineSettings:
+    """Worker counts, queue sizes and behaviour flags for a SortPipeline."""
+    extensions: frozenset = TEXTURE_EXTENSIONS
+    recursive: bool = True
+    parallel_scan: bool = False
+    decode_workers: int = 0  # 0 = auto (cpu_count - 1)
+    classify_workers: int = 0  # 0 = auto
+    analyze_workers: int = 0  # 0 = auto
+    io_workers: int = 4
+    queue_size: int = 256
+    use_processes: bool = True
+    use_image_analysis: bool = True
+    run_analyzer: bool = False
+    file_operation: str = "copy"  # copy, move
+    on_existing: str = "rename"  # target already on disk: rename, skip, overwrite
+    dry_run: bool = False
+    incremental: bool = False  # skip files unchanged since the last indexed run
+    prune_deleted: bool = True  # drop manifest rows for files that vanished
+
+    @classmethod
+    def from_config(cls, config=None, **overrides) -> 'PipelineSettings':
+        """
+        Build settings from the application config.
+
+        Args:
+            config: Config instance (uses performance.max_threads)
+            **overrides: Explicit field values that take precedence
+
+        Returns:
+            PipelineSettings instance
+        """
+        settings = cls()
+        if config is not None and hasattr(config, 'get'):
+            max_threads = config.get('performance', 'max_threads', default=0) or 0
+            if max_threads > 0:
+                settings.decode_workers = max_threads
+                settings.classify_workers = max_threads
+                settings.analyze_workers = max_threads
+        for key, value in overrides.items():
+            if hasattr(settings, key):
+                setattr(settings, key, value)
+        return settings
+
+
+@dataclass
+class StageStats:
+    """Throughput counters for one pipeline stage."""
+    name: str
+    workers: int = 1
+    executor: str = "thread"
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    first_start: Optional[float] = None
+    last_finish: Optional[float] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, started: float, finished: float, failed: bool) -> None:
+        """Record one processed item."""
+        with self._lock:
+            self.processed += 1
+            if failed:
+                self.failed += 1
+            self.busy_seconds += finished - started
+            if self.first_start is None or started < self.first_start:
+                self.first_start = started
+            if self.last_finish is None or finished > self.last_finish:
+                self.last_finish = finished
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable snapshot of the counters."""
+        with self._lock:
+            wall = 0.0
+            if self.first_start is not None and self.last_finish is not None:
+                wall = max(self.last_finish - self.first_start, 0.0)
+            return {
+                'workers': self.workers,
+                'executor': self.executor,
+                'processed': self.processed,
+                'failed': self.failed,
+                'busy_seconds': round(self.busy_seconds, 3),
+                'wall_seconds': round(wall, 3),
+                'items_per_second': round(self.processed / wall, 1) if wall > 0 else 0.0,
+            }
+
+
+# ── Stage functions ──────────────────────────────────────────────────────────
+# Stage functions must live at module level so they can be pickled into
+# process-pool workers. Each takes and returns a SortItem; items that already
+# carry an error are passed through untouched.
+
+_worker_state: Dict[str, Any] = {}
+
+
+def decode_item(item: SortItem) -> SortItem:
+    """Decode the image once to read dimensions, format and alpha usage."""
+    if item.error:
+        return item
+    try:
+        from PIL import Image
+    except ImportError:
+        return item
+    try:
+        with Image.open(item.path) as img:
+            item.width, item.height = img.size
+            item.format = img.format or item.path.suffix.lstrip('.').upper()
+            item.mode = img.mode
+            img.load()
+            item.has_alpha = img.mode in ('RGBA', 'LA', 'PA')
+    except Exception as e:
+        # Keep sorting by filename, but remember the decode failure
+        item.is_corrupted = True
+        logger.debug(f"Decode failed for {item.path}: {e}")
+    return item
+
+
+def classify_item(item: SortItem, use_image_analysis: bool = True) -> SortItem:
+    """Classify with a TextureClassifier owned by the current worker."""
+    if item.error:
+        return item
+    classifier = _worker_state.get('classifier')
+    if classifier is None:
+        try:
+            from ..classifier import TextureClassifier
+            from ..config import config
+        except ImportError:
+            from classifier import TextureClassifier  # type: ignore[no-redef]
+            from config import config  # type: ignore[no-redef]
+        classifier = TextureClassifier(config=config)
+        _worker_state['classifier'] = classifier
+    analyze = use_image_analysis and not item.is_corrupted
+    item.category, item.confidence = classifier.classify_texture(item.path, analyze)
+    return item
+
+
+def analyze_item(item: SortItem) -> SortItem:
+    """Run TextureAnalyzer and keep only the fields the index needs."""
+    if item.error or item.is_corrupted:
+        return item
+    analyzer = _worker_state.get('analyzer')
+    if analyzer is None:
+        try:
+            from ..features.texture_analysis import TextureAnalyzer
+            from ..utils.analysis_cache import get_analysis_cache
+        except ImportError:
+            from features.texture_analysis import TextureAnalyzer  # type: ignore[no-redef]
+            from utils.analysis_cache import get_analysis_cache  # type: ignore[no-redef]
+        analyzer = TextureAnalyzer(analysis_cache=get_analysis_cache())
+        _worker_state['analyzer'] = analyzer
+    analysis = analyzer.analyze(item.path)
+    if analysis.get('alpha', {}).get('has_alpha') is True:
+        item.has_alpha = True
+    item.hash = analysis.get('hashes', {}).get('md5', '') or item.hash
+    return item
+
+
+def iter_texture_files(
+    root: Path,
+    extensions: Iterable[str] = TEXTURE_EXTENSIONS,
+    recursive: bool = True,
+    check_cancelled: Optional[Callable[[], bool]] = None,
+    parallel: bool = False
+) -> Iterator[SortItem]:
+    """
+    Walk a directory once and yield a SortItem per texture file.
+
+    Args:
+        root: Directory to scan
+        extensions: Extensions to accept (matched case-insensitively)
+        recursive: Whether to descend into subdirectories
+        check_cancelled: Optional callable returning True to stop early
+        parallel: List subdirectories concurrently
+
+    Yields:
+        SortItem with path, size, mtime and inode filled in
+    """
+    for entry in scan_files(root, extensions, recursive=recursive, parallel=parallel,
+                            check_cancelled=check_cancelled):
+        yield SortItem(path=entry.path, file_size=entry.size, mtime=entry.mtime, inode=entry.inode)
+
+
+class SortPipeline:
+    """
+    Parallel, pipelined texture sorter.
+
+    The pipeline is driven by :meth:`run`, which blocks until every stage has
+    drained. Callers on a GUI thread should invoke it from a worker thread.
+
+    Example:
+        >>> pipeline = SortPipeline(output_dir=Path('sorted'), organizer=engine)
+        >>> results = pipeline.run(Path('dump'))
+        >>> print(results['stages']['decode']['items_per_second'])
+    """
+
+    STAGE_NAMES = ('scan', 'decode', 'classify', 'analyze', 'plan', 'file_ops', 'index')
+
+    def __init__(
+        self,
+        output_dir: Path,
+        organizer: Any = None,
+        classify_func: Optional[Callable[[Path], Tuple[str, float]]] = None,
+        lod_detector: Any = None,
+        database: Any = None,
+        settings: Optional[PipelineSettings] = None
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            output_dir: Base output directory
+            organizer: Optional OrganizationEngine used to plan target paths
+            classify_func: Optional callable(path) -> (category, confidence).
+                Runs on threads; when omitted a TextureClassifier runs in
+                each process-pool worker instead.
+            lod_detector: Optional LODDetector for LOD group/level detection
+            database: Optional TextureDatabase to index results into
+            settings: PipelineSettings (defaults are used when None)
+        """
+        self.output_dir = Path(output_dir)
+        self.organizer = organizer
+        self.classify_func = classify_func
+        self.lod_detector = lod_detector
+        self.database = database
+        self.settings = settings or PipelineSettings()
+
+        self._cancel_event = threading.Event()
+        self._stats: Dict[str, StageStats] = {}
+        self._reserved_targets: Set[str] = set()
+        self._executors: List[Executor] = []
+        self._scanned = 0
+        self._completed = 0
+        self._counter_lock = threading.Lock()
+        self._diff_counts: Dict[str, int] = {}
+        self._writer: Any = None
+
+    # ── Public API ──────────────────────────────────────────────────────────
+
+    def run(
+        self,
+        input_dir: Path,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        log_callback: Optional[Callable[[str], None]] = None,
+        check_cancelled: Optional[Callable[[], bool]] = None,
+        item_callback: Optional[Callable[[SortItem], None]] = None,
+        items: Optional[Iterable[SortItem]] = None
+    ) -> Dict[str, Any]:
+        """
+        Sort every texture under ``input_dir``.
+
+        Args:
+            input_dir: Directory to scan
+            progress_callback: Optional callback(current, total, message);
+                ``total`` grows while the scan is still running
+            log_callback: Optional callback(message) for user-facing logs
+            check_cancelled: Optional callable returning True to cancel
+            item_callback: Optional callback(item) after each item is indexed
+            items: Optional pre-scanned items to use instead of walking
+
+        Returns:
+            Dict with 'total', 'processed', 'failed', 'skipped', 'cancelled',
+            'items' (list of SortItem), 'duration' and per-stage 'stages'
+            stats. Incremental runs also report 'unchanged', 'modified',
+            'renamed' and 'deleted' counts.
+        """
+        self._cancel_event.clear()
+        self._reserved_targets.clear()
+        self._scanned = 0
+        self._completed = 0
+        log = log_callback or (lambda msg: logger.info(msg))
+        start = time.monotonic()
+
+        def cancelled() -> bool:
+            if self._cancel_event.is_set():
+                return True
+            if check_cancelled and check_cancelled():
+                self._cancel_event.set()
+                return True
+            return False
+
+        input_dir = Path(input_dir)
+        diff = None
+        if self.settings.incremental and self.database is not None:
+            # Manifest paths are absolute, so scan from an absolute root
+            input_dir = input_dir.absolute()
+            try:
+                diff = ManifestDiff(self.database.get_manifest(input_dir))
+                log(f"📒 Incremental scan against {len(diff.manifest)} indexed textures")
+            except Exception as e:
+                logger.warning(f"Could not load file manifest, running full sort: {e}")
+
+        source = items if items is not None else iter_texture_files(
+            input_dir, self.settings.extensions, self.settings.recursive, cancelled,
+            parallel=self.settings.parallel_scan
+        )
+
+        results: Dict[str, Any] = {'items': [], 'processed': 0, 'failed': 0, 'skipped': 0}
+
+        def finish(item: SortItem) -> None:
+            with self._counter_lock:
+                self._completed += 1
+                done, total = self._completed, self._scanned
+                results['items'].append(item)
+                if item.status == 'failed':
+                    results['failed'] += 1
+                elif item.status == 'skipped':
+                    results['skipped'] += 1
+                else:
+                    results['processed'] += 1
+            if progress_callback:
+                if item.status == 'failed':
+                    message = f"Failed: {item.path.name}"
+                elif item.status == 'skipped':
+                    message = f"Unchanged: {item.path.name}"
+                else:
+                    message = f"Sorted {item.path.name} → {item.category}"
+                progress_callback(done, max(total, done), message)
+            if item_callback:
+                item_callback(item)
+
+        # Index rows go through the database's background writer so worker
+        # threads never share the main connection's cursor
+        self._writer = None
+        if self.database is not None and hasattr(self.database, 'start_writer'):
+            try:
+                self._writer = self.database.start_writer()
+            except Exception as e:
+                logger.debug(f"Background DB writer unavailable: {e}")
+
+        stages = self._build_stages()
+        try:
+            threads = self._start_stages(stages, finish, cancelled)
+            self._scan(source, stages[0][1], cancelled, diff, finish)
+            for thread in threads:
+                thread.join()
+        finally:
+            self._shutdown_executors()
+            if self._writer is not None:
+                self.database.stop_writer()
+                self._writer = None
+
+        was_cancelled = self._cancel_event.is_set()
+        if was_cancelled:
+            log("⏹️ Operation cancelled by user")
+
+        if diff is not None:
+            results.update(self._diff_counts)
+            deleted = [] if was_cancelled else diff.deleted_paths(
+                input_dir, recursive=self.settings.recursive)
+            results['deleted'] = len(deleted)
+            if deleted and self.settings.prune_deleted:
+                self.database.remove_textures(deleted)
+            log(f"📒 {results['unchanged']} unchanged, {results['modified']} modified, "
+                f"{results['renamed']} renamed, {results['deleted']} deleted")
+
+        results['total'] = self._scanned
+        results['cancelled'] = was_cancelled
+        results['duration'] = time.monotonic() - start
+        results['stages'] = self.get_stage_stats()
+        return results
+
+    def cancel(self) -> None:
+        """Request cancellation; in-flight items finish, queued items are dropped."""
+        self._cancel_event.set()
+
+    def get_stage_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-stage throughput counters keyed by stage name."""
+        return {name: stats.to_dict() for name, stats in self._stats.items()}
+
+    def format_stage_stats(self) -> List[str]:
+        """Return one human-readable throughput line per stage."""
+        lines = []
+        for name, stats in self.get_stage_stats().items():
+            lines.append(
+                f"{name:<9} {stats['processed']:>7} items  "
+                f"{stats['items_per_second']:>8.1f}/s  "
+                f"({stats['workers']} {stats['executor']} workers)"
+            )
+        return lines
+
+    # ── Stage wiring ────────────────────────────────────────────────────────
+
+    def _auto_workers(self, requested: int) -> int:
+        if requested > 0:
+            return requested
+        return max(1, (os.cpu_count() or 2) - 1)
+
+    def _make_executor(self, workers: int, use_processes: bool) -> Tuple[Executor, str]:
+        """Create a process pool when allowed, falling back to threads."""
+        if use_processes and self.settings.use_processes:
+            try:
+                executor: Executor = ProcessPoolExecutor(max_workers=workers)
+                self._executors.append(executor)
+                return executor, 'process'
+            except (OSError, NotImplementedError, ValueError) as e:
+                logger.warning(f"Process pool unavailable, using threads: {e}")
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="SortPipeline")
+        self._executors.append(executor)
+        return executor, 'thread'
+
+    def _build_stages(self) -> List[Tuple[str, queue.Queue, Callable, int, Optional[Executor]]]:
+        """
+        Build the ordered stage list.
+
+        Each entry is (name, input_queue, func, thread_count, executor). When
+        an executor is set, stage threads submit work to it and wait for the
+        result, so ``thread_count`` bounds the in-flight window.
+        """
+        s = self.settings
+        stages = []
+        self._stats = {'scan': StageStats('scan')}
+
+        def add(name: str, func: Callable, workers: int, executor: Optional[Executor] = None,
+                kind: str = 'thread', window: Optional[int] = None) -> None:
+            threads = window if window is not None else workers
+            stages.append((name, queue.Queue(maxsize=s.queue_size), func, threads, executor))
+            self._stats[name] = StageStats(name, workers=workers, executor=kind)
+
+        decode_workers = self._auto_workers(s.decode_workers)
+        executor, kind = self._make_executor(decode_workers, use_processes=True)
+        add('decode', decode_item, decode_workers, executor, kind, window=decode_workers * 2)
+
+        classify_workers = self._auto_workers(s.classify_workers)
+        if self.classify_func is not None:
+            add('classify', self._classify_with_func, classify_workers)
+        else:
+            executor, kind = self._make_executor(classify_workers, use_processes=True)
+            add('classify', partial(classify_item, use_image_analysis=s.use_image_analysis),
+                classify_workers, executor, kind, window=classify_workers * 2)
+
+        if s.run_analyzer:
+            analyze_workers = self._auto_workers(s.analyze_workers)
+            executor, kind = self._make_executor(analyze_workers, use_processes=True)
+            add('analyze', analyze_item, analyze_workers, executor, kind, window=analyze_workers * 2)
+
+        # Planning reserves unique target names, so it must stay single-threaded
+        add('plan', self._plan_item, 1)
+        add('file_ops', self._file_op_item, max(1, s.io_workers))
+        # A single indexer keeps database writes on one connection-owning thread
+        add('index', self._index_item, 1)
+        return stages
+
+    def _start_stages(self, stages, finish: Callable[[SortItem], None],
+                      cancelled: Callable[[], bool]) -> List[threading.Thread]:
+        threads: List[threading.Thread] = []
+        for idx, (name, in_q, func, thread_count, executor) in enumerate(stages):
+            out_q = stages[idx + 1][1] if idx + 1 < len(stages) else None
+            alive = [thread_count]
+            alive_lock = threading.Lock()
+            for n in range(thread_count):
+                t = threading.Thread(
+                    target=self._stage_worker,
+                    args=(name, in_q, out_q, func, executor, finish, cancelled, alive, alive_lock),
+                    name=f"SortPipeline_{name}_{n}",
+                    daemon=True
+                )
+                t.start()
+                threads.append(t)
+        return threads
+
+    def _stage_worker(self, name: str, in_q: queue.Queue, out_q: Optional[queue.Queue],
+                      func: Callable, executor: Optional[Executor],
+                      finish: Callable[[SortItem], None], cancelled: Callable[[], bool],
+                      alive: List[int], alive_lock: threading.Lock) -> None:
+        stats = self._stats[name]
+        while True:
+            item = in_q.get()
+            if item is _SENTINEL:
+                # Let sibling workers see the sentinel too
+                in_q.put(_SENTINEL)
+                break
+            if cancelled():
+                # Drain without processing so upstream never blocks
+                continue
+            started = time.monotonic()
+            try:
+                if executor is not None:
+                    item = executor.submit(func, item).result()
+                else:
+                    item = func(item)
+            except Exception as e:
+                item.status = 'failed'
+                item.error = item.error or str(e)
+                logger.debug(f"Stage {name} failed for {item.path}: {e}")
+            stats.record(started, time.monotonic(), bool(item.error))
+            if out_q is not None:
+                out_q.put(item)
+            else:
+                finish(item)
+
+        with alive_lock:
+            alive[0] -= 1
+            last = alive[0] == 0
+        if last and out_q is not None:
+            out_q.put(_SENTINEL)
+
+    def _scan(self, source: Iterable[SortItem], first_q: queue.Queue,
+              cancelled: Callable[[], bool], diff: Optional[ManifestDiff] = None,
+              finish: Optional[Callable[[SortItem], None]] = None) -> None:
+        stats = self._stats['scan']
+        self._diff_counts = {'unchanged': 0, 'modified': 0, 'renamed': 0, 'new': 0}
+        started = time.monotonic()
+        try:
+            for item in source:
+                if cancelled():
+                    break
+                with self._counter_lock:
+                    self._scanned += 1
+                skip = diff is not None and self._apply_manifest(item, diff)
+                now = time.monotonic()
+                stats.record(started, now, False)
+                started = now
+                if skip and finish is not None:
+                    finish(item)
+                else:
+                    first_q.put(item)
+        finally:
+            first_q.put(_SENTINEL)
+
+    def _apply_manifest(self, item: SortItem, diff: ManifestDiff) -> bool:
+        """
+        Compare an item with the stored manifest.
+
+        Returns:
+            True when the item can skip every processing stage
+        """
+        status, record = diff.check(item.path, item.file_size, item.mtime, item.inode)
+        self._diff_counts[status] += 1
+        if status in (ManifestDiff.NEW, ManifestDiff.MODIFIED):
+            return False
+
+        # Reuse the stored classification for unchanged and renamed files
+        item.category = record.get('category') or item.category
+        item.confidence = record.get('confidence') or 0.0
+        item.lod_group = record.get('lod_group') or None
+        item.lod_level = record.get('lod_level') or None
+        item.width = record.get('width') or 0
+        item.height = record.get('height') or 0
+        item.format = record.get('format') or ''
+        item.hash = record.get('hash') or ''
+        item.status = 'skipped'
+        if status == ManifestDiff.RENAMED:
+            old_path = diff.renames[-1][0]
+            self.database.rename_texture(old_path, item.path, item.mtime, item.inode)
+        return True
+
+    def _shutdown_executors(self) -> None:
+        for executor in self._executors:
+            try:
+                executor.shutdown(wait=True, cancel_futures=True)
+            except Exception as e:
+                logger.debug(f"Executor shutdown error: {e}")
+        self._executors.clear()
+
+    # ── Thread-side stage functions ─────────────────────────────────────────
+
+    def _classify_with_func(self, item: SortItem) -> SortItem:
+        if item.error:
+            return item
+        item.category, item.confidence = self.classify_func(item.path)
+        return item
+
+    def _plan_item(self, item: SortItem) -> SortItem:
+        """Detect LODs and choose a unique target path for the item."""
+        if item.error:
+            return item
+
+        if item.has_alpha and item.category == 'unknown':
+            item.category = 'alpha_textures'
+
+        if self.lod_detector:
+            try:
+                base, level = self.lod_detector.detect_lod_pattern(item.path.stem)
+                if level is not None:
+                    item.lod_group, item.lod_level = base, level
+            except Exception:
+                pass
+
+        target = None
+        if self.organizer is not None:
+            try:
+                try:
+                    from ..organizer.organization_engine import TextureInfo
+                except ImportError:
+                    from organizer.organization_engine import TextureInfo  # type: ignore[no-redef]
+                info = TextureInfo(
+                    file_path=str(item.path),
+                    filename=item.path.name,
+                    category=item.category,
+                    confidence=item.confidence,
+                    lod_group=item.lod_group,
+                    lod_level=int(item.lod_level) if str(item.lod_level).isdigit() else None,
+                    file_size=item.file_size,
+                    dimensions=(item.width, item.height) if item.width else None,
+                    format=item.path.suffix.lstrip('.').upper(),
+                )
+                target = self.output_dir / self.organizer.style.get_target_path(info)
+            except Exception as e:
+                logger.debug(f"OrganizationEngine planning error: {e}")
+        if target is None:
+            target = self.output_dir / item.category / item.path.name
+
+        reserved = self._reserve_target(target)
+        if reserved is None:
+            # on_existing='skip': an earlier run already placed this file
+            item.target = target
+            item.status = 'skipped'
+        else:
+            item.target = reserved
+        return item
+
+    def _reserve_target(self, target: Path) -> Optional[Path]:
+        """
+        Return a target path not used by another planned item.
+
+        A file already on disk at the target is handled by the on_existing
+        setting: 'rename' picks the next free ``name_N`` path, 'overwrite'
+        keeps the target, and 'skip' returns None.
+        """
+        policy = self.settings.on_existing
+        with self._counter_lock:
+            if str(target) not in self._reserved_targets and policy != 'rename' \
+                    and target.exists():
+                if policy == 'skip':
+                    return None
+                self._reserved_targets.add(str(target))
+                return target
+            candidate = target
+            counter = 1
+            while str(candidate) in self._reserved_targets or candidate.exists():
+                candidate = target.with_name(f"{target.stem}_{counter}{target.suffix}")
+                counter += 1
+            self._reserved_targets.add(str(candidate))
+            return candidate
+
+    def _file_op_item(self, item: SortItem) -> SortItem:
+        if item.error or item.target is None or item.status == 'skipped':
+            return item
+        dry_run = self.settings.dry_run or getattr(self.organizer, 'dry_run', False)
+        if dry_run:
+            item.status = 'simulated'
+            return item
+        started = time.monotonic()
+        item.target.parent.mkdir(parents=True, exist_ok=True)
+        if self.settings.file_operation == 'move':
+            try:
+                item.path.rename(item.target)
+            except OSError:
+                # Cross-device moves need a copy
+                shutil.move(str(item.path), str(item.target))
+        else:
+            shutil.copy2(item.path, item.target)
+        item.elapsed = time.monotonic() - started
+        item.status = 'success'
+        return item
+
+    def _index_item(self, item: SortItem) -> SortItem:
+        if item.error:
+            item.status = 'failed'
+        if self.database is None or item.status == 'simulated':
+            return item
+        sink = self._writer or self.database
+        try:
+            sink.add_texture(item.path, {
+                'file_size': item.file_size,
+                'width': item.width,
+                'height': item.height,
+                'format': item.format,
+                'category': item.category,
+                'confidence': item.confidence,
+                'lod_group': item.lod_group,
+                'lod_level': item.lod_level,
+                'hash': item.hash,
+                'is_corrupted': item.is_corrupted,
+                'date_modified': (datetime.fromtimestamp(item.mtime) if item.mtime
+                                  else datetime.now()).isoformat(),
+                'mtime': item.mtime or None,
+                'inode': item.inode or None,
+            })
+            status = 'ok' if not item.error else 'error'
+            sink.log_operation('sort', item.path, status, item.error)
+        except Exception as e:
+            logger.debug(f"Database index error: {e}")
+        return item
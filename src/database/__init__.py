@@ -1,4 +1,5 @@
 """Database module"""
 from .texture_db import TextureDatabase
+from .manifest import ManifestDiff, compute_file_hash
 
-__all__ = ['TextureDatabase']
+__all__ = ['TextureDatabase', 'ManifestDiff', 'compute_file_hash']
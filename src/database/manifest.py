@@ -0,0 +1,164 @@
+"""
+File Manifest Diffing
+Compares a fresh directory scan against the manifest stored in
+TextureDatabase so incremental runs only process new or modified files.
+"""
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from ..utils.analysis_cache import content_hash
+except (ImportError, ValueError):
+    from utils.analysis_cache import content_hash  # type: ignore[no-redef]
+
+
+def compute_file_hash(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """MD5 of a file, matching the hash stored by TextureAnalyzer"""
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def _hash_like(file_path: Path, stored: str) -> str:
+    """
+    Hash a file with the algorithm of a stored digest: prefixed content
+    digests ('xxh3:...', 'b2:...', written by duplicate detection) or MD5.
+    """
+    if ':' in stored:
+        return content_hash(file_path)
+    return compute_file_hash(file_path)
+
+
+class ManifestDiff:
+    """
+    Classify scanned files against a stored manifest.
+
+    A file is *unchanged* when its (size, mtime, inode) match the manifest,
+    *modified* when the path is known but any of those differ, *renamed* when
+    the path is new but the content belongs to a manifest entry whose file has
+    disappeared, and *new* otherwise. Manifest entries never seen during the
+    scan whose files no longer exist are reported by :meth:`deleted_paths`.
+    """
+
+    UNCHANGED = 'unchanged'
+    MODIFIED = 'modified'
+    RENAMED = 'renamed'
+    NEW = 'new'
+
+    def __init__(self, manifest: Dict[str, dict]):
+        """
+        Args:
+            manifest: Mapping of file_path -> record, as returned by
+                TextureDatabase.get_manifest()
+        """
+        self.manifest = manifest
+        self.renames: List[Tuple[str, str]] = []
+        self._seen: Set[str] = set()
+
+        # Secondary indexes used only for rename detection
+        self._by_inode: Dict[Tuple[int, int], str] = {}
+        self._by_size: Dict[int, List[str]] = {}
+        for path, record in manifest.items():
+            size = record.get('file_size') or 0
+            if record.get('inode'):
+                self._by_inode[(record['inode'], size)] = path
+            if record.get('hash'):
+                self._by_size.setdefault(size, []).append(path)
+
+    def check(self, path: Path, size: int, mtime: float,
+              inode: int = 0) -> Tuple[str, Optional[dict]]:
+        """
+        Classify one scanned file.
+
+        Args:
+            path: Scanned file path
+            size: File size in bytes
+            mtime: Modification time (st_mtime)
+            inode: Inode number (0 when unknown)
+
+        Returns:
+            Tuple of (status, manifest record or None). For renames the
+            record is the one stored under the old path.
+        """
+        key = str(path)
+        record = self.manifest.get(key)
+        if record is not None:
+            self._seen.add(key)
+            if (record.get('file_size') == size and record.get('mtime') == mtime
+                    and (not inode or not record.get('inode') or record.get('inode') == inode)):
+                return self.UNCHANGED, record
+            return self.MODIFIED, record
+
+        old_path = self._find_renamed(path, size, mtime, inode)
+        if old_path is not None:
+            self._seen.add(old_path)
+            self.renames.append((old_path, key))
+            return self.RENAMED, self.manifest[old_path]
+        return self.NEW, None
+
+    def _find_renamed(self, path: Path, size: int, mtime: float, inode: int) -> Optional[str]:
+        """Find a vanished manifest entry with the same content"""
+        # Same inode + size + mtime on the same volume: a plain rename/move
+        if inode:
+            old = self._by_inode.get((inode, size))
+            if old is not None and self._is_vanished(old) \
+                    and self.manifest[old].get('mtime') == mtime:
+                return old
+
+        # Otherwise fall back to the content hash, but only hash the file
+        # when a vanished entry of the same size exists
+        candidates = [p for p in self._by_size.get(size, ()) if self._is_vanished(p)]
+        if not candidates:
+            return None
+        digests: Dict[bool, str] = {}
+        for old in candidates:
+            stored = self.manifest[old]['hash']
+            kind = ':' in stored
+            if kind not in digests:
+                try:
+                    digests[kind] = _hash_like(path, stored)
+                except OSError as e:
+                    logger.debug(f"Cannot hash {path}: {e}")
+                    return None
+            if digests[kind] == stored:
+                return old
+        return None
+
+    def _is_vanished(self, old_path: str) -> bool:
+        return old_path not in self._seen and not os.path.exists(old_path)
+
+    def deleted_paths(self, root: Optional[Path] = None, recursive: bool = True) -> List[str]:
+        """
+        Manifest paths whose files are gone (call after the scan completes).
+
+        Only entries the scan could have seen are considered: paths under
+        ``root`` (direct children only when ``recursive`` is False) that were
+        not seen and no longer exist on disk.
+
+        Args:
+            root: Directory that was scanned (no scope check if None)
+            recursive: Whether the scan descended into subdirectories
+        """
+        root_str = os.path.abspath(root) if root is not None else None
+        deleted = []
+        for path in self.manifest:
+            if path in self._seen:
+                continue
+            if root_str is not None:
+                parent = os.path.dirname(os.path.abspath(path))
+                if recursive:
+                    if parent != root_str and not parent.startswith(root_str.rstrip(os.sep) + os.sep):
+                        continue
+                elif parent != root_str:
+                    continue
+            if not os.path.exists(path):
+                deleted.append(path)
+        return deleted
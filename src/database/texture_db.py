@@ -3,15 +3,158 @@ Database Indexing System
 SQLite-based indexing for massive texture libraries (200,000+ files)
 """
 
+import os
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Iterable, Iterator, List, Dict, Optional, Set, Tuple
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Upsert rather than INSERT OR REPLACE so a re-indexed file keeps its row id
+# (stable keyset pagination) and the full-text index is not rewritten
+_INSERT_TEXTURE_SQL = '''
+    INSERT INTO textures 
+    (file_path, filename, file_size, width, height, format, category, 
+     confidence, lod_group, lod_level, hash, is_corrupted, date_added, 
+     date_modified, last_classified, mtime, inode)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(file_path) DO UPDATE SET
+        file_size = excluded.file_size, width = excluded.width,
+        height = excluded.height, format = excluded.format,
+        category = excluded.category, confidence = excluded.confidence,
+        lod_group = excluded.lod_group, lod_level = excluded.lod_level,
+        hash = excluded.hash, is_corrupted = excluded.is_corrupted,
+        date_added = excluded.date_added, date_modified = excluded.date_modified,
+        last_classified = excluded.last_classified, mtime = excluded.mtime,
+        inode = excluded.inode
+'''
+
+_INSERT_OPERATION_SQL = '''
+    INSERT INTO operations_log (timestamp, operation, file_path, status, details)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+
+# Compound indexes for the filters exposed by query_textures / FilterCriteria.
+# The single-column ones stay: their entries are ordered by id within a key,
+# which lets keyset pages on an equality filter seek instead of sort.
+_TEXTURE_INDEXES = (
+    ('idx_category', 'category'),
+    ('idx_filename', 'filename'),
+    ('idx_lod_group', 'lod_group'),
+    ('idx_hash', 'hash'),
+    ('idx_category_format', 'category, format'),
+    ('idx_format_size', 'format, file_size'),
+    ('idx_file_size', 'file_size'),
+    ('idx_dimensions', 'width, height'),
+    ('idx_lod_group_level', 'lod_group, lod_level'),
+)
+
+# Full-text index over filenames, kept in sync by triggers. The trigram
+# tokenizer (SQLite 3.34+) matches arbitrary substrings. Full paths are not
+# indexed: doing so nearly doubles the indexing cost of a bulk insert, and
+# path filters are served by the UNIQUE(file_path) range scan instead.
+_FTS_TABLE_SQL = '''
+    CREATE VIRTUAL TABLE textures_fts USING fts5(
+        filename, content='textures', content_rowid='id', tokenize='trigram'
+    )
+'''
+
+_FTS_TRIGGERS = (
+    '''
+    CREATE TRIGGER IF NOT EXISTS textures_fts_insert AFTER INSERT ON textures BEGIN
+        INSERT INTO textures_fts(rowid, filename) VALUES (new.id, new.filename);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS textures_fts_delete AFTER DELETE ON textures BEGIN
+        INSERT INTO textures_fts(textures_fts, rowid, filename)
+        VALUES ('delete', old.id, old.filename);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS textures_fts_update AFTER UPDATE OF filename ON textures BEGIN
+        INSERT INTO textures_fts(textures_fts, rowid, filename)
+        VALUES ('delete', old.id, old.filename);
+        INSERT INTO textures_fts(rowid, filename) VALUES (new.id, new.filename);
+    END
+    ''',
+)
+
+# Extension aliases used to match FilterCriteria-style formats ('.jpg')
+# against the format names stored by the sort pipeline ('JPEG')
+_FORMAT_ALIASES = {
+    'JPG': ('JPG', 'JPEG'),
+    'JPEG': ('JPG', 'JPEG'),
+    'TIF': ('TIF', 'TIFF'),
+    'TIFF': ('TIF', 'TIFF'),
+}
+
+
+def _format_names(formats: Iterable[str]) -> List[str]:
+    """Normalise '.png' / 'png' / 'PNG' to the stored upper-case format names"""
+    names = set()
+    for fmt in formats:
+        key = fmt.lstrip('.').upper()
+        names.update(_FORMAT_ALIASES.get(key, (key,)))
+    return sorted(names)
+
+
+def _fts_phrase(text: str) -> str:
+    """Quote user text as a single FTS5 phrase"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _texture_row(file_path: Path, metadata: dict) -> tuple:
+    """Build the parameter tuple for _INSERT_TEXTURE_SQL"""
+    file_path = Path(file_path)
+    now = datetime.now().isoformat()
+    return (
+        str(file_path),
+        file_path.name,
+        metadata.get('file_size', 0),
+        metadata.get('width', 0),
+        metadata.get('height', 0),
+        metadata.get('format', ''),
+        metadata.get('category', 'unclassified'),
+        metadata.get('confidence', 0.0),
+        metadata.get('lod_group', ''),
+        metadata.get('lod_level', ''),
+        metadata.get('hash', ''),
+        metadata.get('is_corrupted', False),
+        metadata.get('date_added', now),
+        metadata.get('date_modified', now),
+        now,
+        metadata.get('mtime'),
+        metadata.get('inode')
+    )
+
+
+def _operation_row(operation: str, file_path: Path, status: str, details: str = "") -> tuple:
+    """Build the parameter tuple for _INSERT_OPERATION_SQL"""
+    return (datetime.now().isoformat(), operation, str(file_path), status, details)
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    """Open a connection in WAL mode so readers never block the writer"""
+    conn = sqlite3.connect(str(db_path), timeout=30.0, check_same_thread=False)
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        # NORMAL is durable in WAL mode except on power loss, and avoids an
+        # fsync on every commit
+        conn.execute('PRAGMA synchronous=NORMAL')
+    except sqlite3.DatabaseError as e:
+        logger.debug(f"Could not enable WAL mode: {e}")
+    return conn
+
+
 class TextureDatabase:
     """Database manager for texture indexing"""
     
@@ -19,11 +162,16 @@ class TextureDatabase:
         self.db_path = db_path
         self.conn = None
         self.cursor = None
+        self.writer: Optional['DatabaseWriter'] = None
+        # Whether the trigram filename index is available (needs FTS5, SQLite 3.34+)
+        self.has_fts = False
+        # The connection is shared with sort-pipeline worker threads
+        self._lock = threading.RLock()
         self._initialize_database()
     
     def _initialize_database(self):
         """Initialize database connection and create tables"""
-        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn = _connect(self.db_path)
         self.cursor = self.conn.cursor()
         
         # Create textures table
@@ -44,20 +192,17 @@ class TextureDatabase:
                 is_corrupted BOOLEAN DEFAULT 0,
                 date_added TEXT,
                 date_modified TEXT,
-                last_classified TEXT
+                last_classified TEXT,
+                mtime REAL,
+                inode INTEGER
             )
         ''')
+        self._migrate_textures_table()
         
-        # Create index for faster searches
-        self.cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_category ON textures(category)
-        ''')
-        self.cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_filename ON textures(filename)
-        ''')
-        self.cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_lod_group ON textures(lod_group)
-        ''')
+        # Create indexes for faster searches
+        for name, columns in _TEXTURE_INDEXES:
+            self.cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON textures({columns})')
+        self._create_fts_index()
         
         # Create settings table
         self.cursor.execute('''
@@ -81,135 +226,616 @@ class TextureDatabase:
         
         self.conn.commit()
     
+    def _migrate_textures_table(self):
+        """Add columns introduced after the original schema to older databases"""
+        self.cursor.execute('PRAGMA table_info(textures)')
+        existing = {row[1] for row in self.cursor.fetchall()}
+        for column, column_type in (('mtime', 'REAL'), ('inode', 'INTEGER')):
+            if column not in existing:
+                self.cursor.execute(f'ALTER TABLE textures ADD COLUMN {column} {column_type}')
+    
+    def _create_fts_index(self):
+        """Create the filename full-text index and backfill it once"""
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'textures_fts'")
+        if self.cursor.fetchone() is None:
+            try:
+                self.cursor.execute(_FTS_TABLE_SQL)
+            except sqlite3.OperationalError as e:
+                logger.info(f"Trigram FTS5 unavailable, filename search will scan: {e}")
+                return
+            # Index rows written before the FTS table existed
+            self.cursor.execute("INSERT INTO textures_fts(textures_fts) VALUES ('rebuild')")
+        for trigger in _FTS_TRIGGERS:
+            self.cursor.execute(trigger)
+        self.has_fts = True
+    
     def add_texture(self, file_path: Path, metadata: dict) -> bool:
         """Add or update texture in database"""
         try:
-            self.cursor.execute('''
-                INSERT OR REPLACE INTO textures 
-                (file_path, filename, file_size, width, height, format, category, 
-                 confidence, lod_group, lod_level, hash, is_corrupted, date_added, 
-                 date_modified, last_classified)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                str(file_path),
-                file_path.name,
-                metadata.get('file_size', 0),
-                metadata.get('width', 0),
-                metadata.get('height', 0),
-                metadata.get('format', ''),
-                metadata.get('category', 'unclassified'),
-                metadata.get('confidence', 0.0),
-                metadata.get('lod_group', ''),
-                metadata.get('lod_level', ''),
-                metadata.get('hash', ''),
-                metadata.get('is_corrupted', False),
-                metadata.get('date_added', datetime.now().isoformat()),
-                metadata.get('date_modified', datetime.now().isoformat()),
-                datetime.now().isoformat()
-            ))
-            self.conn.commit()
+            with self._lock:
+                self._insert_texture(file_path, metadata)
+                self.conn.commit()
             return True
         except Exception as e:
             logger.error(f"Error adding texture to database: {e}")
             return False
     
+    def _insert_texture(self, file_path: Path, metadata: dict):
+        """Execute the upsert for one texture row (caller commits)"""
+        self.cursor.execute(_INSERT_TEXTURE_SQL, _texture_row(file_path, metadata))
+    
+    def add_textures_bulk(self, textures: Iterable[Tuple[Path, dict]]) -> int:
+        """
+        Add or update many textures in a single transaction.
+        
+        Args:
+            textures: Iterable of (file_path, metadata) pairs
+        
+        Returns:
+            Number of rows written (0 on error)
+        """
+        rows = [_texture_row(path, metadata) for path, metadata in textures]
+        if not rows:
+            return 0
+        try:
+            with self._lock:
+                with self.conn:
+                    self.cursor.executemany(_INSERT_TEXTURE_SQL, rows)
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error bulk-adding textures to database: {e}")
+            return 0
+    
     def get_texture(self, file_path: Path) -> Optional[dict]:
         """Get texture metadata from database"""
-        self.cursor.execute('SELECT * FROM textures WHERE file_path = ?', (str(file_path),))
-        row = self.cursor.fetchone()
+        with self._lock:
+            cursor = self.conn.execute('SELECT * FROM textures WHERE file_path = ?',
+                                       (str(file_path),))
+            row = cursor.fetchone()
         
         if row:
-            columns = [desc[0] for desc in self.cursor.description]
+            columns = [desc[0] for desc in cursor.description]
             return dict(zip(columns, row))
         return None
     
+    def get_manifest(self, root: Optional[Path] = None) -> Dict[str, dict]:
+        """
+        Get the stored file manifest used for incremental re-scans.
+        
+        Args:
+            root: Only return files under this directory (all files if None)
+        
+        Returns:
+            Dict mapping file_path to a dict with file_size, mtime, inode,
+            hash, category, confidence, lod_group, lod_level, width, height
+            and format
+        """
+        query = '''
+            SELECT file_path, file_size, mtime, inode, hash, category, confidence,
+                   lod_group, lod_level, width, height, format
+            FROM textures
+        '''
+        params: Tuple = ()
+        if root is not None:
+            # Range scan on the UNIQUE(file_path) index instead of LIKE
+            prefix = str(root).rstrip(os.sep) + os.sep
+            query += ' WHERE file_path >= ? AND file_path < ?'
+            params = (prefix, prefix[:-1] + chr(ord(os.sep) + 1))
+        
+        with self._lock:
+            self.cursor.execute(query, params)
+            rows = self.cursor.fetchall()
+        
+        columns = ('file_size', 'mtime', 'inode', 'hash', 'category', 'confidence',
+                   'lod_group', 'lod_level', 'width', 'height', 'format')
+        return {row[0]: dict(zip(columns, row[1:])) for row in rows}
+    
+    def get_indexed_paths(self, root: Optional[Path] = None) -> Set[str]:
+        """Set of indexed file paths, optionally limited to a directory"""
+        source, _, where, params = self._filter_clause(root=root)
+        with self._lock:
+            rows = self.conn.execute(f'SELECT textures.file_path FROM {source} WHERE {where}',
+                                     params).fetchall()
+        return {row[0] for row in rows}
+    
+    def rename_texture(self, old_path: Path, new_path: Path, mtime: Optional[float] = None,
+                       inode: Optional[int] = None) -> bool:
+        """Move a texture record to a new path, keeping its classification"""
+        try:
+            with self._lock:
+                self.cursor.execute('''
+                    UPDATE textures SET file_path = ?, filename = ?,
+                           mtime = COALESCE(?, mtime), inode = COALESCE(?, inode)
+                    WHERE file_path = ?
+                ''', (str(new_path), Path(new_path).name, mtime, inode, str(old_path)))
+                self.conn.commit()
+                return self.cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Error renaming texture in database: {e}")
+            return False
+    
+    def update_hashes(self, hashes: Dict[str, str]) -> int:
+        """
+        Store content digests for already indexed textures.
+        
+        Args:
+            hashes: Mapping of file_path -> digest; unknown paths are ignored
+        
+        Returns:
+            Number of rows updated
+        """
+        try:
+            with self._lock:
+                with self.conn:
+                    cursor = self.conn.executemany(
+                        'UPDATE textures SET hash = ? WHERE file_path = ?',
+                        [(digest, str(path)) for path, digest in hashes.items()]
+                    )
+                return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Error updating texture hashes: {e}")
+            return 0
+    
+    def remove_textures(self, file_paths: Iterable[Path]) -> int:
+        """Remove texture records for files that no longer exist"""
+        try:
+            with self._lock:
+                self.cursor.executemany(
+                    'DELETE FROM textures WHERE file_path = ?',
+                    [(str(p),) for p in file_paths]
+                )
+                self.conn.commit()
+                return self.cursor.rowcount
+        except Exception as e:
+            logger.error(f"Error removing textures from database: {e}")
+            return 0
+    
     def search_textures(self, category: Optional[str] = None, 
                        lod_group: Optional[str] = None,
                        filename_pattern: Optional[str] = None) -> List[dict]:
         """Search textures with filters"""
-        query = 'SELECT * FROM textures WHERE 1=1'
-        params = []
+        return self.query_textures(
+            limit=-1,
+            categories=[category] if category else None,
+            lod_group=lod_group or None,
+            name=filename_pattern or None
+        )
+    
+    def query_textures(self, after_id: int = 0, limit: int = 500,
+                       columns: Optional[Iterable[str]] = None, **filters) -> List[dict]:
+        """
+        Fetch one page of textures matching the filters, ordered by id.
         
-        if category:
-            query += ' AND category = ?'
-            params.append(category)
+        Pagination is keyset-based: pass the ``id`` of the last row of the
+        previous page as ``after_id``, so every page costs the same no
+        matter how deep into the result set it is.
         
-        if lod_group:
-            query += ' AND lod_group = ?'
-            params.append(lod_group)
+        Args:
+            after_id: Only return rows with id greater than this
+            limit: Maximum rows to return (-1 for no limit)
+            columns: Columns to select (all columns if None; ``id`` is always included)
+            **filters: See _filter_clause
         
-        if filename_pattern:
-            query += ' AND filename LIKE ?'
-            params.append(f'%{filename_pattern}%')
+        Returns:
+            List of row dicts
+        """
+        source, key, where, params = self._filter_clause(**filters)
+        select = 'textures.*'
+        if columns is not None:
+            wanted = [c for c in columns if c != 'id']
+            self._check_columns(wanted)
+            select = ', '.join(f'textures.{c}' for c in ['id'] + wanted)
+        query = (f'SELECT {select} FROM {source} WHERE {where} AND {key} > ? '
+                 f'ORDER BY {key} LIMIT ?')
         
-        self.cursor.execute(query, params)
-        rows = self.cursor.fetchall()
+        with self._lock:
+            cursor = self.conn.execute(query, params + [after_id, limit])
+            rows = cursor.fetchall()
+            names = [desc[0] for desc in cursor.description]
+        return [dict(zip(names, row)) for row in rows]
+    
+    def iter_textures(self, page_size: int = 500, columns: Optional[Iterable[str]] = None,
+                      **filters) -> Iterator[dict]:
+        """
+        Stream every texture matching the filters, one keyset page at a time.
         
-        columns = [desc[0] for desc in self.cursor.description]
-        return [dict(zip(columns, row)) for row in rows]
+        The database lock is only held while a page is fetched, so writers
+        are not blocked while the caller consumes results.
+        
+        Args:
+            page_size: Rows fetched per query
+            columns: Columns to select (all columns if None)
+            **filters: See _filter_clause
+        
+        Yields:
+            Row dicts in id order
+        """
+        if columns is not None:
+            columns = list(columns)
+        after_id = 0
+        while True:
+            page = self.query_textures(after_id, page_size, columns, **filters)
+            yield from page
+            if len(page) < page_size:
+                return
+            after_id = page[-1]['id']
+    
+    def count_textures(self, **filters) -> int:
+        """Count textures matching the filters (see _filter_clause)"""
+        source, _, where, params = self._filter_clause(**filters)
+        with self._lock:
+            return self.conn.execute(f'SELECT COUNT(*) FROM {source} WHERE {where}',
+                                     params).fetchone()[0]
+    
+    def _filter_clause(self, name: Optional[str] = None,
+                       path_contains: Optional[str] = None,
+                       root: Optional[Path] = None,
+                       categories: Optional[Iterable[str]] = None,
+                       formats: Optional[Iterable[str]] = None,
+                       lod_group: Optional[str] = None,
+                       min_size: Optional[int] = None,
+                       max_size: Optional[int] = None,
+                       min_width: Optional[int] = None,
+                       max_width: Optional[int] = None,
+                       min_height: Optional[int] = None,
+                       max_height: Optional[int] = None,
+                       modified_after: Optional[str] = None,
+                       modified_before: Optional[str] = None) -> Tuple[str, str, str, list]:
+        """
+        Build the FROM / WHERE clauses shared by the query methods.
+        
+        A filename search is driven from the FTS table, which yields rowids in
+        order, so keyset pages stop after ``limit`` matches instead of
+        materialising every match on each page.
+        
+        Args:
+            name: Case-insensitive substring of the filename
+            path_contains: Case-insensitive substring of the full path
+            root: Only files under this directory
+            categories: Allowed categories
+            formats: Allowed formats ('.png', 'png' and 'PNG' are equivalent)
+            lod_group: Exact LOD group
+            min_size / max_size: File size bounds in bytes
+            min_width / max_width / min_height / max_height: Dimension bounds
+            modified_after / modified_before: ISO timestamps compared with date_modified
+        
+        Returns:
+            Tuple of (FROM source, keyset column, WHERE expression, parameter list)
+        """
+        source, key = 'textures', 'textures.id'
+        clauses = ['1=1']
+        params: list = []
+        
+        if name:
+            if self.has_fts and len(name) >= 3:
+                source = 'textures_fts JOIN textures ON textures.id = textures_fts.rowid'
+                key = 'textures_fts.rowid'
+                clauses.append('textures_fts MATCH ?')
+                params.append(_fts_phrase(name))
+            else:
+                # Trigrams need at least three characters; short strings scan
+                clauses.append('instr(lower(textures.filename), ?) > 0')
+                params.append(name.lower())
+        
+        if path_contains:
+            clauses.append('instr(lower(textures.file_path), ?) > 0')
+            params.append(path_contains.lower())
+        
+        if root is not None:
+            prefix = str(root).rstrip(os.sep) + os.sep
+            clauses.append('textures.file_path >= ? AND textures.file_path < ?')
+            params.extend((prefix, prefix[:-1] + chr(ord(os.sep) + 1)))
+        
+        for column, values in (('category', categories),
+                               ('format', _format_names(formats) if formats is not None else None)):
+            if values is None:
+                continue
+            values = list(values)
+            if not values:
+                clauses.append('0')
+                continue
+            clauses.append(f'textures.{column} IN ({", ".join("?" * len(values))})')
+            params.extend(values)
+        
+        if lod_group is not None:
+            clauses.append('textures.lod_group = ?')
+            params.append(lod_group)
+        
+        for column, op, value in (('file_size', '>=', min_size), ('file_size', '<=', max_size),
+                                  ('width', '>=', min_width), ('width', '<=', max_width),
+                                  ('height', '>=', min_height), ('height', '<=', max_height),
+                                  ('date_modified', '>=', modified_after),
+                                  ('date_modified', '<=', modified_before)):
+            if value is not None:
+                clauses.append(f'textures.{column} {op} ?')
+                params.append(value)
+        
+        return source, key, ' AND '.join(clauses), params
+    
+    def _check_columns(self, columns: List[str]):
+        """Reject unknown column names before they are interpolated into SQL"""
+        with self._lock:
+            known = {row[1] for row in self.conn.execute('PRAGMA table_info(textures)')}
+        unknown = [c for c in columns if c not in known]
+        if unknown:
+            raise ValueError(f"Unknown texture columns: {', '.join(unknown)}")
     
     def get_statistics(self) -> dict:
         """Get database statistics"""
         stats = {}
         
-        # Total textures
-        self.cursor.execute('SELECT COUNT(*) FROM textures')
-        stats['total_textures'] = self.cursor.fetchone()[0]
+        with self._lock:
+            # Total textures
+            self.cursor.execute('SELECT COUNT(*) FROM textures')
+            stats['total_textures'] = self.cursor.fetchone()[0]
         
-        # By category
-        self.cursor.execute('SELECT category, COUNT(*) FROM textures GROUP BY category')
-        stats['by_category'] = dict(self.cursor.fetchall())
+            # By category
+            self.cursor.execute('SELECT category, COUNT(*) FROM textures GROUP BY category')
+            stats['by_category'] = dict(self.cursor.fetchall())
         
-        # By format
-        self.cursor.execute('SELECT format, COUNT(*) FROM textures GROUP BY format')
-        stats['by_format'] = dict(self.cursor.fetchall())
+            # By format
+            self.cursor.execute('SELECT format, COUNT(*) FROM textures GROUP BY format')
+            stats['by_format'] = dict(self.cursor.fetchall())
         
-        # Total size
-        self.cursor.execute('SELECT SUM(file_size) FROM textures')
-        stats['total_size_bytes'] = self.cursor.fetchone()[0] or 0
+            # Total size
+            self.cursor.execute('SELECT SUM(file_size) FROM textures')
+            stats['total_size_bytes'] = self.cursor.fetchone()[0] or 0
         
-        # Corrupted files
-        self.cursor.execute('SELECT COUNT(*) FROM textures WHERE is_corrupted = 1')
-        stats['corrupted_count'] = self.cursor.fetchone()[0]
+            # Corrupted files
+            self.cursor.execute('SELECT COUNT(*) FROM textures WHERE is_corrupted = 1')
+            stats['corrupted_count'] = self.cursor.fetchone()[0]
         
         return stats
     
     def log_operation(self, operation: str, file_path: Path, status: str, details: str = ""):
         """Log an operation"""
         try:
-            self.cursor.execute('''
-                INSERT INTO operations_log (timestamp, operation, file_path, status, details)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (datetime.now().isoformat(), operation, str(file_path), status, details))
-            self.conn.commit()
+            with self._lock:
+                self.cursor.execute(_INSERT_OPERATION_SQL,
+                                    _operation_row(operation, file_path, status, details))
+                self.conn.commit()
         except Exception as e:
             logger.error(f"Error logging operation: {e}")
     
+    def log_operations_bulk(self, operations: Iterable[Tuple[str, Path, str, str]]) -> int:
+        """
+        Log many operations in a single transaction.
+        
+        Args:
+            operations: Iterable of (operation, file_path, status, details)
+        
+        Returns:
+            Number of rows written (0 on error)
+        """
+        rows = [_operation_row(*op) for op in operations]
+        if not rows:
+            return 0
+        try:
+            with self._lock:
+                with self.conn:
+                    self.cursor.executemany(_INSERT_OPERATION_SQL, rows)
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error bulk-logging operations: {e}")
+            return 0
+    
+    @contextmanager
+    def write_batch(self, batch_size: int = 500,
+                    flush_interval_ms: int = 250) -> Iterator['TextureWriteBatch']:
+        """
+        Buffer writes and commit them in batches.
+        
+        Example:
+            >>> with db.write_batch() as batch:
+            ...     for path, meta in results:
+            ...         batch.add_texture(path, meta)
+        
+        Args:
+            batch_size: Commit after this many buffered rows
+            flush_interval_ms: Commit when the oldest buffered row is this old
+        """
+        batch = TextureWriteBatch(self, batch_size, flush_interval_ms)
+        try:
+            yield batch
+        finally:
+            batch.flush()
+    
+    def start_writer(self, batch_size: int = 500,
+                     flush_interval_ms: int = 250) -> 'DatabaseWriter':
+        """
+        Start (or return the running) background writer thread.
+        
+        The writer owns its own connection, so any thread can enqueue rows
+        without touching ``self.cursor``. Not supported for ``:memory:``
+        databases, which cannot be shared between connections.
+        """
+        if str(self.db_path) == ':memory:':
+            raise ValueError("Background writer requires a file-backed database")
+        if self.writer is None or not self.writer.is_running():
+            self.writer = DatabaseWriter(self.db_path, batch_size, flush_interval_ms)
+            self.writer.start()
+        return self.writer
+    
+    def stop_writer(self):
+        """Flush and stop the background writer thread"""
+        if self.writer is not None:
+            self.writer.stop()
+            self.writer = None
+    
     def get_recent_operations(self, limit: int = 100) -> List[dict]:
         """Get recent operations log"""
-        self.cursor.execute('''
-            SELECT * FROM operations_log 
-            ORDER BY timestamp DESC 
-            LIMIT ?
-        ''', (limit,))
-        
-        rows = self.cursor.fetchall()
-        columns = [desc[0] for desc in self.cursor.description]
+        with self._lock:
+            cursor = self.conn.execute('''
+                SELECT * FROM operations_log 
+                ORDER BY timestamp DESC 
+                LIMIT ?
+            ''', (limit,))
+            rows = cursor.fetchall()
+        columns = [desc[0] for desc in cursor.description]
         return [dict(zip(columns, row)) for row in rows]
     
     def clear_database(self):
         """Clear all texture records (but keep schema)"""
-        self.cursor.execute('DELETE FROM textures')
-        self.cursor.execute('DELETE FROM operations_log')
-        self.conn.commit()
+        with self._lock:
+            with self.conn:
+                self.conn.execute('DELETE FROM textures')
+                self.conn.execute('DELETE FROM operations_log')
     
     def close(self):
         """Close database connection"""
-        if self.conn:
-            self.conn.close()
+        self.stop_writer()
+        with self._lock:
+            if self.conn:
+                try:
+                    # Refresh planner statistics for the filter indexes
+                    self.conn.execute('PRAGMA optimize')
+                except sqlite3.DatabaseError:
+                    pass
+                self.conn.close()
     
     def __enter__(self):
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
+
+
+class TextureWriteBatch:
+    """Buffered writer on the TextureDatabase connection (see write_batch)"""
+    
+    def __init__(self, database: TextureDatabase, batch_size: int = 500,
+                 flush_interval_ms: int = 250):
+        self.database = database
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._textures: List[Tuple[Path, dict]] = []
+        self._operations: List[Tuple[str, Path, str, str]] = []
+        self._oldest: Optional[float] = None
+    
+    def add_texture(self, file_path: Path, metadata: dict):
+        """Buffer a texture upsert"""
+        self._textures.append((file_path, metadata))
+        self._maybe_flush()
+    
+    def log_operation(self, operation: str, file_path: Path, status: str, details: str = ""):
+        """Buffer an operations_log row"""
+        self._operations.append((operation, file_path, status, details))
+        self._maybe_flush()
+    
+    def _maybe_flush(self):
+        now = time.monotonic()
+        if self._oldest is None:
+            self._oldest = now
+        pending = len(self._textures) + len(self._operations)
+        if pending >= self.batch_size or now - self._oldest >= self.flush_interval:
+            self.flush()
+    
+    def flush(self):
+        """Commit everything buffered so far"""
+        if self._textures:
+            self.database.add_textures_bulk(self._textures)
+            self._textures = []
+        if self._operations:
+            self.database.log_operations_bulk(self._operations)
+            self._operations = []
+        self._oldest = None
+
+
+class DatabaseWriter:
+    """
+    Background thread that drains a queue of rows into SQLite.
+    
+    Rows are committed every ``batch_size`` rows or ``flush_interval_ms``
+    milliseconds, whichever comes first, using a dedicated connection.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, db_path: Path, batch_size: int = 500,
+                 flush_interval_ms: int = 250, max_queue: int = 10000):
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self.rows_written = 0
+        self.commits = 0
+    
+    def start(self):
+        """Start the writer thread"""
+        if self.is_running():
+            return
+        self._thread = threading.Thread(target=self._run, name="TextureDBWriter", daemon=True)
+        self._thread.start()
+    
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def add_texture(self, file_path: Path, metadata: dict):
+        """Enqueue a texture upsert (blocks only when the queue is full)"""
+        self._queue.put(('texture', _texture_row(file_path, metadata)))
+    
+    def log_operation(self, operation: str, file_path: Path, status: str, details: str = ""):
+        """Enqueue an operations_log row"""
+        self._queue.put(('operation', _operation_row(operation, file_path, status, details)))
+    
+    def flush(self):
+        """Block until every row enqueued so far is committed"""
+        if self.is_running():
+            self._queue.join()
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Commit pending rows and stop the thread"""
+        if not self.is_running():
+            return
+        self._queue.put((self._STOP, None))
+        self._thread.join(timeout)
+    
+    def _run(self):
+        conn = _connect(self.db_path)
+        textures: List[tuple] = []
+        operations: List[tuple] = []
+        deadline: Optional[float] = None
+        stopping = False
+        try:
+            while not stopping:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+                try:
+                    kind, row = self._queue.get(timeout=timeout)
+                    if kind is self._STOP:
+                        stopping = True
+                    elif kind == 'texture':
+                        textures.append(row)
+                    else:
+                        operations.append(row)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+                except queue.Empty:
+                    pass
+                
+                pending = len(textures) + len(operations)
+                if pending and (stopping or pending >= self.batch_size
+                                or time.monotonic() >= deadline):
+                    self._commit(conn, textures, operations)
+                    for _ in range(pending):
+                        self._queue.task_done()
+                    textures, operations = [], []
+                    deadline = None
+                if stopping:
+                    self._queue.task_done()
+                elif not pending:
+                    deadline = None
+        finally:
+            conn.close()
+    
+    def _commit(self, conn: sqlite3.Connection, textures: List[tuple], operations: List[tuple]):
+        try:
+            with conn:
+                if textures:
+                    conn.executemany(_INSERT_TEXTURE_SQL, textures)
+                if operations:
+                    conn.executemany(_INSERT_OPERATION_SQL, operations)
+            self.rows_written += len(textures) + len(operations)
+            self.commits += 1
+        except Exception as e:
+            logger.error(f"Background database write failed: {e}")
@@ -4,11 +4,12 @@ Advanced search and filtering for PS2 textures with preset support
 Author: Dead On The Inside / JosephsDeadish
 """
 
+import os
 import re
 import json
 import logging
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Callable, Set
+from typing import Dict, Any, Iterator, List, Optional, Callable, Set
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from threading import Lock
@@ -33,6 +34,7 @@ class FilterCriteria:
     is_problematic: Optional[bool] = None
     modified_after: Optional[str] = None
     modified_before: Optional[str] = None
+    lod_group: Optional[str] = None
 
 
 @dataclass
@@ -83,7 +85,8 @@ class SearchFilter:
         files: List[Path],
         criteria: FilterCriteria,
         combine_mode: str = "AND",
-        metadata_provider: Optional[Callable[[Path], Dict[str, Any]]] = None
+        metadata_provider: Optional[Callable[[Path], Dict[str, Any]]] = None,
+        database=None
     ) -> List[Path]:
         """
         Search and filter files based on criteria.
@@ -93,12 +96,20 @@ class SearchFilter:
             criteria: Filter criteria to apply
             combine_mode: How to combine filters ("AND" or "OR")
             metadata_provider: Optional function to get file metadata
+            database: Optional TextureDatabase; indexed files are filtered
+                with one indexed query instead of per-file stat() calls
             
         Returns:
             List of file paths matching the criteria
         """
         try:
             logger.debug(f"Searching {len(files)} files with combine_mode={combine_mode}")
+            if database is not None and combine_mode.upper() == "AND" and files:
+                try:
+                    return self._search_with_database(files, criteria, metadata_provider, database)
+                except Exception as e:
+                    logger.warning(f"Database search failed, filtering files directly: {e}")
+            
             results = []
             
             for file_path in files:
@@ -112,6 +123,88 @@ class SearchFilter:
             logger.error(f"Error during search: {e}", exc_info=True)
             return []
     
+    def search_database(
+        self,
+        database,
+        criteria: FilterCriteria,
+        root: Optional[Path] = None,
+        page_size: int = 500
+    ) -> Iterator[Path]:
+        """
+        Stream indexed files matching the criteria straight from the database.
+        
+        Args:
+            database: TextureDatabase to query
+            criteria: Filter criteria to apply (AND semantics)
+            root: Only return files under this directory
+            page_size: Rows fetched per database round trip
+            
+        Yields:
+            Matching file paths in index order
+        """
+        residual = self._residual_criteria(criteria)
+        for row in database.iter_textures(page_size=page_size, columns=('file_path',),
+                                          root=root, **self._database_filters(criteria)):
+            file_path = Path(row['file_path'])
+            if residual is None or self._matches_criteria(file_path, residual, "AND", None):
+                yield file_path
+    
+    def _search_with_database(
+        self,
+        files: List[Path],
+        criteria: FilterCriteria,
+        metadata_provider: Optional[Callable[[Path], Dict[str, Any]]],
+        database
+    ) -> List[Path]:
+        """AND-search using the index for known files and per-file checks for the rest."""
+        root = Path(os.path.commonpath([str(Path(f).parent) for f in files]))
+        indexed = database.get_indexed_paths(root)
+        matched = {str(p) for p in self.search_database(database, criteria, root)}
+        
+        results = []
+        for file_path in files:
+            key = str(file_path)
+            if key in indexed:
+                if key in matched:
+                    results.append(file_path)
+            elif self._matches_criteria(file_path, criteria, "AND", metadata_provider):
+                results.append(file_path)
+        
+        logger.info(f"Search found {len(results)} matching files out of {len(files)} "
+                    f"({len(indexed)} indexed)")
+        return results
+    
+    @staticmethod
+    def _database_filters(criteria: FilterCriteria) -> Dict[str, Any]:
+        """Translate the indexable part of the criteria to TextureDatabase filters."""
+        filters = {
+            'name': criteria.name,
+            'categories': criteria.categories,
+            'formats': criteria.formats,
+            'lod_group': criteria.lod_group,
+            'min_size': criteria.min_size,
+            'max_size': criteria.max_size,
+            'min_width': criteria.min_width,
+            'max_width': criteria.max_width,
+            'min_height': criteria.min_height,
+            'max_height': criteria.max_height,
+            'modified_after': criteria.modified_after,
+            'modified_before': criteria.modified_before,
+        }
+        return {key: value for key, value in filters.items() if value is not None}
+    
+    @staticmethod
+    def _residual_criteria(criteria: FilterCriteria) -> Optional[FilterCriteria]:
+        """Criteria the database cannot evaluate (regex and quick filters), or None."""
+        if criteria.name_regex is None and criteria.is_favorite is None \
+                and criteria.is_problematic is None:
+            return None
+        return FilterCriteria(
+            name_regex=criteria.name_regex,
+            is_favorite=criteria.is_favorite,
+            is_problematic=criteria.is_problematic
+        )
+    
     def _matches_criteria(
         self,
         file_path: Path,
@@ -166,6 +259,7 @@ class SearchFilter:
             metadata = None
             if metadata_provider and any([
                 criteria.categories,
+                criteria.lod_group,
                 criteria.min_width,
                 criteria.max_width,
                 criteria.min_height,
@@ -178,6 +272,10 @@ class SearchFilter:
                 category = metadata.get('category', '')
                 matches.append(category in criteria.categories)
             
+            # LOD group filter
+            if criteria.lod_group is not None and metadata:
+                matches.append(metadata.get('lod_group', '') == criteria.lod_group)
+            
             # Resolution filters
             if metadata:
                 width = metadata.get('width', 0)
@@ -41,6 +41,14 @@ except ImportError:
     logger.warning("OpenCV not available — advanced texture analysis disabled. "
                    "Install with: pip install opencv-python")
 
+try:
+    from ..utils.analysis_cache import AnalysisCache
+except ImportError:
+    try:
+        from utils.analysis_cache import AnalysisCache
+    except ImportError:
+        AnalysisCache = None  # type: ignore[assignment,misc]
+
 
 class TextureAnalyzer:
     """
@@ -56,14 +64,20 @@ class TextureAnalyzer:
     - Format optimization suggestions
     """
     
-    def __init__(self, max_palette_colors: int = 10):
+    # Bump when analysis output changes so persisted results are recomputed
+    CACHE_VERSION = "1"
+    
+    def __init__(self, max_palette_colors: int = 10, analysis_cache=None):
         """
         Initialize texture analyzer.
         
         Args:
             max_palette_colors: Maximum number of colors to extract for palette
+            analysis_cache: Optional AnalysisCache; results are then reused for
+                any file with the same contents (tuples come back as lists)
         """
         self.max_palette_colors = max_palette_colors
+        self.analysis_cache = analysis_cache
         logger.debug(f"TextureAnalyzer initialized with max_palette_colors={max_palette_colors}")
     
     def analyze(self, image_path: Path) -> Dict[str, Any]:
@@ -79,6 +93,17 @@ class TextureAnalyzer:
         if not HAS_PIL:
             logger.error("Pillow is required for texture analysis. Install: pip install Pillow")
             return {'error': 'Pillow not available', 'path': str(image_path)}
+        digest = None
+        version = f'{self.CACHE_VERSION}:{self.max_palette_colors}:{int(HAS_CV2)}'
+        if self.analysis_cache is not None:
+            try:
+                digest = self.analysis_cache.file_digest(image_path)
+                cached = self.analysis_cache.get(digest, AnalysisCache.ANALYSIS, version)
+                if cached is not None:
+                    return cached
+            except OSError:
+                digest = None
+        
         try:
             logger.debug(f"Analyzing texture: {image_path}")
             
@@ -115,6 +140,8 @@ class TextureAnalyzer:
             }
             
             logger.debug(f"Analysis complete for: {image_path}")
+            if digest is not None and 'error' not in hash_info:
+                self.analysis_cache.put(digest, AnalysisCache.ANALYSIS, result, version)
             return result
             
         except Exception as e:
@@ -1,4 +1,7 @@
 """File Handler module"""
 from .file_handler import FileHandler
+from .scanner import ScanEntry, TEXTURE_EXTENSIONS, scan_files, scan_paths
+from .duplicate_finder import find_duplicate_groups
 
-__all__ = ['FileHandler']
+__all__ = ['FileHandler', 'ScanEntry', 'TEXTURE_EXTENSIONS', 'scan_files', 'scan_paths',
+           'find_duplicate_groups']
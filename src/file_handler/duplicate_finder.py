@@ -0,0 +1,165 @@
+"""
+Duplicate File Finder
+Tiered exact-duplicate detection. Files are grouped by size (free from the
+scan); same-size files are compared by a hash of their first and last
+64 KB, and only files that still collide are hashed in full. Hashing runs
+on a thread pool (hashlib and xxhash release the GIL while hashing), and
+full digests are reused from, and written back to, the TextureDatabase
+manifest.
+Author: Dead On The Inside / JosephsDeadish
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    from ..utils.analysis_cache import content_hash, content_hasher
+except (ImportError, ValueError):
+    from utils.analysis_cache import content_hash, content_hasher  # type: ignore[no-redef]
+
+try:
+    from .scanner import ScanEntry
+except ImportError:
+    from file_handler.scanner import ScanEntry  # type: ignore[no-redef]
+
+# Bytes hashed from each end of a file in the partial tier
+PARTIAL_BLOCK = 64 * 1024
+
+
+def digest_prefix() -> str:
+    """Prefix of the full digests produced here (e.g. 'xxh3:')."""
+    return content_hasher()[1] + ':'
+
+
+def partial_digest(file_path: Path, size: int, block: int = PARTIAL_BLOCK) -> Tuple[str, bool]:
+    """
+    Hash the first and last ``block`` bytes of a file.
+
+    Files no larger than two blocks are hashed whole, which makes the result
+    their full content digest.
+
+    Returns:
+        Tuple of (digest, is_full_digest)
+    """
+    hasher, prefix = content_hasher()
+    with open(file_path, 'rb') as f:
+        if size <= 2 * block:
+            hasher.update(f.read())
+            return f'{prefix}:{hasher.hexdigest()}', True
+        hasher.update(f.read(block))
+        f.seek(size - block)
+        hasher.update(f.read(block))
+    return f'{prefix}:partial:{hasher.hexdigest()}', False
+
+
+def _stat(path: Path) -> Optional[Tuple[int, float]]:
+    try:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime
+    except OSError as e:
+        logger.debug(f"Cannot stat {path}: {e}")
+        return None
+
+
+def _safe(func, *args):
+    """Run a hashing function, mapping read errors to None."""
+    try:
+        return func(*args)
+    except OSError as e:
+        logger.debug(f"Cannot hash {args[0]}: {e}")
+        return None
+
+
+def find_duplicate_groups(
+    files: Iterable[Union[Path, ScanEntry]],
+    max_workers: Optional[int] = None,
+    manifest: Optional[Dict[str, dict]] = None
+) -> Tuple[List[List[Path]], Dict[str, str]]:
+    """
+    Group files with identical contents.
+
+    Args:
+        files: Paths, or ScanEntry tuples whose size/mtime are used as is
+        max_workers: Hashing threads (default: min(8, CPU count))
+        manifest: Optional TextureDatabase.get_manifest() result; stored
+            full digests are reused when size and mtime still match
+
+    Returns:
+        Tuple of (groups of 2+ paths in input order, newly computed full
+        digests by path for persisting)
+    """
+    files = list(files)
+    workers = max_workers or min(8, os.cpu_count() or 1)
+    prefix = digest_prefix()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dup-hash') as pool:
+        # Tier 1: size (and mtime, for manifest reuse)
+        paths = [Path(f.path) if isinstance(f, ScanEntry) else Path(f) for f in files]
+        missing = [i for i, f in enumerate(files) if not isinstance(f, ScanEntry)]
+        stats: List[Optional[Tuple[int, float]]] = [
+            (f.size, f.mtime) if isinstance(f, ScanEntry) else None for f in files]
+        for i, st in zip(missing, pool.map(_stat, [paths[i] for i in missing])):
+            stats[i] = st
+
+        by_size: Dict[int, List[int]] = {}
+        for i, st in enumerate(stats):
+            if st is not None:
+                by_size.setdefault(st[0], []).append(i)
+
+        full: Dict[int, str] = {}
+        new_digests: Dict[str, str] = {}
+        need_partial: List[int] = []
+        for size, members in by_size.items():
+            if len(members) < 2:
+                continue  # a unique size cannot have a duplicate
+            unknown = []
+            for i in members:
+                record = manifest.get(str(paths[i])) if manifest else None
+                if (size == 0 or (record is not None and record.get('file_size') == size
+                                  and record.get('mtime') == stats[i][1]
+                                  and (record.get('hash') or '').startswith(prefix))):
+                    full[i] = record['hash'] if size else f'{prefix}empty'
+                else:
+                    unknown.append(i)
+            if unknown and size > 2 * PARTIAL_BLOCK:
+                # Known files join the partial tier so a new file is only
+                # fully hashed when its ends match one of them
+                need_partial.extend(members)
+            else:
+                need_partial.extend(unknown)
+
+        # Tier 2: first/last 64 KB of same-size files (whole small files)
+        partial: Dict[int, str] = {}
+        jobs = [(paths[i], stats[i][0]) for i in need_partial]
+        for i, result in zip(need_partial, pool.map(lambda job: _safe(partial_digest, *job), jobs)):
+            if result is None:
+                continue
+            digest, is_full = result
+            if is_full:
+                full[i] = new_digests[str(paths[i])] = digest
+            else:
+                partial[i] = digest
+
+        # Tier 3: full hash of files whose partial digest collides
+        by_partial: Dict[Tuple[int, str], List[int]] = {}
+        for i, digest in partial.items():
+            by_partial.setdefault((stats[i][0], digest), []).append(i)
+        need_full = [i for members in by_partial.values() if len(members) > 1
+                     for i in members if i not in full]
+        for i, digest in zip(need_full, pool.map(lambda i: _safe(content_hash, paths[i]), need_full)):
+            if digest is not None:
+                full[i] = new_digests[str(paths[i])] = digest
+
+    # Ascending input order, so each group starts with its first-seen file
+    by_content: Dict[Tuple[int, str], List[int]] = {}
+    for i in sorted(full):
+        by_content.setdefault((stats[i][0], full[i]), []).append(i)
+    groups = [[paths[i] for i in members] for members in by_content.values() if len(members) > 1]
+    logger.debug(f"Duplicate scan: {len(files)} files, {len(need_partial)} partial hashes, "
+                 f"{len(need_full)} full hashes, {len(groups)} groups")
+    return groups, new_digests
@@ -57,6 +57,9 @@ try:
 except ImportError:
     HAS_BYTESIO = False
 
+from .duplicate_finder import find_duplicate_groups
+from .scanner import ScanEntry
+
 # Import archive handler
 try:
     from ..utils.archive_handler import ArchiveHandler
@@ -636,41 +639,39 @@ class FileHandler:
         
         return hash_obj.hexdigest()
     
-    def find_duplicates(self, file_paths: List[Path], by_hash=True) -> dict:
+    def find_duplicates(self, file_paths: List[Path], by_hash=True, database=None,
+                        max_workers: Optional[int] = None) -> dict:
         """
         Find duplicate files
         
         Args:
-            file_paths: List of file paths to check
+            file_paths: List of file paths (or scanner ScanEntry tuples) to check
             by_hash: Use hash comparison (slower but accurate) vs name+size (faster)
+            database: Optional TextureDatabase; stored content digests are
+                reused for unchanged files and new ones are saved back
+            max_workers: Hashing threads (default: min(8, CPU count))
         
         Returns:
             Dictionary mapping original files to lists of duplicates
         """
         if by_hash:
-            hash_map = {}
-            duplicates = {}
-            
-            for file_path in file_paths:
-                file_hash = self.calculate_file_hash(file_path)
-                
-                if file_hash in hash_map:
-                    # Found duplicate
-                    original = hash_map[file_hash]
-                    if original not in duplicates:
-                        duplicates[original] = []
-                    duplicates[original].append(file_path)
-                else:
-                    hash_map[file_hash] = file_path
-            
-            return duplicates
+            # Size -> first/last 64 KB -> full hash, see duplicate_finder
+            manifest = database.get_manifest() if database is not None else None
+            groups, new_digests = find_duplicate_groups(file_paths, max_workers, manifest)
+            if database is not None and new_digests:
+                database.update_hashes(new_digests)
+            return {group[0]: group[1:] for group in groups}
         else:
             # Compare by name and size (faster)
             size_name_map = {}
             duplicates = {}
             
-            for file_path in file_paths:
-                key = (file_path.name, file_path.stat().st_size)
+            for entry in file_paths:
+                if isinstance(entry, ScanEntry):
+                    file_path, size = entry.path, entry.size
+                else:
+                    file_path, size = entry, entry.stat().st_size
+                key = (file_path.name, size)
                 
                 if key in size_name_map:
                     original = size_name_map[key]
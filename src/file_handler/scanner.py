@@ -0,0 +1,156 @@
+"""
+Directory Scanner
+Single-pass, streaming os.scandir walker shared by the sort pipeline,
+the CLI and the file browser.
+Author: Dead On The Inside / JosephsDeadish
+"""
+
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+TEXTURE_EXTENSIONS = frozenset({
+    '.dds', '.png', '.jpg', '.jpeg', '.tga', '.bmp', '.tif', '.tiff'
+})
+
+
+class ScanEntry(NamedTuple):
+    """A file found by the scanner."""
+    path: Path
+    size: int
+    mtime: float
+    inode: int
+
+
+def _normalize_extensions(extensions: Optional[Iterable[str]]) -> Optional[Set[str]]:
+    """Lower-case extensions and make sure they start with a dot."""
+    if extensions is None:
+        return None
+    return {e.lower() if e.startswith('.') else f'.{e.lower()}' for e in extensions}
+
+
+def _scan_directory(
+    directory: str,
+    extensions: Optional[Set[str]],
+    follow_symlinks: bool
+) -> Tuple[List[ScanEntry], List[str]]:
+    """
+    List one directory.
+
+    Returns:
+        Tuple of (matching file entries, subdirectory paths)
+    """
+    files: List[ScanEntry] = []
+    subdirs: List[str] = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=follow_symlinks):
+                        subdirs.append(entry.path)
+                        continue
+                    if extensions is not None and \
+                            os.path.splitext(entry.name)[1].lower() not in extensions:
+                        continue
+                    if not entry.is_file(follow_symlinks=follow_symlinks):
+                        continue
+                    st = entry.stat(follow_symlinks=follow_symlinks)
+                    files.append(ScanEntry(Path(entry.path), st.st_size, st.st_mtime, st.st_ino))
+                except OSError:
+                    continue
+    except OSError as e:
+        logger.debug(f"Cannot scan {directory}: {e}")
+    return files, subdirs
+
+
+def scan_files(
+    root: Path,
+    extensions: Optional[Iterable[str]] = TEXTURE_EXTENSIONS,
+    recursive: bool = True,
+    parallel: bool = False,
+    max_workers: int = 4,
+    follow_symlinks: bool = False,
+    check_cancelled: Optional[Callable[[], bool]] = None
+) -> Iterator[ScanEntry]:
+    """
+    Walk a directory tree once, yielding matching files as they are found.
+
+    The tree is only listed once regardless of how many extensions are
+    requested, and extensions are matched case-insensitively. Because this
+    is a generator, callers can start processing the first files before the
+    walk has finished.
+
+    Args:
+        root: Directory to scan
+        extensions: Extensions to accept (e.g. {'.png', '.dds'}); None accepts all
+        recursive: Whether to descend into subdirectories
+        parallel: List subdirectories concurrently on a thread pool
+            (helps on network shares and cold disk caches)
+        max_workers: Thread count for the parallel walk
+        follow_symlinks: Whether to follow symlinked files and directories
+        check_cancelled: Optional callable returning True to stop early
+
+    Yields:
+        ScanEntry(path, size, mtime, inode) per matching file
+    """
+    exts = _normalize_extensions(extensions)
+    root_str = str(root)
+
+    if not parallel or not recursive:
+        pending = [root_str]
+        while pending:
+            if check_cancelled and check_cancelled():
+                return
+            files, subdirs = _scan_directory(pending.pop(), exts, follow_symlinks)
+            for entry in files:
+                if check_cancelled and check_cancelled():
+                    return
+                yield entry
+            if recursive:
+                # Reverse so directories are visited in listing order
+                pending.extend(reversed(subdirs))
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers),
+                            thread_name_prefix="DirScanner") as executor:
+        in_flight: Set[Future] = {
+            executor.submit(_scan_directory, root_str, exts, follow_symlinks)
+        }
+        try:
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, subdirs = future.result()
+                    for subdir in subdirs:
+                        in_flight.add(executor.submit(_scan_directory, subdir, exts, follow_symlinks))
+                    for entry in files:
+                        if check_cancelled and check_cancelled():
+                            return
+                        yield entry
+                if check_cancelled and check_cancelled():
+                    return
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+
+def scan_paths(root: Path, extensions: Optional[Iterable[str]] = TEXTURE_EXTENSIONS,
+               recursive: bool = True, **kwargs) -> List[Path]:
+    """
+    Convenience wrapper returning a sorted list of matching paths.
+
+    Args:
+        root: Directory to scan
+        extensions: Extensions to accept; None accepts all
+        recursive: Whether to descend into subdirectories
+        **kwargs: Passed through to scan_files
+
+    Returns:
+        Sorted list of file paths
+    """
+    return sorted(entry.path for entry in scan_files(root, extensions, recursive, **kwargs))
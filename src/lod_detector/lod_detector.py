@@ -3,14 +3,31 @@ LOD (Level of Detail) Detection System
 Automatically detects and groups LOD textures
 """
 
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Set, Tuple, Optional
 from collections import defaultdict
 import logging
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+
 logger = logging.getLogger(__name__)
 
+try:
+    from ..similarity.near_duplicates import iter_similarity_components
+except (ImportError, ValueError):
+    from similarity.near_duplicates import iter_similarity_components  # type: ignore[no-redef]
+
+# Side of the thumbnail compared by the visual LOD checks
+FEATURE_SIZE = 64
+
 
 class LODDetector:
     """Detects and groups Level of Detail (LOD) textures"""
@@ -169,60 +186,112 @@ class LODDetector:
         Returns:
             True if textures are similar enough to be LODs
         """
+        if not file1.exists() or not file2.exists():
+            return False
         try:
-            from PIL import Image
-            import numpy as np
-            
-            if not file1.exists() or not file2.exists():
-                return False
-            
-            # Load and resize both images to same size for comparison
-            with Image.open(file1) as _img1:
-                arr1 = np.array(_img1.convert('RGB').resize((64, 64)), dtype=np.float32)
-            with Image.open(file2) as _img2:
-                arr2 = np.array(_img2.convert('RGB').resize((64, 64)), dtype=np.float32)
-            
-            # Calculate similarity (normalized cross-correlation)
-            similarity = np.corrcoef(arr1.flatten(), arr2.flatten())[0, 1]
-            
-            return similarity >= threshold
-            
+            feature1, _ = self._visual_features(file1)
+            feature2, _ = self._visual_features(file2)
         except Exception as e:
             logger.warning(f"Error comparing images: {e}")
             return False
+        if feature1 is None or feature2 is None:
+            return False  # a flat image correlates with nothing
+        # Normalized cross-correlation
+        return float(feature1 @ feature2) >= threshold
+    
+    @staticmethod
+    def _visual_features(file_path: Path) -> Tuple[Optional["np.ndarray"], Tuple[int, int]]:
+        """
+        Decode an image once into a zero-mean, unit-length 64x64 RGB vector
+        (dot products of these are Pearson correlations).
+        
+        Returns:
+            Tuple of (feature vector or None for a flat image, (width, height))
+        """
+        from PIL import Image
+        
+        with Image.open(file_path) as img:
+            size = img.size
+            pixels = np.asarray(img.convert('RGB').resize((FEATURE_SIZE, FEATURE_SIZE)),
+                                dtype=np.float32).ravel()
+        pixels -= pixels.mean()
+        norm = float(np.linalg.norm(pixels))
+        if norm == 0.0:
+            return None, size
+        return pixels / norm, size
     
-    def detect_unnumbered_lods(self, file_paths: List[Path], similarity_threshold=0.85) -> Dict[str, List[Path]]:
+    @staticmethod
+    def _size_bucket(size: Tuple[int, int]) -> Tuple[int, int, int]:
+        """
+        Key shared by sizes that differ by a power of two with the same
+        aspect ratio (e.g. 512x256, 256x128 and 64x32): the odd parts of
+        width and height and the difference of their powers of two.
+        """
+        (w, h) = size
+        w_shift = (w & -w).bit_length() - 1 if w else 0
+        h_shift = (h & -h).bit_length() - 1 if h else 0
+        return w >> w_shift, h >> h_shift, w_shift - h_shift
+    
+    def detect_unnumbered_lods(
+        self,
+        file_paths: List[Path],
+        similarity_threshold=0.85,
+        bucket_by_size: bool = True,
+        max_workers: Optional[int] = None,
+        memory_budget_mb: float = 256
+    ) -> Dict[str, List[Path]]:
         """
         Detect LODs without explicit numbering using visual similarity
         
+        Each file is decoded once into a 64x64 feature vector. Files are
+        bucketed by aspect ratio and power-of-two size relationship, and
+        within a bucket all pairwise correlations are computed with blocked
+        matrix products; pairs above the threshold are merged with
+        union-find, so groups are connected components.
+        
         Args:
             file_paths: List of file paths to check
             similarity_threshold: Minimum similarity to consider as LOD pair
+            bucket_by_size: Only compare files whose sizes differ by a power
+                of two at the same aspect ratio
+            max_workers: Decoding threads (default: min(8, CPU count))
+            memory_budget_mb: Memory for one block of pairwise correlations
         
         Returns:
-            Dictionary of grouped similar textures
+            Dictionary of grouped similar textures, keyed by the stem of each
+            group's first file
         """
-        # This is computationally expensive, so only use on small sets
-        if len(file_paths) > 100:
-            logger.warning("Visual similarity detection is slow for large sets")
+        file_paths = [Path(p) for p in file_paths]
+        workers = max_workers or min(8, os.cpu_count() or 1)
         
-        groups = defaultdict(list)
-        processed = set()
+        def load(path):
+            try:
+                return self._visual_features(path)
+            except Exception as e:
+                logger.debug(f"Cannot read {path}: {e}")
+                return None, None
         
-        for i, file1 in enumerate(file_paths):
-            if str(file1) in processed:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='lod-decode') as pool:
+            decoded = list(pool.map(load, file_paths))
+        
+        buckets: Dict[Tuple, List[int]] = defaultdict(list)
+        for i, (feature, size) in enumerate(decoded):
+            if feature is not None:
+                buckets[self._size_bucket(size) if bucket_by_size else ()].append(i)
+        
+        components: List[List[int]] = []
+        for members in buckets.values():
+            if len(members) < 2:
                 continue
-            
-            group_key = file1.stem
-            groups[group_key].append(file1)
-            processed.add(str(file1))
-            
-            # Compare with remaining files
-            for file2 in file_paths[i+1:]:
-                if str(file2) not in processed:
-                    if self.are_visually_similar(file1, file2, similarity_threshold):
-                        groups[group_key].append(file2)
-                        processed.add(str(file2))
-        
-        # Filter out single-file groups
-        return {k: v for k, v in groups.items() if len(v) > 1}
+            vectors = np.stack([decoded[i][0] for i in members])
+            for rows in iter_similarity_components(vectors, similarity_threshold, 'cosine',
+                                                   memory_budget_mb):
+                components.append([members[row] for row in rows.tolist()])
+        
+        groups: Dict[str, List[Path]] = {}
+        for component in sorted(components):
+            key = file_paths[component[0]].stem
+            if key in groups:
+                key = str(file_paths[component[0]])
+            groups[key] = [file_paths[i] for i in component]
+        return groups
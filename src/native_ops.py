@@ -11,8 +11,15 @@ The ``texture_ops`` Rust extension (built with PyO3) accelerates:
 - Bitmap to SVG vector tracing (via vtracer)
 - Batch parallel processing of multiple images
 
-When the native module is unavailable, the pure-Python fallbacks in this
-file are used instead.  They produce similar results but are slower.
+The batch functions take a stacked ``(N, H, W, C)`` uint8 array or a list
+of ``(H, W, C)`` arrays and return NumPy arrays.  Extensions built with the
+``*_array`` entry points read those buffers in place (no per-image
+``tobytes()`` copy) and release the GIL while they work; older builds are
+fed through the byte-tuple API.
+
+When the native module is unavailable, the NumPy fallbacks in this file are
+used instead.  Hashing, histograms and edge density repeat the Rust
+arithmetic step for step, so they return the same values as the extension.
 """
 
 from __future__ import annotations
@@ -43,6 +50,9 @@ except ImportError:
     NATIVE_AVAILABLE = False
     logger.debug("Native Rust acceleration module not available, using Python fallbacks")
 
+# Builds older than the zero-copy NumPy entry points only take bytes
+_NATIVE_ARRAYS = NATIVE_AVAILABLE and hasattr(_native, "batch_perceptual_hash_array")
+
 # ---------------------------------------------------------------------------
 # Public helpers
 # ---------------------------------------------------------------------------
@@ -53,6 +63,68 @@ def is_native_available() -> bool:
     return NATIVE_AVAILABLE
 
 
+# ---------------------------------------------------------------------------
+# NumPy fallback helpers
+# ---------------------------------------------------------------------------
+
+# Rows of float64 work arrays processed at a time by the edge fallback
+_EDGE_STRIP_ROWS = 256
+
+_BYTE_POPCOUNT = (np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+                  if HAS_NUMPY else None)
+
+# Images per vectorised chunk in the batch perceptual-hash fallback
+_HASH_CHUNK = 64
+
+
+def _as_batch(images):
+    """A C-contiguous uint8 ``(N, H, W, C)`` array, or a list of C-contiguous
+    uint8 ``(H, W, C)`` arrays.  Inputs already in that form are not copied."""
+    if isinstance(images, np.ndarray) and images.ndim == 4:
+        return np.ascontiguousarray(images, dtype=np.uint8)
+    return [np.ascontiguousarray(img, dtype=np.uint8) for img in images]
+
+
+def _byte_tuples(images) -> List[Tuple[bytes, int, int]]:
+    """(rgb_bytes, width, height) tuples for the pre-NumPy batch API."""
+    tuples = []
+    for img in images:
+        if len(img.shape) == 3 and img.shape[2] == 4:
+            img = img[:, :, :3]
+        h, w = img.shape[:2]
+        tuples.append((img.tobytes(), w, h))
+    return tuples
+
+
+def _luma(image: np.ndarray) -> np.ndarray:
+    """``0.299 R + 0.587 G + 0.114 B`` in float64, summed in the Rust order."""
+    gray = image[..., 0].astype(np.float64)
+    gray *= 0.299
+    gray += 0.587 * image[..., 1]
+    gray += 0.114 * image[..., 2]
+    return gray
+
+
+def _sequential_sum(values: np.ndarray, axis: int = -1) -> np.ndarray:
+    """Left-to-right float sum (like a Rust loop); np.sum is pairwise."""
+    if values.shape[axis] == 0:
+        return np.zeros(np.delete(values.shape, axis), dtype=np.float64)
+    return np.take(np.cumsum(values, axis=axis), -1, axis=axis)
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    """Number of set bits in each element of an array of 64-bit hashes.
+
+    Uses ``np.bitwise_count`` (NumPy 2.0+) or a per-byte lookup table.
+    """
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return _BYTE_POPCOUNT[values.view(np.uint8)].reshape(values.shape + (8,)).sum(
+        axis=-1, dtype=np.uint8
+    )
+
+
 # ---------------------------------------------------------------------------
 # Upscaling
 # ---------------------------------------------------------------------------
@@ -84,6 +156,11 @@ def lanczos_upscale(
     h, w = image.shape[:2]
     channels = image.shape[2] if len(image.shape) == 3 else 1
 
+    if _NATIVE_ARRAYS and image.ndim == 3:
+        return _native.lanczos_upscale_array(
+            np.ascontiguousarray(image, dtype=np.uint8), scale_factor
+        )
+
     if NATIVE_AVAILABLE:
         flat = image.tobytes()
         result_bytes, new_w, new_h = _native.lanczos_upscale(
@@ -118,25 +195,88 @@ def perceptual_hash(image: np.ndarray) -> int:
     int
         64-bit perceptual hash.
     """
-    if len(image.shape) == 3 and image.shape[2] == 4:
-        image = image[:, :, :3]
-
-    h, w = image.shape[:2]
+    if _NATIVE_ARRAYS:
+        return int(_native.batch_perceptual_hash_array([np.ascontiguousarray(image)])[0])
 
     if NATIVE_AVAILABLE:
+        if len(image.shape) == 3 and image.shape[2] == 4:
+            image = image[:, :, :3]
+        h, w = image.shape[:2]
         return _native.perceptual_hash(image.tobytes(), w, h)
 
-    # Pure-Python fallback
-    from PIL import Image as PILImage
+    # NumPy fallback: mean luma of an 8x8 grid of area blocks, one bit per
+    # block above the grid mean
+    return int(_hash_bits(_block_luma(image)[None])[0])
+
+
+def _block_luma(image: np.ndarray) -> np.ndarray:
+    """The 64 block mean lumas of one image (fast path when it is safe)."""
+    h, w = image.shape[:2]
+    if h >= 8 and w >= 8:
+        values, ok = _block_luma_fast(image[None])
+        if ok[0]:
+            return values[0]
+    return _block_luma_exact(image)
+
+
+def _hash_bits(values: np.ndarray) -> np.ndarray:
+    """uint64 hashes from ``(N, 64)`` block lumas: bit i set when block i is
+    above its grid mean."""
+    bits = values > _sequential_sum(values, axis=1)[:, None] / 64.0
+    return np.packbits(bits, axis=1, bitorder="little").view("<u8").ravel()
+
 
-    pil_img = PILImage.fromarray(image).convert("L").resize((8, 8), PILImage.LANCZOS)
-    pixels = list(pil_img.getdata())
-    mean_val = sum(pixels) / 64.0
-    hash_val = 0
-    for i, p in enumerate(pixels):
-        if p > mean_val:
-            hash_val |= 1 << i
-    return hash_val
+def _block_bounds(size: int) -> List[Tuple[int, int]]:
+    """The Rust code's 8 block ranges along one axis."""
+    step = size / 8.0
+    return [(int(i * step), min(int((i + 1) * step), size)) for i in range(8)]
+
+
+def _block_luma_exact(image: np.ndarray) -> np.ndarray:
+    """Block mean luma with the Rust code's float summation order."""
+    h, w = image.shape[:2]
+    gray = _luma(image)
+    if h % 8 == 0 and w % 8 == 0 and h and w:
+        blocks = gray.reshape(8, h // 8, 8, w // 8).transpose(0, 2, 1, 3).reshape(64, -1)
+        return _sequential_sum(blocks) / blocks.shape[1]
+    values = np.zeros(64, dtype=np.float64)
+    for by, (y0, y1) in enumerate(_block_bounds(h)):
+        for bx, (x0, x1) in enumerate(_block_bounds(w)):
+            block = gray[y0:y1, x0:x1].ravel()
+            if block.size:
+                values[by * 8 + bx] = _sequential_sum(block) / block.size
+    return values
+
+
+def _block_luma_fast(images: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Block mean luma of ``(N, H, W, C)`` images from exact integer channel
+    sums (any alpha channel is skipped, not copied away).
+
+    Differs from the Rust float sums only by rounding, so an image's values
+    are marked ok only when every block is further than that rounding bound
+    from the grid mean (no bit can flip); the others need the exact path.
+
+    Returns:
+        Tuple of (``(N, 64)`` block lumas, ``(N,)`` ok mask)
+    """
+    n, h, w, c = images.shape
+    ys = [y0 for y0, _ in _block_bounds(h)]
+    xs = [x0 for x0, _ in _block_bounds(w)]
+    images = np.ascontiguousarray(images)
+    # Sum each band of rows (contiguous, vectorised along the row), then
+    # the columns of the 8 band sums
+    rows = images.reshape(n, h, w * c)
+    bands = np.stack([rows[:, y0:y1].sum(axis=1, dtype=np.uint64)
+                      for y0, y1 in _block_bounds(h)], axis=1)
+    sums = np.add.reduceat(bands.reshape(n, 8, w, c), xs, axis=2)
+    counts = np.outer(np.diff(ys + [h]), np.diff(xs + [w])).astype(np.float64)
+    values = (0.299 * sums[..., 0] + 0.587 * sums[..., 1] + 0.114 * sums[..., 2]) / counts
+    values = values.reshape(n, 64)
+    # Relative error of a float sum of n terms is below n * eps; block means
+    # are at most 255
+    bound = 4.0 * (counts.max() + 64.0) * 255.0 * np.finfo(np.float64).eps
+    ok = np.abs(values - values.mean(axis=1, keepdims=True)).min(axis=1) > bound
+    return values, ok
 
 
 def hamming_distance(hash_a: int, hash_b: int) -> int:
@@ -154,7 +294,25 @@ def hamming_distance(hash_a: int, hash_b: int) -> int:
     """
     if NATIVE_AVAILABLE:
         return _native.hamming_distance(hash_a, hash_b)
-    return bin(hash_a ^ hash_b).count("1")
+    return bin(int(hash_a) ^ int(hash_b)).count("1")
+
+
+def hamming_distances(hashes: np.ndarray, other: int) -> np.ndarray:
+    """Hamming distances from many 64-bit hashes to one hash, vectorized.
+
+    Parameters
+    ----------
+    hashes : np.ndarray
+        Array (or sequence) of 64-bit hashes.
+    other : int
+        Hash to compare against.
+
+    Returns
+    -------
+    np.ndarray
+        ``uint8`` array of differing-bit counts, one per hash.
+    """
+    return popcount64(np.asarray(hashes, dtype=np.uint64) ^ np.uint64(other))
 
 
 def color_histogram(image: np.ndarray, bins: int = 16) -> List[float]:
@@ -173,25 +331,31 @@ def color_histogram(image: np.ndarray, bins: int = 16) -> List[float]:
         Flattened histogram of length ``3 * bins``, normalized so that
         each channel sums to 1.
     """
-    if len(image.shape) == 3 and image.shape[2] == 4:
-        image = image[:, :, :3]
-
-    h, w = image.shape[:2]
+    if _NATIVE_ARRAYS:
+        return _native.batch_color_histogram_array([np.ascontiguousarray(image)], bins)[0].tolist()
 
     if NATIVE_AVAILABLE:
+        if len(image.shape) == 3 and image.shape[2] == 4:
+            image = image[:, :, :3]
+        h, w = image.shape[:2]
         return _native.color_histogram(image.tobytes(), w, h, bins)
 
-    # Pure-Python fallback
-    total = h * w
-    hist = [0.0] * (3 * bins)
-    bw = 256.0 / bins
-    flat = image.reshape(-1, 3)
-    for c in range(3):
-        channel = flat[:, c]
-        for val in channel:
-            b = min(int(val / bw), bins - 1)
-            hist[c * bins + b] += 1
-    return [v / total for v in hist]
+    if not 1 <= bins <= 256:
+        raise ValueError("bins must be between 1 and 256")
+    return _histogram(image, bins).tolist()
+
+
+def _histogram(image: np.ndarray, bins: int) -> np.ndarray:
+    """NumPy fallback: count byte values per channel, then fold the 256
+    counts into the same bins as the Rust code (alpha is ignored)."""
+    h, w = image.shape[:2]
+    bin_of = np.minimum((np.arange(256) / (256.0 / bins)).astype(np.intp), bins - 1)
+    flat = image.reshape(h * w, -1)
+    hist = np.concatenate([
+        np.bincount(bin_of, weights=np.bincount(flat[:, c], minlength=256), minlength=bins)
+        for c in range(3)
+    ])
+    return hist / (h * w)
 
 
 def edge_density(image: np.ndarray) -> float:
@@ -215,15 +379,22 @@ def edge_density(image: np.ndarray) -> float:
     if NATIVE_AVAILABLE:
         return _native.edge_density(image.tobytes(), w, h)
 
-    # Pure-Python fallback using OpenCV
-    try:
-        import cv2
-
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-        edges = cv2.Canny(gray, 50, 150)
-        return float(np.sum(edges > 0)) / edges.size
-    except ImportError:
+    # NumPy fallback: 3x3 Sobel magnitude over interior pixels, in row
+    # strips so the float64 work arrays stay small for 4K textures
+    if w < 3 or h < 3:
         return 0.0
+    edges = 0
+    for y0 in range(0, h - 2, _EDGE_STRIP_ROWS):
+        g = _luma(image[y0:min(h, y0 + _EDGE_STRIP_ROWS + 2)])
+        top, mid, bot = g[:-2], g[1:-1], g[2:]
+        gx = -top[:, :-2] + top[:, 2:] - 2.0 * mid[:, :-2] + 2.0 * mid[:, 2:] - bot[:, :-2] + bot[:, 2:]
+        gy = -top[:, :-2] - 2.0 * top[:, 1:-1] - top[:, 2:] + bot[:, :-2] + 2.0 * bot[:, 1:-1] + bot[:, 2:]
+        gx *= gx
+        gy *= gy
+        gx += gy
+        np.sqrt(gx, out=gx)
+        edges += int(np.count_nonzero(gx > 30.0))
+    return edges / ((h - 2) * (w - 2))
 
 
 def bitmap_to_svg(
@@ -335,62 +506,77 @@ def bitmap_to_svg(
 # ---------------------------------------------------------------------------
 
 
-def batch_perceptual_hash(images: List[np.ndarray]) -> List[int]:
-    """Compute perceptual hashes for a list of RGB images in parallel.
+def batch_perceptual_hash(images) -> np.ndarray:
+    """Compute perceptual hashes for a batch of RGB(A) images in parallel.
 
     Parameters
     ----------
-    images : list[np.ndarray]
-        List of RGB images.
+    images : np.ndarray | list[np.ndarray]
+        Stacked ``(N, H, W, C)`` uint8 array or list of ``(H, W, C)``
+        images (C = 3 or 4).
 
     Returns
     -------
-    list[int]
-        Corresponding 64-bit perceptual hashes.
+    np.ndarray
+        ``uint64`` array of the corresponding 64-bit perceptual hashes.
     """
+    batch = _as_batch(images)
+    if len(batch) == 0:
+        return np.zeros(0, dtype=np.uint64)
+
+    if _NATIVE_ARRAYS:
+        return _native.batch_perceptual_hash_array(batch)
+
     if NATIVE_AVAILABLE:
-        tuples = []
-        for img in images:
-            if len(img.shape) == 3 and img.shape[2] == 4:
-                img = img[:, :, :3]
-            h, w = img.shape[:2]
-            tuples.append((img.tobytes(), w, h))
-        return _native.batch_perceptual_hash(tuples)
+        return np.asarray(_native.batch_perceptual_hash(_byte_tuples(batch)), dtype=np.uint64)
 
-    return [perceptual_hash(img) for img in images]
+    if isinstance(batch, np.ndarray) and min(batch.shape[1:3]) >= 8:
+        # One vectorised pass per chunk; only images too close to call
+        # take the exact per-image path
+        values = np.empty((len(batch), 64), dtype=np.float64)
+        for start in range(0, len(batch), _HASH_CHUNK):
+            chunk = batch[start:start + _HASH_CHUNK]
+            fast, ok = _block_luma_fast(chunk)
+            for i in np.flatnonzero(~ok):
+                fast[i] = _block_luma_exact(chunk[i])
+            values[start:start + len(chunk)] = fast
+        return _hash_bits(values)
+    return _hash_bits(np.stack([_block_luma(img) for img in batch]))
 
 
-def batch_color_histogram(
-    images: List[np.ndarray], bins: int = 16
-) -> List[List[float]]:
-    """Compute color histograms for a list of RGB images in parallel.
+def batch_color_histogram(images, bins: int = 16) -> np.ndarray:
+    """Compute color histograms for a batch of RGB(A) images in parallel.
 
     Parameters
     ----------
-    images : list[np.ndarray]
-        List of RGB images.
+    images : np.ndarray | list[np.ndarray]
+        Stacked ``(N, H, W, C)`` uint8 array or list of ``(H, W, C)``
+        images (C = 3 or 4).
     bins : int
         Number of bins per channel.
 
     Returns
     -------
-    list[list[float]]
-        Corresponding color histograms.
+    np.ndarray
+        ``(N, 3 * bins)`` float64 array, one normalized histogram per row.
     """
+    if not 1 <= bins <= 256:
+        raise ValueError("bins must be between 1 and 256")
+    batch = _as_batch(images)
+    if len(batch) == 0:
+        return np.zeros((0, 3 * bins), dtype=np.float64)
+
+    if _NATIVE_ARRAYS:
+        return _native.batch_color_histogram_array(batch, bins)
+
     if NATIVE_AVAILABLE:
-        tuples = []
-        for img in images:
-            if len(img.shape) == 3 and img.shape[2] == 4:
-                img = img[:, :, :3]
-            h, w = img.shape[:2]
-            tuples.append((img.tobytes(), w, h))
-        return _native.batch_color_histogram(tuples, bins)
+        return np.asarray(_native.batch_color_histogram(_byte_tuples(batch), bins), dtype=np.float64)
 
-    return [color_histogram(img, bins) for img in images]
+    return np.stack([_histogram(img, bins) for img in batch])
 
 
 def batch_bitmap_to_svg(
-    images: List[np.ndarray],
+    images,
     threshold: int = 25,
     mode: str = "color",
 ) -> List[Optional[str]]:
@@ -398,8 +584,9 @@ def batch_bitmap_to_svg(
 
     Parameters
     ----------
-    images : list[np.ndarray]
-        List of RGB images.
+    images : np.ndarray | list[np.ndarray]
+        Stacked ``(N, H, W, C)`` uint8 array or list of ``(H, W, C)``
+        images (C = 3 or 4).
     threshold : int, default 25
         Color difference threshold for edge detection (0-255).
     mode : str, default "color"
@@ -412,13 +599,9 @@ def batch_bitmap_to_svg(
     """
     if NATIVE_AVAILABLE:
         try:
-            tuples = []
-            for img in images:
-                if len(img.shape) == 3 and img.shape[2] == 4:
-                    img = img[:, :, :3]
-                h, w = img.shape[:2]
-                tuples.append((img.tobytes(), w, h))
-            return _native.batch_bitmap_to_svg(tuples, threshold, mode)
+            if _NATIVE_ARRAYS:
+                return _native.batch_bitmap_to_svg_array(_as_batch(images), threshold, mode)
+            return _native.batch_bitmap_to_svg(_byte_tuples(images), threshold, mode)
         except Exception as e:
             logger.warning(f"Native batch_bitmap_to_svg failed: {e}, using sequential fallback")
 
@@ -10,7 +10,8 @@ Author: GitHub Copilot for PR #168
 from __future__ import annotations
 
 import logging
-from typing import List, Optional, Tuple, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple, Dict, Any
 from pathlib import Path
 try:
     import numpy as np
@@ -21,6 +22,14 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+try:
+    from ..utils.analysis_cache import AnalysisCache
+except ImportError:
+    try:
+        from utils.analysis_cache import AnalysisCache
+    except ImportError:
+        AnalysisCache = None  # type: ignore[assignment,misc]
+
 
 class CombinedFeatureExtractor:
     """
@@ -33,17 +42,36 @@ class CombinedFeatureExtractor:
     Note: timm models are NOT compiled with TorchScript to avoid source access errors.
     """
     
-    def __init__(self, model_config: str):
+    # Weights loaded for each model; part of the embedding cache key
+    MODEL_VARIANTS = {
+        'CLIP': 'openai/clip-vit-base-patch32',
+        'DINOv2': 'dinov2_vits14',
+        'timm': 'efficientnet_b0',
+    }
+    
+    # Shorter side assumed for a model whose preprocessing size is unknown
+    DEFAULT_INPUT_SIDE = 256
+    
+    def __init__(self, model_config: str, analysis_cache=None, precision: str = 'fp32'):
         """
         Initialize the feature extractor(s).
         
         Args:
             model_config: Model configuration string (e.g., "CLIP", "CLIP+DINOv2", etc.)
+            analysis_cache: Optional AnalysisCache; per-model embeddings are then
+                reused for any file with the same contents
+            precision: Inference precision passed to every model ('fp32',
+                'fp16', 'bf16' or 'int8')
         """
         self.model_config = model_config
+        self.analysis_cache = analysis_cache
+        self.precision = precision
         self.models = []
         self.model_names = self._parse_model_config(model_config)
         self._initialize_models()
+        # Images are decoded once and shrunk to this shorter side for all models
+        self.shared_side = max((self._input_side(model) for _, model in self.models),
+                               default=self.DEFAULT_INPUT_SIDE)
     
     def _parse_model_config(self, config: str) -> List[str]:
         """Parse model configuration string to extract individual model names."""
@@ -82,7 +110,7 @@ class CombinedFeatureExtractor:
         """Initialize CLIP model."""
         try:
             from src.vision_models.clip_model import CLIPModel
-            model = CLIPModel()
+            model = CLIPModel(self.MODEL_VARIANTS['CLIP'], precision=self.precision)
             self.models.append(('CLIP', model))
             logger.info("✅ CLIP model initialized")
         except ImportError as e:
@@ -94,7 +122,7 @@ class CombinedFeatureExtractor:
         """Initialize DINOv2 model."""
         try:
             from src.vision_models.dinov2_model import DINOv2Model
-            model = DINOv2Model()
+            model = DINOv2Model(self.MODEL_VARIANTS['DINOv2'], precision=self.precision)
             self.models.append(('DINOv2', model))
             logger.info("✅ DINOv2 model initialized")
         except ImportError as e:
@@ -112,7 +140,7 @@ class CombinedFeatureExtractor:
         try:
             from src.vision_models.efficientnet_model import EfficientNetModel
             # Default to efficientnet_b0 - NOT compiled with TorchScript
-            model = EfficientNetModel('efficientnet_b0')
+            model = EfficientNetModel(self.MODEL_VARIANTS['timm'], precision=self.precision)
             self.models.append(('timm', model))
             logger.info("✅ timm (EfficientNet) model initialized (NOT TorchScript compiled)")
         except ImportError as e:
@@ -136,11 +164,25 @@ class CombinedFeatureExtractor:
             raise RuntimeError("No models initialized")
         
         features_list = []
+        digest = None
+        if self.analysis_cache is not None:
+            try:
+                digest = self.analysis_cache.file_digest(image_path)
+            except OSError:
+                digest = None
         
         for model_name, model in self.models:
             try:
-                # Each model's encode_image returns a feature vector
-                features = model.encode_image(image_path)
+                version = self._cache_version(model_name)
+                features = None
+                if digest is not None:
+                    features = self.analysis_cache.get(digest, AnalysisCache.EMBEDDING, version)
+                if features is None:
+                    # Each model's encode_image returns a feature vector
+                    features = model.encode_image(image_path)
+                    if digest is not None:
+                        self.analysis_cache.put(digest, AnalysisCache.EMBEDDING,
+                                                np.asarray(features), version)
                 features_list.append(features)
                 logger.debug(f"{model_name} extracted {features.shape} features")
             except Exception as e:
@@ -160,6 +202,171 @@ class CombinedFeatureExtractor:
         
         return combined_features
     
+    def extract_features_batch(
+        self,
+        image_paths: Iterable[Path],
+        batch_size: int = 32,
+        prefetch: int = 2,
+        parallel_models: bool = True,
+        embedding_store=None
+    ) -> Iterator[Tuple[Path, Optional[np.ndarray]]]:
+        """
+        Stream combined features for many images.
+        
+        Each file is decoded once (in background threads, ``prefetch``
+        batches ahead) and downscaled once to the largest input size any
+        model needs; every model then applies only its own final
+        resize/crop/normalize to that shared image and encodes the whole
+        batch in one forward pass. With ``parallel_models`` the models of a
+        batch run concurrently on separate threads.
+        
+        Args:
+            image_paths: Image files; any iterable, consumed lazily
+            batch_size: Images per forward pass
+            prefetch: Batches decoded ahead of the models (0 = inline)
+            parallel_models: Run the configured models concurrently
+            embedding_store: Optional EmbeddingStore; complete vectors are
+                written with store_batch() under the combined model name
+                as each batch finishes
+        
+        Yields:
+            Tuples of (path, combined feature vector) in input order. The
+            vector is None for a file that cannot be read or that any
+            model failed to encode, so every yielded vector has the full
+            combined dimension
+        """
+        if not self.models:
+            raise RuntimeError("No models initialized")
+        from src.vision_models.batch_utils import prefetch_batches
+        
+        store_name = '+'.join(self.get_model_names())
+        store_version = '|'.join(self._cache_version(name) for name in self.get_model_names())
+        workers = len(self.models) if parallel_models and len(self.models) > 1 else 0
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='feature-model') \
+            if workers else None
+        try:
+            batches = prefetch_batches((Path(p) for p in image_paths), batch_size,
+                                       self._load_batch, prefetch)
+            for paths, (images, digests, features) in batches:
+                jobs = []
+                for model_name, model in self.models:
+                    todo = [i for i, image in enumerate(images)
+                            if image is not None and features[i].get(model_name) is None]
+                    if todo:
+                        args = (model_name, model, [images[i] for i in todo])
+                        jobs.append((model_name, todo, pool.submit(self._encode_batch, *args)
+                                     if pool else self._encode_batch(*args)))
+                
+                for model_name, todo, result in jobs:
+                    encoded = result.result() if pool else result
+                    if encoded is None:
+                        continue
+                    version = self._cache_version(model_name)
+                    for i, vector in zip(todo, encoded):
+                        features[i][model_name] = vector
+                        if digests[i] is not None:
+                            self.analysis_cache.put(digests[i], AnalysisCache.EMBEDDING,
+                                                    np.asarray(vector), version)
+                
+                results, complete = [], []
+                for path, per_model in zip(paths, features):
+                    missing = [name for name, _ in self.models if name not in per_model]
+                    if missing:
+                        logger.warning(f"No {', '.join(missing)} features extracted for {path}")
+                        results.append((path, None))
+                        continue
+                    results.append((path, np.concatenate([per_model[name]
+                                                          for name, _ in self.models])))
+                    complete.append(results[-1])
+                
+                if embedding_store is not None and complete:
+                    embedding_store.store_batch([p for p, _ in complete],
+                                                np.stack([v for _, v in complete]),
+                                                store_name, version=store_version)
+                yield from results
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False)
+    
+    def _load_batch(self, paths: List[Path]):
+        """
+        Cached per-model features, content digests and (when any model
+        still needs them) shared decoded images for one batch.
+        """
+        images, digests, features = [], [], []
+        for path in paths:
+            digest, cached = None, {}
+            if self.analysis_cache is not None:
+                try:
+                    digest = self.analysis_cache.file_digest(path)
+                except OSError:
+                    digest = None
+            if digest is not None:
+                for model_name, _ in self.models:
+                    vector = self.analysis_cache.get(digest, AnalysisCache.EMBEDDING,
+                                                     self._cache_version(model_name))
+                    if vector is not None:
+                        cached[model_name] = vector
+            image = None
+            if len(cached) < len(self.models):
+                try:
+                    image = self._shared_image(path)
+                except Exception as e:
+                    logger.error(f"Cannot read {path}: {e}")
+            images.append(image)
+            digests.append(digest)
+            features.append(cached)
+        return images, digests, features
+    
+    def _shared_image(self, path: Path):
+        """Decode once and downscale to the largest side any model resizes to."""
+        from PIL import Image
+        side = self.shared_side
+        with Image.open(path) as img:
+            # JPEG: let the decoder skip detail the models never see
+            img.draft('RGB', (side, side))
+            image = img.convert('RGB')
+        short = min(image.size)
+        if short > side:
+            scale = side / short
+            image = image.resize((max(1, round(image.width * scale)),
+                                  max(1, round(image.height * scale))), Image.BICUBIC)
+        return image
+    
+    def _input_side(self, model) -> int:
+        """Shorter side a model's own preprocessing resizes images to."""
+        config = getattr(model, 'data_config', None)
+        if config and 'input_size' in config:
+            # timm: crop size / crop fraction
+            return int(round(config['input_size'][-1] / config.get('crop_pct', 1.0)))
+        processor = getattr(model, 'processor', None)
+        size = getattr(getattr(processor, 'image_processor', None), 'size', None)
+        if isinstance(size, dict) and 'shortest_edge' in size:
+            return int(size['shortest_edge'])
+        transform = getattr(model, 'transform', None) or processor
+        for step in getattr(transform, 'transforms', []):
+            size = getattr(step, 'size', None)
+            if isinstance(size, int):
+                return size
+            if isinstance(size, (tuple, list)) and size:
+                return int(min(size))
+        return self.DEFAULT_INPUT_SIDE
+    
+    def _encode_batch(self, model_name: str, model, images: List) -> Optional[np.ndarray]:
+        """One model's features for shared images (None if the model fails)."""
+        try:
+            return model.encode_pixel_batch(images)
+        except Exception as e:
+            logger.error(f"Error extracting features with {model_name}: {e}")
+            return None
+    
+    def _cache_version(self, model_name: str) -> str:
+        """Embedding cache version: model weights plus non-default precision"""
+        version = f"{model_name}:{self.MODEL_VARIANTS.get(model_name, '')}"
+        if self.precision != 'fp32':
+            version += f":{self.precision}"
+        return version
+    
     def is_combined(self) -> bool:
         """Check if this is a combined model configuration."""
         return len(self.models) > 1
@@ -173,12 +380,15 @@ class CombinedFeatureExtractor:
         return [name for name, _ in self.models]
 
 
-def create_feature_extractor(settings: Dict[str, Any]) -> CombinedFeatureExtractor:
+def create_feature_extractor(settings: Dict[str, Any],
+                             analysis_cache=None) -> CombinedFeatureExtractor:
     """
     Factory function to create a feature extractor from settings.
     
     Args:
-        settings: Settings dictionary containing 'feature_extractor' key
+        settings: Settings dictionary containing 'feature_extractor' key and
+            optionally 'feature_precision'
+        analysis_cache: Optional AnalysisCache for persisting embeddings
         
     Returns:
         CombinedFeatureExtractor instance
@@ -189,7 +399,8 @@ def create_feature_extractor(settings: Dict[str, Any]) -> CombinedFeatureExtract
         >>> features = extractor.extract_features(image_path)
     """
     model_config = settings.get('feature_extractor', 'CLIP (image-to-text classification)')
-    return CombinedFeatureExtractor(model_config)
+    return CombinedFeatureExtractor(model_config, analysis_cache=analysis_cache,
+                                    precision=settings.get('feature_precision', 'fp32'))
 
 
 def estimate_processing_time(model_config: str, num_images: int = 1) -> Tuple[float, str]:
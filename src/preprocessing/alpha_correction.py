@@ -7,9 +7,15 @@ Author: Dead On The Inside / JosephsDeadish
 
 from __future__ import annotations
 
+import json
 import logging
+import os
+import shutil
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Tuple, Union
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple, Union
 try:
     import numpy as np
     HAS_NUMPY = True
@@ -25,6 +31,90 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# preserve_gradients: ranges wider than this keep values within
+# GRADIENT_TOLERANCE of the target
+GRADIENT_RANGE = 50
+GRADIENT_TOLERANCE = 20
+
+
+@lru_cache(maxsize=256)
+def _compile_lut(thresholds: Tuple[Tuple[int, int, Optional[int]], ...],
+                 preserve_gradients: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compile threshold rules into a 256-entry alpha lookup table.
+
+    Rules apply in order to the already-corrected value, exactly like
+    applying them one by one to the image.
+
+    Returns:
+        Tuple of (uint8 LUT, per-value count of rules that matched it, for
+        the 'pixels_modified' statistic)
+    """
+    values = np.arange(256, dtype=np.int64)
+    current = values.copy()
+    matched = np.zeros(256, dtype=np.int64)
+    for min_val, max_val, target in thresholds:
+        mask = (current >= min_val) & (current <= max_val)
+        if target is None:
+            # Preserve original values in this range
+            continue
+        if preserve_gradients and (max_val - min_val) > GRADIENT_RANGE:
+            # Preserve gradient, only snap values far from the target
+            mask &= np.abs(current - target) > GRADIENT_TOLERANCE
+        current[mask] = target
+        matched += mask
+    lut = current.astype(np.uint8)
+    lut.setflags(write=False)
+    matched.setflags(write=False)
+    return lut, matched
+
+
+# Per-process corrector used by batch workers
+_worker_state: Dict[str, Any] = {}
+
+
+def _process_worker(job: Tuple[str, Optional[str], Any, bool, bool, bool]) -> Dict[str, Any]:
+    """Batch worker: process_image() on a corrector private to the process."""
+    corrector = _worker_state.get('corrector')
+    if corrector is None:
+        corrector = _worker_state['corrector'] = AlphaCorrector()
+    image_path, output_path, preset, overwrite, backup, preserve_gradients = job
+    return corrector.process_image(Path(image_path),
+                                   output_path=Path(output_path) if output_path else None,
+                                   preset=preset, overwrite=overwrite, backup=backup,
+                                   preserve_gradients=preserve_gradients)
+
+
+def _common_root(paths: List[Path]) -> Optional[Path]:
+    """Deepest directory containing every path (no filesystem access)."""
+    try:
+        common = Path(os.path.commonpath([os.path.abspath(p) for p in paths]))
+    except ValueError:
+        return None  # different drives
+    if str(common) == os.path.abspath(paths[0]):
+        common = common.parent  # every entry is the same file
+    return common
+
+
+def _atomic_save(img: 'Image.Image', out_path: Path, **params) -> None:
+    """Save through a temporary file in the target directory plus rename."""
+    tmp_path = out_path.with_name(f'.{out_path.stem}.{os.getpid()}.tmp{out_path.suffix}')
+    try:
+        img.save(tmp_path, **params)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _median_from_histogram(hist: np.ndarray) -> float:
+    """Median of the values a 256-bin count histogram describes."""
+    cumulative = np.cumsum(hist)
+    n = int(cumulative[-1])
+    lower = int(np.searchsorted(cumulative, (n - 1) // 2, side='right'))
+    upper = int(np.searchsorted(cumulative, n // 2, side='right'))
+    return (lower + upper) / 2.0
+
 
 class AlphaCorrectionPresets:
     """Predefined alpha correction presets for different platforms and use cases."""
@@ -214,31 +304,30 @@ class AlphaCorrector:
                 'message': 'Image does not have an alpha channel'
             }
         
-        alpha = image[:, :, 3]
-        
-        # Calculate histogram
-        hist, bins = np.histogram(alpha, bins=256, range=(0, 256))
+        return self._detection_from_histogram(
+            np.bincount(image[:, :, 3].ravel(), minlength=256))
+    
+    def _detection_from_histogram(self, hist: np.ndarray) -> Dict[str, Any]:
+        """detect_alpha_colors() results from a 256-bin alpha histogram."""
+        hist = np.asarray(hist, dtype=np.int64)
+        total = int(hist.sum())
+        present = np.flatnonzero(hist)
         
         # Find dominant alpha values (peaks in histogram)
         # Use a threshold of 1% of total pixels
-        threshold = alpha.size * 0.01
-        dominant_values = []
-        for i, count in enumerate(hist):
-            if count > threshold:
-                dominant_values.append((i, count))
+        dominant = np.flatnonzero(hist > total * 0.01)
+        dominant_values = [(int(v), int(hist[v])) for v in dominant]
         
         # Calculate statistics
-        unique_values = len(np.unique(alpha))
-        has_transparency = np.any(alpha < 255)
-        has_semi_transparency = np.any((alpha > 0) & (alpha < 255))
-        
-        transparent_pixels = np.sum(alpha == 0)
-        opaque_pixels = np.sum(alpha == 255)
-        semi_pixels = alpha.size - transparent_pixels - opaque_pixels
+        transparent_pixels = int(hist[0])
+        opaque_pixels = int(hist[255])
+        semi_pixels = total - transparent_pixels - opaque_pixels
+        has_transparency = total > opaque_pixels
+        has_semi_transparency = semi_pixels > 0
         
-        transparency_ratio = transparent_pixels / alpha.size
-        opacity_ratio = opaque_pixels / alpha.size
-        semi_ratio = semi_pixels / alpha.size
+        transparency_ratio = transparent_pixels / total
+        opacity_ratio = opaque_pixels / total
+        semi_ratio = semi_pixels / total
         
         # Detect if alpha is binary (mostly 0 or 255)
         is_binary = semi_ratio < 0.05
@@ -258,23 +347,23 @@ class AlphaCorrector:
         
         return {
             'has_alpha': True,
-            'unique_values': unique_values,
+            'unique_values': len(present),
             'dominant_values': dominant_values[:10],  # Top 10
             'has_transparency': has_transparency,
             'has_semi_transparency': has_semi_transparency,
-            'transparent_pixels': int(transparent_pixels),
-            'opaque_pixels': int(opaque_pixels),
-            'semi_transparent_pixels': int(semi_pixels),
+            'transparent_pixels': transparent_pixels,
+            'opaque_pixels': opaque_pixels,
+            'semi_transparent_pixels': semi_pixels,
             'transparency_ratio': float(transparency_ratio),
             'opacity_ratio': float(opacity_ratio),
             'semi_transparency_ratio': float(semi_ratio),
             'is_binary': is_binary,
             'patterns': patterns,
             'histogram': hist.tolist(),
-            'alpha_min': int(np.min(alpha)),
-            'alpha_max': int(np.max(alpha)),
-            'alpha_mean': float(np.mean(alpha)),
-            'alpha_median': float(np.median(alpha))
+            'alpha_min': int(present[0]),
+            'alpha_max': int(present[-1]),
+            'alpha_mean': float(hist @ np.arange(256) / total),
+            'alpha_median': _median_from_histogram(hist)
         }
     
     def correct_alpha(
@@ -282,17 +371,22 @@ class AlphaCorrector:
         image: np.ndarray,
         preset: Optional[Union[str, Dict[str, Any]]] = None,
         custom_thresholds: Optional[List[Tuple[int, int, int]]] = None,
-        preserve_gradients: bool = False
+        preserve_gradients: bool = False,
+        in_place: bool = False
     ) -> Tuple[np.ndarray, Dict[str, Any]]:
         """
         Correct alpha channel to target values.
         
+        The rules are compiled once into a 256-entry lookup table and
+        applied to the alpha channel with np.take.
+        
         Args:
             image: Input image (H, W, RGBA)
             preset: Preset name or preset dictionary
             custom_thresholds: Custom threshold list [(min, max, target), ...]
                              Use None as target to preserve original value in range
             preserve_gradients: If True, preserve smooth gradients (only snap extremes)
+            in_place: Modify ``image`` itself instead of a copy
             
         Returns:
             Tuple of (corrected_image, statistics)
@@ -302,69 +396,72 @@ class AlphaCorrector:
             logger.warning("Image does not have alpha channel, returning original")
             return image, {'modified': False, 'reason': 'No alpha channel'}
         
-        # Get thresholds from preset or custom
-        thresholds = None
-        mode = 'threshold'
+        compiled = self.get_lut(preset, custom_thresholds, preserve_gradients)
+        if isinstance(compiled, str):
+            return image, {'modified': False, 'reason': compiled}
+        lut, matched, mode = compiled
+        
+        alpha = image[:, :, 3]
+        hist = np.bincount(alpha.ravel(), minlength=256)
+        stats = self._correction_stats(hist, lut, matched, mode, preserve_gradients)
+        
+        corrected = image if in_place else image.copy()
+        if stats['modified']:
+            alpha = corrected[:, :, 3]
+            np.take(lut, alpha, out=alpha)
+        return corrected, stats
+    
+    def get_lut(
+        self,
+        preset: Optional[Union[str, Dict[str, Any]]] = None,
+        custom_thresholds: Optional[List[Tuple[int, int, int]]] = None,
+        preserve_gradients: bool = False
+    ) -> Union[Tuple[np.ndarray, np.ndarray, str], str]:
+        """
+        Compiled lookup table for a preset or custom thresholds.
         
+        Returns:
+            Tuple of (uint8 LUT, per-value matched-rule counts, mode), or
+            the reason string when no thresholds can be resolved
+        """
+        mode = 'threshold'
         if preset is not None:
             if isinstance(preset, str):
                 preset_dict = AlphaCorrectionPresets.get_preset(preset)
                 if preset_dict is None:
                     logger.error(f"Unknown preset: {preset}")
-                    return image, {'modified': False, 'reason': f'Unknown preset: {preset}'}
-                thresholds = preset_dict['thresholds']
-                mode = preset_dict.get('mode', 'threshold')
-            elif isinstance(preset, dict):
-                thresholds = preset['thresholds']
-                mode = preset.get('mode', 'threshold')
+                    return f'Unknown preset: {preset}'
+            else:
+                preset_dict = preset
+            thresholds = preset_dict['thresholds']
+            mode = preset_dict.get('mode', 'threshold')
         elif custom_thresholds is not None:
             thresholds = custom_thresholds
         else:
             logger.error("Either preset or custom_thresholds must be provided")
-            return image, {'modified': False, 'reason': 'No thresholds specified'}
-        
-        # Create corrected image
-        corrected = image.copy()
-        alpha = corrected[:, :, 3]
-        original_alpha = alpha.copy()
-        
-        # Track modifications
-        pixels_modified = 0
-        
-        # Apply thresholds
-        for min_val, max_val, target in thresholds:
-            mask = (alpha >= min_val) & (alpha <= max_val)
-            pixels_in_range = np.sum(mask)
-            
-            if pixels_in_range == 0:
-                continue
-            
-            if target is None:
-                # Preserve original values in this range
-                continue
-            elif preserve_gradients and (max_val - min_val) > 50:
-                # Preserve gradient, only modify if far from target
-                # Map the range [min_val, max_val] to [target, target]
-                # But only if difference is significant
-                diff = np.abs(alpha[mask] - target)
-                significant_mask = mask & (diff > 20)
-                alpha[significant_mask] = target
-                pixels_modified += np.sum(significant_mask)
-            else:
-                # Set to target value
-                alpha[mask] = target
-                pixels_modified += pixels_in_range
-        
-        corrected[:, :, 3] = alpha
+            return 'No thresholds specified'
         
-        # Calculate statistics
-        alpha_changed = np.sum(original_alpha != alpha)
+        lut, matched = _compile_lut(tuple(tuple(t) for t in thresholds), bool(preserve_gradients))
+        return lut, matched, mode
+    
+    def _correction_stats(
+        self,
+        hist: np.ndarray,
+        lut: np.ndarray,
+        matched: np.ndarray,
+        mode: str,
+        preserve_gradients: bool
+    ) -> Dict[str, Any]:
+        """correct_alpha() statistics from the alpha histogram; updates totals."""
+        hist = np.asarray(hist, dtype=np.int64)
+        total = int(hist.sum())
+        alpha_changed = int(hist[lut != np.arange(256)].sum())
         stats = {
             'modified': alpha_changed > 0,
-            'pixels_modified': int(pixels_modified),
-            'pixels_changed': int(alpha_changed),
-            'total_pixels': int(alpha.size),
-            'modification_ratio': float(alpha_changed / alpha.size),
+            'pixels_modified': int(hist @ matched),
+            'pixels_changed': alpha_changed,
+            'total_pixels': total,
+            'modification_ratio': float(alpha_changed / total) if total else 0.0,
             'mode': mode,
             'preserve_gradients': preserve_gradients
         }
@@ -373,8 +470,7 @@ class AlphaCorrector:
         if stats['modified']:
             self.stats['images_modified'] += 1
             self.stats['pixels_modified'] += stats['pixels_changed']
-        
-        return corrected, stats
+        return stats
     
     def process_image(
         self,
@@ -382,17 +478,23 @@ class AlphaCorrector:
         output_path: Optional[Path] = None,
         preset: str = 'ps2_binary',
         overwrite: bool = False,
-        backup: bool = True
+        backup: bool = True,
+        preserve_gradients: bool = False
     ) -> Dict[str, Any]:
         """
         Process a single image file.
         
+        Files whose alpha the preset would not change are not written.
+        Outputs are written to a temporary file and renamed into place, so
+        an interrupted run never leaves a truncated image.
+        
         Args:
             image_path: Input image path
             output_path: Output path (defaults to same as input with _corrected suffix)
             preset: Correction preset name
             overwrite: If True, overwrite input file
             backup: If True and overwrite=True, create backup
+            preserve_gradients: If True, preserve smooth gradients (only snap extremes)
             
         Returns:
             Dictionary with processing results
@@ -412,13 +514,17 @@ class AlphaCorrector:
                     }
                 img = img.convert('RGBA')
             
-            img_array = np.array(img)
-            
-            # Detect alpha colors
-            detection = self.detect_alpha_colors(img_array)
+            compiled = self.get_lut(preset, preserve_gradients=preserve_gradients)
+            if isinstance(compiled, str):
+                return {'success': False, 'path': str(image_path), 'reason': compiled}
+            lut, matched, mode = compiled
             
-            # Correct alpha
-            corrected, stats = self.correct_alpha(img_array, preset=preset)
+            # Detect and correct on the A band alone (PIL histogram/point,
+            # no NumPy round trip of the pixels)
+            alpha_band = img.getchannel('A')
+            hist = np.asarray(alpha_band.histogram(), dtype=np.int64)
+            detection = self._detection_from_histogram(hist)
+            stats = self._correction_stats(hist, lut, matched, mode, preserve_gradients)
             
             if not stats['modified']:
                 return {
@@ -434,7 +540,7 @@ class AlphaCorrector:
                 out_path = image_path
                 if backup:
                     backup_path = image_path.with_suffix(f'.backup{image_path.suffix}')
-                    img.save(backup_path)
+                    shutil.copy2(image_path, backup_path)
                     logger.info(f"Backup created: {backup_path}")
             elif output_path:
                 out_path = output_path
@@ -443,8 +549,8 @@ class AlphaCorrector:
             
             # Save corrected image
             out_path.parent.mkdir(parents=True, exist_ok=True)
-            corrected_img = Image.fromarray(corrected)
-            corrected_img.save(out_path)
+            img.putalpha(alpha_band.point(lut.tolist()))
+            _atomic_save(img, out_path)
             
             return {
                 'success': True,
@@ -471,11 +577,18 @@ class AlphaCorrector:
         preserve_structure: bool = True,
         overwrite: bool = False,
         backup: bool = True,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        jobs: int = 1,
+        preserve_gradients: bool = False,
+        checkpoint_path: Optional[Path] = None,
+        results_path: Optional[Path] = None
     ) -> List[Dict[str, Any]]:
         """
         Process multiple images in batch.
         
+        Collects iter_process_batch() into a list; use that generator (and
+        ``results_path``) for very large batches.
+        
         Args:
             image_paths: List of input image paths
             output_dir: Output directory (if None, save next to originals)
@@ -484,75 +597,170 @@ class AlphaCorrector:
             overwrite: If True, overwrite input files
             backup: If True and overwrite=True, create backups
             progress_callback: Optional callback function(current, total)
+            jobs: Worker processes (1 = in this process, 0 = CPU count - 1)
+            preserve_gradients: If True, preserve smooth gradients
+            checkpoint_path: Optional checkpoint file for resuming
+            results_path: Optional JSON-lines file receiving every result
             
         Returns:
             List of processing results
         """
-        results = []
-        total = len(image_paths)
+        return list(self.iter_process_batch(
+            image_paths, output_dir=output_dir, preset=preset,
+            preserve_structure=preserve_structure, overwrite=overwrite, backup=backup,
+            progress_callback=progress_callback, jobs=jobs,
+            preserve_gradients=preserve_gradients, checkpoint_path=checkpoint_path,
+            results_path=results_path))
+    
+    def iter_process_batch(
+        self,
+        image_paths: Iterable[Path],
+        output_dir: Optional[Path] = None,
+        preset: str = 'ps2_binary',
+        preserve_structure: bool = True,
+        overwrite: bool = False,
+        backup: bool = True,
+        progress_callback: Optional[callable] = None,
+        jobs: int = 1,
+        preserve_gradients: bool = False,
+        checkpoint_path: Optional[Path] = None,
+        results_path: Optional[Path] = None,
+        window: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Process images on a worker pool, yielding results in input order.
+        
+        At most ``window`` images are in flight at once, so memory stays
+        flat however many files there are.
+        
+        Args:
+            image_paths: Input image paths
+            output_dir: Output directory (if None, save next to originals)
+            preset: Correction preset name or dictionary
+            preserve_structure: If True, preserve directory structure in output
+            overwrite: If True, overwrite input files
+            backup: If True and overwrite=True, create backups
+            progress_callback: Optional callback function(current, total)
+            jobs: Worker processes (1 = in this process, 0 = CPU count - 1)
+            preserve_gradients: If True, preserve smooth gradients
+            checkpoint_path: File listing finished inputs, one per line.
+                Inputs already listed are skipped, so an interrupted run
+                resumes where it stopped; failures are retried.
+            results_path: JSON-lines file each result is appended to
+            window: Maximum images in flight (default: 2 * jobs)
+        
+        Yields:
+            Processing results, in input order
+        """
+        image_paths = [Path(p) for p in image_paths]
+        workers = jobs if jobs > 0 else max(1, (os.cpu_count() or 2) - 1)
         
-        logger.info(f"Processing {total} images with preset '{preset}'...")
+        done = set()
+        if checkpoint_path is not None and Path(checkpoint_path).exists():
+            with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                done = {line.rstrip('\n') for line in f if line.endswith('\n')}
+        pending_paths = [p for p in image_paths if str(p) not in done]
+        total = len(pending_paths)
         
-        # Find common root if preserving structure
+        logger.info(f"Processing {total} images with preset '{preset}' on {workers} worker(s)"
+                    + (f" ({len(image_paths) - total} already done)" if done else ""))
+        
+        # Common root if preserving structure
         common_root = None
         if preserve_structure and output_dir and len(image_paths) > 1:
-            try:
-                # Start with the first path's parent
-                common_root = Path(image_paths[0]).resolve().parent
-                # Find the common parent directory of all paths
-                for path in image_paths[1:]:
-                    resolved_path = path.resolve()
-                    # Keep going up until we find a common parent
-                    while not str(resolved_path).startswith(str(common_root) + str(Path('/'))):
-                        common_root = common_root.parent
-                        # Safety check to avoid going above filesystem root
-                        if common_root == common_root.parent:
-                            common_root = None
-                            break
-            except Exception:
-                common_root = None
-        
-        for idx, img_path in enumerate(image_paths):
-            if progress_callback:
-                progress_callback(idx + 1, total)
-            
-            # Determine output path
+            common_root = _common_root(image_paths)
+        
+        def job(img_path: Path):
             out_path = None
             if output_dir and not overwrite:
-                if preserve_structure and common_root:
-                    rel_path = img_path.relative_to(common_root)
-                    out_path = output_dir / rel_path
+                if common_root is not None:
+                    out_path = Path(output_dir) / Path(os.path.abspath(img_path)).relative_to(common_root)
                 else:
-                    out_path = output_dir / img_path.name
+                    out_path = Path(output_dir) / img_path.name
+            return (str(img_path), str(out_path) if out_path else None, preset,
+                    overwrite, backup, preserve_gradients)
+        
+        executor: Optional[Executor] = None
+        if workers > 1:
+            try:
+                executor = ProcessPoolExecutor(max_workers=workers)
+            except (OSError, NotImplementedError, ValueError) as e:
+                logger.warning(f"Process pool unavailable, using threads: {e}")
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='alpha-fix')
+        window = window or workers * 2
+        
+        checkpoint = open(checkpoint_path, 'a', encoding='utf-8') if checkpoint_path else None
+        results_file = open(results_path, 'a', encoding='utf-8') if results_path else None
+        counts = {'modified': 0, 'unchanged': 0, 'failed': 0}
+        try:
+            paths_iter = iter(pending_paths)
+            in_flight: deque = deque()
             
-            result = self.process_image(
-                img_path,
-                output_path=out_path,
-                preset=preset,
-                overwrite=overwrite,
-                backup=backup
-            )
-            results.append(result)
+            def submit_next() -> bool:
+                img_path = next(paths_iter, None)
+                if img_path is None:
+                    return False
+                work = job(img_path)
+                in_flight.append((img_path, executor.submit(_process_worker, work)
+                                  if executor else work))
+                return True
             
-            if result['success'] and result.get('modified'):
-                logger.info(f"[{idx+1}/{total}] Corrected: {img_path.name}")
-            elif result['success']:
-                logger.debug(f"[{idx+1}/{total}] Skipped: {img_path.name}")
-            else:
-                logger.warning(f"[{idx+1}/{total}] Failed: {img_path.name}")
+            while len(in_flight) < window and submit_next():
+                pass
+            idx = 0
+            while in_flight:
+                img_path, pending = in_flight.popleft()
+                submit_next()
+                try:
+                    result = pending.result() if executor else _process_worker(pending)
+                except Exception as e:
+                    logger.error(f"Error processing {img_path}: {e}")
+                    result = {'success': False, 'path': str(img_path), 'error': str(e)}
+                idx += 1
+                self._record_result(result)
+                
+                if result['success'] and result.get('modified'):
+                    counts['modified'] += 1
+                    logger.info(f"[{idx}/{total}] Corrected: {img_path.name}")
+                elif result['success']:
+                    counts['unchanged'] += 1
+                    logger.debug(f"[{idx}/{total}] Skipped: {img_path.name}")
+                else:
+                    counts['failed'] += 1
+                    logger.warning(f"[{idx}/{total}] Failed: {img_path.name}")
+                
+                if results_file is not None:
+                    results_file.write(json.dumps(result) + '\n')
+                    results_file.flush()
+                if checkpoint is not None and result['success']:
+                    checkpoint.write(f"{img_path}\n")
+                    checkpoint.flush()
+                if progress_callback:
+                    progress_callback(idx, total)
+                yield result
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            for f in (checkpoint, results_file):
+                if f is not None:
+                    f.close()
         
         # Print summary
-        successful = sum(1 for r in results if r['success'])
-        modified = sum(1 for r in results if r.get('modified'))
-        failed = total - successful
-        
         logger.info(f"\nBatch processing complete:")
         logger.info(f"  Total: {total}")
-        logger.info(f"  Modified: {modified}")
-        logger.info(f"  Unchanged: {successful - modified}")
-        logger.info(f"  Failed: {failed}")
-        
-        return results
+        logger.info(f"  Modified: {counts['modified']}")
+        logger.info(f"  Unchanged: {counts['unchanged']}")
+        logger.info(f"  Failed: {counts['failed']}")
+    
+    def _record_result(self, result: Dict[str, Any]) -> None:
+        """Add a worker's process_image() result to this corrector's totals."""
+        correction = result.get('correction')
+        if not result.get('success') or 'modified' not in result:
+            return
+        self.stats['images_processed'] += 1
+        if result['modified'] and correction:
+            self.stats['images_modified'] += 1
+            self.stats['pixels_modified'] += correction['pixels_changed']
     
     def get_stats(self) -> Dict[str, Any]:
         """Get processing statistics."""
@@ -5,11 +5,17 @@ Author: Dead On The Inside / JosephsDeadish
 """
 
 from .similarity_search import SimilaritySearch
+from .sharded_search import ShardedSimilaritySearch
 from .embedding_store import EmbeddingStore
 from .duplicate_detector import DuplicateDetector
+from .phash_index import PHashIndex, BKTree, MultiIndexHash
 
 __all__ = [
     'SimilaritySearch',
+    'ShardedSimilaritySearch',
     'EmbeddingStore',
-    'DuplicateDetector'
+    'DuplicateDetector',
+    'PHashIndex',
+    'BKTree',
+    'MultiIndexHash'
 ]
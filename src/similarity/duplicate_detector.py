@@ -44,22 +44,28 @@ class DuplicateDetector:
     
     def find_exact_duplicates(
         self,
-        threshold: float = 0.99
+        threshold: float = 0.99,
+        memory_budget_mb: float = 256,
+        progress_callback=None
     ) -> List[List[Path]]:
         """
         Find exact duplicate textures.
         
+        All pairs are compared in blocks; groups are the connected
+        components of pairs at or above the threshold.
+        
         Args:
             threshold: Similarity threshold for exact duplicates
+            memory_budget_mb: Memory for one block of pairwise similarities
+            progress_callback: Optional callable(rows_done, total_rows)
             
         Returns:
             List of duplicate groups (list of paths)
         """
-        duplicate_groups = self.similarity_search.find_duplicates(threshold)
-        
         # Convert to list of paths
         result = []
-        for group in duplicate_groups:
+        for group in self.similarity_search.iter_duplicate_groups(
+                threshold, memory_budget_mb, progress_callback):
             paths = [item['texture_path'] for item in group]
             result.append(paths)
         
@@ -170,7 +176,8 @@ class DuplicateDetector:
     def group_by_similarity(
         self,
         similarity_threshold: float = 0.90,
-        max_group_size: int = 50
+        max_group_size: int = 50,
+        memory_budget_mb: float = 256
     ) -> List[List[Dict[str, Any]]]:
         """
         Group all textures by similarity.
@@ -178,13 +185,15 @@ class DuplicateDetector:
         Args:
             similarity_threshold: Minimum similarity for same group
             max_group_size: Maximum textures per group
+            memory_budget_mb: Memory for one block of pairwise similarities
             
         Returns:
             List of texture groups
         """
         groups = self.similarity_search.cluster_similar(
             similarity_threshold=similarity_threshold,
-            max_cluster_size=max_group_size
+            max_cluster_size=max_group_size,
+            memory_budget_mb=memory_budget_mb
         )
         
         logger.info(f"Grouped textures into {len(groups)} similarity groups")
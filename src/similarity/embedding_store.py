@@ -6,11 +6,13 @@ Author: Dead On The Inside / JosephsDeadish
 
 from __future__ import annotations
 
+import json
 import logging
+import re
 
 logger = logging.getLogger(__name__)
-from pathlib import Path
-from typing import Dict, Any, List, Optional
+from pathlib import Path, PurePath
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 try:
     import numpy as np
     HAS_NUMPY = True
@@ -19,56 +21,180 @@ except ImportError:
     logger.error("numpy not available - limited functionality")
     logger.error("Install with: pip install numpy")
 import sqlite3
-import pickle
 
+# Keep IN (...) lists well below SQLite's bound-parameter limit
+_SQL_CHUNK = 500
+
+
+def _json_default(value):
+    """json.dumps hook for metadata: numpy values become lists/scalars, paths strings."""
+    if HAS_NUMPY and isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    if isinstance(value, PurePath):
+        return str(value)
+    raise TypeError(f"Metadata value of type {type(value).__name__} is not JSON-serializable: {value!r}")
 
 
 class EmbeddingStore:
     """
-    Persistent storage for texture embeddings using SQLite.
-    
+    Persistent storage for texture embeddings.
+
+    Vectors for each model live in one contiguous raw float32 (or float16)
+    file next to the database, which is memory-mapped for reads; SQLite only
+    maps (texture path, model) to a row offset plus version and metadata.
+    Nothing is pickled. compact() writes a new generation of the file and
+    switches SQLite to it, so readers never see a file replaced under them.
+
     Features:
     - Store embeddings with metadata
     - Query by texture path
-    - Batch operations
-    - Efficient serialization
+    - Bulk writes (store_batch) and zero-copy reads (get_matrix)
+    - In-place replacement; removed rows are reclaimed by compact()
+
+    Example:
+        >>> store = EmbeddingStore(Path('embeddings.db'))
+        >>> store.store_batch(paths, vectors, 'CLIP')
+        >>> matrix, paths = store.get_matrix('CLIP')
+        >>> search.add_embeddings_batch(matrix, paths)
     """
-    
-    def __init__(self, db_path: Path):
+
+    def __init__(self, db_path: Path, dtype: str = 'float32'):
         """
         Initialize embedding store.
-        
+
         Args:
             db_path: Path to SQLite database
+            dtype: On-disk vector type for new models ('float32' or 'float16')
         """
-        self.db_path = db_path
+        if dtype not in ('float32', 'float16'):
+            raise ValueError(f"Unsupported embedding dtype: {dtype}")
+        self.db_path = Path(db_path)
+        self.dtype = dtype
         self.conn = sqlite3.connect(str(db_path))
+        # model_name -> {texture_path: row}, loaded on first use
+        self._rows: Dict[str, Dict[str, int]] = {}
+        # model_name -> read-only memmap of the current file size
+        self._maps: Dict[str, np.memmap] = {}
         self._create_tables()
+        self._migrate_legacy()
         logger.info(f"EmbeddingStore initialized: {db_path}")
-    
+
     def _create_tables(self):
         """Create database tables."""
         cursor = self.conn.cursor()
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS embeddings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                texture_path TEXT UNIQUE NOT NULL,
-                embedding BLOB NOT NULL,
+            CREATE TABLE IF NOT EXISTS embedding_matrices (
+                model_name TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL,
                 embedding_dim INTEGER NOT NULL,
-                model_name TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                dtype TEXT NOT NULL,
+                row_count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS embedding_rows (
+                texture_path TEXT NOT NULL,
+                model_name TEXT NOT NULL,
+                row INTEGER NOT NULL,
+                version TEXT NOT NULL DEFAULT '',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (texture_path, model_name)
             )
         ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_embedding_rows_model ON embedding_rows(model_name, row)')
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS metadata (
+            CREATE TABLE IF NOT EXISTS embedding_metadata (
                 texture_path TEXT PRIMARY KEY,
-                metadata BLOB,
-                FOREIGN KEY (texture_path) REFERENCES embeddings(texture_path)
+                metadata TEXT NOT NULL
             )
         ''')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_texture_path ON embeddings(texture_path)')
         self.conn.commit()
-    
+
+    def _migrate_legacy(self):
+        """Move rows from the old pickled-BLOB tables into the columnar layout."""
+        cursor = self.conn.cursor()
+        tables = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if 'embeddings' not in tables:
+            return
+        # Old databases were written by this class itself; unpickle them once
+        import pickle
+        by_model: Dict[str, Tuple[List[str], List[np.ndarray]]] = {}
+        for path, blob, model in cursor.execute('SELECT texture_path, embedding, model_name FROM embeddings'):
+            paths, vectors = by_model.setdefault(model or '', ([], []))
+            paths.append(path)
+            vectors.append(np.asarray(pickle.loads(blob), dtype=np.float32).ravel())
+        metadata = {}
+        if 'metadata' in tables:
+            for path, blob in cursor.execute('SELECT texture_path, metadata FROM metadata'):
+                if blob is None:
+                    continue
+                value = pickle.loads(blob)
+                try:
+                    json.dumps(value, default=_json_default)
+                except TypeError as e:
+                    logger.warning(f"Dropping legacy metadata of {path}: {e}")
+                    continue
+                metadata[path] = value
+
+        for model, (paths, vectors) in by_model.items():
+            self.store_batch(paths, np.stack(vectors), model,
+                             [metadata.get(p) for p in paths])
+        cursor.execute('DROP TABLE embeddings')
+        if 'metadata' in tables:
+            cursor.execute('DROP TABLE metadata')
+        self.conn.commit()
+        logger.info(f"Migrated {sum(len(p) for p, _ in by_model.values())} legacy embeddings")
+
+    # ── Matrix files ────────────────────────────────────────────────────────
+
+    def _matrix_info(self, model_name: str) -> Optional[Tuple[Path, int, str, int]]:
+        """(file path, dim, dtype, row_count) for a model, or None."""
+        row = self.conn.execute(
+            'SELECT file_name, embedding_dim, dtype, row_count FROM embedding_matrices WHERE model_name = ?',
+            (model_name,)).fetchone()
+        if row is None:
+            return None
+        return self.db_path.parent / row[0], row[1], row[2], row[3]
+
+    def _ensure_matrix(self, model_name: str, dim: int) -> Tuple[Path, int, str, int]:
+        info = self._matrix_info(model_name)
+        if info is not None:
+            if info[1] != dim:
+                raise ValueError(f"Embedding dim {dim} does not match stored dim {info[1]} for {model_name}")
+            return info
+        safe = re.sub(r'[^\w.-]', '_', model_name) or 'default'
+        file_name = f"{self.db_path.stem}.{safe}.{'f16' if self.dtype == 'float16' else 'f32'}"
+        self.conn.execute(
+            'INSERT INTO embedding_matrices (model_name, file_name, embedding_dim, dtype, row_count) '
+            'VALUES (?, ?, ?, ?, 0)', (model_name, file_name, dim, self.dtype))
+        path = self.db_path.parent / file_name
+        # A leftover file from a deleted database must not leak stale rows
+        path.write_bytes(b'')
+        return path, dim, self.dtype, 0
+
+    def _row_map(self, model_name: str) -> Dict[str, int]:
+        rows = self._rows.get(model_name)
+        if rows is None:
+            rows = dict(self.conn.execute(
+                'SELECT texture_path, row FROM embedding_rows WHERE model_name = ?', (model_name,)))
+            self._rows[model_name] = rows
+        return rows
+
+    def _memmap(self, model_name: str) -> Optional[np.memmap]:
+        """Read-only memmap over all rows of a model's file."""
+        cached = self._maps.get(model_name)
+        if cached is not None:
+            return cached
+        info = self._matrix_info(model_name)
+        if info is None or info[3] == 0:
+            return None
+        path, dim, dtype, row_count = info
+        matrix = np.memmap(path, dtype=dtype, mode='r', shape=(row_count, dim))
+        self._maps[model_name] = matrix
+        return matrix
+
+    # ── Writing ─────────────────────────────────────────────────────────────
+
     def store(
         self,
         texture_path: Path,
@@ -77,76 +203,271 @@ class EmbeddingStore:
         metadata: Optional[Dict[str, Any]] = None
     ):
         """Store an embedding."""
+        self.store_batch([texture_path], np.asarray(embedding).reshape(1, -1), model_name,
+                         [metadata] if metadata else None)
+
+    def store_batch(
+        self,
+        texture_paths: Sequence[Path],
+        embeddings: np.ndarray,
+        model_name: str,
+        metadata_list: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+        version: str = ''
+    ):
+        """
+        Store many embeddings in one transaction.
+
+        Paths already stored for the model are overwritten in place; new
+        paths are appended to the model's file.
+
+        Args:
+            texture_paths: Texture paths, one per row of ``embeddings``
+            embeddings: Array of embeddings (N, embedding_dim)
+            model_name: Model that produced the embeddings
+            metadata_list: Optional metadata dicts of JSON types; numpy
+                values and paths are converted, tuples come back as lists
+            version: Free-form version tag (e.g. model weights) stored per row
+
+        Raises:
+            TypeError: If metadata holds any other type (nothing is written)
+        """
+        if len(texture_paths) == 0:
+            return
+        # Within one batch the last occurrence of a path wins
+        positions = {str(p): i for i, p in enumerate(texture_paths)}
+        # Serialized up front so unsupported metadata fails before any write
+        metadata_rows = []
+        if metadata_list:
+            metadata_rows = [(k, json.dumps(metadata_list[i], default=_json_default))
+                             for k, i in positions.items() if metadata_list[i]]
+        embeddings = np.asarray(embeddings).reshape(len(texture_paths), -1)
+        path, dim, dtype, row_count = self._ensure_matrix(model_name, embeddings.shape[1])
+        embeddings = embeddings.astype(dtype, copy=False)
+        rows = self._row_map(model_name)
+        keys = list(positions)
+        existing = [(rows[k], positions[k]) for k in keys if k in rows]
+        new = [k for k in keys if k not in rows]
+
+        with open(path, 'r+b') as f:
+            if existing:
+                # Overwrite replaced rows in place
+                matrix = np.memmap(f, dtype=dtype, mode='r+', shape=(row_count, dim))
+                targets, sources = zip(*existing)
+                matrix[list(targets)] = embeddings[list(sources)]
+                matrix.flush()
+                del matrix
+            if new:
+                f.seek(row_count * dim * np.dtype(dtype).itemsize)
+                f.write(np.ascontiguousarray(embeddings[[positions[k] for k in new]]).tobytes())
+
+        new_rows = {k: row_count + i for i, k in enumerate(new)}
+        with self.conn:
+            self.conn.executemany('''
+                INSERT INTO embedding_rows (texture_path, model_name, row, version)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(texture_path, model_name) DO UPDATE SET
+                    version = excluded.version, created_at = CURRENT_TIMESTAMP
+            ''', [(k, model_name, rows.get(k, new_rows.get(k)), version) for k in keys])
+            if new:
+                self.conn.execute('UPDATE embedding_matrices SET row_count = ? WHERE model_name = ?',
+                                  (row_count + len(new), model_name))
+            if metadata_rows:
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO embedding_metadata (texture_path, metadata) VALUES (?, ?)',
+                    metadata_rows)
+        rows.update(new_rows)
+        self._maps.pop(model_name, None)
+
+    def remove(self, texture_paths: Sequence[Path], model_name: Optional[str] = None) -> int:
+        """
+        Remove embeddings (for one model, or all models when None).
+
+        The rows stay in the matrix file until compact().
+
+        Returns:
+            Number of (path, model) entries removed
+        """
+        keys = [str(p) for p in texture_paths]
+        removed = 0
+        with self.conn:
+            for start in range(0, len(keys), _SQL_CHUNK):
+                chunk = keys[start:start + _SQL_CHUNK]
+                marks = ','.join('?' * len(chunk))
+                if model_name is None:
+                    cursor = self.conn.execute(
+                        f'DELETE FROM embedding_rows WHERE texture_path IN ({marks})', chunk)
+                    self.conn.execute(
+                        f'DELETE FROM embedding_metadata WHERE texture_path IN ({marks})', chunk)
+                else:
+                    cursor = self.conn.execute(
+                        f'DELETE FROM embedding_rows WHERE model_name = ? AND texture_path IN ({marks})',
+                        [model_name] + chunk)
+                removed += cursor.rowcount
+        if model_name is None:
+            self._rows.clear()
+        else:
+            self._rows.pop(model_name, None)
+        return removed
+
+    def compact(self, model_name: str):
+        """
+        Drop removed rows from a model's file, preserving row order.
+
+        The live rows are copied into a new generation file and SQLite is
+        pointed at it in one transaction; the old file is then deleted if
+        nothing holds it open (a memmap on Windows does, in which case it is
+        left behind). Arrays from earlier get_matrix() calls stay valid but
+        go stale, so fetch the matrix again afterwards.
+        """
+        info = self._matrix_info(model_name)
+        if info is None:
+            return
+        path, dim, dtype, row_count = info
+        live = self.conn.execute(
+            'SELECT texture_path, row FROM embedding_rows WHERE model_name = ? ORDER BY row',
+            (model_name,)).fetchall()
+        if len(live) == row_count:
+            return
+
+        new_path = path.with_name(self._next_generation(path.name))
+        with open(new_path, 'wb') as f:
+            if live:
+                source = np.memmap(path, dtype=dtype, mode='r', shape=(row_count, dim))
+                old_rows = np.fromiter((row for _, row in live), dtype=np.int64, count=len(live))
+                for start in range(0, len(old_rows), 65536):
+                    f.write(np.ascontiguousarray(source[old_rows[start:start + 65536]]).tobytes())
+                del source
+
+        with self.conn:
+            self.conn.executemany(
+                'UPDATE embedding_rows SET row = ? WHERE texture_path = ? AND model_name = ?',
+                [(new_row, texture_path, model_name) for new_row, (texture_path, _) in enumerate(live)])
+            self.conn.execute('UPDATE embedding_matrices SET file_name = ?, row_count = ? WHERE model_name = ?',
+                              (new_path.name, len(live), model_name))
+        self._rows.pop(model_name, None)
+        self._maps.pop(model_name, None)
+        try:
+            path.unlink()
+        except OSError as e:
+            logger.debug(f"Old embedding file {path.name} still in use, left in place: {e}")
+        logger.debug(f"Compacted {model_name} embeddings: {row_count} -> {len(live)} rows")
+
+    @staticmethod
+    def _next_generation(file_name: str) -> str:
+        """'db.CLIP.f32' -> 'db.CLIP.g1.f32' -> 'db.CLIP.g2.f32' ..."""
+        match = re.match(r'^(.*?)(?:\.g(\d+))?\.(f16|f32)$', file_name)
+        if match is None:
+            return file_name + '.g1'
+        stem, generation, suffix = match.groups()
+        return f"{stem}.g{int(generation or 0) + 1}.{suffix}"
+
+    # ── Reading ─────────────────────────────────────────────────────────────
+
+    def get_matrix(self, model_name: str) -> Tuple[np.ndarray, List[Path]]:
+        """
+        All embeddings of a model as one matrix; row i belongs to paths[i].
+
+        The matrix is a zero-copy memmap of the model's file unless rows
+        were removed since the last compact(), in which case the live rows
+        are gathered into a copy. Reading never compacts.
+
+        Returns:
+            Tuple of (read-only (N, embedding_dim) array, texture paths)
+        """
+        info = self._matrix_info(model_name)
+        if info is None:
+            return np.empty((0, 0), dtype=np.float32), []
+        rows = self._row_map(model_name)
+        matrix = self._memmap(model_name)
+        if matrix is None or not rows:
+            return np.empty((0, info[1]), dtype=info[2]), []
+        if len(rows) == info[3]:
+            paths: List[Optional[Path]] = [None] * len(rows)
+            for texture_path, row in rows.items():
+                paths[row] = Path(texture_path)
+            return matrix, paths
+        ordered = sorted(rows.items(), key=lambda item: item[1])
+        index = np.fromiter((row for _, row in ordered), dtype=np.int64, count=len(ordered))
+        gathered = matrix[index]
+        gathered.flags.writeable = False
+        return gathered, [Path(texture_path) for texture_path, _ in ordered]
+
+    def get_vectors(self, texture_paths: Sequence[Path], model_name: str) -> np.ndarray:
+        """
+        Embeddings of the given paths, in order.
+
+        Returns:
+            float32 array (len(texture_paths), embedding_dim)
+
+        Raises:
+            KeyError: If a path has no embedding for the model
+        """
+        rows = self._row_map(model_name)
+        keys = [str(p) for p in texture_paths]
+        missing = [k for k in keys if k not in rows]
+        if missing:
+            raise KeyError(f"{len(missing)} path(s) have no {model_name} embedding, e.g. {missing[0]}")
+        info = self._matrix_info(model_name)
+        if not keys:
+            return np.empty((0, info[1] if info else 0), dtype=np.float32)
+        index = np.fromiter((rows[k] for k in keys), dtype=np.int64, count=len(keys))
+        return np.asarray(self._memmap(model_name)[index], dtype=np.float32)
+
+    def get(self, texture_path: Path, model_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Retrieve an embedding (the most recent one when no model is given)."""
         cursor = self.conn.cursor()
-        embedding_blob = pickle.dumps(embedding)
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO embeddings (texture_path, embedding, embedding_dim, model_name)
-            VALUES (?, ?, ?, ?)
-        ''', (str(texture_path), embedding_blob, embedding.shape[0], model_name))
-        
-        if metadata:
-            metadata_blob = pickle.dumps(metadata)
+        if model_name is None:
             cursor.execute('''
-                INSERT OR REPLACE INTO metadata (texture_path, metadata)
-                VALUES (?, ?)
-            ''', (str(texture_path), metadata_blob))
-        
-        self.conn.commit()
-    
-    def get(self, texture_path: Path) -> Optional[Dict[str, Any]]:
-        """Retrieve an embedding."""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT embedding, embedding_dim, model_name, created_at
-            FROM embeddings WHERE texture_path = ?
-        ''', (str(texture_path),))
-        
+                SELECT model_name, row, version, created_at FROM embedding_rows
+                WHERE texture_path = ? ORDER BY created_at DESC LIMIT 1
+            ''', (str(texture_path),))
+        else:
+            cursor.execute('''
+                SELECT model_name, row, version, created_at FROM embedding_rows
+                WHERE texture_path = ? AND model_name = ?
+            ''', (str(texture_path), model_name))
+
         row = cursor.fetchone()
         if not row:
             return None
-        
-        embedding = pickle.loads(row[0])
-        
+        model, index, version, created_at = row
+        embedding = np.array(self._memmap(model)[index], dtype=np.float32)
+
         # Get metadata
-        cursor.execute('SELECT metadata FROM metadata WHERE texture_path = ?', (str(texture_path),))
+        cursor.execute('SELECT metadata FROM embedding_metadata WHERE texture_path = ?', (str(texture_path),))
         metadata_row = cursor.fetchone()
-        metadata = pickle.loads(metadata_row[0]) if metadata_row else None
-        
+        metadata = json.loads(metadata_row[0]) if metadata_row else None
+
         return {
             'embedding': embedding,
-            'embedding_dim': row[1],
-            'model_name': row[2],
-            'created_at': row[3],
+            'embedding_dim': embedding.shape[0],
+            'model_name': model,
+            'version': version,
+            'created_at': created_at,
             'metadata': metadata
         }
-    
+
     def get_all(self, model_name: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get all embeddings, optionally filtered by model."""
-        cursor = self.conn.cursor()
-        
+        """Get all embeddings, optionally filtered by model (prefer get_matrix)."""
         if model_name:
-            cursor.execute('''
-                SELECT texture_path, embedding, embedding_dim, model_name
-                FROM embeddings WHERE model_name = ?
-            ''', (model_name,))
+            models = [model_name]
         else:
-            cursor.execute('''
-                SELECT texture_path, embedding, embedding_dim, model_name
-                FROM embeddings
-            ''')
-        
+            models = [row[0] for row in self.conn.execute('SELECT model_name FROM embedding_matrices')]
+
         results = []
-        for row in cursor.fetchall():
-            results.append({
-                'texture_path': Path(row[0]),
-                'embedding': pickle.loads(row[1]),
-                'embedding_dim': row[2],
-                'model_name': row[3]
-            })
-        
+        for model in models:
+            matrix, paths = self.get_matrix(model)
+            for texture_path, embedding in zip(paths, matrix):
+                results.append({
+                    'texture_path': texture_path,
+                    'embedding': np.asarray(embedding),
+                    'embedding_dim': matrix.shape[1],
+                    'model_name': model
+                })
+
         return results
-    
+
     def close(self):
         """Close database connection."""
+        self._maps.clear()
         self.conn.close()
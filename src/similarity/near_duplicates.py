@@ -0,0 +1,173 @@
+"""
+Near-Duplicate Grouping
+All-pairs similarity over an embedding matrix in row blocks sized to a memory
+budget. Pairs above the threshold are merged with union-find into exact
+connected components, which are streamed out as soon as no later block can
+extend them.
+Author: Dead On The Inside / JosephsDeadish
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+
+class UnionFind:
+    """
+    Disjoint sets over 0..n-1 (union by size, path halving) that also track
+    each set's members and largest element.
+    """
+
+    def __init__(self, n: int):
+        self.parent = np.arange(n, dtype=np.int64)
+        self.members: Dict[int, List[int]] = {}
+        self.max_member: Dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return int(x)
+
+    def find_many(self, xs: np.ndarray) -> np.ndarray:
+        """Roots of many elements at once (pointer jumping)."""
+        roots = self.parent[xs]
+        while True:
+            nxt = self.parent[roots]
+            if np.array_equal(nxt, roots):
+                return roots
+            roots = nxt
+
+    def union(self, a: int, b: int) -> int:
+        """Merge the sets of two roots; returns the surviving root."""
+        if a == b:
+            return a
+        members_a = self.members.get(a) or [a]
+        members_b = self.members.get(b) or [b]
+        if len(members_a) < len(members_b):
+            a, b = b, a
+            members_a, members_b = members_b, members_a
+        self.parent[b] = a
+        members_a.extend(members_b)
+        self.members[a] = members_a
+        self.members.pop(b, None)
+        self.max_member[a] = max(self.max_member.get(a, a), self.max_member.pop(b, b))
+        return a
+
+
+def block_rows(n: int, memory_budget_mb: float, itemsize: int = 4) -> int:
+    """Rows per block so a block x n similarity matrix fits the budget."""
+    # Similarities plus the boolean threshold mask
+    per_row = max(n, 1) * (itemsize + 1)
+    return max(1, min(n, int(memory_budget_mb * 1024 * 1024 // per_row)))
+
+
+def iter_similarity_components(
+    vectors: np.ndarray,
+    threshold: float,
+    metric: str = 'cosine',
+    memory_budget_mb: float = 256,
+    progress_callback=None
+) -> Iterator[np.ndarray]:
+    """
+    Stream the connected components of the "similarity >= threshold" graph.
+
+    Each row block computes similarities against itself and every later
+    row only (the upper triangle), so after the block ending at row ``e``
+    no new edge can touch a row below ``e``; components entirely below it
+    are final and yielded immediately.
+
+    Args:
+        vectors: (N, dim) embeddings; already normalized for cosine
+        threshold: Minimum similarity for an edge
+        metric: 'cosine' (similarity = dot product); 'l2' and
+            'inner_product' use 1 / (1 + distance) like SimilaritySearch
+        memory_budget_mb: Memory for one block of similarities
+        progress_callback: Optional callable(rows_done, total_rows)
+
+    Yields:
+        Arrays of row indices (2+ members, ascending), one per component
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n = len(vectors)
+    if n < 2:
+        return
+
+    uf = UnionFind(n)
+    ready: List = []  # heap of (max member, root)
+    step = block_rows(n, memory_budget_mb)
+    sq_norms = np.einsum('ij,ij->i', vectors, vectors) if metric == 'l2' else None
+
+    for start in range(0, n, step):
+        end = min(n, start + step)
+        block = vectors[start:end]
+        others = vectors[start:]
+        scores = block @ others.T
+        if metric == 'cosine':
+            mask = scores >= threshold
+        else:
+            if metric == 'l2':
+                # Squared L2 distance, as FAISS reports it
+                scores *= -2.0
+                scores += sq_norms[start:end, None]
+                scores += sq_norms[None, start:]
+            # 1 / (1 + d) >= t  <=>  d <= 1/t - 1 (for 0 < t <= 1)
+            mask = scores <= (1.0 / threshold - 1.0) if threshold > 0 else np.ones_like(scores, dtype=bool)
+        # Upper triangle only (j > i); the diagonal block is square
+        diag = np.arange(end - start)
+        mask[:, :end - start] &= diag[None, :] > diag[:, None]
+
+        rows, cols = np.nonzero(mask)
+        del scores, mask
+        if len(rows):
+            rows += start
+            cols += start
+            # Group edges by row; one root lookup per row's neighbour set
+            splits = np.flatnonzero(np.diff(rows)) + 1
+            for row_edges, col_edges in zip(np.split(rows, splits), np.split(cols, splits)):
+                root = uf.find(int(row_edges[0]))
+                for other in np.unique(uf.find_many(col_edges)).tolist():
+                    if other != root:
+                        root = uf.union(root, other)
+                heapq.heappush(ready, (uf.max_member.get(root, root), root))
+
+        # Components whose largest member is below ``end`` are complete
+        while ready and ready[0][0] < end:
+            largest, root = heapq.heappop(ready)
+            if uf.parent[root] != root or uf.max_member.get(root) != largest:
+                continue  # stale entry: merged or grown since it was pushed
+            members = uf.members.pop(root)
+            uf.max_member.pop(root)
+            yield np.sort(np.asarray(members, dtype=np.int64))
+
+        if progress_callback:
+            progress_callback(end, n)
+
+
+def similarity_to(vectors: np.ndarray, members: np.ndarray, anchor: int,
+                  metric: str = 'cosine', sq_norms: Optional[np.ndarray] = None) -> np.ndarray:
+    """Similarity of each member to ``anchor`` using SimilaritySearch's scale."""
+    dots = vectors[members] @ vectors[anchor]
+    if metric == 'cosine':
+        return dots
+    if metric == 'l2':
+        if sq_norms is None:
+            sq_norms = np.einsum('ij,ij->i', vectors[members], vectors[members])
+            anchor_norm = float(vectors[anchor] @ vectors[anchor])
+        else:
+            anchor_norm = float(sq_norms[anchor])
+            sq_norms = sq_norms[members]
+        dots = np.maximum(sq_norms + anchor_norm - 2.0 * dots, 0.0)
+    return 1.0 / (1.0 + dots)
@@ -0,0 +1,556 @@
+"""
+Perceptual Hash Index
+Model-free near-duplicate lookup over 64-bit perceptual hashes (from
+native_ops.batch_perceptual_hash). Two backends answer Hamming-radius
+queries without comparing against every stored hash:
+
+- multi-index hashing (default): the 64 bits are split into bands, each
+  indexed in a sorted table. Two hashes within distance r agree to within
+  r // bands bits on at least one band (pigeonhole), so only hashes sharing
+  a nearby band value are ever compared. All-pairs search joins the band
+  tables directly and is fully vectorized.
+- BK-tree: a metric tree over distinct hashes; cheap to update and good for
+  small radii on small collections.
+
+Author: Dead On The Inside / JosephsDeadish
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+try:
+    from ..native_ops import batch_perceptual_hash, popcount64
+except (ImportError, ValueError):
+    try:
+        from native_ops import batch_perceptual_hash, popcount64
+    except ImportError:
+        batch_perceptual_hash = popcount64 = None
+
+try:
+    from ..utils.analysis_cache import AnalysisCache
+except (ImportError, ValueError):
+    try:
+        from utils.analysis_cache import AnalysisCache
+    except ImportError:
+        AnalysisCache = None  # type: ignore[assignment,misc]
+
+from .near_duplicates import UnionFind
+
+HASH_BITS = 64
+
+# Candidate pairs verified per vectorized step of the all-pairs join
+_PAIR_CHUNK = 1 << 22
+
+def _band_layout(bands: int) -> List[Tuple[int, int]]:
+    """(shift, width) of each band, splitting the hash as evenly as possible."""
+    layout, shift = [], 0
+    for i in range(bands):
+        width = HASH_BITS // bands + (1 if i < HASH_BITS % bands else 0)
+        layout.append((shift, width))
+        shift += width
+    return layout
+
+
+def _flip_masks(width: int, radius: int) -> List[int]:
+    """All masks of ``width`` bits with at most ``radius`` bits set, 0 first."""
+    masks = [0]
+    for weight in range(1, min(radius, width) + 1):
+        for bits in combinations(range(width), weight):
+            masks.append(sum(1 << b for b in bits))
+    return masks
+
+
+def _expand_pairs(left_starts, left_counts, right_starts, right_counts, same_run):
+    """
+    Yield chunks of (left position, right position) for the cartesian
+    product of each left run with its right run; within one run
+    (``same_run``) only pairs with left < right are kept.
+    """
+    totals = left_counts * right_counts
+    if not len(totals):
+        return
+    ends = np.cumsum(totals)
+    for start in range(0, int(ends[-1]), _PAIR_CHUNK):
+        index = np.arange(start, min(int(ends[-1]), start + _PAIR_CHUNK), dtype=np.int64)
+        run = np.searchsorted(ends, index, side='right')
+        offset = index - (ends[run] - totals[run])
+        width = right_counts[run]
+        a = left_starts[run] + offset // width
+        b = right_starts[run] + offset % width
+        if same_run:
+            keep = a < b
+            a, b = a[keep], b[keep]
+        yield a, b
+
+
+class MultiIndexHash:
+    """
+    Multi-index hashing over 64-bit hashes.
+
+    Each band keeps its values sorted (argsort order plus sorted values), so
+    a band lookup is a binary search and tables are rebuilt lazily after
+    additions.
+    """
+
+    def __init__(self, bands: int = 4):
+        """
+        Args:
+            bands: Number of bands; about 64 / log2(N) is optimal, i.e. 4
+                (16-bit bands) for tens of thousands to millions of hashes
+        """
+        if not 1 <= bands <= HASH_BITS:
+            raise ValueError(f"bands must be between 1 and {HASH_BITS}")
+        self.bands = bands
+        self.layout = _band_layout(bands)
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self._tables: Optional[List[Tuple[np.ndarray, np.ndarray]]] = None
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def add(self, hashes: np.ndarray):
+        """Append hashes; their ids continue from the current length."""
+        self.hashes = np.concatenate([self.hashes, np.asarray(hashes, dtype=np.uint64)])
+        self._tables = None
+
+    def _band_values(self, hashes: np.ndarray, band: int) -> np.ndarray:
+        shift, width = self.layout[band]
+        return (hashes >> np.uint64(shift)) & np.uint64((1 << width) - 1)
+
+    def _get_tables(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        if self._tables is None:
+            tables = []
+            for band in range(self.bands):
+                values = self._band_values(self.hashes, band)
+                order = np.argsort(values, kind='stable')
+                tables.append((order, values[order]))
+            self._tables = tables
+        return self._tables
+
+    def query(self, hash_value: int, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ids and distances of all hashes within ``radius`` of ``hash_value``.
+
+        Returns:
+            Tuple of (ids, distances), sorted by distance then id
+        """
+        if not len(self.hashes):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8)
+        query = np.uint64(hash_value)
+        band_radius = radius // self.bands
+        candidates = []
+        for band, (order, values) in enumerate(self._get_tables()):
+            key = int(self._band_values(query, band))
+            for mask in _flip_masks(self.layout[band][1], band_radius):
+                target = np.uint64(key ^ mask)
+                lo = int(np.searchsorted(values, target, side='left'))
+                hi = int(np.searchsorted(values, target, side='right'))
+                if hi > lo:
+                    candidates.append(order[lo:hi])
+        if not candidates:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8)
+        ids = np.unique(np.concatenate(candidates))
+        distances = popcount64(self.hashes[ids] ^ query)
+        keep = distances <= radius
+        ids, distances = ids[keep], distances[keep]
+        order = np.lexsort((ids, distances))
+        return ids[order].astype(np.int64), distances[order]
+
+    def iter_candidate_pairs(self, radius: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Chunks of (id_a, id_b) that share a band within radius // bands bits."""
+        band_radius = radius // self.bands
+        for band, (order, values) in enumerate(self._get_tables()):
+            if not len(values):
+                continue
+            boundaries = np.flatnonzero(np.diff(values)) + 1
+            starts = np.concatenate([[0], boundaries]).astype(np.int64)
+            counts = np.diff(np.concatenate([starts, [len(values)]])).astype(np.int64)
+            unique_values = values[starts]
+            for mask in _flip_masks(self.layout[band][1], band_radius):
+                if mask == 0:
+                    runs = counts > 1
+                    pairs = _expand_pairs(starts[runs], counts[runs], starts[runs], counts[runs], True)
+                else:
+                    # Runs whose value differs from a later run's by exactly ``mask``
+                    target = unique_values ^ np.uint64(mask)
+                    other = np.searchsorted(unique_values, target)
+                    other_clipped = np.minimum(other, len(unique_values) - 1)
+                    hit = (unique_values[other_clipped] == target) & (other_clipped > np.arange(len(unique_values)))
+                    left, right = np.flatnonzero(hit), other_clipped[hit]
+                    pairs = _expand_pairs(starts[left], counts[left], starts[right], counts[right], False)
+                for a, b in pairs:
+                    yield order[a], order[b]
+
+    def pairs(self, radius: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        All pairs of ids within ``radius`` of each other.
+
+        Returns:
+            Tuple of (id_a, id_b, distance) arrays with id_a < id_b, sorted
+        """
+        n = len(self.hashes)
+        keys, dists = [], []
+        for a, b in self.iter_candidate_pairs(radius):
+            d = popcount64(self.hashes[a] ^ self.hashes[b])
+            keep = d <= radius
+            if keep.any():
+                a, b = a[keep], b[keep]
+                keys.append(np.minimum(a, b) * n + np.maximum(a, b))
+                dists.append(d[keep])
+        if not keys:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0, dtype=np.uint8)
+        # A pair can share several bands; keep one copy
+        keys, first = np.unique(np.concatenate(keys), return_index=True)
+        return keys // n, keys % n, np.concatenate(dists)[first]
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree under Hamming distance.
+
+    Nodes are distinct hash values (identical hashes share a node), stored
+    in flat lists so the tree can be saved as (parent, edge distance) arrays.
+    """
+
+    def __init__(self):
+        self.node_hash: List[int] = []
+        self.node_ids: List[List[int]] = []
+        self.node_parent: List[int] = []
+        self.node_distance: List[int] = []
+        self._children: List[Dict[int, int]] = []
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self.node_ids)
+
+    def _new_node(self, hash_value: int, item_id: int, parent: int, distance: int):
+        self.node_hash.append(hash_value)
+        self.node_ids.append([item_id])
+        self.node_parent.append(parent)
+        self.node_distance.append(distance)
+        self._children.append({})
+
+    def add(self, hash_value: int, item_id: int):
+        """Insert one hash under the given item id."""
+        hash_value = int(hash_value)
+        if not self.node_hash:
+            self._new_node(hash_value, item_id, -1, 0)
+            return
+        node = 0
+        while True:
+            distance = bin(self.node_hash[node] ^ hash_value).count("1")
+            if distance == 0:
+                self.node_ids[node].append(item_id)
+                return
+            child = self._children[node].get(distance)
+            if child is None:
+                self._children[node][distance] = len(self.node_hash)
+                self._new_node(hash_value, item_id, node, distance)
+                return
+            node = child
+
+    def query(self, hash_value: int, radius: int) -> List[Tuple[int, int]]:
+        """(item id, distance) for every hash within ``radius``, by distance."""
+        if not self.node_hash:
+            return []
+        hash_value = int(hash_value)
+        results = []
+        stack = [0]
+        node_hash, children = self.node_hash, self._children
+        while stack:
+            node = stack.pop()
+            distance = bin(node_hash[node] ^ hash_value).count("1")
+            if distance <= radius:
+                results.extend((item_id, distance) for item_id in self.node_ids[node])
+            # Triangle inequality: only subtrees at |edge - distance| <= radius
+            for edge, child in children[node].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        results.sort(key=lambda r: (r[1], r[0]))
+        return results
+
+    @classmethod
+    def from_arrays(cls, node_hash, node_parent, node_distance, item_node) -> 'BKTree':
+        """Rebuild a tree saved with its node arrays (linear time)."""
+        tree = cls()
+        tree.node_hash = [int(h) for h in node_hash]
+        tree.node_parent = [int(p) for p in node_parent]
+        tree.node_distance = [int(d) for d in node_distance]
+        tree.node_ids = [[] for _ in tree.node_hash]
+        tree._children = [{} for _ in tree.node_hash]
+        for node, (parent, distance) in enumerate(zip(tree.node_parent, tree.node_distance)):
+            if parent >= 0:
+                tree._children[parent][distance] = node
+        for item_id, node in enumerate(item_node):
+            tree.node_ids[int(node)].append(item_id)
+        return tree
+
+
+class PHashIndex:
+    """
+    Perceptual-hash index for fast, model-free visual dedupe.
+
+    Example:
+        >>> index = PHashIndex()
+        >>> index.add_files(texture_paths)
+        >>> index.query_file(Path('tex_grass_01.png'), radius=6)
+        [(PosixPath('tex_grass_01_copy.png'), 0), ...]
+        >>> index.find_groups(max_distance=4)
+        [[PosixPath('a.png'), PosixPath('b.png')], ...]
+        >>> index.save(Path('phash_index.npz'))
+    """
+
+    METHODS = ('mih', 'bktree')
+
+    # Version of the hashes cached in the analysis cache (native and NumPy
+    # hashes are identical since version 2)
+    CACHE_VERSION = '2'
+
+    def __init__(self, method: str = 'mih', bands: int = 4):
+        """
+        Args:
+            method: 'mih' (multi-index hashing) or 'bktree'
+            bands: Number of bands for multi-index hashing
+        """
+        if not HAS_NUMPY:
+            raise ImportError("numpy is required for PHashIndex")
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown method '{method}', expected one of {self.METHODS}")
+        self.method = method
+        self.bands = bands
+        self.paths: List[Path] = []
+        self._mih = MultiIndexHash(bands) if method == 'mih' else None
+        self._tree = BKTree() if method == 'bktree' else None
+        self._hashes: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    @property
+    def hashes(self) -> np.ndarray:
+        """All stored hashes as a uint64 array, in insertion order."""
+        if self._mih is not None:
+            return self._mih.hashes
+        if len(self._hashes) > 1:
+            self._hashes = [np.concatenate(self._hashes)]
+        return self._hashes[0] if self._hashes else np.empty(0, dtype=np.uint64)
+
+    # ── Filling ─────────────────────────────────────────────────────────────
+
+    def add_hashes(self, hashes: Sequence[int], paths: Sequence[Path]):
+        """Add precomputed 64-bit hashes."""
+        if len(hashes) != len(paths):
+            raise ValueError("Number of hashes and paths must match")
+        values = np.array([int(h) for h in hashes], dtype=np.uint64)
+        start = len(self.paths)
+        self.paths.extend(Path(p) for p in paths)
+        if self._mih is not None:
+            self._mih.add(values)
+        else:
+            self._hashes.append(values)
+            for offset, value in enumerate(values.tolist()):
+                self._tree.add(value, start + offset)
+
+    def add_images(self, images: Sequence[np.ndarray], paths: Sequence[Path]):
+        """Hash decoded RGB images (a list, or one stacked (N, H, W, C) array)
+        with batch_perceptual_hash and add them."""
+        if batch_perceptual_hash is None:
+            raise ImportError("native_ops is required to hash images")
+        if not isinstance(images, np.ndarray):
+            images = list(images)
+        self.add_hashes(batch_perceptual_hash(images), paths)
+
+    def add_files(self, file_paths: Sequence[Path], batch_size: int = 256,
+                  analysis_cache=None, progress_callback=None) -> List[Path]:
+        """
+        Hash image files in batches and add them.
+
+        Args:
+            file_paths: Image files
+            batch_size: Images decoded per batch_perceptual_hash call
+            analysis_cache: Optional AnalysisCache; hashes are then reused
+                across runs for unchanged files
+            progress_callback: Optional callable(done, total)
+
+        Returns:
+            Paths that could not be read (not added)
+        """
+        if not HAS_PIL:
+            raise ImportError("Pillow is required to hash image files")
+        version = self.CACHE_VERSION
+        failed: List[Path] = []
+        total = len(file_paths)
+
+        for start in range(0, total, batch_size):
+            hashes, paths, images, pending = [], [], [], []
+            for path in file_paths[start:start + batch_size]:
+                path = Path(path)
+                digest = None
+                if analysis_cache is not None:
+                    try:
+                        digest = analysis_cache.file_digest(path)
+                        cached = analysis_cache.get(digest, AnalysisCache.PHASH, version)
+                        if cached is not None:
+                            hashes.append(int(cached))
+                            paths.append(path)
+                            continue
+                    except OSError:
+                        digest = None
+                try:
+                    with Image.open(path) as img:
+                        images.append(np.asarray(img.convert('RGB')))
+                    pending.append((path, digest))
+                except Exception as e:
+                    logger.debug(f"Cannot hash {path}: {e}")
+                    failed.append(path)
+
+            if images:
+                computed = batch_perceptual_hash(images)
+                for (path, digest), value in zip(pending, computed):
+                    hashes.append(int(value))
+                    paths.append(path)
+                    if digest is not None:
+                        analysis_cache.put(digest, AnalysisCache.PHASH, int(value), version)
+            self.add_hashes(hashes, paths)
+            if progress_callback:
+                progress_callback(min(total, start + batch_size), total)
+
+        return failed
+
+    # ── Queries ─────────────────────────────────────────────────────────────
+
+    def query_hash(self, hash_value: int, radius: int = 8) -> List[Tuple[Path, int]]:
+        """(path, distance) for every stored hash within ``radius``, closest first."""
+        if self._mih is not None:
+            ids, distances = self._mih.query(hash_value, radius)
+            return [(self.paths[i], d) for i, d in zip(ids.tolist(), distances.tolist())]
+        return [(self.paths[i], d) for i, d in self._tree.query(hash_value, radius)]
+
+    def query_image(self, image: np.ndarray, radius: int = 8) -> List[Tuple[Path, int]]:
+        """Radius query for a decoded RGB image."""
+        return self.query_hash(batch_perceptual_hash([image])[0], radius)
+
+    def query_file(self, file_path: Path, radius: int = 8) -> List[Tuple[Path, int]]:
+        """Radius query for an image file."""
+        with Image.open(file_path) as img:
+            return self.query_image(np.asarray(img.convert('RGB')), radius)
+
+    def find_pair_ids(self, max_distance: int = 8) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        All pairs of stored items within ``max_distance``.
+
+        Returns:
+            Tuple of (id_a, id_b, distance) arrays with id_a < id_b
+        """
+        if self._mih is not None:
+            return self._mih.pairs(max_distance)
+        id_a, id_b, dists = [], [], []
+        for node, node_hash in enumerate(self._tree.node_hash):
+            ids = self._tree.node_ids[node]
+            for item_id, distance in self._tree.query(node_hash, max_distance):
+                for own in ids:
+                    if own < item_id:
+                        id_a.append(own)
+                        id_b.append(item_id)
+                        dists.append(distance)
+        order = np.lexsort((id_b, id_a))
+        return (np.array(id_a, dtype=np.int64)[order], np.array(id_b, dtype=np.int64)[order],
+                np.array(dists, dtype=np.uint8)[order])
+
+    def find_pairs(self, max_distance: int = 8) -> List[Tuple[Path, Path, int]]:
+        """All (path_a, path_b, distance) within ``max_distance``."""
+        id_a, id_b, dists = self.find_pair_ids(max_distance)
+        return [(self.paths[a], self.paths[b], d)
+                for a, b, d in zip(id_a.tolist(), id_b.tolist(), dists.tolist())]
+
+    def find_groups(self, max_distance: int = 4) -> List[List[Path]]:
+        """
+        Groups of visually near-identical textures.
+
+        Items are linked when their hashes are within ``max_distance`` and
+        groups are the connected components (so a chain a~b~c is one group).
+
+        Returns:
+            Groups of 2+ paths, largest first
+        """
+        id_a, id_b, _ = self.find_pair_ids(max_distance)
+        if not len(id_a):
+            return []
+        uf = UnionFind(len(self.paths))
+        for a, b in zip(id_a.tolist(), id_b.tolist()):
+            uf.union(uf.find(a), uf.find(b))
+        groups = [sorted(members) for members in uf.members.values()]
+        groups.sort(key=lambda g: (-len(g), g[0]))
+        return [[self.paths[i] for i in group] for group in groups]
+
+    # ── Persistence ─────────────────────────────────────────────────────────
+
+    def save(self, path: Path):
+        """Save hashes, paths and (for the BK-tree) the tree structure to an .npz file."""
+        arrays = {
+            'hashes': self.hashes,
+            'paths': np.frombuffer(json.dumps([str(p) for p in self.paths]).encode('utf-8'), dtype=np.uint8),
+            'config': np.frombuffer(json.dumps({'method': self.method, 'bands': self.bands}).encode('utf-8'),
+                                    dtype=np.uint8),
+        }
+        if self._tree is not None:
+            item_node = np.empty(len(self.paths), dtype=np.int64)
+            for node, ids in enumerate(self._tree.node_ids):
+                item_node[ids] = node
+            arrays.update(
+                node_hash=np.array(self._tree.node_hash, dtype=np.uint64),
+                node_parent=np.array(self._tree.node_parent, dtype=np.int64),
+                node_distance=np.array(self._tree.node_distance, dtype=np.uint8),
+                item_node=item_node,
+            )
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+        logger.info(f"Saved pHash index with {len(self)} hashes to {path}")
+
+    @classmethod
+    def load(cls, path: Path) -> 'PHashIndex':
+        """Load an index written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            config = json.loads(data['config'].tobytes().decode('utf-8'))
+            index = cls(method=config['method'], bands=config['bands'])
+            index.paths = [Path(p) for p in json.loads(data['paths'].tobytes().decode('utf-8'))]
+            hashes = data['hashes'].astype(np.uint64)
+            if index._mih is not None:
+                index._mih.add(hashes)
+            else:
+                index._hashes = [hashes]
+                if len(hashes):
+                    index._tree = BKTree.from_arrays(data['node_hash'], data['node_parent'],
+                                                     data['node_distance'], data['item_node'])
+        logger.info(f"Loaded pHash index with {len(index)} hashes from {path}")
+        return index
+
+    def get_stats(self) -> Dict[str, int]:
+        """Index statistics."""
+        stats = {'num_hashes': len(self), 'method': self.method}
+        if self._mih is not None:
+            stats['bands'] = self.bands
+            stats['distinct_hashes'] = int(len(np.unique(self.hashes)))
+        else:
+            stats['distinct_hashes'] = len(self._tree.node_hash)
+        return stats
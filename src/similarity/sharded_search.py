@@ -0,0 +1,356 @@
+"""
+Sharded Similarity Search
+Per-game SimilaritySearch shards for multi-game archives. Shards are saved
+side by side in one directory, loaded lazily (memory-mapped by default) the
+first time a query or write touches them, and searched in parallel with the
+per-shard top-k merged into one ranking. IVF-PQ / OPQ shards share one set
+of quantizers trained on a cross-game sample, so their scores are directly
+comparable; after retraining, each shard is re-encoded from the original
+vectors in an EmbeddingStore the next time it is loaded.
+Author: Dead On The Inside / JosephsDeadish
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+
+from .similarity_search import SimilaritySearch, FAISS_AVAILABLE
+
+if FAISS_AVAILABLE:
+    import faiss
+
+logger = logging.getLogger(__name__)
+
+
+class ShardedSimilaritySearch:
+    """
+    A directory of named SimilaritySearch shards (typically one per game).
+
+    Layout::
+
+        <root>/shards.json        settings and shard list
+        <root>/trained.index      shared trained quantizers (IVF types)
+        <root>/<shard>.index/.pkl one SimilaritySearch.save() per shard
+
+    Only the shards a call needs are loaded, and unload() drops them again,
+    so a 1M+ vector archive does not have to sit in RAM at once.
+    """
+
+    MANIFEST = 'shards.json'
+    TEMPLATE = 'trained.index'
+
+    def __init__(
+        self,
+        root_dir: Path,
+        embedding_dim: int = 512,
+        index_type: str = 'ivfpq',
+        metric: str = 'cosine',
+        mmap: bool = True,
+        max_workers: int = 4,
+        embedding_store=None,
+        store_model: Optional[str] = None,
+        **index_params
+    ):
+        """
+        Open (or create) a shard directory.
+
+        Args:
+            root_dir: Directory holding the shards
+            embedding_dim: Dimension of embedding vectors
+            index_type: SimilaritySearch index type of every shard
+            metric: Distance metric of every shard
+            mmap: Memory-map shard indexes on load (read-only until written)
+            max_workers: Threads for parallel shard loading and search
+            embedding_store: EmbeddingStore with every shard's original
+                vectors, needed to re-encode quantized shards (see
+                SimilaritySearch.attach_store())
+            store_model: Model name the vectors are stored under
+            **index_params: nlist, pq_m, pq_bits, nprobe for SimilaritySearch
+
+        Settings stored in an existing directory take precedence.
+        """
+        if not FAISS_AVAILABLE:
+            raise RuntimeError("FAISS is required for similarity search")
+
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.mmap = mmap
+        self.max_workers = max_workers
+        self.embedding_store = embedding_store
+        self.store_model = store_model
+        self.settings: Dict[str, Any] = {
+            'embedding_dim': embedding_dim,
+            'index_type': index_type,
+            'metric': metric,
+            **index_params
+        }
+        # shard name -> file stem
+        self._files: Dict[str, str] = {}
+        self._loaded: Dict[str, SimilaritySearch] = {}
+        self._dirty: set = set()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._template: Optional[faiss.Index] = None
+        self._recall: Optional[Dict[str, Any]] = None
+        self._counts: Dict[str, int] = {}
+        # Shards saved with older quantizers, re-encoded on their next load
+        self._stale: set = set()
+
+        manifest_path = self.root_dir / self.MANIFEST
+        if manifest_path.exists():
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.settings = data['settings']
+            self._recall = data.get('recall')
+            for name, info in data['shards'].items():
+                self._files[name] = info['file']
+                self._counts[name] = info.get('count', 0)
+                if info.get('stale'):
+                    self._stale.add(name)
+        template_path = self.root_dir / self.TEMPLATE
+        if template_path.exists():
+            self._template = faiss.read_index(str(template_path))
+
+    # ── Shards ──────────────────────────────────────────────────────────────
+
+    @property
+    def shard_names(self) -> List[str]:
+        return sorted(self._files)
+
+    def _new_shard(self) -> SimilaritySearch:
+        shard = SimilaritySearch(**self.settings)
+        if self.embedding_store is not None:
+            shard.attach_store(self.embedding_store, self.store_model)
+        if self._template is not None:
+            shard.use_trained_index(self._template)
+        return shard
+
+    def shard(self, name: str, create: bool = True) -> Optional[SimilaritySearch]:
+        """
+        The loaded shard ``name`` (loading it on first use).
+
+        Args:
+            name: Shard name, e.g. the game's title or serial
+            create: Create an empty shard when it does not exist
+
+        Returns:
+            The shard, or None if it does not exist and create is False
+        """
+        with self._lock:
+            if name in self._loaded:
+                return self._loaded[name]
+            if name not in self._files and not create:
+                return None
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            if name in self._loaded:
+                return self._loaded[name]
+            stem = self._files.get(name)
+            shard = self._new_shard()
+            reencoded = False
+            if stem is not None and (self.root_dir / f'{stem}.index').exists():
+                shard.load(self.root_dir / stem, mmap=self.mmap)
+                logger.debug(f"Loaded shard '{name}' ({len(shard)} vectors)")
+                if name in self._stale and self._template is not None:
+                    shard.use_trained_index(self._template)
+                    logger.debug(f"Re-encoded shard '{name}' with the shared quantizers")
+                    reencoded = True
+            with self._lock:
+                if reencoded:
+                    self._stale.discard(name)
+                    self._dirty.add(name)
+                if stem is None:
+                    self._files[name] = self._file_stem(name)
+                self._loaded[name] = shard
+            return shard
+
+    def _file_stem(self, name: str) -> str:
+        stem = re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('._') or 'shard'
+        taken = set(self._files.values())
+        unique, n = stem, 1
+        while unique in taken or unique == Path(self.TEMPLATE).stem:
+            n += 1
+            unique = f'{stem}_{n}'
+        return unique
+
+    def unload(self, names: Optional[Iterable[str]] = None):
+        """Save (if changed) and drop loaded shards from memory (default: all)."""
+        for name in list(self._loaded if names is None else names):
+            if name in self._dirty:
+                self._save_shard(name)
+            self._loaded.pop(name, None)
+
+    def drop_shard(self, name: str):
+        """Delete a shard and its files."""
+        self._loaded.pop(name, None)
+        self._dirty.discard(name)
+        self._stale.discard(name)
+        self._counts.pop(name, None)
+        stem = self._files.pop(name, None)
+        if stem is not None:
+            for suffix in ('.index', '.pkl'):
+                (self.root_dir / f'{stem}{suffix}').unlink(missing_ok=True)
+        self._write_manifest()
+
+    # ── Training ────────────────────────────────────────────────────────────
+
+    def train(self, sample: np.ndarray, **kwargs) -> Dict[str, Any]:
+        """
+        Train the shared quantizers on a sample drawn across all games.
+
+        Loaded shards are saved and unloaded, and every existing shard is
+        marked stale: it is re-encoded with the new quantizers (from the
+        embedding store for IVF-PQ / OPQ) the next time it is loaded, so
+        training never holds more than the sample in memory. Keyword
+        arguments go to SimilaritySearch.train().
+
+        Returns:
+            The recall estimate dict
+        """
+        trainer = SimilaritySearch(**self.settings)
+        self._recall = trainer.train(sample, **kwargs) or None
+        self._template = trainer.trained_index
+        if self._template is not None:
+            faiss.write_index(self._template, str(self.root_dir / self.TEMPLATE))
+            self.unload()
+            self._stale.update(self._files)
+        self._write_manifest()
+        return dict(self._recall or {})
+
+    # ── Adding and removing ─────────────────────────────────────────────────
+
+    def add_embeddings_batch(
+        self,
+        shard_name: str,
+        embeddings: np.ndarray,
+        texture_paths: List[Path],
+        metadata_list: Optional[List[Dict[str, Any]]] = None
+    ) -> np.ndarray:
+        """Insert or replace embeddings in one shard (see SimilaritySearch.upsert)."""
+        shard = self.shard(shard_name)
+        ids = shard.upsert(embeddings, texture_paths, metadata_list)
+        self._dirty.add(shard_name)
+        if self._template is None and shard.trained_index is not None:
+            # The first shard trained itself: share its quantizers
+            self._template = shard.trained_index
+            faiss.write_index(self._template, str(self.root_dir / self.TEMPLATE))
+        return ids
+
+    def remove(self, shard_name: str, texture_paths: List[Path]) -> int:
+        """Remove textures from one shard by path."""
+        shard = self.shard(shard_name, create=False)
+        if shard is None:
+            return 0
+        self._dirty.add(shard_name)
+        return shard.remove(texture_paths)
+
+    # ── Searching ───────────────────────────────────────────────────────────
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 10,
+        threshold: Optional[float] = None,
+        shards: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search several shards in parallel and merge their top-k.
+
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            threshold: Optional similarity threshold
+            shards: Shard names to search (default: all)
+
+        Returns:
+            List of results with path, distance, metadata and shard name,
+            best first
+        """
+        names = [n for n in (self.shard_names if shards is None else shards) if n in self._files]
+        if not names:
+            return []
+
+        # Stale shards re-encode from the EmbeddingStore, whose SQLite
+        # connection only works on this thread: load those here first
+        for name in names:
+            if name in self._stale and name not in self._loaded:
+                self.shard(name, create=False)
+
+        def search_one(name):
+            results = self.shard(name, create=False).search(query_embedding, k, threshold)
+            for result in results:
+                result['shard'] = name
+            return results
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(names))),
+                                thread_name_prefix='shard-search') as pool:
+            results = [result for found in pool.map(search_one, names) for result in found]
+
+        # Cosine and inner product rank high scores first, L2 low distances
+        results.sort(key=lambda r: r['distance'], reverse=self.settings['metric'] != 'l2')
+        return results[:k]
+
+    # ── Persistence and stats ───────────────────────────────────────────────
+
+    def _save_shard(self, name: str):
+        shard = self._loaded[name]
+        shard.save(self.root_dir / self._files[name])
+        self._counts[name] = len(shard)
+        self._dirty.discard(name)
+
+    def _write_manifest(self):
+        data = {
+            'format': 1,
+            'settings': self.settings,
+            'recall': self._recall,
+            'shards': {name: {'file': stem, 'count': self._counts.get(name, 0),
+                              'stale': name in self._stale}
+                       for name, stem in sorted(self._files.items())}
+        }
+        tmp_path = self.root_dir / (self.MANIFEST + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        tmp_path.replace(self.root_dir / self.MANIFEST)
+
+    def save(self):
+        """Save every changed shard and the manifest."""
+        for name in list(self._dirty):
+            if name in self._loaded:
+                self._save_shard(name)
+        self._write_manifest()
+        logger.info(f"Saved {len(self._files)} similarity shards to {self.root_dir}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Totals across shards plus per-shard stats for the loaded ones."""
+        counts = dict(self._counts)
+        for name, shard in self._loaded.items():
+            counts[name] = len(shard)
+        probe = next(iter(self._loaded.values()), None) or SimilaritySearch(**self.settings)
+        return {
+            'shards': len(self._files),
+            'loaded_shards': sorted(self._loaded),
+            'total_embeddings': sum(counts.values()),
+            'shard_sizes': counts,
+            'index_type': self.settings['index_type'],
+            'metric': self.settings['metric'],
+            'is_trained': self._template is not None
+            or self.settings['index_type'] not in SimilaritySearch.TRAINED_TYPES,
+            'memory_mapped': self.mmap,
+            'bytes_per_vector': probe.bytes_per_vector(),
+            'estimated_total_mb': probe.bytes_per_vector() * sum(counts.values()) / 2 ** 20,
+            'recall_at_k': self._recall,
+            'loaded': {name: shard.get_stats() for name, shard in self._loaded.items()}
+        }
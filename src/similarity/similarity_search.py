@@ -8,7 +8,7 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 try:
     import numpy as np
     HAS_NUMPY = True
@@ -19,6 +19,8 @@ import pickle
 
 logger = logging.getLogger(__name__)
 
+from .near_duplicates import iter_similarity_components, similarity_to
+
 # Check for FAISS availability
 try:
     import faiss
@@ -28,6 +30,10 @@ except ImportError:
     logger.warning("FAISS not available. Similarity search disabled.")
 
 
+# Marks metadata keys a texture does not have in the columnar store
+_ABSENT = object()
+
+
 class SimilaritySearch:
     """
     Fast similarity search using FAISS vector database.
@@ -38,14 +44,42 @@ class SimilaritySearch:
     - Detect duplicates and variants
     - Auto-group similar textures
     - Find reused UI elements
+    - Product-quantized IVF-PQ / OPQ indexes for libraries of 1M+ vectors
+    
+    Vectors are stored under integer ids (faiss.IndexIDMap2) with a
+    path -> id dict, so each texture has at most one live vector and lookups
+    by path or id are O(1). Adding a path that is already indexed replaces
+    its vector. Removed or replaced ids become tombstones that searches skip;
+    they are dropped by compact(), which runs automatically once they make
+    up ``compact_ratio`` of the index.
+    
+    The IVF types ('ivf', 'ivfpq', 'opq') must be trained before vectors
+    are added: call train() with a representative sample, or make the first
+    upsert() a batch large enough to train on. Compaction reuses the
+    trained quantizers, so training happens once per index.
+    
+    The product-quantized types ('ivfpq', 'opq') keep only lossy codes, so
+    re-encoding them (train(), use_trained_index(), compact()) reads the
+    original vectors from an EmbeddingStore attached with attach_store().
+    The other types store full vectors and re-encode from the index itself.
     """
     
+    # Index types that need a training pass before vectors can be added
+    TRAINED_TYPES = ('ivf', 'ivfpq', 'opq')
+    # Index types whose stored vectors cannot be reconstructed exactly
+    QUANTIZED_TYPES = ('ivfpq', 'opq')
+    
     def __init__(
         self,
         embedding_dim: int = 512,
-        index_type: str = 'flat',  # 'flat', 'ivf', 'hnsw'
+        index_type: str = 'flat',  # 'flat', 'ivf', 'ivfpq', 'opq', 'hnsw'
         metric: str = 'cosine',  # 'cosine', 'l2', 'inner_product'
-        use_gpu: bool = False
+        use_gpu: bool = False,
+        compact_ratio: float = 0.25,
+        nlist: Optional[int] = None,
+        pq_m: Optional[int] = None,
+        pq_bits: int = 8,
+        nprobe: int = 16
     ):
         """
         Initialize similarity search system.
@@ -55,6 +89,12 @@ class SimilaritySearch:
             index_type: FAISS index type
             metric: Distance metric
             use_gpu: Use GPU acceleration if available
+            compact_ratio: Fraction of tombstoned ids that triggers compaction
+            nlist: IVF cells (default: 100 for 'ivf', 1024 for 'ivfpq'/'opq')
+            pq_m: PQ sub-quantizers, must divide embedding_dim (default:
+                the largest divisor of embedding_dim up to 64)
+            pq_bits: Bits per PQ sub-quantizer code
+            nprobe: IVF cells visited per query
         """
         if not FAISS_AVAILABLE:
             raise RuntimeError("FAISS is required for similarity search")
@@ -63,27 +103,55 @@ class SimilaritySearch:
         self.index_type = index_type
         self.metric = metric
         self.use_gpu = use_gpu
+        self.compact_ratio = compact_ratio
+        self.nlist = nlist or (100 if index_type == 'ivf' else 1024)
+        self.pq_m = pq_m or next(m for m in range(min(64, embedding_dim), 0, -1)
+                                 if embedding_dim % m == 0)
+        self.pq_bits = pq_bits
+        self.nprobe = nprobe
+        
+        # Empty trained index that compaction and shards clone
+        self._trained: Optional[faiss.Index] = None
+        self._recall: Optional[Dict[str, Any]] = None
+        # Set while the index is memory-mapped (read-only) from this path
+        self._mmap_path: Optional[Path] = None
+        # Source of the original vectors for re-encoding quantized indexes
+        self._store = None
+        self._store_model: Optional[str] = None
         
         # Create index
         self.index = self._create_index()
         
-        # Storage for metadata
-        self.texture_paths: List[Path] = []
-        self.texture_metadata: List[Dict[str, Any]] = []
+        # Columnar metadata: row i of every column belongs to vector id i
+        self._paths: List[Optional[Path]] = []   # None = tombstone
+        self._metadata_columns: Dict[str, List[Any]] = {}
+        self._path_to_id: Dict[str, int] = {}
+        self._tombstones = 0
         
         logger.info(f"SimilaritySearch initialized: dim={embedding_dim}, "
                    f"index={index_type}, metric={metric}")
     
     def _create_index(self) -> faiss.Index:
         """Create FAISS index based on configuration."""
-        if self.metric == 'cosine':
+        if self._trained is not None:
+            index = faiss.clone_index(self._trained)
+            return self._to_gpu(index)
+        
+        if self.index_type in ('ivfpq', 'opq'):
+            pq = f"IVF{self.nlist},PQ{self.pq_m}x{self.pq_bits}"
+            if self.index_type == 'opq':
+                pq = f"OPQ{self.pq_m},{pq}"
+            metric = faiss.METRIC_L2 if self.metric == 'l2' else faiss.METRIC_INNER_PRODUCT
+            index = faiss.index_factory(self.embedding_dim, pq, metric)
+        elif self.metric in ('cosine', 'inner_product'):
             # For cosine similarity, normalize vectors and use inner product
             if self.index_type == 'flat':
                 index = faiss.IndexFlatIP(self.embedding_dim)
             elif self.index_type == 'ivf':
                 # IVF (Inverted File) index for large datasets
                 quantizer = faiss.IndexFlatIP(self.embedding_dim)
-                index = faiss.IndexIVFFlat(quantizer, self.embedding_dim, 100)
+                index = faiss.IndexIVFFlat(quantizer, self.embedding_dim, self.nlist,
+                                           faiss.METRIC_INNER_PRODUCT)
             elif self.index_type == 'hnsw':
                 # HNSW (Hierarchical Navigable Small World) for fast search
                 index = faiss.IndexHNSWFlat(self.embedding_dim, 32)
@@ -95,7 +163,7 @@ class SimilaritySearch:
                 index = faiss.IndexFlatL2(self.embedding_dim)
             elif self.index_type == 'ivf':
                 quantizer = faiss.IndexFlatL2(self.embedding_dim)
-                index = faiss.IndexIVFFlat(quantizer, self.embedding_dim, 100)
+                index = faiss.IndexIVFFlat(quantizer, self.embedding_dim, self.nlist)
             elif self.index_type == 'hnsw':
                 index = faiss.IndexHNSWFlat(self.embedding_dim, 32)
             else:
@@ -104,14 +172,269 @@ class SimilaritySearch:
             # Default to inner product
             index = faiss.IndexFlatIP(self.embedding_dim)
         
-        # Move to GPU if requested
+        if self.index_type in self.TRAINED_TYPES:
+            # Needed to reconstruct vectors by id
+            faiss.extract_index_ivf(index).make_direct_map()
+            faiss.extract_index_ivf(index).nprobe = self.nprobe
+        
+        # Store vectors under explicit ids (reconstructible by id)
+        index = faiss.IndexIDMap2(index)
+        return self._to_gpu(index)
+    
+    def _to_gpu(self, index: faiss.Index) -> faiss.Index:
+        """Move an index to the GPU if requested and available."""
         if self.use_gpu and faiss.get_num_gpus() > 0:
             res = faiss.StandardGpuResources()
             index = faiss.index_cpu_to_gpu(res, 0, index)
             logger.info("Using GPU for FAISS index")
-        
         return index
     
+    def _cpu_index(self, index: Optional[faiss.Index] = None) -> faiss.Index:
+        """An index (default: this one) or a CPU copy of it if on the GPU."""
+        index = self.index if index is None else index
+        if self.use_gpu and hasattr(faiss, 'index_gpu_to_cpu'):
+            try:
+                return faiss.index_gpu_to_cpu(index)
+            except Exception:
+                pass
+        return index
+    
+    # ── Training ────────────────────────────────────────────────────────────
+    
+    @property
+    def is_trained(self) -> bool:
+        return bool(getattr(self.index, 'is_trained', True))
+    
+    def train(
+        self,
+        sample: np.ndarray,
+        max_points: int = 200_000,
+        recall_k: int = 10,
+        recall_queries: int = 200
+    ) -> Dict[str, Any]:
+        """
+        Train the IVF/PQ quantizers on a sample of embeddings.
+        
+        Vectors already in the index are re-encoded with the new
+        quantizers, from the attached store for 'ivfpq'/'opq' (see
+        attach_store()) and from the index itself otherwise. Recall@k is then estimated on the sample (approximate
+        vs exact top-k) and reported by get_stats().
+        
+        Args:
+            sample: Training embeddings (N, embedding_dim); N should be at
+                least ~40 * nlist for good IVF cells
+            max_points: Random subsample size used for training
+            recall_k: k for the recall estimate (0 to skip it)
+            recall_queries: Queries drawn from the sample for the estimate
+        
+        Returns:
+            The recall estimate dict (empty when skipped)
+        
+        Raises:
+            ValueError: If the sample is too small, or stored vectors of a
+                quantized index have no original to re-encode from
+        """
+        sample = np.asarray(sample, dtype=np.float32).reshape(-1, self.embedding_dim)
+        if self.metric == 'cosine':
+            sample = self._normalize_batch(sample)
+        sample = np.ascontiguousarray(sample, dtype=np.float32)
+        if self.index_type not in self.TRAINED_TYPES:
+            logger.info(f"Index type '{self.index_type}' needs no training")
+        else:
+            minimum = self._min_training_points()
+            if len(sample) < minimum:
+                raise ValueError(f"Training needs at least {minimum} vectors, got {len(sample)}")
+            rng = np.random.default_rng(0)
+            points = sample if len(sample) <= max_points else \
+                sample[np.sort(rng.choice(len(sample), max_points, replace=False))]
+            self._ensure_writable()
+            # Fetched before anything changes so a missing source fails cleanly
+            live, vectors = self._live_vectors()
+            trained = self._trained
+            self._trained = None
+            try:
+                index = self._create_index()
+                index.train(points)
+            except Exception:
+                self._trained = trained
+                raise
+            self._trained = faiss.clone_index(self._cpu_index(index))
+            self._rebuild(index, live, vectors)
+            logger.info(f"Trained {self.index_type} index on {len(points)} vectors")
+        
+        self._recall = self._estimate_recall(sample, recall_k, recall_queries) if recall_k else None
+        return dict(self._recall or {})
+    
+    def use_trained_index(self, trained: faiss.Index):
+        """
+        Adopt an empty, already trained index (e.g. shared by shards) as
+        the template for this index. Stored vectors are re-encoded, from
+        the attached store for quantized types (see train()).
+        """
+        self._ensure_writable()
+        live, vectors = self._live_vectors()
+        self._trained = faiss.clone_index(trained)
+        self._rebuild(self._create_index(), live, vectors)
+        self.set_nprobe(self.nprobe)
+    
+    @property
+    def trained_index(self) -> Optional[faiss.Index]:
+        """The empty trained template, or None if the index is untrained."""
+        return self._template()
+    
+    def _template(self) -> Optional[faiss.Index]:
+        """Empty trained template, derived from the index after a load()."""
+        if self._trained is None and self.index_type in self.TRAINED_TYPES and self.is_trained:
+            template = faiss.clone_index(self._cpu_index())
+            template.reset()
+            self._trained = template
+        return self._trained
+    
+    def _min_training_points(self) -> int:
+        if self.index_type in ('ivfpq', 'opq'):
+            return max(self.nlist, 2 ** self.pq_bits)
+        return self.nlist
+    
+    def _rebuild(self, index: faiss.Index, live: List[int], vectors: np.ndarray):
+        """Add the live ``vectors`` (see _live_vectors()) to ``index`` (trained, empty)."""
+        if live:
+            index.add_with_ids(vectors, np.asarray(live, dtype=np.int64))
+        self.index = index
+    
+    # ── Original vectors ────────────────────────────────────────────────────
+    
+    def attach_store(self, store, model_name: str):
+        """
+        Read original vectors from an EmbeddingStore when the index has to
+        be re-encoded. Every indexed path must be stored under model_name.
+        
+        Args:
+            store: EmbeddingStore holding the un-quantized embeddings
+            model_name: Model the embeddings were stored under
+        """
+        self._store = store
+        self._store_model = model_name
+    
+    @property
+    def can_reencode(self) -> bool:
+        """Whether stored vectors can be re-encoded without loss."""
+        return self.index_type not in self.QUANTIZED_TYPES or self._store is not None
+    
+    def _live_vectors(self) -> Tuple[List[int], np.ndarray]:
+        """
+        Ids and original vectors of every live texture.
+        
+        Full-vector indexes reconstruct them from the index; quantized ones
+        read them from the attached store, since their codes are lossy.
+        
+        Raises:
+            ValueError: If a quantized index holds vectors but has no store
+        """
+        live = [i for i, p in enumerate(self._paths) if p is not None]
+        if not live:
+            return live, np.empty((0, self.embedding_dim), dtype=np.float32)
+        if self.index_type not in self.QUANTIZED_TYPES:
+            return live, self._reconstruct(live)
+        if self._store is None:
+            raise ValueError(f"Re-encoding {len(live)} '{self.index_type}' vectors needs their "
+                             f"originals: call attach_store() with the EmbeddingStore first")
+        vectors = self._store.get_vectors([self._paths[i] for i in live], self._store_model)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(live), self.embedding_dim)
+        if self.metric == 'cosine':
+            vectors = self._normalize_batch(vectors)
+        return live, np.ascontiguousarray(vectors, dtype=np.float32)
+    
+    def _estimate_recall(self, sample: np.ndarray, k: int, n_queries: int) -> Dict[str, Any]:
+        """
+        Recall@k of the configured index on a (normalized) sample: the
+        fraction of each query's exact top-k that the index returns.
+        """
+        if len(sample) <= k:
+            return {}
+        base = sample[:50_000]
+        rng = np.random.default_rng(1)
+        queries = base[rng.choice(len(base), min(n_queries, len(base)), replace=False)]
+        
+        index = self._create_index()
+        index.add_with_ids(base, np.arange(len(base), dtype=np.int64))
+        _, approx = index.search(queries, k)
+        
+        scores = queries @ base.T
+        if self.metric == 'l2':
+            # Larger is closer: -(|b|^2 - 2 q.b), the query norm is constant
+            scores = 2.0 * scores - np.einsum('ij,ij->i', base, base)[None, :]
+        exact = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        hits = sum(len(np.intersect1d(a, e)) for a, e in zip(approx, exact))
+        recall = {'k': k, 'recall': hits / float(k * len(queries)),
+                  'queries': len(queries), 'base_size': len(base)}
+        logger.info(f"Recall@{k}: {recall['recall']:.3f} ({len(queries)} queries)")
+        return recall
+    
+    def set_nprobe(self, nprobe: int):
+        """IVF cells visited per query (higher: better recall, slower)."""
+        self.nprobe = nprobe
+        if self.index_type not in self.TRAINED_TYPES:
+            return
+        for index in (self.index, self._trained):
+            if index is None:
+                continue
+            try:
+                faiss.extract_index_ivf(index).nprobe = nprobe
+            except RuntimeError:
+                faiss.GpuParameterSpace().set_index_parameter(index, 'nprobe', nprobe)
+    
+    def _ensure_writable(self):
+        """Reload a memory-mapped (read-only) index into RAM before writes."""
+        if self._mmap_path is not None:
+            logger.debug(f"Loading {self._mmap_path} into memory for writing")
+            self.index = faiss.read_index(str(self._mmap_path))
+            self._mmap_path = None
+    
+    # ── Compatibility views ─────────────────────────────────────────────────
+    
+    @property
+    def texture_paths(self) -> List[Path]:
+        """Paths of all live textures, in id order."""
+        return [p for p in self._paths if p is not None]
+    
+    @property
+    def texture_metadata(self) -> List[Dict[str, Any]]:
+        """Metadata dicts of all live textures, in id order."""
+        return [self._metadata(i) for i, p in enumerate(self._paths) if p is not None]
+    
+    def __len__(self) -> int:
+        return len(self._path_to_id)
+    
+    def __contains__(self, texture_path) -> bool:
+        return str(texture_path) in self._path_to_id
+    
+    def get_id(self, texture_path: Path) -> Optional[int]:
+        """Vector id of a texture, or None when it is not indexed."""
+        return self._path_to_id.get(str(texture_path))
+    
+    def get_path(self, texture_id: int) -> Optional[Path]:
+        """Texture path for a vector id, or None for unknown/removed ids."""
+        if 0 <= texture_id < len(self._paths):
+            return self._paths[texture_id]
+        return None
+    
+    def get_embedding(self, texture_path: Path) -> Optional[np.ndarray]:
+        """Stored (normalized, for cosine) vector of a texture."""
+        texture_id = self.get_id(texture_path)
+        if texture_id is None:
+            return None
+        return self.index.reconstruct(texture_id)
+    
+    def _metadata(self, texture_id: int) -> Dict[str, Any]:
+        """Rebuild one texture's metadata dict from the columns."""
+        return {
+            key: column[texture_id]
+            for key, column in self._metadata_columns.items()
+            if column[texture_id] is not _ABSENT
+        }
+    
+    # ── Adding, replacing and removing ──────────────────────────────────────
+    
     def add_embedding(
         self,
         embedding: np.ndarray,
@@ -119,24 +442,16 @@ class SimilaritySearch:
         metadata: Optional[Dict[str, Any]] = None
     ):
         """
-        Add an embedding to the index.
+        Add an embedding to the index, replacing any existing vector for
+        the same path.
         
         Args:
             embedding: Embedding vector (embedding_dim,)
             texture_path: Path to texture file
             metadata: Optional metadata dictionary
         """
-        # Normalize embedding if using cosine similarity
-        if self.metric == 'cosine':
-            embedding = self._normalize(embedding)
-        
-        # Add to index
-        embedding = embedding.reshape(1, -1).astype(np.float32)
-        self.index.add(embedding)
-        
-        # Store metadata
-        self.texture_paths.append(texture_path)
-        self.texture_metadata.append(metadata or {})
+        self.upsert(np.asarray(embedding).reshape(1, -1), [texture_path],
+                    [metadata] if metadata else None)
     
     def add_embeddings_batch(
         self,
@@ -145,29 +460,198 @@ class SimilaritySearch:
         metadata_list: Optional[List[Dict[str, Any]]] = None
     ):
         """
-        Add multiple embeddings at once.
+        Add multiple embeddings at once (paths already indexed are replaced).
         
         Args:
             embeddings: Array of embeddings (N, embedding_dim)
             texture_paths: List of texture paths
             metadata_list: Optional list of metadata dicts
         """
+        self.upsert(embeddings, texture_paths, metadata_list)
+        logger.info(f"Added {len(texture_paths)} embeddings to index")
+    
+    def upsert(
+        self,
+        embeddings: np.ndarray,
+        texture_paths: List[Path],
+        metadata_list: Optional[List[Optional[Dict[str, Any]]]] = None
+    ) -> np.ndarray:
+        """
+        Insert or replace embeddings by path.
+        
+        Args:
+            embeddings: Array of embeddings (N, embedding_dim)
+            texture_paths: List of texture paths
+            metadata_list: Optional list of metadata dicts
+        
+        Returns:
+            Array of the ids now holding each path's vector
+        
+        Raises:
+            ValueError: If the index is untrained and the batch is too small
+                to train on; nothing is added in that case
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(texture_paths), -1)
+        if not len(texture_paths):
+            return np.empty(0, dtype=np.int64)
+        if not self.is_trained:
+            minimum = self._min_training_points()
+            if len(embeddings) < minimum:
+                raise ValueError(f"Untrained {self.index_type} index: call train() with at least "
+                                 f"{minimum} vectors before adding (batch has {len(embeddings)})")
+            # Train on the first batch; train() with a larger sample is better
+            logger.warning(f"Untrained {self.index_type} index: training on the first "
+                           f"{len(embeddings)} embeddings")
+            self.train(embeddings, recall_k=0)
+        self._ensure_writable()
         # Normalize if using cosine similarity
         if self.metric == 'cosine':
             embeddings = self._normalize_batch(embeddings)
         
-        # Add to index
-        embeddings = embeddings.astype(np.float32)
-        self.index.add(embeddings)
+        # Within one batch the last occurrence of a path wins
+        last = {str(path): i for i, path in enumerate(texture_paths)}
+        if len(last) != len(texture_paths):
+            keep = sorted(last.values())
+            embeddings = embeddings[keep]
+            texture_paths = [texture_paths[i] for i in keep]
+            if metadata_list:
+                metadata_list = [metadata_list[i] for i in keep]
+        
+        self._tombstone([self._path_to_id[key] for key in last if key in self._path_to_id])
+        
+        start = len(self._paths)
+        self.index.add_with_ids(np.ascontiguousarray(embeddings, dtype=np.float32),
+                                np.arange(start, start + len(texture_paths), dtype=np.int64))
         
         # Store metadata
-        self.texture_paths.extend(texture_paths)
-        if metadata_list:
-            self.texture_metadata.extend(metadata_list)
-        else:
-            self.texture_metadata.extend([{} for _ in texture_paths])
+        self._paths.extend(Path(p) for p in texture_paths)
+        for column in self._metadata_columns.values():
+            column.extend([_ABSENT] * len(texture_paths))
+        for offset, path in enumerate(texture_paths):
+            self._path_to_id[str(path)] = start + offset
+            metadata = metadata_list[offset] if metadata_list else None
+            for key, value in (metadata or {}).items():
+                column = self._metadata_columns.get(key)
+                if column is None:
+                    column = self._metadata_columns[key] = [_ABSENT] * len(self._paths)
+                column[start + offset] = value
+        
+        self._maybe_compact()
+        return np.array([self._path_to_id[str(p)] for p in texture_paths], dtype=np.int64)
+    
+    def remove(self, texture_paths: List[Path]) -> int:
+        """
+        Remove textures from the index by path.
         
-        logger.info(f"Added {len(texture_paths)} embeddings to index")
+        Args:
+            texture_paths: Paths to remove (unknown paths are ignored)
+        
+        Returns:
+            Number of textures removed
+        """
+        self._ensure_writable()
+        ids = [self._path_to_id.pop(str(p)) for p in texture_paths if str(p) in self._path_to_id]
+        # pop() already dropped the path mapping; _tombstone clears the rest
+        self._tombstone(ids, unmap=False)
+        self._maybe_compact()
+        return len(ids)
+    
+    def _tombstone(self, ids: List[int], unmap: bool = True):
+        """Mark ids dead; their vectors stay in the index until compact()."""
+        for texture_id in ids:
+            path = self._paths[texture_id]
+            if path is None:
+                continue
+            if unmap and self._path_to_id.get(str(path)) == texture_id:
+                del self._path_to_id[str(path)]
+            self._paths[texture_id] = None
+            for column in self._metadata_columns.values():
+                column[texture_id] = _ABSENT
+            self._tombstones += 1
+    
+    def _maybe_compact(self):
+        if self._tombstones and self._tombstones >= self.compact_ratio * len(self._paths) \
+                and self.can_reencode:
+            self.compact()
+    
+    def compact(self):
+        """
+        Rebuild the index without tombstoned vectors and renumber ids densely.
+        
+        Full-vector indexes re-add what they store. Quantized ones
+        ('ivfpq', 'opq') re-encode the originals from the attached store
+        (see attach_store()); without one they keep their tombstones, which
+        searches skip.
+        """
+        if not self._tombstones:
+            return
+        if not self.can_reencode:
+            logger.warning(f"Not compacting '{self.index_type}' index: no EmbeddingStore attached")
+            return
+        self._ensure_writable()
+        # Compaction reuses the trained quantizers
+        self._template()
+        live, vectors = self._live_vectors()
+        
+        self.index = self._create_index()
+        if live:
+            self.index.add_with_ids(vectors, np.arange(len(live), dtype=np.int64))
+        
+        self._paths = [self._paths[i] for i in live]
+        for key, column in list(self._metadata_columns.items()):
+            column = [column[i] for i in live]
+            if all(value is _ABSENT for value in column):
+                del self._metadata_columns[key]
+            else:
+                self._metadata_columns[key] = column
+        self._path_to_id = {str(p): i for i, p in enumerate(self._paths)}
+        logger.debug(f"Compacted similarity index: dropped {self._tombstones} tombstones")
+        self._tombstones = 0
+    
+    def _reconstruct(self, ids: List[int]) -> np.ndarray:
+        """Stored vectors for a list of ids, as one (N, dim) array."""
+        keys = np.asarray(ids, dtype=np.int64)
+        if hasattr(self.index, 'reconstruct_batch'):
+            try:
+                return np.asarray(self.index.reconstruct_batch(keys), dtype=np.float32)
+            except RuntimeError:
+                pass
+        vectors = np.empty((len(ids), self.embedding_dim), dtype=np.float32)
+        for row, texture_id in enumerate(keys):
+            vectors[row] = self.index.reconstruct(int(texture_id))
+        return vectors
+    
+    # ── Searching ───────────────────────────────────────────────────────────
+    
+    def _search_ids(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Raw top-k search over live vectors.
+        
+        Over-fetches by the tombstone count so removed ids never crowd out
+        live results.
+        
+        Returns:
+            Tuple of (distances, ids) for one query
+        """
+        if self.metric == 'cosine':
+            query = self._normalize(query)
+        query = np.asarray(query, dtype=np.float32).reshape(1, -1)
+        fetch = min(k + self._tombstones, self.index.ntotal)
+        if fetch <= 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        distances, ids = self.index.search(query, fetch)
+        distances, ids = distances[0], ids[0]
+        keep = np.fromiter((i >= 0 and self._paths[i] is not None for i in ids),
+                           dtype=bool, count=len(ids))
+        return distances[keep][:k], ids[keep][:k]
+    
+    def _result(self, texture_id: int, dist: float) -> Dict[str, Any]:
+        return {
+            'texture_path': self._paths[texture_id],
+            'distance': float(dist),
+            'similarity': float(dist) if self.metric == 'cosine' else 1.0 / (1.0 + float(dist)),
+            'metadata': self._metadata(texture_id)
+        }
     
     def search(
         self,
@@ -186,87 +670,82 @@ class SimilaritySearch:
         Returns:
             List of results with path, distance, and metadata
         """
-        # Normalize if using cosine similarity
-        if self.metric == 'cosine':
-            query_embedding = self._normalize(query_embedding)
-        
-        # Search
-        query_embedding = query_embedding.reshape(1, -1).astype(np.float32)
-        distances, indices = self.index.search(query_embedding, k)
+        distances, ids = self._search_ids(query_embedding, k)
         
         # Build results
         results = []
-        for dist, idx in zip(distances[0], indices[0]):
-            if idx == -1:  # No result found
-                continue
-            
+        for dist, idx in zip(distances.tolist(), ids.tolist()):
             # Apply threshold if specified
             if threshold is not None and dist < threshold:
                 continue
-            
-            result = {
-                'texture_path': self.texture_paths[idx],
-                'distance': float(dist),
-                'similarity': float(dist) if self.metric == 'cosine' else 1.0 / (1.0 + float(dist)),
-                'metadata': self.texture_metadata[idx]
-            }
-            results.append(result)
+            results.append(self._result(idx, dist))
         
         return results
     
     def find_duplicates(
         self,
-        similarity_threshold: float = 0.99
+        similarity_threshold: float = 0.99,
+        memory_budget_mb: float = 256
     ) -> List[List[Dict[str, Any]]]:
         """
         Find duplicate or near-duplicate textures.
         
         Args:
             similarity_threshold: Minimum similarity to consider as duplicate
+            memory_budget_mb: Memory for one block of pairwise similarities
             
         Returns:
             List of duplicate groups
         """
-        duplicate_groups = []
-        processed = set()
-        
-        # Search for each texture
-        for i in range(len(self.texture_paths)):
-            if i in processed:
-                continue
-            
-            # Get embedding
-            embedding = self.index.reconstruct(i)
-            
-            # Search for similar textures
-            results = self.search(embedding, k=10, threshold=similarity_threshold)
-            
-            # Filter out self and create group
-            group = []
-            for result in results:
-                # Find index of this result
-                try:
-                    idx = self.texture_paths.index(result['texture_path'])
-                    if idx != i and idx not in processed:
-                        group.append(result)
-                        processed.add(idx)
-                except ValueError:
-                    pass
-            
-            if group:
-                # Add original texture to group
-                group.insert(0, {
-                    'texture_path': self.texture_paths[i],
-                    'distance': 1.0,
-                    'similarity': 1.0,
-                    'metadata': self.texture_metadata[i]
-                })
-                processed.add(i)
-                duplicate_groups.append(group)
-        
+        duplicate_groups = list(self.iter_duplicate_groups(similarity_threshold, memory_budget_mb))
         logger.info(f"Found {len(duplicate_groups)} duplicate groups")
         return duplicate_groups
     
+    def iter_duplicate_groups(
+        self,
+        similarity_threshold: float = 0.99,
+        memory_budget_mb: float = 256,
+        progress_callback=None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream groups of textures connected by similarity >= threshold.
+        
+        Compares every pair of live vectors with blocked matrix products
+        (see near_duplicates.iter_similarity_components), so groups are exact
+        connected components with no size cap.
+        
+        Args:
+            similarity_threshold: Minimum similarity to consider as duplicate
+            memory_budget_mb: Memory for one block of pairwise similarities
+            progress_callback: Optional callable(rows_done, total_rows)
+        
+        Yields:
+            Groups of result dicts; the first entry is the group's lowest id
+            and the others carry their similarity to it
+        """
+        live = np.array([i for i, p in enumerate(self._paths) if p is not None], dtype=np.int64)
+        vectors = self._reconstruct(live)
+        sq_norms = np.einsum('ij,ij->i', vectors, vectors) if self.metric == 'l2' else None
+        
+        for members in iter_similarity_components(vectors, similarity_threshold, self.metric,
+                                                  memory_budget_mb, progress_callback):
+            similarities = similarity_to(vectors, members, int(members[0]), self.metric, sq_norms)
+            group = [{
+                'texture_path': self._paths[live[members[0]]],
+                'distance': 1.0,
+                'similarity': 1.0,
+                'metadata': self._metadata(int(live[members[0]]))
+            }]
+            for row, similarity in zip(members[1:].tolist(), similarities[1:].tolist()):
+                texture_id = int(live[row])
+                group.append({
+                    'texture_path': self._paths[texture_id],
+                    'distance': float(similarity) if self.metric == 'cosine' else 1.0 / similarity - 1.0,
+                    'similarity': float(similarity),
+                    'metadata': self._metadata(texture_id)
+                })
+            yield group
+    
     def find_variants(
         self,
         query_path: Path,
@@ -282,18 +761,13 @@ class SimilaritySearch:
         Returns:
             List of variant textures
         """
-        # Find index of query texture
-        try:
-            idx = self.texture_paths.index(query_path)
-        except ValueError:
+        idx = self.get_id(query_path)
+        if idx is None:
             logger.error(f"Texture not found in index: {query_path}")
             return []
         
-        # Get embedding
-        embedding = self.index.reconstruct(idx)
-        
         # Search for similar textures
-        results = self.search(embedding, k=50)
+        results = self.search(self.index.reconstruct(idx), k=50)
         
         # Filter by similarity range
         variants = [
@@ -306,44 +780,32 @@ class SimilaritySearch:
     def cluster_similar(
         self,
         similarity_threshold: float = 0.9,
-        max_cluster_size: int = 50
+        max_cluster_size: int = 50,
+        memory_budget_mb: float = 256
     ) -> List[List[Dict[str, Any]]]:
         """
         Auto-group similar textures into clusters.
         
+        Clusters are the connected components at ``similarity_threshold``;
+        components larger than ``max_cluster_size`` are split into chunks
+        ordered by similarity to their first member.
+        
         Args:
             similarity_threshold: Minimum similarity for same cluster
             max_cluster_size: Maximum number of textures per cluster
+            memory_budget_mb: Memory for one block of pairwise similarities
             
         Returns:
             List of clusters
         """
         clusters = []
-        processed = set()
-        
-        for i in range(len(self.texture_paths)):
-            if i in processed:
-                continue
-            
-            # Get embedding
-            embedding = self.index.reconstruct(i)
-            
-            # Search for similar textures
-            results = self.search(embedding, k=max_cluster_size + 1, threshold=similarity_threshold)
-            
-            # Create cluster
-            cluster = []
-            for result in results:
-                try:
-                    idx = self.texture_paths.index(result['texture_path'])
-                    if idx not in processed:
-                        cluster.append(result)
-                        processed.add(idx)
-                except ValueError:
-                    pass
-            
-            if len(cluster) > 1:
-                clusters.append(cluster)
+        for group in self.iter_duplicate_groups(similarity_threshold, memory_budget_mb):
+            if len(group) > max_cluster_size:
+                group = group[:1] + sorted(group[1:], key=lambda r: r['similarity'], reverse=True)
+            for start in range(0, len(group), max(1, max_cluster_size)):
+                cluster = group[start:start + max_cluster_size]
+                if len(cluster) > 1:
+                    clusters.append(cluster)
         
         logger.info(f"Created {len(clusters)} clusters")
         return clusters
@@ -380,44 +842,95 @@ class SimilaritySearch:
         return self.search(text_embedding, k=k, threshold=threshold)
     
     def save(self, path: Path):
-        """Save index and metadata to disk."""
+        """Save index and metadata to disk (compacted first when possible)."""
+        if self.can_reencode:
+            self.compact()
+        
         # Save FAISS index
         index_path = path.with_suffix('.index')
-        faiss.write_index(self.index, str(index_path))
+        if self._mmap_path != index_path:
+            self._ensure_writable()
+            faiss.write_index(self._cpu_index(), str(index_path))
         
         # Save metadata
         metadata_path = path.with_suffix('.pkl')
         with open(metadata_path, 'wb') as f:
             pickle.dump({
-                'texture_paths': self.texture_paths,
-                'texture_metadata': self.texture_metadata,
+                'format': 2,
+                'texture_paths': self._paths,
+                # Sparse columns: key -> {id: value}
+                'metadata_columns': {
+                    key: {i: v for i, v in enumerate(column) if v is not _ABSENT}
+                    for key, column in self._metadata_columns.items()
+                },
                 'embedding_dim': self.embedding_dim,
                 'index_type': self.index_type,
-                'metric': self.metric
+                'metric': self.metric,
+                'index_params': {'nlist': self.nlist, 'pq_m': self.pq_m,
+                                 'pq_bits': self.pq_bits, 'nprobe': self.nprobe},
+                'recall': self._recall
             }, f)
         
         logger.info(f"Saved similarity search to {path}")
     
-    def load(self, path: Path):
-        """Load index and metadata from disk."""
+    def load(self, path: Path, mmap: bool = False):
+        """
+        Load index and metadata from disk (older list-based saves included).
+        
+        Args:
+            path: Path given to save()
+            mmap: Memory-map the index file (faiss IO_FLAG_MMAP) instead of
+                reading it into RAM. The index is then read-only; the first
+                write reloads it into memory.
+        """
         # Load FAISS index
         index_path = path.with_suffix('.index')
-        self.index = faiss.read_index(str(index_path))
-        
-        # Move to GPU if requested
-        if self.use_gpu and faiss.get_num_gpus() > 0:
-            res = faiss.StandardGpuResources()
-            self.index = faiss.index_cpu_to_gpu(res, 0, self.index)
+        mmap = mmap and not self.use_gpu
+        index = faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP if mmap else 0)
+        self._mmap_path = index_path if mmap else None
         
         # Load metadata
         metadata_path = path.with_suffix('.pkl')
         with open(metadata_path, 'rb') as f:
             data = pickle.load(f)
-            self.texture_paths = data['texture_paths']
-            self.texture_metadata = data['texture_metadata']
-            self.embedding_dim = data['embedding_dim']
-            self.index_type = data['index_type']
-            self.metric = data['metric']
+        self.embedding_dim = data['embedding_dim']
+        self.index_type = data['index_type']
+        self.metric = data['metric']
+        for key, value in data.get('index_params', {}).items():
+            setattr(self, key, value)
+        self._recall = data.get('recall')
+        self._trained = None
+        self._paths = [None if p is None else Path(p) for p in data['texture_paths']]
+        self._tombstones = sum(p is None for p in self._paths)
+        
+        if data.get('format', 1) >= 2:
+            self._metadata_columns = {}
+            for key, values in data['metadata_columns'].items():
+                column = self._metadata_columns[key] = [_ABSENT] * len(self._paths)
+                for row, value in values.items():
+                    column[row] = value
+        else:
+            # Row-wise metadata from saves made before the id-mapped index
+            self._metadata_columns = {}
+            for row, metadata in enumerate(data['texture_metadata']):
+                for key, value in (metadata or {}).items():
+                    column = self._metadata_columns.setdefault(key, [_ABSENT] * len(self._paths))
+                    column[row] = value
+        
+        if not isinstance(index, faiss.IndexIDMap2):
+            # Positional index from an older save: re-add under ids 0..n-1
+            vectors = index.reconstruct_n(0, index.ntotal)
+            index = self._create_index()
+            index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32),
+                               np.arange(len(vectors), dtype=np.int64))
+            self._mmap_path = None
+        else:
+            # Move to GPU if requested
+            index = self._to_gpu(index)
+        self.index = index
+        if self.index_type in self.TRAINED_TYPES:
+            self.set_nprobe(self.nprobe)
+        self._path_to_id = {str(p): i for i, p in enumerate(self._paths) if p is not None}
         
         logger.info(f"Loaded similarity search from {path}")
     
@@ -436,12 +949,38 @@ class SimilaritySearch:
         norms = np.where(norms > 0, norms, 1.0)
         return embeddings / norms
     
+    def bytes_per_vector(self) -> float:
+        """
+        Approximate index memory per stored vector: the encoded vector plus
+        id bookkeeping (IVF list id, IndexIDMap2 id and reverse map entry).
+        """
+        dim = self.embedding_dim
+        if self.index_type in ('ivfpq', 'opq'):
+            code = self.pq_m * self.pq_bits / 8.0 + 8
+        elif self.index_type == 'ivf':
+            code = 4.0 * dim + 8
+        elif self.index_type == 'hnsw':
+            code = 4.0 * dim + 32 * 2 * 4  # vector + ~2M links per node
+        else:
+            code = 4.0 * dim
+        return code + 8 + 16
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the index."""
-        return {
-            'total_embeddings': len(self.texture_paths),
+        stats = {
+            'total_embeddings': len(self._path_to_id),
+            'tombstones': self._tombstones,
             'embedding_dim': self.embedding_dim,
             'index_type': self.index_type,
             'metric': self.metric,
-            'is_trained': self.index.is_trained if hasattr(self.index, 'is_trained') else True
+            'is_trained': self.is_trained,
+            'memory_mapped': self._mmap_path is not None,
+            'bytes_per_vector': self.bytes_per_vector(),
+            'estimated_index_mb': self.bytes_per_vector() * self.index.ntotal / 2 ** 20,
+            'recall_at_k': self._recall
         }
+        if self.index_type in self.TRAINED_TYPES:
+            stats.update(nlist=self.nlist, nprobe=self.nprobe)
+        if self.index_type in ('ivfpq', 'opq'):
+            stats.update(pq_m=self.pq_m, pq_bits=self.pq_bits)
+        return stats
@@ -7,6 +7,10 @@ Author: Dead On The Inside / JosephsDeadish
 
 from __future__ import annotations
 import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 try:
     import numpy as np
     HAS_NUMPY = True
@@ -14,10 +18,10 @@ except ImportError:
     np = None  # type: ignore[assignment]
     HAS_NUMPY = False
 from pathlib import Path
-from typing import List, Optional, Tuple, Callable
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Callable
 from dataclasses import dataclass
 try:
-    from PIL import Image, ImageFilter
+    from PIL import Image, ImageFilter, ImageOps
     HAS_PIL = True
 except ImportError:
     HAS_PIL = False
@@ -49,6 +53,71 @@ except ImportError:
     HAS_CV2 = False
     logger.warning("opencv-python not available - advanced edge refinement disabled")
 
+# Models whose rembg sessions use the U²-Net pre/post-processing that the
+# batched path reproduces (320x320 input, ImageNet normalization, first
+# output channel as mask)
+_U2NET_MODELS = ('u2net', 'u2netp', 'u2net_human_seg', 'silueta')
+_U2NET_SIZE = (320, 320)
+_U2NET_MEAN = (0.485, 0.456, 0.406)
+_U2NET_STD = (0.229, 0.224, 0.225)
+
+# Serializes session creation; see _new_session
+_session_lock = threading.Lock()
+
+
+def _new_session(model_name: str, threads: int = 0):
+    """
+    rembg new_session() with ONNX Runtime limited to ``threads`` CPU threads
+    (0 = ONNX Runtime's default).
+    """
+    with _session_lock:
+        if threads <= 0:
+            return new_session(model_name)
+        # rembg sizes the session's thread pools from OMP_NUM_THREADS
+        previous = os.environ.get('OMP_NUM_THREADS')
+        os.environ['OMP_NUM_THREADS'] = str(threads)
+        try:
+            return new_session(model_name)
+        finally:
+            if previous is None:
+                os.environ.pop('OMP_NUM_THREADS', None)
+            else:
+                os.environ['OMP_NUM_THREADS'] = previous
+
+
+def _u2net_input(image: Image.Image) -> np.ndarray:
+    """(3, 320, 320) float32 U²-Net input, as rembg's session.normalize() builds it."""
+    pixels = np.asarray(image.convert('RGB').resize(_U2NET_SIZE, Image.Resampling.LANCZOS),
+                        dtype=np.float32)
+    pixels = pixels / max(float(pixels.max()), 1e-6)
+    pixels = (pixels - np.array(_U2NET_MEAN, dtype=np.float32)) / np.array(_U2NET_STD, dtype=np.float32)
+    return pixels.transpose(2, 0, 1)
+
+
+def _decode_batch(paths: List[Path], u2net_inputs: bool) -> Tuple[list, Optional[np.ndarray]]:
+    """
+    Open a batch of images (EXIF orientation applied).
+    
+    Returns:
+        ([(image or None, error message)], stacked U²-Net input of the
+        images that opened, or None)
+    """
+    decoded = []
+    for path in paths:
+        try:
+            with Image.open(path) as img:
+                image = ImageOps.exif_transpose(img)
+                image.load()
+            decoded.append((image, ''))
+        except Exception as e:
+            decoded.append((None, str(e)))
+    inputs = None
+    if u2net_inputs:
+        opened = [image for image, _ in decoded if image is not None]
+        if opened:
+            inputs = np.stack([_u2net_input(image) for image in opened])
+    return decoded, inputs
+
 
 @dataclass
 class BackgroundRemovalResult:
@@ -217,6 +286,8 @@ class BackgroundRemover:
         """
         self.model_name = model_name
         self.session = None
+        # Warm sessions by (model name, CPU threads), created on first use
+        self._sessions: Dict[Tuple[str, int], List[Any]] = {}
         self.processing_queue = queue.Queue()
         self.results_queue = queue.Queue()
         self.is_processing = False
@@ -229,12 +300,26 @@ class BackgroundRemover:
         # Initialize session if rembg available
         if HAS_REMBG:
             try:
-                self.session = new_session(model_name)
+                self.session = self._warm_sessions(model_name, 1)[0]
                 logger.info(f"Background removal session initialized with model: {model_name}")
             except Exception as e:
                 logger.error(f"Failed to initialize background removal session: {e}")
                 self.session = None
     
+    def _warm_sessions(self, model_name: str, count: int, threads: int = 0) -> List[Any]:
+        """
+        ``count`` loaded sessions of a model, reusing the ones created before.
+        
+        Args:
+            model_name: rembg model name
+            count: Number of independent sessions (each runs one call at a time)
+            threads: ONNX Runtime CPU threads per session (0 = default)
+        """
+        sessions = self._sessions.setdefault((model_name, threads), [])
+        while len(sessions) < count:
+            sessions.append(_new_session(model_name, threads))
+        return sessions[:count]
+    
     def is_available(self) -> bool:
         """Check if background removal is available."""
         return HAS_REMBG and self.session is not None
@@ -289,11 +374,29 @@ class BackgroundRemover:
             logger.error("Background removal not available")
             return None
         
+        return self._remove_with(
+            self.session, image,
+            alpha_matting=alpha_matting,
+            alpha_matting_foreground_threshold=alpha_matting_foreground_threshold,
+            alpha_matting_background_threshold=alpha_matting_background_threshold,
+            alpha_matting_erode_size=alpha_matting_erode_size
+        )
+    
+    def _remove_with(
+        self,
+        session: Any,
+        image: Image.Image,
+        alpha_matting: bool = False,
+        alpha_matting_foreground_threshold: int = 240,
+        alpha_matting_background_threshold: int = 10,
+        alpha_matting_erode_size: int = 10
+    ) -> Optional[Image.Image]:
+        """remove_background() on a given session."""
         try:
             # Remove background using rembg
             output = remove(
                 image,
-                session=self.session,
+                session=session,
                 alpha_matting=alpha_matting,
                 alpha_matting_foreground_threshold=alpha_matting_foreground_threshold,
                 alpha_matting_background_threshold=alpha_matting_background_threshold,
@@ -447,44 +550,18 @@ class BackgroundRemover:
             input_paths: List of input image paths
             output_dir: Directory for output images (default: same as input)
             progress_callback: Callback function(current, total, filename)
-            **kwargs: Additional arguments for remove_background
+            **kwargs: Batch options of iter_batch_process (sessions,
+                threads_per_session, batch_size, prefetch) and additional
+                arguments for remove_background
         
         Returns:
             List of BackgroundRemovalResult objects
         """
-        results = []
-        total = len(input_paths)
-        
-        self.cancel_requested = False
-        
-        for i, input_path in enumerate(input_paths):
-            # Check for cancellation
-            if self.cancel_requested:
-                logger.info("Batch processing cancelled")
-                break
-            
-            # Determine output path
-            input_path = Path(input_path)
-            if output_dir:
-                output_path = Path(output_dir) / f"{input_path.stem}_nobg.png"
-            else:
-                output_path = None
-            
-            # Progress callback
-            if progress_callback:
-                progress_callback(i + 1, total, input_path.name)
-            
-            # Process image
-            result = self.remove_background_from_file(
-                str(input_path),
-                str(output_path) if output_path else None,
-                **kwargs
-            )
-            results.append(result)
+        results = list(self.iter_batch_process(input_paths, output_dir, progress_callback, **kwargs))
         
         # Final summary
         successful = sum(1 for r in results if r.success)
-        failed = total - successful
+        failed = len(results) - successful
         total_time = sum(r.processing_time for r in results)
         
         logger.info(
@@ -494,12 +571,208 @@ class BackgroundRemover:
         
         return results
     
+    def iter_batch_process(
+        self,
+        input_paths: Iterable[str],
+        output_dir: Optional[str] = None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        sessions: int = 1,
+        threads_per_session: int = 0,
+        batch_size: int = 4,
+        prefetch: int = 2,
+        **kwargs
+    ) -> Iterator[BackgroundRemovalResult]:
+        """
+        Remove backgrounds from many files, yielding results as they finish.
+        
+        Images are decoded on prefetch threads while inference runs, batches
+        are spread over ``sessions`` warm sessions of the current model, and
+        results come back in input order. For the U²-Net family without alpha
+        matting, a batch goes through the model in one call when its input
+        has a dynamic batch dimension; otherwise each image is one call.
+        
+        Args:
+            input_paths: Input image paths
+            output_dir: Directory for output images (default: same as input)
+            progress_callback: Callback function(current, total, filename)
+            sessions: Sessions run concurrently (each holds its own model copy)
+            threads_per_session: ONNX Runtime CPU threads per session
+                (0 = CPU count / sessions, or the default for one session)
+            batch_size: Images per decode batch and, where possible, per call
+            prefetch: Batches decoded ahead of inference
+            **kwargs: Additional arguments for remove_background
+        
+        Yields:
+            BackgroundRemovalResult per input, in input order
+        """
+        paths = [Path(p) for p in input_paths]
+        total = len(paths)
+        self.cancel_requested = False
+        
+        def out_path_for(input_path: Path) -> Path:
+            directory = Path(output_dir) if output_dir else input_path.parent
+            return directory / f"{input_path.stem}_nobg.png"
+        
+        if not self.is_available():
+            logger.error("Background removal not available")
+            for i, input_path in enumerate(paths):
+                if progress_callback:
+                    progress_callback(i + 1, total, input_path.name)
+                yield BackgroundRemovalResult(
+                    input_path=str(input_path),
+                    output_path=str(out_path_for(input_path)),
+                    success=False,
+                    error_message="Background removal not available"
+                )
+            return
+        
+        try:
+            from ..vision_models.batch_utils import prefetch_batches
+        except ImportError:
+            from vision_models.batch_utils import prefetch_batches  # type: ignore[no-redef]
+        
+        sessions = max(1, min(sessions, -(-total // max(1, batch_size)) or 1))
+        if threads_per_session <= 0 and sessions > 1:
+            threads_per_session = max(1, (os.cpu_count() or 1) // sessions)
+        pool_sessions = self._warm_sessions(self.model_name, sessions, max(0, threads_per_session))
+        batched = [self._batch_capable(pool_sessions[0], kwargs)]
+        idle = deque(pool_sessions)
+        idle_lock = threading.Lock()
+        
+        def run(chunk, prepared):
+            with idle_lock:
+                session = idle.popleft()
+            try:
+                return self._process_decoded(session, chunk, prepared, out_path_for, batched, kwargs)
+            finally:
+                with idle_lock:
+                    idle.append(session)
+        
+        batches = prefetch_batches(
+            paths, batch_size,
+            lambda chunk: _decode_batch(chunk, batched[0]),
+            prefetch=prefetch
+        )
+        executor = ThreadPoolExecutor(max_workers=sessions, thread_name_prefix='bg-remove') \
+            if sessions > 1 else None
+        # Keep every session busy plus one batch queued per session
+        window = sessions * 2 if executor is not None else 1
+        in_flight: deque = deque()
+        done = 0
+        try:
+            while True:
+                while not self.cancel_requested and len(in_flight) < window:
+                    item = next(batches, None)
+                    if item is None:
+                        break
+                    in_flight.append(executor.submit(run, *item) if executor else run(*item))
+                if not in_flight:
+                    break
+                pending = in_flight.popleft()
+                for result in (pending.result() if executor else pending):
+                    done += 1
+                    if progress_callback:
+                        progress_callback(done, total, Path(result.input_path).name)
+                    yield result
+            if self.cancel_requested:
+                logger.info("Batch processing cancelled")
+        finally:
+            batches.close()
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _batch_capable(self, session: Any, kwargs: dict) -> bool:
+        """Whether several images can go through ``session`` in one call."""
+        if self.model_name not in _U2NET_MODELS or kwargs.get('alpha_matting'):
+            return False
+        try:
+            dim = session.inner_session.get_inputs()[0].shape[0]
+        except (AttributeError, IndexError):
+            return False
+        # Exported models have either a fixed batch of 1 or a symbolic one
+        return not isinstance(dim, int)
+    
+    def _process_decoded(
+        self,
+        session: Any,
+        chunk: List[Path],
+        prepared: Tuple[list, Optional[np.ndarray]],
+        out_path_for: Callable[[Path], Path],
+        batched: List[bool],
+        kwargs: dict
+    ) -> List[BackgroundRemovalResult]:
+        """Remove the backgrounds of one decoded batch on ``session`` and save them."""
+        decoded, inputs = prepared
+        start_time = time.time()
+        images = [image for image, _ in decoded if image is not None]
+        
+        cutouts: Optional[List[Optional[Image.Image]]] = None
+        if batched[0] and inputs is not None:
+            try:
+                cutouts = self._u2net_cutouts(session, images, inputs)
+            except Exception as e:
+                # The model rejected a batched call: one image per call from now on
+                logger.warning(f"Batched inference unavailable, processing images singly: {e}")
+                batched[0] = False
+        if cutouts is None:
+            cutouts = [self._remove_with(session, image, **kwargs) for image in images]
+        per_image = (time.time() - start_time) / max(1, len(images))
+        
+        results = []
+        cutout_iter = iter(cutouts)
+        for input_path, (image, error) in zip(chunk, decoded):
+            output_path = out_path_for(input_path)
+            result_image = next(cutout_iter) if image is not None else None
+            result = BackgroundRemovalResult(
+                input_path=str(input_path),
+                output_path=str(output_path),
+                success=False,
+                error_message=error or "Background removal failed",
+                processing_time=per_image
+            )
+            if result_image is not None:
+                try:
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    result_image.save(output_path, 'PNG', optimize=True)
+                    result.success = True
+                    result.error_message = ""
+                    result.original_size = image.size
+                    result.output_size = result_image.size
+                    logger.info(f"Background removed: {input_path.name} -> {output_path.name}")
+                except Exception as e:
+                    logger.error(f"Failed to process {input_path}: {e}")
+                    result.error_message = str(e)
+            results.append(result)
+        return results
+    
+    def _u2net_cutouts(self, session: Any, images: List[Image.Image],
+                       inputs: np.ndarray) -> List[Image.Image]:
+        """
+        Cut out a batch of images with one U²-Net call, matching rembg's
+        predict() plus naive cutout for each image.
+        """
+        inner = session.inner_session
+        predictions = inner.run(None, {inner.get_inputs()[0].name: inputs})[0][:, 0]
+        cutouts = []
+        for image, pred in zip(images, predictions):
+            lo, hi = float(pred.min()), float(pred.max())
+            pred = (pred - lo) / max(hi - lo, 1e-6)
+            mask = Image.fromarray((pred * 255).astype(np.uint8), mode='L')
+            mask = mask.resize(image.size, Image.Resampling.LANCZOS)
+            rgba = image.convert('RGBA')
+            output = Image.composite(rgba, Image.new('RGBA', rgba.size, 0), mask)
+            if self.edge_refinement > 0.0:
+                output = self._refine_edges(output)
+            cutouts.append(output)
+        return cutouts
+    
     def batch_process_async(
         self,
         input_paths: List[str],
         output_dir: Optional[str] = None,
         progress_callback: Optional[Callable[[int, int, str], None]] = None,
         completion_callback: Optional[Callable[[List[BackgroundRemovalResult]], None]] = None,
+        result_callback: Optional[Callable[[BackgroundRemovalResult], None]] = None,
         **kwargs
     ) -> threading.Thread:
         """
@@ -510,7 +783,8 @@ class BackgroundRemover:
             output_dir: Directory for output images
             progress_callback: Callback function(current, total, filename)
             completion_callback: Callback when processing completes
-            **kwargs: Additional arguments for remove_background
+            result_callback: Callback with each result as soon as it is ready
+            **kwargs: Batch options and additional arguments, as for batch_process
         
         Returns:
             Thread object (already started)
@@ -518,12 +792,16 @@ class BackgroundRemover:
         def worker():
             self.is_processing = True
             try:
-                results = self.batch_process(
+                results = []
+                for result in self.iter_batch_process(
                     input_paths,
                     output_dir,
                     progress_callback,
                     **kwargs
-                )
+                ):
+                    results.append(result)
+                    if result_callback:
+                        result_callback(result)
                 if completion_callback:
                     completion_callback(results)
             finally:
@@ -571,8 +849,9 @@ class BackgroundRemover:
             return False
         
         try:
+            # Sessions of models used before stay warm
+            self.session = self._warm_sessions(model_name, 1)[0]
             self.model_name = model_name
-            self.session = new_session(model_name)
             logger.info(f"Model changed to: {model_name}")
             return True
         except Exception as e:
@@ -6,12 +6,18 @@ Provides various color correction and enhancement features:
 - Exposure correction
 - Vibrance enhancement
 - Clarity/sharpness
-- LUT support (.cube files)
+- LUT support (.cube files), compiled once to a uint8 cube and applied in
+  tiles with tetrahedral interpolation (or a dense 24-bit table for batches)
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 try:
@@ -28,17 +34,252 @@ except ImportError:
     logger.error("numpy not available - limited functionality")
     logger.error("Install with: pip install numpy")
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any, List
+from typing import Optional, Tuple, Dict, Any, List, Union
 import re
 
 
+# Pixels per tile when applying a LUT; bounds the float32 temporaries
+LUT_TILE_PIXELS = 1 << 18
+
+# Batches of at least this many pixels are mapped through a dense table of
+# all 2^24 colors, which costs about as much to build as 2^25 pixels
+DENSE_LUT_MIN_PIXELS = 1 << 26
+
+
+def _parse_cube(text: str) -> np.ndarray:
+    """
+    Parse .cube LUT text into a float32 array indexed [r, g, b, channel].
+    
+    Raises:
+        ValueError: If the text holds no valid 3D LUT
+    """
+    lut_size = None
+    lut_data = []
+    
+    for line in text.splitlines():
+        line = line.strip()
+        
+        # Skip comments and empty lines
+        if not line or line.startswith('#'):
+            continue
+        
+        # Get LUT size
+        if line.startswith('LUT_3D_SIZE'):
+            lut_size = int(line.split()[-1])
+            continue
+        
+        # Get LUT data (RGB triplets)
+        parts = line.split()
+        if len(parts) == 3:
+            try:
+                lut_data.append([float(v) for v in parts])
+            except ValueError:
+                continue
+    
+    if not lut_size or lut_size < 2 or len(lut_data) != lut_size ** 3:
+        raise ValueError("missing LUT_3D_SIZE or wrong number of entries")
+    
+    # Red varies fastest in .cube files, so the reshaped axes are [b, g, r]
+    lut_array = np.array(lut_data, dtype=np.float32).reshape((lut_size, lut_size, lut_size, 3))
+    return np.ascontiguousarray(lut_array.transpose(2, 1, 0, 3))
+
+
+class CompiledLUT:
+    """
+    A 3D LUT baked for 8-bit images.
+    
+    The LUT is stored as a compact uint8 cube indexed [r, g, b] (about
+    100 KB for the usual 33³) and applied with tetrahedral interpolation:
+    four gathers per pixel instead of trilinear's eight. build_dense()
+    additionally bakes the result for all 2^24 colors (48 MB) so that each
+    pixel is a single lookup.
+    """
+    
+    def __init__(self, cube: np.ndarray, digest: str = ''):
+        """
+        Args:
+            cube: (N, N, N, 3) uint8 cube indexed [r, g, b], N >= 2
+            digest: Content hash of the .cube file it was compiled from
+        """
+        self.cube = np.ascontiguousarray(cube, dtype=np.uint8)
+        self.digest = digest
+        self.size = self.cube.shape[0]
+        self.dense: Optional[np.ndarray] = None
+        
+        n = self.size
+        self._table = self.cube.reshape(-1, 3).astype(np.float32)
+        # Lower grid index and fraction for every 8-bit value; the top value
+        # uses the last cell with fraction 1 so index + 1 stays in range
+        scaled = np.arange(256, dtype=np.float32) * np.float32((n - 1) / 255.0)
+        self._index = np.minimum(scaled.astype(np.int32), n - 2)
+        self._frac = scaled - self._index
+    
+    @classmethod
+    def from_array(cls, lut: np.ndarray, digest: str = '') -> 'CompiledLUT':
+        """Compile a float LUT (values 0-1, indexed [r, g, b]) such as load_lut() returns."""
+        return cls(np.clip(np.rint(lut * 255.0), 0, 255).astype(np.uint8), digest)
+    
+    def _interpolate(self, rgb: np.ndarray) -> np.ndarray:
+        """Tetrahedral interpolation of (P, 3) uint8 colors; float32 0-255."""
+        n = self.size
+        r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+        base = (self._index[r] * n + self._index[g]) * n + self._index[b]
+        x, y, z = self._frac[r], self._frac[g], self._frac[b]
+        
+        # The tetrahedron runs from corner 000 along the axis with the
+        # largest fraction, then away from the axis with the smallest, to 111
+        hi = np.maximum(np.maximum(x, y), z)
+        lo = np.minimum(np.minimum(x, y), z)
+        mid = x + y + z - hi - lo
+        far = n * n + n + 1
+        first = np.where(x >= y, np.where(x >= z, n * n, 1), np.where(y >= z, n, 1))
+        second = far - np.where(x <= y, np.where(x <= z, n * n, 1), np.where(y <= z, n, 1))
+        
+        table = self._table
+        out = table[base] * (1.0 - hi)[:, None]
+        out += table[base + first] * (hi - mid)[:, None]
+        out += table[base + second] * (mid - lo)[:, None]
+        out += table[base + far] * lo[:, None]
+        return out
+    
+    def build_dense(self, cache_dir: Optional[Path] = None) -> np.ndarray:
+        """
+        Bake the LUT for every 24-bit color: (2^24, 3) uint8 indexed by
+        r << 16 | g << 8 | b. Equal to the interpolated result.
+        
+        With a cache_dir the table is stored there and memory-mapped, so
+        batch worker processes share one copy.
+        """
+        if self.dense is not None:
+            return self.dense
+        path = Path(cache_dir) / f'{_digest_stem(self.digest)}.dense.npy' \
+            if cache_dir is not None and self.digest else None
+        if path is not None and path.exists():
+            try:
+                self.dense = np.load(path, mmap_mode='r')
+                return self.dense
+            except (OSError, ValueError) as e:
+                logger.warning(f"Discarding unreadable dense LUT {path}: {e}")
+        
+        dense = np.empty((1 << 24, 3), dtype=np.uint8)
+        values = np.arange(256, dtype=np.uint8)
+        step = max(1, LUT_TILE_PIXELS >> 16)
+        for red in range(0, 256, step):
+            rr, gg, bb = np.meshgrid(values[red:red + step], values, values, indexing='ij')
+            colors = np.stack([rr.ravel(), gg.ravel(), bb.ravel()], axis=1)
+            dense[red << 16:(red + step) << 16] = np.rint(self._interpolate(colors))
+        self.dense = dense
+        if path is not None:
+            _save_npy(dense, path)
+            if path.exists():
+                self.dense = np.load(path, mmap_mode='r')
+        return self.dense
+    
+    def apply_array(self, pixels: np.ndarray, strength: float = 1.0) -> np.ndarray:
+        """
+        Apply the LUT to (H, W, 3 or 4) uint8 pixels, tile by tile.
+        
+        Alpha is passed through unchanged. Returns a new array.
+        """
+        flat = pixels.reshape(-1, pixels.shape[-1])
+        out = flat.copy()
+        if strength <= 0.0:
+            return out.reshape(pixels.shape)
+        
+        for start in range(0, len(flat), LUT_TILE_PIXELS):
+            rgb = flat[start:start + LUT_TILE_PIXELS, :3]
+            if self.dense is not None:
+                rgb32 = rgb.astype(np.int32)
+                mapped = self.dense[(rgb32[:, 0] << 16) | (rgb32[:, 1] << 8) | rgb32[:, 2]]
+                if strength >= 1.0:
+                    out[start:start + len(rgb), :3] = mapped
+                    continue
+                mapped = mapped.astype(np.float32)
+            else:
+                mapped = self._interpolate(rgb)
+                if strength < 1.0:
+                    # Blend the rounded LUT output, as the dense path does
+                    np.rint(mapped, out=mapped)
+            
+            # Blend with original based on strength
+            if strength < 1.0:
+                original = rgb.astype(np.float32)
+                mapped = original + (mapped - original) * np.float32(strength)
+            out[start:start + len(rgb), :3] = np.rint(mapped)
+        return out.reshape(pixels.shape)
+
+
+def _digest_stem(digest: str) -> str:
+    """File-name-safe form of a content digest."""
+    return digest.replace(':', '_')
+
+
+def _save_npy(array: np.ndarray, path: Path) -> None:
+    """np.save through a temporary file plus rename."""
+    tmp_path = path.with_name(f'.{path.stem}.{os.getpid()}.tmp.npy')
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(tmp_path, array, allow_pickle=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        tmp_path.unlink(missing_ok=True)
+        logger.debug(f"Could not cache LUT at {path}: {e}")
+
+
+def _default_lut_cache_dir() -> Optional[Path]:
+    """<app cache>/luts, or None if the application config is unavailable."""
+    try:
+        try:
+            from ..config import CACHE_DIR
+        except ImportError:
+            from config import CACHE_DIR  # type: ignore[no-redef]
+    except Exception:
+        return None
+    return CACHE_DIR / 'luts'
+
+
+# Compiled LUTs by content digest, shared by every ColorCorrector in the process
+_compiled_luts: Dict[str, CompiledLUT] = {}
+_compiled_lock = threading.Lock()
+
+# Per-process state of batch_process workers
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_batch_worker(cube: Optional[np.ndarray], digest: str,
+                       dense_path: Optional[str], settings: Dict[str, Any]) -> None:
+    """Batch worker initializer: receives the compiled LUT once per process."""
+    lut = None
+    if cube is not None:
+        lut = CompiledLUT(cube, digest)
+        if dense_path:
+            lut.dense = np.load(dense_path, mmap_mode='r')
+    _worker_state.update(corrector=ColorCorrector(), lut=lut, settings=settings)
+
+
+def _batch_worker(job: Tuple[str, str]) -> None:
+    """Batch worker: correct one image and save it."""
+    input_file, output_file = job
+    corrector = _worker_state['corrector']
+    with Image.open(input_file) as image:
+        result = corrector.apply_corrections(image, lut=_worker_state['lut'],
+                                             **_worker_state['settings'])
+    result.save(output_file, quality=95)
+
 
 class ColorCorrector:
     """Main color correction class combining all correction methods."""
     
-    def __init__(self):
-        """Initialize color corrector."""
+    def __init__(self, lut_cache_dir: Optional[Path] = None):
+        """
+        Initialize color corrector.
+        
+        Args:
+            lut_cache_dir: Directory for compiled LUTs (default: <app cache>/luts)
+        """
         self.lut_cache = {}  # Cache loaded LUTs
+        self._lut_cache_dir = lut_cache_dir
+        self._lut_digests: Dict[str, Tuple[int, float, str]] = {}  # path -> (size, mtime, digest)
         
     def auto_white_balance(self, image: Image.Image, strength: float = 1.0) -> Image.Image:
         """
@@ -209,7 +450,7 @@ class ColorCorrector:
             lut_path: Path to .cube file
             
         Returns:
-            3D LUT array or None if failed
+            3D LUT array indexed [r, g, b] or None if failed
         """
         try:
             # Check cache first
@@ -217,40 +458,7 @@ class ColorCorrector:
                 return self.lut_cache[lut_path]
             
             with open(lut_path, 'r') as f:
-                lines = f.readlines()
-            
-            # Parse LUT file
-            lut_size = None
-            lut_data = []
-            
-            for line in lines:
-                line = line.strip()
-                
-                # Skip comments and empty lines
-                if not line or line.startswith('#'):
-                    continue
-                
-                # Get LUT size
-                if line.startswith('LUT_3D_SIZE'):
-                    lut_size = int(line.split()[-1])
-                    continue
-                
-                # Get LUT data (RGB triplets)
-                parts = line.split()
-                if len(parts) == 3:
-                    try:
-                        r, g, b = map(float, parts)
-                        lut_data.append([r, g, b])
-                    except ValueError:
-                        continue
-            
-            if not lut_size or not lut_data:
-                logger.error(f"Invalid LUT file: {lut_path}")
-                return None
-            
-            # Convert to numpy array and reshape to 3D
-            lut_array = np.array(lut_data, dtype=np.float32)
-            lut_array = lut_array.reshape((lut_size, lut_size, lut_size, 3))
+                lut_array = _parse_cube(f.read())
             
             # Cache the LUT
             self.lut_cache[lut_path] = lut_array
@@ -261,71 +469,97 @@ class ColorCorrector:
             logger.error(f"Failed to load LUT {lut_path}: {e}")
             return None
     
-    def apply_lut(self, image: Image.Image, lut: np.ndarray, strength: float = 1.0) -> Image.Image:
+    @property
+    def lut_cache_dir(self) -> Optional[Path]:
+        """Directory compiled LUTs are stored in (None disables the disk cache)."""
+        if self._lut_cache_dir is None:
+            self._lut_cache_dir = _default_lut_cache_dir()
+        return self._lut_cache_dir
+    
+    def compile_lut(self, lut_path: str, dense: bool = False) -> Optional[CompiledLUT]:
+        """
+        Compile a .cube file, reusing earlier compilations of the same contents.
+        
+        Compiled cubes are cached in memory and in lut_cache_dir, keyed by a
+        hash of the file; an unchanged file (same size and mtime) is not even
+        re-read.
+        
+        Args:
+            lut_path: Path to .cube file
+            dense: Also build the dense 24-bit table (see CompiledLUT.build_dense)
+            
+        Returns:
+            CompiledLUT or None if the file cannot be loaded
+        """
+        try:
+            st = os.stat(lut_path)
+            known = self._lut_digests.get(str(lut_path))
+            if known is not None and known[:2] == (st.st_size, st.st_mtime):
+                digest, data = known[2], None
+            else:
+                with open(lut_path, 'rb') as f:
+                    data = f.read()
+                digest = 'b2:' + hashlib.blake2b(data, digest_size=16).hexdigest()
+                self._lut_digests[str(lut_path)] = (st.st_size, st.st_mtime, digest)
+            
+            with _compiled_lock:
+                compiled = _compiled_luts.get(digest)
+            if compiled is None:
+                compiled = self._load_compiled(digest)
+            if compiled is None:
+                if data is None:
+                    with open(lut_path, 'rb') as f:
+                        data = f.read()
+                compiled = CompiledLUT.from_array(_parse_cube(data.decode('utf-8', 'replace')), digest)
+                if self.lut_cache_dir is not None:
+                    _save_npy(compiled.cube, self.lut_cache_dir / f'{_digest_stem(digest)}.npy')
+            with _compiled_lock:
+                compiled = _compiled_luts.setdefault(digest, compiled)
+        except Exception as e:
+            logger.error(f"Failed to compile LUT {lut_path}: {e}")
+            return None
+        
+        if dense:
+            compiled.build_dense(self.lut_cache_dir)
+        return compiled
+    
+    def _load_compiled(self, digest: str) -> Optional[CompiledLUT]:
+        """A compiled cube from the disk cache, if present."""
+        if self.lut_cache_dir is None:
+            return None
+        path = self.lut_cache_dir / f'{_digest_stem(digest)}.npy'
+        if not path.exists():
+            return None
+        try:
+            cube = np.load(path, allow_pickle=False)
+            if cube.dtype != np.uint8 or cube.ndim != 4 or cube.shape[-1] != 3:
+                raise ValueError(f"unexpected cube {cube.dtype} {cube.shape}")
+            return CompiledLUT(cube, digest)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable compiled LUT {path}: {e}")
+            return None
+    
+    def apply_lut(self, image: Image.Image, lut: Union[np.ndarray, CompiledLUT],
+                  strength: float = 1.0) -> Image.Image:
         """
         Apply a 3D LUT to an image.
         
         Args:
             image: Input PIL Image
-            lut: 3D LUT array
+            lut: CompiledLUT, or a 3D LUT array from load_lut()
             strength: LUT application strength (0.0 to 1.0)
             
         Returns:
-            LUT-applied PIL Image
+            LUT-applied PIL Image (alpha is kept)
         """
         try:
-            # Convert to numpy array
-            img_array = np.array(image, dtype=np.float32) / 255.0
-            h, w = img_array.shape[:2]
-            
-            # Get LUT size
-            lut_size = lut.shape[0]
-            
-            # Map image colors to LUT indices
-            r_idx = (img_array[:, :, 0] * (lut_size - 1)).astype(np.float32)
-            g_idx = (img_array[:, :, 1] * (lut_size - 1)).astype(np.float32)
-            b_idx = (img_array[:, :, 2] * (lut_size - 1)).astype(np.float32)
-            
-            # Get integer indices and fractional parts for interpolation
-            r0 = np.floor(r_idx).astype(np.int32)
-            g0 = np.floor(g_idx).astype(np.int32)
-            b0 = np.floor(b_idx).astype(np.int32)
-            
-            r1 = np.minimum(r0 + 1, lut_size - 1)
-            g1 = np.minimum(g0 + 1, lut_size - 1)
-            b1 = np.minimum(b0 + 1, lut_size - 1)
-            
-            r_frac = (r_idx - r0).reshape(h, w, 1)
-            g_frac = (g_idx - g0).reshape(h, w, 1)
-            b_frac = (b_idx - b0).reshape(h, w, 1)
-            
-            # Trilinear interpolation
-            c000 = lut[r0, g0, b0]
-            c001 = lut[r0, g0, b1]
-            c010 = lut[r0, g1, b0]
-            c011 = lut[r0, g1, b1]
-            c100 = lut[r1, g0, b0]
-            c101 = lut[r1, g0, b1]
-            c110 = lut[r1, g1, b0]
-            c111 = lut[r1, g1, b1]
-            
-            c00 = c000 * (1 - b_frac) + c001 * b_frac
-            c01 = c010 * (1 - b_frac) + c011 * b_frac
-            c10 = c100 * (1 - b_frac) + c101 * b_frac
-            c11 = c110 * (1 - b_frac) + c111 * b_frac
-            
-            c0 = c00 * (1 - g_frac) + c01 * g_frac
-            c1 = c10 * (1 - g_frac) + c11 * g_frac
-            
-            result = c0 * (1 - r_frac) + c1 * r_frac
-            
-            # Blend with original based on strength
-            if strength < 1.0:
-                result = img_array * (1 - strength) + result * strength
-            
-            # Convert back to 0-255 range
-            result = np.clip(result * 255, 0, 255).astype(np.uint8)
+            if not isinstance(lut, CompiledLUT):
+                lut = CompiledLUT.from_array(lut)
+            if image.mode not in ('RGB', 'RGBA'):
+                has_alpha = 'A' in image.mode or 'transparency' in image.info
+                image = image.convert('RGBA' if has_alpha else 'RGB')
             
+            result = lut.apply_array(np.asarray(image), strength)
             return Image.fromarray(result, mode=image.mode)
             
         except Exception as e:
@@ -340,7 +574,8 @@ class ColorCorrector:
         vibrance: float = 1.0,
         clarity: float = 0.0,
         lut_path: Optional[str] = None,
-        lut_strength: float = 1.0
+        lut_strength: float = 1.0,
+        lut: Optional[CompiledLUT] = None
     ) -> Image.Image:
         """
         Apply multiple corrections to an image.
@@ -353,6 +588,7 @@ class ColorCorrector:
             clarity: Clarity amount (0.0 to 2.0)
             lut_path: Optional path to .cube LUT file
             lut_strength: LUT application strength (0.0 to 1.0)
+            lut: Already compiled LUT (takes the place of lut_path)
             
         Returns:
             Corrected PIL Image
@@ -372,10 +608,10 @@ class ColorCorrector:
         if clarity > 0:
             result = self.enhance_clarity(result, clarity)
         
-        if lut_path:
-            lut = self.load_lut(lut_path)
-            if lut is not None:
-                result = self.apply_lut(result, lut, lut_strength)
+        if lut is None and lut_path:
+            lut = self.compile_lut(lut_path)
+        if lut is not None:
+            result = self.apply_lut(result, lut, lut_strength)
         
         return result
     
@@ -384,16 +620,22 @@ class ColorCorrector:
         input_files: List[str],
         output_dir: str,
         settings: Dict[str, Any],
-        progress_callback=None
+        progress_callback=None,
+        max_workers: int = 0
     ) -> Tuple[int, List[str]]:
         """
         Batch process multiple images with same corrections.
         
+        The LUT (if any) is compiled once and handed to each worker process
+        when it starts. Large batches map colors through the dense table,
+        memory-mapped from the LUT cache so the processes share it.
+        
         Args:
             input_files: List of input image paths
             output_dir: Output directory
             settings: Dictionary of correction settings
             progress_callback: Optional callback(current, total, filename)
+            max_workers: Worker processes (0 = CPU count - 1)
             
         Returns:
             Tuple of (success_count, error_messages)
@@ -402,28 +644,88 @@ class ColorCorrector:
         
         success_count = 0
         errors = []
+        total = len(input_files)
+        if not total:
+            return success_count, errors
+        
+        settings = dict(settings)
+        lut_path = settings.pop('lut_path', None)
+        lut = self.compile_lut(lut_path) if lut_path else None
+        if lut_path and lut is None:
+            logger.warning(f"Continuing without LUT {lut_path}")
+        dense_path = None
+        if lut is not None and self._batch_pixels(input_files) >= DENSE_LUT_MIN_PIXELS:
+            lut.build_dense(self.lut_cache_dir)
+            if isinstance(lut.dense, np.memmap):
+                dense_path = lut.dense.filename
         
-        for idx, input_file in enumerate(input_files):
+        workers = max_workers if max_workers > 0 else max(1, (os.cpu_count() or 2) - 1)
+        workers = min(workers, total)
+        init_args = (lut.cube if lut is not None else None, lut.digest if lut is not None else '',
+                     dense_path, settings)
+        executor: Optional[Executor] = None
+        if workers > 1:
             try:
+                executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                               initargs=init_args)
+            except (OSError, NotImplementedError, ValueError) as e:
+                logger.warning(f"Process pool unavailable, using threads: {e}")
+                _init_batch_worker(*init_args)
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='color-correct')
+        else:
+            _init_batch_worker(*init_args)
+        if executor is None or isinstance(executor, ThreadPoolExecutor):
+            # In-process workers use this process's copy, dense table included
+            _worker_state['lut'] = lut
+        
+        try:
+            jobs = iter(input_files)
+            in_flight: deque = deque()
+            
+            def submit_next() -> bool:
+                input_file = next(jobs, None)
+                if input_file is None:
+                    return False
+                job = (str(input_file), str(Path(output_dir) / Path(input_file).name))
+                in_flight.append((job, executor.submit(_batch_worker, job) if executor else None))
+                return True
+            
+            while len(in_flight) < workers * 2 and submit_next():
+                pass
+            idx = 0
+            while in_flight:
+                (input_file, output_file), pending = in_flight.popleft()
+                submit_next()
+                idx += 1
                 if progress_callback:
-                    progress_callback(idx + 1, len(input_files), Path(input_file).name)
-                
-                # Load image
-                image = Image.open(input_file)
-                
-                # Apply corrections
-                result = self.apply_corrections(image, **settings)
-                
-                # Save result
-                output_file = Path(output_dir) / Path(input_file).name
-                result.save(output_file, quality=95)
-                
-                success_count += 1
-                logger.info(f"Processed: {input_file} -> {output_file}")
-                
-            except Exception as e:
-                error_msg = f"Failed to process {input_file}: {e}"
-                errors.append(error_msg)
-                logger.error(error_msg)
+                    progress_callback(idx, total, Path(input_file).name)
+                try:
+                    if pending is not None:
+                        pending.result()
+                    else:
+                        _batch_worker((input_file, output_file))
+                    success_count += 1
+                    logger.info(f"Processed: {input_file} -> {output_file}")
+                except Exception as e:
+                    error_msg = f"Failed to process {input_file}: {e}"
+                    errors.append(error_msg)
+                    logger.error(error_msg)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
         
         return success_count, errors
+    
+    @staticmethod
+    def _batch_pixels(input_files: List[str]) -> int:
+        """Pixel count of a batch from the image headers, stopping once it is large."""
+        pixels = 0
+        for input_file in input_files:
+            try:
+                with Image.open(input_file) as image:
+                    pixels += image.width * image.height
+            except Exception:
+                continue
+            if pixels >= DENSE_LUT_MIN_PIXELS:
+                break
+        return pixels
@@ -7,6 +7,10 @@ Author: Dead On The Inside / JosephsDeadish
 
 from __future__ import annotations
 import logging
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
 try:
     import numpy as np
     HAS_NUMPY = True
@@ -14,7 +18,7 @@ except ImportError:
     np = None  # type: ignore[assignment]
     HAS_NUMPY = False
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict, Any
+from typing import List, Optional, Tuple, Dict, Any, Iterable, Iterator
 from dataclasses import dataclass
 try:
     from PIL import Image, ImageStat
@@ -34,6 +38,14 @@ except ImportError:
     HAS_CV2 = False
     logger.warning("opencv-python not available - advanced artifact detection disabled")
 
+try:
+    from ..utils.analysis_cache import AnalysisCache
+except ImportError:
+    try:
+        from utils.analysis_cache import AnalysisCache
+    except ImportError:
+        AnalysisCache = None  # type: ignore[assignment,misc]
+
 
 class QualityLevel(Enum):
     """Quality level classifications."""
@@ -123,9 +135,25 @@ class ImageQualityChecker:
     PRINT_DPI = 300
     HIGH_QUALITY_DPI = 600
     
-    def __init__(self):
-        """Initialize the quality checker."""
+    # Sharpness and noise are measured on a grayscale level of at most this
+    # many pixels per side
+    ANALYSIS_SIDE = 1024
+    
+    # Bump when report metrics change so cached reports are recomputed
+    CACHE_VERSION = "1"
+    
+    def __init__(self, analysis_cache=None, max_workers: int = 0):
+        """
+        Initialize the quality checker.
+        
+        Args:
+            analysis_cache: Optional AnalysisCache; reports are then reused for
+                any file with the same contents and check options
+            max_workers: Threads for check_batch (0 = min(8, CPU count))
+        """
         self.has_cv2 = HAS_CV2
+        self.analysis_cache = analysis_cache
+        self.max_workers = max_workers
     
     def check_quality(self, image_path: str, options: Optional[QualityCheckOptions] = None) -> QualityReport:
         """
@@ -142,144 +170,259 @@ class ImageQualityChecker:
         if options is None:
             options = QualityCheckOptions()
         
+        digest = None
+        version = self._cache_version(options)
+        if self.analysis_cache is not None:
+            try:
+                digest = self.analysis_cache.file_digest(image_path)
+                cached = self.analysis_cache.get(digest, AnalysisCache.QUALITY, version)
+                if cached is not None:
+                    return self._report_from_cache(cached, image_path)
+            except OSError:
+                digest = None
+        
         try:
-            img = Image.open(image_path)
-            width, height = img.size
-            
-            # Basic metrics (always collected)
-            total_pixels = width * height
-            format_type = img.format or "Unknown"
-            mode = img.mode
-            has_alpha = mode in ('RGBA', 'LA', 'PA')
-            color_depth = len(mode) * 8
-            
-            # Calculate these once regardless of conditional checks
-            min_dim = min(width, height)
-            max_dim = max(width, height)
-            aspect_ratio = width / height if height > 0 else 1.0
-            
-            # Resolution analysis (conditional)
-            if options.check_resolution:
-                is_low_res = min_dim < self.LOW_RES_THRESHOLD
-                resolution_score = self._calculate_resolution_score(min_dim, max_dim)
-            else:
-                # Use defaults when skipped
-                is_low_res = False
-                resolution_score = 100.0
-            
-            # Compression analysis (conditional)
-            if options.check_compression:
-                has_artifacts, jpeg_quality, compression_score, blocking_score = \
-                    self._analyze_compression(img, image_path)
-            else:
-                has_artifacts = False
-                jpeg_quality = None
-                compression_score = 100.0
-                blocking_score = 0.0
-            
-            # DPI analysis (conditional)
-            if options.check_dpi:
-                dpi, effective_dpi, dpi_warning = self._analyze_dpi(img, width, height, options.target_dpi)
-            else:
-                dpi = (72.0, 72.0)
-                effective_dpi = 72.0
-                dpi_warning = None
-            
-            # Upscaling analysis
-            upscale_limit, can_2x, can_4x, upscale_warning = \
-                self._analyze_upscale_potential(width, height, resolution_score, compression_score)
-            
-            # Sharpness and noise (conditional)
-            if options.check_sharpness:
-                sharpness = self._calculate_sharpness(img)
-            else:
-                sharpness = 50.0
-                
-            if options.check_noise:
-                noise = self._calculate_noise_level(img)
-            else:
-                noise = 0.0
-            
-            # Overall quality score (weighted average)
-            overall_score = self._calculate_overall_score(
-                resolution_score, compression_score, sharpness, noise
-            )
-            
-            # Quality level classification
-            quality_level = self._classify_quality(overall_score)
-            
-            # Generate recommendations and warnings
-            recommendations, warnings = self._generate_recommendations(
-                is_low_res, has_artifacts, jpeg_quality, effective_dpi,
-                sharpness, noise, overall_score
-            )
-            
-            return QualityReport(
-                input_path=image_path,
-                width=width,
-                height=height,
-                total_pixels=total_pixels,
-                format=format_type,
-                mode=mode,
-                is_low_resolution=is_low_res,
-                resolution_score=resolution_score,
-                min_dimension=min_dim,
-                max_dimension=max_dim,
-                aspect_ratio=aspect_ratio,
-                has_compression_artifacts=has_artifacts,
-                jpeg_quality_estimate=jpeg_quality,
-                compression_score=compression_score,
-                blocking_score=blocking_score,
-                dpi=dpi,
-                effective_dpi=effective_dpi,
-                dpi_warning=dpi_warning,
-                upscale_safe_limit=upscale_limit,
-                can_upscale_2x=can_2x,
-                can_upscale_4x=can_4x,
-                upscale_warning=upscale_warning,
-                overall_score=overall_score,
-                quality_level=quality_level,
-                recommendations=recommendations,
-                warnings=warnings,
-                sharpness_score=sharpness,
-                noise_level=noise,
-                has_alpha=has_alpha,
-                color_depth=color_depth
-            )
-            
+            with Image.open(image_path) as img:
+                report = self._analyze_image(img, image_path, options)
         except Exception as e:
             logger.error(f"Error checking quality for {image_path}: {e}")
             raise
+        
+        if digest is not None:
+            self.analysis_cache.put(digest, AnalysisCache.QUALITY,
+                                    self._report_to_cache(report), version)
+        return report
+    
+    def _analyze_image(self, img: Image.Image, image_path: str,
+                       options: QualityCheckOptions) -> QualityReport:
+        """
+        Fused analysis of one open image.
+        
+        The pixels are decoded once and converted to grayscale once; blocking
+        is measured on that full-resolution level and sharpness and noise on
+        a single downsampled level shared by both.
+        """
+        img.load()
+        width, height = img.size
+        
+        # Basic metrics (always collected)
+        total_pixels = width * height
+        format_type = img.format or "Unknown"
+        mode = img.mode
+        has_alpha = mode in ('RGBA', 'LA', 'PA')
+        color_depth = len(mode) * 8
+        
+        # Calculate these once regardless of conditional checks
+        min_dim = min(width, height)
+        max_dim = max(width, height)
+        aspect_ratio = width / height if height > 0 else 1.0
+        
+        # Resolution analysis (conditional)
+        if options.check_resolution:
+            is_low_res = min_dim < self.LOW_RES_THRESHOLD
+            resolution_score = self._calculate_resolution_score(min_dim, max_dim)
+        else:
+            # Use defaults when skipped
+            is_low_res = False
+            resolution_score = 100.0
+        
+        # Grayscale levels, only the ones some enabled check reads
+        need_full = options.check_compression and self.has_cv2 and mode in ('RGB', 'L')
+        need_small = options.check_sharpness or options.check_noise
+        gray_full, gray_small = self._gray_levels(img, need_full, need_small)
+        
+        # Compression analysis (conditional)
+        if options.check_compression:
+            has_artifacts, jpeg_quality, compression_score, blocking_score = \
+                self._analyze_compression(img, image_path, gray_full)
+        else:
+            has_artifacts = False
+            jpeg_quality = None
+            compression_score = 100.0
+            blocking_score = 0.0
+        
+        # DPI analysis (conditional)
+        if options.check_dpi:
+            dpi, effective_dpi, dpi_warning = self._analyze_dpi(img, width, height, options.target_dpi)
+        else:
+            dpi = (72.0, 72.0)
+            effective_dpi = 72.0
+            dpi_warning = None
+        
+        # Upscaling analysis
+        upscale_limit, can_2x, can_4x, upscale_warning = \
+            self._analyze_upscale_potential(width, height, resolution_score, compression_score)
+        
+        # Sharpness and noise (conditional), from the shared level
+        gray_float = gray_small.astype(float) if gray_small is not None else None
+        if options.check_sharpness:
+            sharpness = self._calculate_sharpness(gray_small, gray_float)
+        else:
+            sharpness = 50.0
+            
+        if options.check_noise:
+            noise = self._calculate_noise_level(gray_small, gray_float)
+        else:
+            noise = 0.0
+        
+        # Overall quality score (weighted average)
+        overall_score = self._calculate_overall_score(
+            resolution_score, compression_score, sharpness, noise
+        )
+        
+        # Quality level classification
+        quality_level = self._classify_quality(overall_score)
+        
+        # Generate recommendations and warnings
+        recommendations, warnings = self._generate_recommendations(
+            is_low_res, has_artifacts, jpeg_quality, effective_dpi,
+            sharpness, noise, overall_score
+        )
+        
+        return QualityReport(
+            input_path=image_path,
+            width=width,
+            height=height,
+            total_pixels=total_pixels,
+            format=format_type,
+            mode=mode,
+            is_low_resolution=is_low_res,
+            resolution_score=resolution_score,
+            min_dimension=min_dim,
+            max_dimension=max_dim,
+            aspect_ratio=aspect_ratio,
+            has_compression_artifacts=has_artifacts,
+            jpeg_quality_estimate=jpeg_quality,
+            compression_score=compression_score,
+            blocking_score=blocking_score,
+            dpi=dpi,
+            effective_dpi=effective_dpi,
+            dpi_warning=dpi_warning,
+            upscale_safe_limit=upscale_limit,
+            can_upscale_2x=can_2x,
+            can_upscale_4x=can_4x,
+            upscale_warning=upscale_warning,
+            overall_score=overall_score,
+            quality_level=quality_level,
+            recommendations=recommendations,
+            warnings=warnings,
+            sharpness_score=sharpness,
+            noise_level=noise,
+            has_alpha=has_alpha,
+            color_depth=color_depth
+        )
+    
+    def _gray_levels(self, img: Image.Image, need_full: bool,
+                     need_small: bool) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Grayscale pyramid of an image: (full resolution, analysis level).
+        
+        The analysis level is the full level itself for images up to
+        ANALYSIS_SIDE² pixels and one LANCZOS resize to ANALYSIS_SIDE²
+        otherwise. Levels that are not needed are None.
+        """
+        if not (need_full or need_small):
+            return None, None
+        gray = img if img.mode == 'L' else img.convert('L')
+        full = np.asarray(gray) if need_full else None
+        small = None
+        if need_small:
+            side = self.ANALYSIS_SIDE
+            if gray.width * gray.height > side * side:
+                small = np.asarray(gray.resize((side, side), Image.Resampling.LANCZOS))
+            else:
+                small = full if full is not None else np.asarray(gray)
+        return full, small
     
     def check_batch(self, image_paths: List[str], 
-                   progress_callback: Optional[callable] = None) -> List[QualityReport]:
+                   progress_callback: Optional[callable] = None,
+                   options: Optional[QualityCheckOptions] = None,
+                   max_workers: Optional[int] = None) -> List[QualityReport]:
         """
         Check quality for multiple images.
         
         Args:
             image_paths: List of image file paths
             progress_callback: Optional callback function(current, total, filename)
+            options: Optional configuration for which checks to perform
+            max_workers: Threads to use (default: the checker's max_workers)
             
         Returns:
-            List of QualityReport objects
+            List of QualityReport objects, in input order
+        """
+        return list(self.iter_check_batch(image_paths, progress_callback, options, max_workers))
+    
+    def iter_check_batch(self, image_paths: Iterable[str],
+                         progress_callback: Optional[callable] = None,
+                         options: Optional[QualityCheckOptions] = None,
+                         max_workers: Optional[int] = None) -> Iterator[QualityReport]:
         """
-        reports = []
-        total = len(image_paths)
+        Check images on a thread pool, yielding reports in input order.
         
-        for i, path in enumerate(image_paths):
+        Decoding, resizing and the OpenCV kernels release the GIL, so threads
+        scale across cores. At most twice as many images as workers are in
+        flight. Images that fail are logged and skipped.
+        
+        Args:
+            image_paths: Image file paths
+            progress_callback: Optional callback function(current, total, filename)
+            options: Optional configuration for which checks to perform
+            max_workers: Threads to use (default: the checker's max_workers)
+        """
+        paths = list(image_paths)
+        total = len(paths)
+        workers = max_workers if max_workers is not None else self.max_workers
+        if workers <= 0:
+            workers = min(8, os.cpu_count() or 1)
+        workers = max(1, min(workers, total))
+        
+        def check(path):
             try:
-                report = self.check_quality(path)
-                reports.append(report)
-                
-                if progress_callback:
-                    progress_callback(i + 1, total, Path(path).name)
-                    
+                return self.check_quality(path, options)
             except Exception as e:
                 logger.error(f"Error checking {path}: {e}")
-                if progress_callback:
-                    progress_callback(i + 1, total, Path(path).name)
-        
-        return reports
+                return None
+        
+        def results():
+            if workers == 1:
+                yield from map(check, paths)
+                return
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='quality-check') as pool:
+                pending = deque()
+                for path in paths:
+                    pending.append(pool.submit(check, path))
+                    if len(pending) >= workers * 2:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+        
+        for i, (path, report) in enumerate(zip(paths, results())):
+            if progress_callback:
+                progress_callback(i + 1, total, Path(path).name)
+            if report is not None:
+                yield report
+    
+    def _cache_version(self, options: QualityCheckOptions) -> str:
+        """Cache version for reports made with these options."""
+        return (f'{self.CACHE_VERSION}:{int(self.has_cv2)}:'
+                + ':'.join(str(v) for v in asdict(options).values()))
+    
+    @staticmethod
+    def _report_to_cache(report: QualityReport) -> Dict[str, Any]:
+        """JSON-friendly report without its path."""
+        data = asdict(report)
+        del data['input_path']
+        data['quality_level'] = report.quality_level.value
+        return data
+    
+    @staticmethod
+    def _report_from_cache(data: Dict[str, Any], image_path: str) -> QualityReport:
+        """Rebuild a cached report for ``image_path``."""
+        data = dict(data)
+        data['quality_level'] = QualityLevel(data['quality_level'])
+        data['dpi'] = tuple(data['dpi'])
+        data['upscale_safe_limit'] = tuple(data['upscale_safe_limit'])
+        return QualityReport(input_path=image_path, **data)
     
     def _calculate_resolution_score(self, min_dim: int, max_dim: int) -> float:
         """Calculate resolution quality score (0-100)."""
@@ -301,11 +444,14 @@ class ImageQualityChecker:
         
         return min(100, max(0, base_score))
     
-    def _analyze_compression(self, img: Image.Image, 
-                           image_path: str) -> Tuple[bool, Optional[int], float, float]:
+    def _analyze_compression(self, img: Image.Image, image_path: str,
+                           gray_full: Optional[np.ndarray] = None) -> Tuple[bool, Optional[int], float, float]:
         """
         Analyze compression artifacts.
         
+        Blocking is measured on ``gray_full``, the full-resolution grayscale
+        level, when it is given.
+        
         Returns:
             (has_artifacts, jpeg_quality, compression_score, blocking_score)
         """
@@ -328,8 +474,8 @@ class ImageQualityChecker:
                     compression_score = 90 + (jpeg_quality - 80) / 2
         
         # Detect blocking artifacts using OpenCV if available
-        if self.has_cv2 and img.mode in ('RGB', 'L'):
-            blocking_score = self._detect_blocking_artifacts(img)
+        if self.has_cv2 and gray_full is not None:
+            blocking_score = self._detect_blocking_artifacts(gray_full)
             if blocking_score > 0.3:
                 has_artifacts = True
                 compression_score = min(compression_score, 70)
@@ -379,30 +525,28 @@ class ImageQualityChecker:
             logger.debug(f"Could not estimate JPEG quality: {e}")
             return None
     
-    def _detect_blocking_artifacts(self, img: Image.Image) -> float:
+    def _detect_blocking_artifacts(self, arr: np.ndarray) -> float:
         """
         Detect JPEG blocking artifacts using gradient analysis.
         
+        Args:
+            arr: Full-resolution grayscale pixels (uint8)
+        
         Returns blocking score (0.0 = no blocking, 1.0 = severe blocking)
         """
         try:
-            # Convert to numpy array
-            if img.mode == 'RGB':
-                arr = np.array(img.convert('L'))
-            else:
-                arr = np.array(img)
-            
-            # Calculate gradients
-            grad_x = cv2.Sobel(arr, cv2.CV_64F, 1, 0, ksize=3)
-            grad_y = cv2.Sobel(arr, cv2.CV_64F, 0, 1, ksize=3)
+            # Calculate gradients; 8-bit Sobel responses are small integers,
+            # exact in float32, and the sums are taken in float64
+            grad_x = np.abs(cv2.Sobel(arr, cv2.CV_32F, 1, 0, ksize=3))
+            grad_y = np.abs(cv2.Sobel(arr, cv2.CV_32F, 0, 1, ksize=3))
             
             # Detect 8x8 block boundaries (JPEG block size)
-            block_edges_x = np.sum(np.abs(grad_x[:, ::8]))
-            block_edges_y = np.sum(np.abs(grad_y[::8, :]))
+            block_edges_x = grad_x[:, ::8].sum(dtype=np.float64)
+            block_edges_y = grad_y[::8, :].sum(dtype=np.float64)
             
             # Compare to average edge strength
-            avg_edge_x = np.sum(np.abs(grad_x)) / arr.shape[1] if arr.shape[1] > 0 else 0
-            avg_edge_y = np.sum(np.abs(grad_y)) / arr.shape[0] if arr.shape[0] > 0 else 0
+            avg_edge_x = grad_x.sum(dtype=np.float64) / arr.shape[1] if arr.shape[1] > 0 else 0
+            avg_edge_y = grad_y.sum(dtype=np.float64) / arr.shape[0] if arr.shape[0] > 0 else 0
             
             # Calculate blocking ratio
             block_ratio_x = block_edges_x / (avg_edge_x * arr.shape[0]) if avg_edge_x > 0 else 0
@@ -425,8 +569,9 @@ class ImageQualityChecker:
         Returns:
             (dpi_tuple, effective_dpi, warning)
         """
-        # Get DPI from image metadata
+        # Get DPI from image metadata (plain floats, so reports can be cached)
         dpi = img.info.get('dpi', (self.SCREEN_DPI, self.SCREEN_DPI))
+        dpi = (float(dpi[0]), float(dpi[1]))
         
         # Calculate effective DPI based on dimensions
         # Assume target physical size of 10 inches
@@ -477,25 +622,18 @@ class ImageQualityChecker:
         
         return safe_limit, can_2x, can_4x, warning
     
-    def _calculate_sharpness(self, img: Image.Image) -> float:
+    def _calculate_sharpness(self, arr: np.ndarray,
+                             arr_float: Optional[np.ndarray] = None) -> float:
         """
         Calculate image sharpness score (0-100).
         
         Uses Laplacian variance method.
+        
+        Args:
+            arr: Grayscale analysis level (uint8, see _gray_levels)
+            arr_float: The same pixels as float, when already converted
         """
         try:
-            # Convert to grayscale
-            if img.mode != 'L':
-                gray = img.convert('L')
-            else:
-                gray = img
-            
-            # Resize if too large for performance
-            if gray.width * gray.height > 1024 * 1024:
-                gray = gray.resize((1024, 1024), Image.Resampling.LANCZOS)
-            
-            arr = np.array(gray)
-            
             if self.has_cv2:
                 # Use Laplacian variance method
                 laplacian = cv2.Laplacian(arr, cv2.CV_64F)
@@ -506,8 +644,10 @@ class ImageQualityChecker:
                 sharpness = min(100, (variance / 10))
             else:
                 # Fallback: simple edge detection
-                edges_x = np.abs(np.diff(arr.astype(float), axis=1))
-                edges_y = np.abs(np.diff(arr.astype(float), axis=0))
+                if arr_float is None:
+                    arr_float = arr.astype(float)
+                edges_x = np.abs(np.diff(arr_float, axis=1))
+                edges_y = np.abs(np.diff(arr_float, axis=0))
                 edge_strength = (edges_x.mean() + edges_y.mean()) / 2
                 sharpness = min(100, edge_strength * 2)
             
@@ -517,27 +657,22 @@ class ImageQualityChecker:
             logger.debug(f"Error calculating sharpness: {e}")
             return 50.0
     
-    def _calculate_noise_level(self, img: Image.Image) -> float:
+    def _calculate_noise_level(self, arr: np.ndarray,
+                               arr_float: Optional[np.ndarray] = None) -> float:
         """
         Calculate noise level (0-100, higher = more noise).
+        
+        Args:
+            arr: Grayscale analysis level (uint8, see _gray_levels)
+            arr_float: The same pixels as float, when already converted
         """
         try:
-            # Convert to grayscale
-            if img.mode != 'L':
-                gray = img.convert('L')
-            else:
-                gray = img
-            
-            # Resize if too large
-            if gray.width * gray.height > 1024 * 1024:
-                gray = gray.resize((1024, 1024), Image.Resampling.LANCZOS)
-            
-            arr = np.array(gray)
-            
+            if arr_float is None:
+                arr_float = arr.astype(float)
             if self.has_cv2:
                 # Use Laplacian of Gaussian for noise estimation
                 blurred = cv2.GaussianBlur(arr, (5, 5), 0)
-                noise = np.abs(arr.astype(float) - blurred.astype(float))
+                noise = np.abs(arr_float - blurred.astype(float))
                 noise_level = noise.mean()
                 
                 # Normalize to 0-100 scale
@@ -52,6 +52,13 @@ except ImportError:
     PIL_AVAILABLE = False
     logger.warning("PIL not available - thumbnails disabled")
 
+try:
+    from file_handler.scanner import scan_files
+    SCANNER_AVAILABLE = True
+except ImportError:
+    SCANNER_AVAILABLE = False
+    logger.warning("File scanner not available - using glob")
+
 try:
     from features.search_filter import SearchFilter, FilterCriteria
     _SEARCH_FILTER = SearchFilter()
@@ -129,7 +136,7 @@ class FileBrowserPanelQt(QWidget):
     file_selected = pyqtSignal(Path)
     folder_changed = pyqtSignal(Path)
     
-    def __init__(self, config=None, tooltip_manager=None, parent=None):
+    def __init__(self, config=None, tooltip_manager=None, parent=None, database=None):
         super().__init__(parent)
         
         if not PYQT_AVAILABLE:
@@ -137,6 +144,8 @@ class FileBrowserPanelQt(QWidget):
         
         self.config = config
         self.tooltip_manager = tooltip_manager
+        # Optional TextureDatabase used to filter indexed files without stat()
+        self.database = database
         self.current_folder: Optional[Path] = None
         self.current_files: List[Path] = []
         self.thumbnail_cache: dict = {}
@@ -330,13 +339,16 @@ class FileBrowserPanelQt(QWidget):
         
         # Scan for files
         try:
-            all_files = []
-            for ext in self.IMAGE_EXTENSIONS:
-                all_files.extend(folder.glob(f"*{ext}"))
-                all_files.extend(folder.glob(f"*{ext.upper()}"))
-            
+            # One scandir pass covers every extension, case-insensitively
+            extensions = set(self.IMAGE_EXTENSIONS)
             if self.show_archives_cb.isChecked():
-                for ext in self.ARCHIVE_EXTENSIONS:
+                extensions |= self.ARCHIVE_EXTENSIONS
+            if SCANNER_AVAILABLE:
+                all_files = [entry.path
+                             for entry in scan_files(folder, extensions, recursive=False)]
+            else:
+                all_files = []
+                for ext in extensions:
                     all_files.extend(folder.glob(f"*{ext}"))
                     all_files.extend(folder.glob(f"*{ext.upper()}"))
             
@@ -376,7 +388,8 @@ class FileBrowserPanelQt(QWidget):
             if _SEARCH_FILTER is not None:
                 try:
                     criteria = FilterCriteria(name=search_text)
-                    filtered = _SEARCH_FILTER.search(candidates, criteria)
+                    filtered = _SEARCH_FILTER.search(candidates, criteria,
+                                                     database=self.database)
                 except Exception:
                     # Fallback to simple substring match on any error
                     filtered = [p for p in candidates if search_text in p.name.lower()]
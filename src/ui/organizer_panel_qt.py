@@ -100,6 +100,13 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+try:
+    from file_handler.scanner import scan_files, scan_paths
+    SCANNER_AVAILABLE = True
+except ImportError:
+    SCANNER_AVAILABLE = False
+    logger.warning("File scanner not available - using glob")
+
 # Import organizer settings panel
 try:
     from ui.organizer_settings_panel import OrganizerSettingsPanel
@@ -338,19 +345,16 @@ class OrganizerWorker(QThread):
     def _collect_files(self, source_dir: Path) -> List[Path]:
         """Collect texture files from source directory."""
         extensions = {'.dds', '.png', '.jpg', '.jpeg', '.tga', '.bmp'}
-        files = []
         
         # Get recursive setting from settings dict (thread-safe)
         # Never access UI widgets from worker thread
         recursive = self.settings.get('recursive', True)
         
-        if recursive:
-            for ext in extensions:
-                files.extend(source_dir.rglob(f'*{ext}'))
-        else:
-            for ext in extensions:
-                files.extend(source_dir.glob(f'*{ext}'))
-        
+        if SCANNER_AVAILABLE:
+            return scan_paths(source_dir, extensions, recursive=recursive)
+        files = []
+        for ext in extensions:
+            files.extend(source_dir.rglob(f'*{ext}') if recursive else source_dir.glob(f'*{ext}'))
         return sorted(files)
     
     def _classify_texture(self, file_path: Path) -> Tuple[str, float]:
@@ -1114,12 +1118,12 @@ class OrganizerPanelQt(QWidget):
         source_path = Path(self.source_directory)
         extensions = {'.dds', '.png', '.jpg', '.jpeg', '.tga', '.bmp'}
         
-        file_count = 0
-        for ext in extensions:
-            if self.subfolders_cb.isChecked():
-                file_count += len(list(source_path.rglob(f'*{ext}')))
-            else:
-                file_count += len(list(source_path.glob(f'*{ext}')))
+        recursive = self.subfolders_cb.isChecked()
+        if SCANNER_AVAILABLE:
+            file_count = sum(1 for _ in scan_files(source_path, extensions, recursive=recursive))
+        else:
+            walk = source_path.rglob if recursive else source_path.glob
+            file_count = sum(len(list(walk(f'*{ext}'))) for ext in extensions)
         
         self.file_count_label.setText(f"{file_count} files selected")
     
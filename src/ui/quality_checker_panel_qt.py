@@ -82,6 +82,11 @@ from tools.quality_checker import ImageQualityChecker, format_quality_report, Qu
 
 logger = logging.getLogger(__name__)
 
+try:
+    from utils.analysis_cache import get_analysis_cache
+except ImportError:
+    get_analysis_cache = None  # type: ignore[assignment]
+
 try:
     from utils.archive_handler import ArchiveHandler
     ARCHIVE_AVAILABLE = True
@@ -108,14 +113,16 @@ class QualityCheckWorker(QThread):
     def run(self):
         """Execute quality check in background thread."""
         try:
-            for i, filepath in enumerate(self.files):
-                self.progress.emit(f"Checking {i+1}/{len(self.files)}: {Path(filepath).name}")
-                
-                report = self.checker.check_quality(filepath, self.options)
-                self.results.append((filepath, report))
-                self.result.emit(report, Path(filepath).name)
+            def progress(current, total, filename):
+                self.progress.emit(f"Checked {current}/{total}: {filename}")
+            
+            # Reports stream in input order from the checker's thread pool;
+            # unreadable files are logged and skipped
+            for report in self.checker.iter_check_batch(self.files, progress, self.options):
+                self.results.append((report.input_path, report))
+                self.result.emit(report, Path(report.input_path).name)
             
-            self.finished.emit(True, f"Checked {len(self.files)} images")
+            self.finished.emit(True, f"Checked {len(self.results)}/{len(self.files)} images")
         except Exception as e:
             logger.error(f"Quality check failed: {e}")
             self.finished.emit(False, f"Quality check failed: {str(e)}")
@@ -130,7 +137,8 @@ class QualityCheckerPanelQt(QWidget):
         super().__init__(parent)
         
         self.tooltip_manager = tooltip_manager
-        self.checker = ImageQualityChecker()
+        self.checker = ImageQualityChecker(
+            analysis_cache=get_analysis_cache() if get_analysis_cache is not None else None)
         self.selected_files: List[str] = []
         self.current_report = None
         self.worker_thread = None
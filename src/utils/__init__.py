@@ -4,6 +4,7 @@ Includes caching, memory management, performance utilities, and image processing
 """
 
 from .cache_manager import CacheManager
+from .analysis_cache import AnalysisCache, content_hash, get_analysis_cache
 from .memory_manager import MemoryManager
 from .performance import PerformanceMonitor, PerformanceMetrics, LazyLoader, JobScheduler
 from .archive_handler import ArchiveHandler, ArchiveFormat
@@ -14,6 +15,9 @@ from . import image_processing
 
 __all__ = [
     'CacheManager',
+    'AnalysisCache',
+    'content_hash',
+    'get_analysis_cache',
     'MemoryManager',
     'PerformanceMonitor',
     'PerformanceMetrics',
@@ -0,0 +1,436 @@
+"""
+Analysis Cache - persistent, content-addressed cache for analysis results
+Author: Dead On The Inside / JosephsDeadish
+
+Results are keyed by a hash of the file contents plus a version string, so
+identical textures duplicated across game folders are analyzed once, and
+results survive restarts. Unchanged files are not even re-hashed: the digest
+is remembered per (path, size, mtime).
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    xxhash = None  # type: ignore[assignment]
+    HAS_XXHASH = False
+
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def content_hasher() -> Tuple[Any, str]:
+    """
+    New hasher for content digests and its algorithm prefix.
+
+    Uses xxh3-128 when xxhash is installed, otherwise BLAKE2b-128.
+    """
+    if HAS_XXHASH:
+        return xxhash.xxh3_128(), 'xxh3'
+    return hashlib.blake2b(digest_size=16), 'b2'
+
+
+def content_hash(file_path: Path) -> str:
+    """
+    Fast hash of a file's contents.
+
+    The algorithm (see content_hasher) is part of the returned string so
+    digests from different installs never collide in a shared cache.
+    """
+    hasher, prefix = content_hasher()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return f'{prefix}:{hasher.hexdigest()}'
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize numpy scalars/arrays found in analysis dicts"""
+    if HAS_NUMPY:
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _encode(value: Any) -> Tuple[str, bytes]:
+    """Encode a value as (codec, blob). Arrays use the .npy format, never pickle."""
+    if HAS_NUMPY and isinstance(value, np.ndarray):
+        buffer = io.BytesIO()
+        np.save(buffer, value, allow_pickle=False)
+        return 'npy', buffer.getvalue()
+    return 'json', json.dumps(value, default=_json_default).encode('utf-8')
+
+
+def _decode(codec: str, blob: bytes) -> Any:
+    if codec == 'npy':
+        return np.load(io.BytesIO(blob), allow_pickle=False)
+    return json.loads(blob.decode('utf-8'))
+
+
+class AnalysisCache:
+    """
+    Thread-safe, size-bounded LRU cache of analysis results stored in SQLite.
+
+    Each entry is addressed by (content digest, kind, version). ``kind`` names
+    the kind of result (see the constants below) and ``version`` should change
+    whenever the code or settings producing the result change.
+
+    Example:
+        >>> cache = AnalysisCache(Path('analysis_cache.db'))
+        >>> digest = cache.file_digest(path)
+        >>> result = cache.get(digest, AnalysisCache.ANALYSIS, 'v1')
+        >>> if result is None:
+        ...     result = analyze(path)
+        ...     cache.put(digest, AnalysisCache.ANALYSIS, result, 'v1')
+    """
+
+    CLASSIFICATION = 'classification'
+    ANALYSIS = 'analysis'
+    PHASH = 'phash'
+    EMBEDDING = 'embedding'
+    QUALITY = 'quality'
+
+    # Pending last-access updates are written in batches of this size
+    _TOUCH_BATCH = 256
+
+    def __init__(self, db_path: Path, max_size_mb: int = 256):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: SQLite file to store the cache in
+            max_size_mb: Maximum total size of cached values in megabytes
+        """
+        self.db_path = Path(db_path)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._kind_stats: Dict[str, Dict[str, int]] = {}
+        self._touched: Dict[Tuple[str, str, str], float] = {}
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30.0, check_same_thread=False)
+        try:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+        except sqlite3.DatabaseError as e:
+            logger.debug(f"Could not enable WAL mode for analysis cache: {e}")
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS entries (
+                    digest TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    codec TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (digest, kind, version)
+                )
+            ''')
+            self.conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS file_digests (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    digest TEXT NOT NULL
+                )
+            ''')
+        self.current_size = self.conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def file_digest(self, file_path: Path) -> str:
+        """
+        Content digest of a file, re-hashing only when its size or mtime changed.
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        key = str(file_path)
+        st = os.stat(key)
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT digest FROM file_digests WHERE path = ? AND size = ? AND mtime = ?',
+                (key, st.st_size, st.st_mtime)
+            ).fetchone()
+        if row is not None:
+            return row[0]
+
+        digest = content_hash(file_path)
+        with self.lock:
+            with self.conn:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO file_digests (path, size, mtime, digest) '
+                    'VALUES (?, ?, ?, ?)',
+                    (key, st.st_size, st.st_mtime, digest)
+                )
+        return digest
+
+    def get(self, digest: str, kind: str, version: str = '') -> Optional[Any]:
+        """
+        Get a cached result.
+
+        Args:
+            digest: Content digest from file_digest()
+            kind: Result kind (e.g. AnalysisCache.ANALYSIS)
+            version: Version of the code/settings that produced the result
+
+        Returns:
+            Cached value or None if not found
+        """
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT codec, value FROM entries WHERE digest = ? AND kind = ? AND version = ?',
+                (digest, kind, version)
+            ).fetchone()
+            stats = self._kind_stats.setdefault(kind, {'hits': 0, 'misses': 0})
+            if row is None:
+                self.misses += 1
+                stats['misses'] += 1
+                return None
+            self.hits += 1
+            stats['hits'] += 1
+            self._touched[(digest, kind, version)] = time.time()
+            if len(self._touched) >= self._TOUCH_BATCH:
+                self._flush_touches()
+        try:
+            return _decode(*row)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry ({kind}): {e}")
+            self.remove(digest, kind, version)
+            return None
+
+    def put(self, digest: str, kind: str, value: Any, version: str = ''):
+        """
+        Store a result, evicting least recently used entries if over budget.
+
+        Args:
+            digest: Content digest from file_digest()
+            kind: Result kind
+            value: JSON-serializable value or numpy array
+            version: Version of the code/settings that produced the result
+        """
+        try:
+            codec, blob = _encode(value)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Value for {kind} is not cacheable: {e}")
+            return
+
+        with self.lock:
+            with self.conn:
+                old = self.conn.execute(
+                    'SELECT size FROM entries WHERE digest = ? AND kind = ? AND version = ?',
+                    (digest, kind, version)
+                ).fetchone()
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO entries '
+                    '(digest, kind, version, codec, value, size, last_access) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (digest, kind, version, codec, blob, len(blob), time.time())
+                )
+            self.current_size += len(blob) - (old[0] if old else 0)
+            if self.current_size > self.max_size_bytes:
+                self._evict()
+
+    def get_file(self, file_path: Path, kind: str, version: str = '') -> Optional[Any]:
+        """Convenience wrapper: get() by file path (None if the file is unreadable)"""
+        try:
+            return self.get(self.file_digest(file_path), kind, version)
+        except OSError:
+            return None
+
+    def put_file(self, file_path: Path, kind: str, value: Any, version: str = ''):
+        """Convenience wrapper: put() by file path"""
+        try:
+            self.put(self.file_digest(file_path), kind, value, version)
+        except OSError:
+            pass
+
+    def _flush_touches(self):
+        """Write batched last-access times (caller holds the lock)"""
+        if not self._touched:
+            return
+        rows = [(t, d, k, v) for (d, k, v), t in self._touched.items()]
+        self._touched = {}
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    'UPDATE entries SET last_access = ? '
+                    'WHERE digest = ? AND kind = ? AND version = ?', rows)
+        except sqlite3.DatabaseError as e:
+            logger.debug(f"Could not update cache access times: {e}")
+
+    def _evict(self):
+        """Evict least recently used entries down to 90% of the budget (caller holds the lock)"""
+        self._flush_touches()
+        # Other processes share the file, so re-read the real total first
+        self.current_size = self.conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        target = int(self.max_size_bytes * 0.9)
+        while self.current_size > target:
+            rows = self.conn.execute(
+                'SELECT rowid, size FROM entries ORDER BY last_access LIMIT 256').fetchall()
+            if not rows:
+                break
+            freed, victims = 0, []
+            for rowid, size in rows:
+                victims.append((rowid,))
+                freed += size
+                if self.current_size - freed <= target:
+                    break
+            with self.conn:
+                self.conn.executemany('DELETE FROM entries WHERE rowid = ?', victims)
+            self.current_size -= freed
+            self.evictions += len(victims)
+        self._prune_digests()
+
+    def _prune_digests(self):
+        """Forget remembered file digests no cached result uses any more (caller holds the lock)"""
+        with self.conn:
+            self.conn.execute(
+                'DELETE FROM file_digests WHERE digest NOT IN (SELECT digest FROM entries)')
+
+    def remove(self, digest: str, kind: str, version: str = '') -> bool:
+        """
+        Remove one cached result.
+
+        Returns:
+            True if removed, False if not found
+        """
+        with self.lock:
+            with self.conn:
+                row = self.conn.execute(
+                    'SELECT size FROM entries WHERE digest = ? AND kind = ? AND version = ?',
+                    (digest, kind, version)
+                ).fetchone()
+                if row is None:
+                    return False
+                self.conn.execute(
+                    'DELETE FROM entries WHERE digest = ? AND kind = ? AND version = ?',
+                    (digest, kind, version)
+                )
+            self.current_size -= row[0]
+            self._touched.pop((digest, kind, version), None)
+            return True
+
+    def clear(self):
+        """Clear every cached result and remembered digest"""
+        with self.lock:
+            with self.conn:
+                self.conn.execute('DELETE FROM entries')
+                self.conn.execute('DELETE FROM file_digests')
+            self.current_size = 0
+            self._touched = {}
+
+    def get_stats(self) -> dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with cache stats, including per-kind hits and misses
+        """
+        with self.lock:
+            items = self.conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+            total_requests = self.hits + self.misses
+            return {
+                'size_mb': self.current_size / (1024 * 1024),
+                'max_size_mb': self.max_size_bytes / (1024 * 1024),
+                'items': items,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total_requests if total_requests > 0 else 0,
+                'evictions': self.evictions,
+                'usage_percent': (self.current_size / self.max_size_bytes) * 100
+                                 if self.max_size_bytes else 0,
+                'by_kind': {kind: dict(stats) for kind, stats in self._kind_stats.items()},
+            }
+
+    def close(self):
+        """Flush pending access times and close the connection"""
+        with self.lock:
+            if self.conn is None:
+                return
+            self._flush_touches()
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_shared_cache: Optional[AnalysisCache] = None
+_shared_pid: Optional[int] = None
+_shared_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    """Forget the parent's cache in a forked child (its SQLite handle and locks are not fork-safe)"""
+    global _shared_cache, _shared_pid, _shared_lock
+    _shared_cache = None
+    _shared_pid = None
+    _shared_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_analysis_cache() -> Optional[AnalysisCache]:
+    """
+    Process-wide AnalysisCache configured from the application settings.
+
+    Returns None when the cache is disabled (performance.analysis_cache_enabled)
+    or cannot be opened. The cache belongs to the process that opened it: a
+    forked sort-pipeline worker never reuses its parent's connection but
+    opens its own connection to the same file on first use.
+    """
+    global _shared_cache, _shared_pid
+    with _shared_lock:
+        if _shared_cache is not None and _shared_pid == os.getpid():
+            return _shared_cache
+        # Inherited from the parent through fork: drop it without closing,
+        # closing would touch the parent's SQLite state
+        _shared_cache = None
+        try:
+            try:
+                from ..config import config, CACHE_DIR
+            except ImportError:
+                from config import config, CACHE_DIR  # type: ignore[no-redef]
+            if not config.get('performance', 'analysis_cache_enabled', default=True):
+                return None
+            max_size_mb = config.get('performance', 'analysis_cache_mb', default=256)
+            _shared_cache = AnalysisCache(CACHE_DIR / 'analysis_cache.db', max_size_mb)
+            _shared_pid = os.getpid()
+        except Exception as e:
+            logger.warning(f"Analysis cache unavailable: {e}")
+            return None
+        return _shared_cache
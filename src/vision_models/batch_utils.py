@@ -0,0 +1,137 @@
+"""
+Batched Inference Helpers
+Shared by the vision models: image loading, a prefetching batch loader that
+decodes upcoming batches on worker threads while the current one runs, and
+reduced-precision (fp16/bf16 autocast, int8 dynamic quantization) setup.
+Author: Dead On The Inside / JosephsDeadish
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+except OSError:
+    # Handle DLL initialization errors (e.g., missing CUDA DLLs)
+    TORCH_AVAILABLE = False
+
+# Supported values for the models' ``precision`` argument
+PRECISIONS = ('fp32', 'fp16', 'bf16', 'int8')
+
+
+def load_rgb(image: Any) -> 'Image.Image':
+    """Open a path (str or Path), numpy array or PIL image as an RGB PIL image."""
+    if isinstance(image, (str, Path)):
+        with Image.open(image) as img:
+            return img.convert('RGB')
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    return image if image.mode == 'RGB' else image.convert('RGB')
+
+
+def prefetch_batches(
+    items: Iterable[Any],
+    batch_size: int,
+    prepare: Callable[[List[Any]], Any],
+    prefetch: int = 2,
+) -> Iterator[Tuple[List[Any], Any]]:
+    """
+    Split ``items`` into batches and run ``prepare`` on upcoming batches in
+    background threads so decoding overlaps with inference.
+
+    Image decoding and resizing release the GIL, so the loader threads run
+    alongside the forward pass of the batch being consumed.
+
+    Args:
+        items: Images or paths; any iterable, consumed lazily
+        batch_size: Items per batch
+        prepare: Callable turning a list of items into a model input
+        prefetch: Batches prepared ahead of the consumer (0 = no threads)
+
+    Yields:
+        Tuples of (batch items, prepared input) in input order
+    """
+    batch_size = max(1, int(batch_size))
+    iterator = iter(items)
+    chunks = iter(lambda: list(islice(iterator, batch_size)), [])
+
+    if prefetch <= 0:
+        for chunk in chunks:
+            yield chunk, prepare(chunk)
+        return
+
+    pool = ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix='batch-prefetch')
+    pending: deque = deque()
+    try:
+        for chunk in islice(chunks, prefetch):
+            pending.append((chunk, pool.submit(prepare, chunk)))
+        while pending:
+            chunk, future = pending.popleft()
+            upcoming = next(chunks, None)
+            if upcoming is not None:
+                pending.append((upcoming, pool.submit(prepare, upcoming)))
+            yield chunk, future.result()
+    finally:
+        # Consumer stopped early or a batch failed: drop queued work
+        for _, future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
+def apply_precision(model: 'torch.nn.Module', precision: str, device: str) -> 'torch.nn.Module':
+    """
+    Prepare a model for the requested inference precision.
+
+    'int8' applies dynamic quantization to Linear layers (CPU only); the
+    fp16/bf16 modes keep fp32 weights and run under autocast, see
+    inference_context().
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+    if precision == 'int8':
+        if device != 'cpu':
+            logger.warning("int8 dynamic quantization is CPU-only; using fp32 on %s", device)
+            return model
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def inference_context(device: str, precision: str = 'fp32'):
+    """Context for a forward pass: inference mode plus autocast for fp16/bf16."""
+    stack = contextlib.ExitStack()
+    stack.enter_context(torch.inference_mode())
+    if precision in ('fp16', 'bf16'):
+        dtype = torch.float16 if precision == 'fp16' else torch.bfloat16
+        device_type = 'cuda' if str(device).startswith('cuda') else 'cpu'
+        stack.enter_context(torch.autocast(device_type=device_type, dtype=dtype))
+    return stack
+
+
+def to_numpy(features: 'torch.Tensor') -> 'np.ndarray':
+    """Move model output to a float32 numpy array."""
+    return features.float().cpu().numpy()
@@ -7,7 +7,7 @@ Author: Dead On The Inside / JosephsDeadish
 from __future__ import annotations
 
 import logging
-from typing import List, Dict, Any, Optional, Union, Tuple
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Union, Tuple
 try:
     import numpy as np
     HAS_NUMPY = True
@@ -53,6 +53,10 @@ except ImportError:
     OPEN_CLIP_AVAILABLE = False
     logger.debug("open_clip not available. Using transformers CLIP.")
 
+from .batch_utils import (
+    apply_precision, inference_context, load_rgb, prefetch_batches, to_numpy,
+)
+
 
 class CLIPModel:
     """
@@ -69,7 +73,8 @@ class CLIPModel:
         self,
         model_name: str = 'openai/clip-vit-base-patch32',
         device: Optional[str] = None,
-        use_open_clip: bool = False
+        use_open_clip: bool = False,
+        precision: str = 'fp32'
     ):
         """
         Initialize CLIP model.
@@ -78,6 +83,8 @@ class CLIPModel:
             model_name: HuggingFace model name or open_clip model name
             device: Device to use ('cuda', 'cpu', or None for auto)
             use_open_clip: Use open_clip instead of transformers
+            precision: Image inference precision: 'fp32', 'fp16'/'bf16'
+                (autocast) or 'int8' (dynamic quantization, CPU only)
         """
         if not TORCH_AVAILABLE:
             raise RuntimeError("PyTorch is required for CLIP model")
@@ -98,6 +105,9 @@ class CLIPModel:
         else:
             self._load_transformers_clip(model_name)
         
+        self.precision = precision
+        self.model = apply_precision(self.model, precision, self.device)
+        
         logger.info(f"CLIP model loaded: {model_name}")
     
     def _load_transformers_clip(self, model_name: str):
@@ -142,24 +152,43 @@ class CLIPModel:
         Returns:
             Image embedding as numpy array
         """
-        # Load image if path
-        if isinstance(image, Path):
-            image = Image.open(image).convert('RGB')
-        elif isinstance(image, np.ndarray):
-            image = Image.fromarray(image)
+        return self.encode_pixel_batch([image])[0]
+    
+    def encode_pixel_batch(self, images: List[Union[np.ndarray, Image.Image, Path]]) -> np.ndarray:
+        """
+        Preprocess and encode a list of images in one forward pass.
         
-        with torch.no_grad():
+        Used by callers that decode (and share) images themselves, such as
+        CombinedFeatureExtractor.
+        
+        Args:
+            images: Images (numpy arrays, PIL Images or Paths)
+            
+        Returns:
+            Array of normalized embeddings (N, embedding_dim)
+        """
+        return self._encode_pixels(self._prepare_batch(images))
+    
+    def _prepare_batch(self, images: List[Union[np.ndarray, Image.Image, Path]]) -> 'torch.Tensor':
+        """Decode and preprocess images into one (N, C, H, W) pixel tensor."""
+        pil_images = [load_rgb(img) for img in images]
+        if self.use_open_clip:
+            return torch.stack([self.processor(img) for img in pil_images])
+        return self.processor(images=pil_images, return_tensors="pt")['pixel_values']
+    
+    def _encode_pixels(self, pixels: 'torch.Tensor') -> np.ndarray:
+        """One forward pass over a preprocessed batch; returns normalized embeddings."""
+        with inference_context(self.device, self.precision):
+            pixels = pixels.to(self.device)
             if self.use_open_clip:
-                image_input = self.processor(image).unsqueeze(0).to(self.device)
-                embedding = self.model.encode_image(image_input)
+                embedding = self.model.encode_image(pixels)
             else:
-                inputs = self.processor(images=image, return_tensors="pt").to(self.device)
-                embedding = self.model.get_image_features(**inputs)
+                embedding = self.model.get_image_features(pixel_values=pixels)
             
             # Normalize embedding
-            embedding = F.normalize(embedding, p=2, dim=-1)
-            
-            return embedding.cpu().numpy()[0]
+            embedding = F.normalize(embedding.float(), p=2, dim=-1)
+        
+        return to_numpy(embedding)
     
     def encode_text(
         self,
@@ -294,28 +323,46 @@ class CLIPModel:
     def batch_encode_images(
         self,
         images: List[Union[np.ndarray, Image.Image, Path]],
-        batch_size: int = 32
+        batch_size: int = 32,
+        prefetch: int = 2
     ) -> np.ndarray:
         """
         Encode multiple images in batches.
         
+        Each batch is preprocessed into a single tensor and encoded with one
+        forward pass; the next batches are decoded in the background
+        meanwhile.
+        
         Args:
             images: List of images
             batch_size: Batch size for processing
+            prefetch: Batches decoded ahead of the model (0 = decode inline)
             
         Returns:
             Array of image embeddings (N, embedding_dim)
         """
-        embeddings = []
+        return np.concatenate(list(self.iter_encode_images(images, batch_size, prefetch))
+                              or [np.empty((0, 0), dtype=np.float32)])
+    
+    def iter_encode_images(
+        self,
+        images: Iterable[Union[np.ndarray, Image.Image, Path]],
+        batch_size: int = 32,
+        prefetch: int = 2
+    ) -> Iterator[np.ndarray]:
+        """
+        Streaming variant of batch_encode_images.
         
-        for i in range(0, len(images), batch_size):
-            batch = images[i:i + batch_size]
+        Args:
+            images: Iterable of images, consumed lazily
+            batch_size: Batch size for processing
+            prefetch: Batches decoded ahead of the model
             
-            # Process batch
-            batch_embeddings = [self.encode_image(img) for img in batch]
-            embeddings.extend(batch_embeddings)
-        
-        return np.array(embeddings)
+        Yields:
+            Embedding arrays (batch, embedding_dim), one per batch, in order
+        """
+        for _, pixels in prefetch_batches(images, batch_size, self._prepare_batch, prefetch):
+            yield self._encode_pixels(pixels)
     
     @staticmethod
     def _softmax(x: np.ndarray, temperature: float = 1.0) -> np.ndarray:
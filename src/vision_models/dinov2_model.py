@@ -7,7 +7,7 @@ Author: Dead On The Inside / JosephsDeadish
 from __future__ import annotations
 
 import logging
-from typing import List, Union, Optional
+from typing import Iterable, Iterator, List, Union, Optional
 try:
     import numpy as np
     HAS_NUMPY = True
@@ -36,6 +36,10 @@ except Exception as e:
     logger.warning(f"Unexpected error loading dependencies: {e}")
     logger.warning("DINOv2 model will be disabled.")
 
+from .batch_utils import (
+    apply_precision, inference_context, load_rgb, prefetch_batches, to_numpy,
+)
+
 
 class DINOv2Model:
     """
@@ -47,13 +51,16 @@ class DINOv2Model:
     - No text supervision needed
     """
     
-    def __init__(self, model_name: str = 'dinov2_vits14', device: Optional[str] = None):
+    def __init__(self, model_name: str = 'dinov2_vits14', device: Optional[str] = None,
+                 precision: str = 'fp32'):
         """
         Initialize DINOv2 model.
         
         Args:
             model_name: Model variant ('dinov2_vits14', 'dinov2_vitb14', 'dinov2_vitl14')
             device: Device to use ('cuda', 'cpu', or None for auto)
+            precision: Inference precision: 'fp32', 'fp16'/'bf16' (autocast)
+                or 'int8' (dynamic quantization, CPU only)
         """
         if not TORCH_AVAILABLE:
             raise RuntimeError("PyTorch is required for DINOv2 model")
@@ -71,6 +78,17 @@ class DINOv2Model:
         self.model = torch.hub.load('facebookresearch/dinov2', model_name)
         self.model = self.model.to(self.device)
         self.model.eval()
+        self.precision = precision
+        self.model = apply_precision(self.model, precision, self.device)
+        
+        # Preprocessing pipeline, built once
+        from torchvision import transforms
+        self.transform = transforms.Compose([
+            transforms.Resize(256),
+            transforms.CenterCrop(224),
+            transforms.ToTensor(),
+            transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+        ])
         
         logger.info(f"DINOv2 model loaded: {model_name}")
     
@@ -84,25 +102,62 @@ class DINOv2Model:
         Returns:
             Feature vector as numpy array
         """
-        # Load image if path
-        if isinstance(image, Path):
-            image = Image.open(image).convert('RGB')
-        elif isinstance(image, np.ndarray):
-            image = Image.fromarray(image)
-        
-        # Preprocess
-        from torchvision import transforms
-        transform = transforms.Compose([
-            transforms.Resize(256),
-            transforms.CenterCrop(224),
-            transforms.ToTensor(),
-            transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-        ])
+        return self.encode_pixel_batch([image])[0]
+    
+    def encode_pixel_batch(self, images: List[Union[np.ndarray, Image.Image, Path]]) -> np.ndarray:
+        """
+        Encode already loaded images with a single forward pass, without
+        the prefetching of iter_encode_images.
         
-        img_tensor = transform(image).unsqueeze(0).to(self.device)
+        Args:
+            images: Images (numpy arrays, PIL Images or Paths)
+            
+        Returns:
+            Array of feature vectors (N, feature_dim)
+        """
+        return self._encode_pixels(self._prepare_batch(images))
+    
+    def batch_encode_images(
+        self,
+        images: List[Union[np.ndarray, Image.Image, Path]],
+        batch_size: int = 32,
+        prefetch: int = 2
+    ) -> np.ndarray:
+        """
+        Encode multiple images in batches, one forward pass per batch.
         
-        # Extract features
-        with torch.no_grad():
-            features = self.model(img_tensor)
+        Args:
+            images: List of images
+            batch_size: Batch size for processing
+            prefetch: Batches decoded ahead of the model (0 = decode inline)
+            
+        Returns:
+            Array of feature vectors (N, feature_dim)
+        """
+        return np.concatenate(list(self.iter_encode_images(images, batch_size, prefetch))
+                              or [np.empty((0, 0), dtype=np.float32)])
+    
+    def iter_encode_images(
+        self,
+        images: Iterable[Union[np.ndarray, Image.Image, Path]],
+        batch_size: int = 32,
+        prefetch: int = 2
+    ) -> Iterator[np.ndarray]:
+        """
+        Streaming variant of batch_encode_images.
         
-        return features.cpu().numpy()[0]
+        Yields:
+            Feature arrays (batch, feature_dim), one per batch, in order
+        """
+        for _, pixels in prefetch_batches(images, batch_size, self._prepare_batch, prefetch):
+            yield self._encode_pixels(pixels)
+    
+    def _prepare_batch(self, images: List[Union[np.ndarray, Image.Image, Path]]) -> 'torch.Tensor':
+        """Decode and preprocess images into one (N, C, H, W) tensor."""
+        return torch.stack([self.transform(load_rgb(img)) for img in images])
+    
+    def _encode_pixels(self, pixels: 'torch.Tensor') -> np.ndarray:
+        """One forward pass over a preprocessed batch."""
+        with inference_context(self.device, self.precision):
+            features = self.model(pixels.to(self.device))
+        return to_numpy(features)
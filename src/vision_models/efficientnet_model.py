@@ -11,7 +11,7 @@ as it causes source access errors in packaged builds.
 from __future__ import annotations
 
 import logging
-from typing import List, Union, Optional
+from typing import Iterable, Iterator, List, Union, Optional
 try:
     import numpy as np
     HAS_NUMPY = True
@@ -41,6 +41,10 @@ except Exception as e:
     logger.warning(f"Unexpected error loading dependencies: {e}")
     logger.warning("EfficientNet model will be disabled.")
 
+from .batch_utils import (
+    apply_precision, inference_context, load_rgb, prefetch_batches, to_numpy,
+)
+
 
 class EfficientNetModel:
     """EfficientNet or ResNet model for texture classification."""
@@ -49,9 +53,19 @@ class EfficientNetModel:
         self,
         model_name: str = 'efficientnet_b0',
         pretrained: bool = True,
-        device: Optional[str] = None
+        device: Optional[str] = None,
+        precision: str = 'fp32'
     ):
-        """Initialize EfficientNet/ResNet model."""
+        """
+        Initialize EfficientNet/ResNet model.
+        
+        Args:
+            model_name: timm model name
+            pretrained: Load pretrained weights
+            device: Device to use ('cuda', 'cpu', or None for auto)
+            precision: Inference precision: 'fp32', 'fp16'/'bf16' (autocast)
+                or 'int8' (dynamic quantization, CPU only)
+        """
         if not AVAILABLE:
             raise RuntimeError("timm and PyTorch required")
         
@@ -66,6 +80,8 @@ class EfficientNetModel:
         self.model = timm.create_model(model_name, pretrained=pretrained, num_classes=0)
         self.model = self.model.to(self.device)
         self.model.eval()  # Standard eval mode only, no TorchScript compilation
+        self.precision = precision
+        self.model = apply_precision(self.model, precision, self.device)
         
         # Get data config for preprocessing
         self.data_config = timm.data.resolve_model_data_config(self.model)
@@ -75,14 +91,53 @@ class EfficientNetModel:
     
     def encode_image(self, image: Union[np.ndarray, Image.Image, Path]) -> np.ndarray:
         """Encode image to feature vector."""
-        if isinstance(image, Path):
-            image = Image.open(image).convert('RGB')
-        elif isinstance(image, np.ndarray):
-            image = Image.fromarray(image)
-        
-        img_tensor = self.transforms(image).unsqueeze(0).to(self.device)
+        return self.encode_pixel_batch([image])[0]
+    
+    def encode_pixel_batch(self, images: List[Union[np.ndarray, Image.Image, Path]]) -> np.ndarray:
+        """Encode a list of images in one forward pass; returns (N, feature_dim)."""
+        return self._encode_pixels(self._prepare_batch(images))
+    
+    def batch_encode_images(
+        self,
+        images: List[Union[np.ndarray, Image.Image, Path]],
+        batch_size: int = 32,
+        prefetch: int = 2
+    ) -> np.ndarray:
+        """
+        Encode multiple images in batches, one forward pass per batch.
         
-        with torch.no_grad():
-            features = self.model(img_tensor)
+        Args:
+            images: List of images
+            batch_size: Batch size for processing
+            prefetch: Batches decoded ahead of the model (0 = decode inline)
+            
+        Returns:
+            Array of feature vectors (N, feature_dim)
+        """
+        return np.concatenate(list(self.iter_encode_images(images, batch_size, prefetch))
+                              or [np.empty((0, 0), dtype=np.float32)])
+    
+    def iter_encode_images(
+        self,
+        images: Iterable[Union[np.ndarray, Image.Image, Path]],
+        batch_size: int = 32,
+        prefetch: int = 2
+    ) -> Iterator[np.ndarray]:
+        """
+        Streaming variant of batch_encode_images.
         
-        return features.cpu().numpy()[0]
+        Yields:
+            Feature arrays (batch, feature_dim), one per batch, in order
+        """
+        for _, pixels in prefetch_batches(images, batch_size, self._prepare_batch, prefetch):
+            yield self._encode_pixels(pixels)
+    
+    def _prepare_batch(self, images: List[Union[np.ndarray, Image.Image, Path]]) -> 'torch.Tensor':
+        """Decode and preprocess images into one (N, C, H, W) tensor."""
+        return torch.stack([self.transforms(load_rgb(img)) for img in images])
+    
+    def _encode_pixels(self, pixels: 'torch.Tensor') -> np.ndarray:
+        """One forward pass over a preprocessed batch."""
+        with inference_context(self.device, self.precision):
+            features = self.model(pixels.to(self.device))
+        return to_numpy(features)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Alpha correction tests: compiled preset LUTs against rule-by-rule
+application, and the batch engine on a small texture tree (worker parity,
+output layout, checkpoint resume).
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from preprocessing.alpha_correction import AlphaCorrector, AlphaCorrectionPresets  # noqa: E402
+
+
+def _apply_rules(alpha, thresholds, preserve_gradients):
+    """The per-rule masking correct_alpha() did before presets were compiled"""
+    alpha = alpha.astype(np.int64)
+    for min_val, max_val, target in thresholds:
+        if target is None:
+            continue
+        mask = (alpha >= min_val) & (alpha <= max_val)
+        if preserve_gradients and (max_val - min_val) > 50:
+            mask &= np.abs(alpha - target) > 20
+        alpha[mask] = target
+    return alpha.astype(np.uint8)
+
+
+def _rgba(alpha):
+    rgb = np.full(alpha.shape + (3,), 120, dtype=np.uint8)
+    return np.dstack([rgb, alpha.astype(np.uint8)])
+
+
+def _make_tree(root):
+    """in/a.png and in/sub/b.png need fixing, opaque.png does not, rgb.png has no alpha"""
+    (root / 'sub').mkdir(parents=True)
+    Image.fromarray(_rgba(np.arange(256).reshape(16, 16)), 'RGBA').save(root / 'a.png')
+    rng = np.random.default_rng(0)
+    Image.fromarray(_rgba(rng.integers(0, 256, (16, 16))), 'RGBA').save(root / 'sub' / 'b.png')
+    Image.fromarray(_rgba(np.full((16, 16), 255)), 'RGBA').save(root / 'opaque.png')
+    Image.new('RGB', (16, 16)).save(root / 'rgb.png')
+    return sorted(p for p in root.rglob('*.png'))
+
+
+def _outputs(out_dir):
+    return {str(p.relative_to(out_dir)): np.asarray(Image.open(p))
+            for p in sorted(out_dir.rglob('*.png'))}
+
+
+def test_compiled_presets_match_rules(tmp_path):
+    """Every preset's LUT gives the same alpha as applying its rules in order"""
+    alpha = np.arange(256, dtype=np.uint8).reshape(16, 16)
+    corrector = AlphaCorrector()
+    for name in AlphaCorrectionPresets.list_presets():
+        thresholds = AlphaCorrectionPresets.get_preset(name)['thresholds']
+        for preserve_gradients in (False, True):
+            corrected, _ = corrector.correct_alpha(_rgba(alpha), preset=name,
+                                                   preserve_gradients=preserve_gradients)
+            np.testing.assert_array_equal(corrected[:, :, 3],
+                                          _apply_rules(alpha, thresholds, preserve_gradients),
+                                          err_msg=name)
+
+
+def test_batch_jobs_parity(tmp_path):
+    """One worker and a process pool write the same files and results"""
+    paths = _make_tree(tmp_path / 'in')
+    runs = []
+    for jobs in (1, 2):
+        out_dir = tmp_path / f'out_{jobs}'
+        results = AlphaCorrector().process_batch(paths, output_dir=out_dir, jobs=jobs)
+        runs.append((results, _outputs(out_dir)))
+
+    (serial, serial_files), (parallel, parallel_files) = runs
+    assert [r['path'] for r in serial] == [str(p) for p in paths]
+    assert [(r['path'], r['success'], r.get('modified')) for r in parallel] == \
+        [(r['path'], r['success'], r.get('modified')) for r in serial]
+    assert sorted(serial_files) == ['a.png', os.path.join('sub', 'b.png')]
+    assert sorted(parallel_files) == sorted(serial_files)
+    for name, pixels in serial_files.items():
+        np.testing.assert_array_equal(parallel_files[name], pixels)
+        assert set(np.unique(pixels[:, :, 3]).tolist()) <= {0, 255}
+
+
+def test_checkpoint_resume(tmp_path):
+    """An interrupted run resumes after the last finished file"""
+    paths = _make_tree(tmp_path / 'in')
+    out_dir = tmp_path / 'out'
+    checkpoint = tmp_path / 'alpha.checkpoint'
+    results_path = tmp_path / 'alpha.jsonl'
+    corrector = AlphaCorrector()
+
+    first = corrector.iter_process_batch(paths, output_dir=out_dir, checkpoint_path=checkpoint,
+                                         results_path=results_path)
+    assert next(first)['path'] == str(paths[0])
+    first.close()
+    assert checkpoint.read_text(encoding='utf-8').splitlines() == [str(paths[0])]
+
+    resumed = corrector.process_batch(paths, output_dir=out_dir, checkpoint_path=checkpoint,
+                                      results_path=results_path)
+    assert [r['path'] for r in resumed] == [str(p) for p in paths[1:]]
+    with open(results_path, encoding='utf-8') as f:
+        assert [json.loads(line)['path'] for line in f] == [str(p) for p in paths]
+    written = {p: p.stat().st_mtime_ns for p in out_dir.rglob('*.png')}
+
+    # Only the failed RGB file is retried
+    again = corrector.process_batch(paths, output_dir=out_dir, checkpoint_path=checkpoint)
+    assert [(Path(r['path']).name, r['success']) for r in again] == [('rgb.png', False)]
+    assert {p: p.stat().st_mtime_ns for p in out_dir.rglob('*.png')} == written
+
+
+if __name__ == "__main__":
+    import tempfile
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✅ {name}")
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AnalysisCache tests: LRU eviction keeps both the results and the remembered
+per-path digests within bounds.
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from utils.analysis_cache import AnalysisCache  # noqa: E402
+
+
+def test_eviction_prunes_file_digests(tmp_path):
+    """Digests of files whose results were all evicted are forgotten too"""
+    files = []
+    for i in range(40):
+        path = tmp_path / f'tex_{i}.bin'
+        path.write_bytes(os.urandom(64))
+        files.append(path)
+
+    with AnalysisCache(tmp_path / 'cache.db', max_size_mb=1) as cache:
+        for path in files:
+            cache.put_file(path, AnalysisCache.ANALYSIS, 'x' * 100_000)
+        assert cache.evictions > 0
+        live = {row[0] for row in cache.conn.execute('SELECT digest FROM entries')}
+        remembered = cache.conn.execute('SELECT path, digest FROM file_digests').fetchall()
+        assert 0 < len(remembered) < len(files)
+        assert {digest for _, digest in remembered} == live
+        # The most recent file is still cached and still skips re-hashing
+        assert cache.get_file(files[-1], AnalysisCache.ANALYSIS) == 'x' * 100_000
+        assert cache.get_file(files[0], AnalysisCache.ANALYSIS) is None
+
+
+if __name__ == "__main__":
+    import tempfile
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✅ {name}")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BackgroundRemover.iter_batch_process tests with stub rembg sessions: input
+order across several sessions, undecodable inputs, and the fallback from
+batched U²-Net calls to one rembg call per image.
+"""
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from tools import background_remover  # noqa: E402
+from tools.background_remover import BackgroundRemover  # noqa: E402
+
+
+class _Input:
+    name = 'input.1'
+    shape = ['batch_size', 3, 320, 320]
+
+
+class _InnerSession:
+    """ONNX Runtime stand-in: the mask is the input's first channel"""
+
+    def __init__(self, owner):
+        self.owner = owner
+
+    def get_inputs(self):
+        return [_Input()]
+
+    def run(self, outputs, feed):
+        inputs = feed[_Input.name]
+        if self.owner.reject_batches and len(inputs) > 1:
+            raise RuntimeError("Got invalid dimensions for input: batch_size")
+        with self.owner.lock:
+            self.owner.batched_calls.append(len(inputs))
+            self.owner.used.add(id(self))
+        # Later batches finish first, so the pool completes out of order
+        time.sleep(0.02 / (1 + len(self.owner.batched_calls)))
+        return [inputs[:, :1]]
+
+
+class _Stubs:
+    """Replaces rembg's new_session() and remove() in background_remover"""
+
+    def __init__(self, reject_batches=False):
+        self.reject_batches = reject_batches
+        self.lock = threading.Lock()
+        self.batched_calls = []
+        self.single_calls = []
+        self.used = set()
+
+    def new_session(self, model_name):
+        session = type('Session', (), {})()
+        session.inner_session = _InnerSession(self)
+        return session
+
+    def remove(self, image, session=None, **kwargs):
+        with self.lock:
+            self.single_calls.append(image.size)
+            self.used.add(id(session.inner_session))
+        return image.convert('RGBA')
+
+    def __enter__(self):
+        self.saved = (background_remover.HAS_REMBG, getattr(background_remover, 'new_session', None),
+                      getattr(background_remover, 'remove', None))
+        background_remover.HAS_REMBG = True
+        background_remover.new_session = self.new_session
+        background_remover.remove = self.remove
+        return self
+
+    def __exit__(self, *exc):
+        (background_remover.HAS_REMBG, background_remover.new_session,
+         background_remover.remove) = self.saved
+
+
+def _make_inputs(root, count=9):
+    """Images with distinct sizes, plus an undecodable file in the middle"""
+    root.mkdir(parents=True)
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(count):
+        pixels = rng.integers(0, 256, (20 + i, 30 + 2 * i, 3), dtype=np.uint8)
+        path = root / f'tex_{i}.png'
+        Image.fromarray(pixels).save(path)
+        paths.append(path)
+    broken = root / 'broken.png'
+    broken.write_bytes(b'not an image')
+    paths.insert(4, broken)
+    return paths
+
+
+def _check_results(results, paths, out_dir):
+    assert [r.input_path for r in results] == [str(p) for p in paths]
+    for path, result in zip(paths, results):
+        if path.name == 'broken.png':
+            assert not result.success and result.error_message
+            assert not Path(result.output_path).exists()
+            continue
+        assert result.success, result.error_message
+        assert Path(result.output_path) == out_dir / f'{path.stem}_nobg.png'
+        with Image.open(path) as source, Image.open(result.output_path) as output:
+            assert result.original_size == result.output_size == source.size == output.size
+            assert output.mode == 'RGBA'
+
+
+def test_batched_sessions_keep_input_order(tmp_path):
+    """Batches spread over several sessions come back in input order"""
+    paths = _make_inputs(tmp_path / 'in')
+    with _Stubs() as stubs:
+        remover = BackgroundRemover()
+        remover.edge_refinement = 0.0
+        progress = []
+        results = remover.batch_process(
+            [str(p) for p in paths], str(tmp_path / 'out'),
+            progress_callback=lambda i, total, name: progress.append((i, total, name)),
+            sessions=3, batch_size=2, prefetch=1)
+    _check_results(results, paths, tmp_path / 'out')
+    assert progress == [(i + 1, len(paths), p.name) for i, p in enumerate(paths)]
+    # The broken file leaves one image in its batch; every call was batched
+    assert sorted(stubs.batched_calls) == [1, 2, 2, 2, 2]
+    assert stubs.single_calls == [] and len(stubs.used) == 3
+
+    # The batched mask follows the U²-Net input, scaled back to the image size
+    with Image.open(results[0].output_path) as output:
+        assert np.asarray(output)[..., 3].std() > 0
+
+
+def test_fallback_to_single_image_calls(tmp_path):
+    """A session that rejects batched input falls back to rembg.remove per image"""
+    paths = _make_inputs(tmp_path / 'in')
+    with _Stubs(reject_batches=True) as stubs:
+        remover = BackgroundRemover()
+        remover.edge_refinement = 0.0
+        results = remover.batch_process([str(p) for p in paths], str(tmp_path / 'out'),
+                                        sessions=1, batch_size=3)
+    _check_results(results, paths, tmp_path / 'out')
+    assert stubs.batched_calls == []
+    with Image.open(paths[0]) as first:
+        assert stubs.single_calls[0] == first.size
+    assert len(stubs.single_calls) == len(paths) - 1
+
+
+if __name__ == "__main__":
+    import tempfile
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✅ {name}")
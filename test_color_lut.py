@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D LUT tests: .cube files are compiled through a temporary LUT cache and
+applied with tetrahedral interpolation, the dense table and batch_process.
+"""
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from tools import color_corrector  # noqa: E402
+from tools.color_corrector import ColorCorrector, CompiledLUT  # noqa: E402
+
+
+def _affine(rgb):
+    """A color transform every 3D LUT interpolates exactly"""
+    rgb = np.asarray(rgb, dtype=np.float64)
+    return np.stack([255.0 - rgb[..., 0], (rgb[..., 0] + rgb[..., 1]) / 2.0,
+                     rgb[..., 2] * 0.8 + 20.0], axis=-1)
+
+
+def _write_cube(path, size, transform):
+    """.cube text with red varying fastest"""
+    grid = np.linspace(0.0, 255.0, size)
+    lines = [f'LUT_3D_SIZE {size}']
+    for b in grid:
+        for g in grid:
+            for r in grid:
+                lines.append(' '.join(f'{v / 255.0:.6f}' for v in transform(np.array([r, g, b]))))
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return path
+
+
+def _pixels(shape=(32, 32), seed=0):
+    return np.random.default_rng(seed).integers(0, 256, shape + (4,), dtype=np.uint8)
+
+
+def test_identity_and_affine_cubes(tmp_path):
+    """An identity cube changes nothing and an affine one matches its formula"""
+    color_corrector._compiled_luts.clear()
+    corrector = ColorCorrector(lut_cache_dir=tmp_path / 'cache')
+    pixels = _pixels()
+
+    identity = corrector.compile_lut(str(_write_cube(tmp_path / 'identity.cube', 18, lambda c: c)))
+    np.testing.assert_array_equal(identity.apply_array(pixels), pixels)
+
+    affine = corrector.compile_lut(str(_write_cube(tmp_path / 'affine.cube', 17, _affine)))
+    result = affine.apply_array(pixels)
+    assert np.abs(result[..., :3] - _affine(pixels[..., :3])).max() <= 1.0
+    np.testing.assert_array_equal(result[..., 3], pixels[..., 3])
+
+
+def test_dense_table_matches_interpolation(tmp_path):
+    """The baked 24-bit table gives the interpolated colors at any strength"""
+    cube = np.random.default_rng(1).integers(0, 256, (9, 9, 9, 3), dtype=np.uint8)
+    pixels = _pixels(seed=2)
+    sparse = CompiledLUT(cube, 'b2:test')
+    dense = CompiledLUT(cube, 'b2:test')
+    dense.build_dense(tmp_path)
+    assert (tmp_path / 'b2_test.dense.npy').exists()
+    for strength in (1.0, 0.5, 0.0):
+        np.testing.assert_array_equal(dense.apply_array(pixels, strength),
+                                      sparse.apply_array(pixels, strength))
+
+    reloaded = CompiledLUT(cube, 'b2:test')
+    assert isinstance(reloaded.build_dense(tmp_path), np.memmap)
+    np.testing.assert_array_equal(reloaded.apply_array(pixels), sparse.apply_array(pixels))
+
+
+def test_compiled_cube_disk_cache(tmp_path):
+    """A compiled cube is reused from the cache until the .cube file changes"""
+    color_corrector._compiled_luts.clear()
+    cube_path = _write_cube(tmp_path / 'look.cube', 5, _affine)
+    cache_dir = tmp_path / 'cache'
+    first = ColorCorrector(lut_cache_dir=cache_dir).compile_lut(str(cube_path))
+    cached = cache_dir / f"{first.digest.replace(':', '_')}.npy"
+    np.testing.assert_array_equal(np.load(cached), first.cube)
+
+    # A fresh process would find the cube on disk instead of parsing the file
+    color_corrector._compiled_luts.clear()
+    np.save(cached, np.zeros_like(first.cube))
+    again = ColorCorrector(lut_cache_dir=cache_dir).compile_lut(str(cube_path))
+    assert again.digest == first.digest and not again.cube.any()
+
+    _write_cube(cube_path, 5, lambda c: c)
+    changed = ColorCorrector(lut_cache_dir=cache_dir).compile_lut(str(cube_path))
+    assert changed.digest != first.digest
+    assert changed.cube[4, 0, 0].tolist() == [255, 0, 0]
+
+
+def test_batch_process_outputs(tmp_path):
+    """batch_process writes one corrected file per readable input, for any worker count"""
+    color_corrector._compiled_luts.clear()
+    cube_path = _write_cube(tmp_path / 'look.cube', 17, _affine)
+    in_dir = tmp_path / 'in'
+    in_dir.mkdir()
+    inputs = []
+    for i in range(4):
+        path = in_dir / f'tex_{i}.png'
+        Image.fromarray(_pixels((16, 16), seed=i), 'RGBA').save(path)
+        inputs.append(str(path))
+    (in_dir / 'broken.png').write_bytes(b'not an image')
+    inputs.append(str(in_dir / 'broken.png'))
+
+    corrector = ColorCorrector(lut_cache_dir=tmp_path / 'cache')
+    expected = corrector.compile_lut(str(cube_path))
+    outputs = {}
+    # The second two-worker run overwrites the first one's files in place
+    for workers in (1, 2, 2):
+        out_dir = tmp_path / f'out_{workers}'
+        done, errors = corrector.batch_process(inputs, str(out_dir), {'lut_path': str(cube_path)},
+                                               max_workers=workers)
+        assert done == 4 and len(errors) == 1 and 'broken.png' in errors[0]
+        outputs[workers] = {p.name: np.asarray(Image.open(p)) for p in sorted(out_dir.iterdir())}
+
+    assert sorted(outputs[1]) == [f'tex_{i}.png' for i in range(4)]
+    for name, pixels in outputs[1].items():
+        np.testing.assert_array_equal(outputs[2][name], pixels)
+        source = np.asarray(Image.open(in_dir / name))
+        np.testing.assert_array_equal(pixels, expected.apply_array(source))
+
+
+if __name__ == "__main__":
+    import tempfile
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✅ {name}")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CombinedFeatureExtractor.extract_features_batch tests with stub models: a
+model that fails on a batch must not leave short vectors in the output or
+the embedding store.
+"""
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from organizer.combined_feature_extractor import CombinedFeatureExtractor  # noqa: E402
+
+
+class _StubModel:
+    """Encodes an image as its mean color repeated; fails on any batch holding a red image"""
+
+    def __init__(self, dim, fail_on_red=False):
+        self.dim = dim
+        self.fail_on_red = fail_on_red
+
+    def encode_pixel_batch(self, images):
+        means = np.array([np.asarray(image, dtype=np.float32).mean(axis=(0, 1)) for image in images])
+        if self.fail_on_red and (means[:, 0] > 200).any():
+            raise RuntimeError("stub failure")
+        return np.repeat(means[:, :1], self.dim, axis=1)
+
+
+class _RecordingStore:
+    def __init__(self):
+        self.stored = {}
+
+    def store_batch(self, paths, vectors, model_name, version=''):
+        for path, vector in zip(paths, vectors):
+            self.stored[path] = vector
+
+
+def _extractor(models):
+    extractor = CombinedFeatureExtractor.__new__(CombinedFeatureExtractor)
+    extractor.analysis_cache = None
+    extractor.precision = 'fp32'
+    extractor.models = models
+    extractor.model_names = [name for name, _ in models]
+    extractor.shared_side = 32
+    return extractor
+
+
+def test_failed_model_marks_batch_items(tmp_path):
+    """Items a model failed on come back as None and are not stored"""
+    colors = [(10, 10, 10), (20, 20, 20), (250, 0, 0), (40, 40, 40)]
+    paths = []
+    for i, color in enumerate(colors):
+        path = tmp_path / f'tex_{i}.png'
+        Image.new('RGB', (16, 16), color).save(path)
+        paths.append(path)
+    (tmp_path / 'broken.png').write_bytes(b'not an image')
+    paths.append(tmp_path / 'broken.png')
+
+    extractor = _extractor([('CLIP', _StubModel(3)), ('DINOv2', _StubModel(5, fail_on_red=True))])
+    store = _RecordingStore()
+    for parallel in (False, True):
+        store.stored.clear()
+        results = list(extractor.extract_features_batch(paths, batch_size=2, prefetch=0,
+                                                        parallel_models=parallel,
+                                                        embedding_store=store))
+        assert [p for p, _ in results] == paths
+        # tex_2 shares its batch with tex_3, so DINOv2 failed on both
+        assert [v is None for _, v in results] == [False, False, True, True, True]
+        for path, vector in results[:2]:
+            assert vector.shape == (8,)
+            np.testing.assert_array_equal(store.stored[path], vector)
+        assert sorted(store.stored) == paths[:2]
+
+
+if __name__ == "__main__":
+    import tempfile
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✅ {name}")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+find_duplicate_groups tests: each hashing tier (size, first/last block,
+full digest), manifest digest reuse, empty files and files that vanish
+between the scan and the hash.
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from file_handler import duplicate_finder  # noqa: E402
+from file_handler.duplicate_finder import (  # noqa: E402
+    PARTIAL_BLOCK, digest_prefix, find_duplicate_groups)
+from file_handler.scanner import ScanEntry  # noqa: E402
+from utils.analysis_cache import content_hash  # noqa: E402
+
+
+def _write(path, data):
+    path.write_bytes(data)
+    return path
+
+
+def _entry(path):
+    st = os.stat(path)
+    return ScanEntry(path, st.st_size, st.st_mtime, st.st_ino)
+
+
+def _big(middle):
+    """Larger than two partial blocks, with identical ends around ``middle``"""
+    end = b'\xab' * PARTIAL_BLOCK
+    return end + middle + end
+
+
+def test_middle_difference_needs_full_hash(tmp_path):
+    """Same-size files with equal ends are told apart by their full digest"""
+    a = _write(tmp_path / 'a.bin', _big(b'A' * 1000))
+    b = _write(tmp_path / 'b.bin', _big(b'B' * 1000))
+    c = _write(tmp_path / 'c.bin', _big(b'A' * 1000))
+    small = _write(tmp_path / 'small.bin', b'small')
+    small_copy = _write(tmp_path / 'small_copy.bin', b'small')
+    unique = _write(tmp_path / 'unique.bin', b'no other file has this size')
+
+    for workers in (1, 4):
+        groups, digests = find_duplicate_groups([a, b, c, small, small_copy, unique],
+                                                max_workers=workers)
+        assert groups == [[a, c], [small, small_copy]]
+        # Partial digests collide, so all three big files were hashed in full
+        assert digests == {str(p): content_hash(p) for p in (a, b, c, small, small_copy)}
+        assert digests[str(a)] != digests[str(b)]
+
+
+def test_manifest_digests_are_reused(tmp_path):
+    """Stored digests with matching size and mtime skip hashing entirely"""
+    a = _write(tmp_path / 'a.bin', _big(b'A' * 10))
+    b = _write(tmp_path / 'b.bin', _big(b'A' * 10))
+    c = _write(tmp_path / 'c.bin', _big(b'A' * 10))
+    entries = [_entry(p) for p in (a, b, c)]
+    stored = digest_prefix() + 'stored'
+    manifest = {str(e.path): {'file_size': e.size, 'mtime': e.mtime, 'hash': stored}
+                for e in entries[:2]}
+
+    hashed = []
+    original = duplicate_finder.content_hash
+
+    def counting_hash(path):
+        hashed.append(Path(path))
+        return original(path)
+
+    duplicate_finder.content_hash = counting_hash
+    try:
+        # Both known files agree: nothing is read in full
+        groups, digests = find_duplicate_groups(entries[:2], manifest=manifest)
+        assert groups == [[a, b]] and digests == {} and hashed == []
+
+        # A new same-size file is compared against the known ones via its
+        # ends; only it is hashed in full, and it does not match the fake digest
+        groups, digests = find_duplicate_groups(entries, manifest=manifest)
+        assert groups == [[a, b]] and hashed == [c]
+        assert digests == {str(c): content_hash(c)}
+
+        # A changed mtime invalidates the stored digest
+        hashed.clear()
+        stale = dict(manifest)
+        stale[str(a)] = dict(manifest[str(a)], mtime=entries[0].mtime - 10)
+        groups, digests = find_duplicate_groups(entries, manifest=stale)
+        assert sorted(hashed) == [a, c]
+        assert groups == [[a, c]]
+        assert set(digests) == {str(a), str(c)}
+    finally:
+        duplicate_finder.content_hash = original
+
+
+def test_empty_and_unreadable_files(tmp_path):
+    """Empty files group without being opened; vanished files are left out"""
+    empty_a = _write(tmp_path / 'empty_a.bin', b'')
+    empty_b = _write(tmp_path / 'empty_b.bin', b'')
+    data = _write(tmp_path / 'data.bin', b'payload!')
+    data_copy = _write(tmp_path / 'data_copy.bin', b'payload!')
+    gone = _write(tmp_path / 'gone.bin', b'payload!')
+    entries = [_entry(p) for p in (empty_a, empty_b, data, gone, data_copy)]
+    gone.unlink()
+
+    groups, digests = find_duplicate_groups(entries + [tmp_path / 'missing.bin'])
+    assert groups == [[empty_a, empty_b], [data, data_copy]]
+    assert str(gone) not in digests and str(empty_a) not in digests
+    assert set(digests) == {str(data), str(data_copy)}
+
+
+if __name__ == "__main__":
+    import tempfile
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✅ {name}")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+EmbeddingStore tests: bulk writes, removal and compaction of the raw
+matrix files in a temporary directory, and metadata serialization.
+"""
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from similarity.embedding_store import EmbeddingStore  # noqa: E402
+
+
+def _vectors(n):
+    return np.arange(n * 4, dtype=np.float32).reshape(n, 4)
+
+
+def test_reads_do_not_compact(tmp_path):
+    """get_matrix() skips removed rows without rewriting the file"""
+    store = EmbeddingStore(tmp_path / 'emb.db')
+    try:
+        store.store_batch(['a', 'b', 'c', 'd'], _vectors(4), 'CLIP')
+        store.remove(['b'])
+        matrix, paths = store.get_matrix('CLIP')
+        assert paths == [Path('a'), Path('c'), Path('d')]
+        np.testing.assert_array_equal(matrix, _vectors(4)[[0, 2, 3]])
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['emb.CLIP.f32', 'emb.db']
+    finally:
+        store.close()
+
+
+def test_compact_switches_generation(tmp_path):
+    """compact() writes a new file, keeps old arrays readable and survives reopening"""
+    store = EmbeddingStore(tmp_path / 'emb.db')
+    try:
+        store.store_batch(['a', 'b', 'c'], _vectors(3), 'CLIP')
+        before, _ = store.get_matrix('CLIP')
+        store.remove(['a'])
+        store.compact('CLIP')
+        np.testing.assert_array_equal(before, _vectors(3))
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['emb.CLIP.g1.f32', 'emb.db']
+    finally:
+        store.close()
+
+    store = EmbeddingStore(tmp_path / 'emb.db')
+    try:
+        matrix, paths = store.get_matrix('CLIP')
+        assert isinstance(matrix, np.memmap) and paths == [Path('b'), Path('c')]
+        store.store_batch(['d'], _vectors(4)[3:], 'CLIP')
+        np.testing.assert_array_equal(store.get_vectors(['d', 'b'], 'CLIP'), _vectors(4)[[3, 1]])
+    finally:
+        store.close()
+
+
+def test_metadata_is_converted_explicitly(tmp_path):
+    """numpy values and paths round-trip as JSON, other types are rejected"""
+    store = EmbeddingStore(tmp_path / 'emb.db')
+    try:
+        metadata = {'size': np.int64(64), 'mean': np.float32(0.5), 'hist': np.arange(3),
+                    'source': Path('in') / 'a.png', 'shape': (8, 8)}
+        store.store_batch(['a'], _vectors(1), 'CLIP', [metadata])
+        assert store.get(Path('a'), 'CLIP')['metadata'] == {
+            'size': 64, 'mean': 0.5, 'hist': [0, 1, 2],
+            'source': str(Path('in') / 'a.png'), 'shape': [8, 8]}
+
+        with pytest.raises(TypeError, match='set'):
+            store.store_batch(['b'], _vectors(1), 'CLIP', [{'tags': {'x'}}])
+        assert store.get(Path('b'), 'CLIP') is None
+        assert len(store.get_matrix('CLIP')[1]) == 1
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✅ {name}")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incremental sort tests: a small texture tree is sorted into a fresh
+TextureDatabase, then re-scanned to check which manifest rows are kept,
+skipped and pruned.
+"""
+import os
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from core.sort_pipeline import SortPipeline, PipelineSettings  # noqa: E402
+from database import TextureDatabase  # noqa: E402
+
+
+def _make_tree(root):
+    """in/a.png, in/c.png and in/sub/b.png"""
+    (root / 'sub').mkdir(parents=True)
+    Image.new('RGB', (8, 8), (255, 0, 0)).save(root / 'a.png')
+    Image.new('RGB', (8, 8), (0, 0, 255)).save(root / 'c.png')
+    Image.new('RGB', (8, 8), (0, 255, 0)).save(root / 'sub' / 'b.png')
+
+
+def _sort(in_dir, out_dir, db, **overrides):
+    settings = PipelineSettings(use_processes=False, incremental=True, **overrides)
+    pipeline = SortPipeline(output_dir=out_dir, classify_func=lambda path: ('misc', 1.0),
+                            database=db, settings=settings)
+    return pipeline.run(in_dir)
+
+
+def test_rescan_skips_unchanged(tmp_path):
+    """A second incremental run processes nothing and keeps every row"""
+    in_dir = (tmp_path / 'in').absolute()
+    _make_tree(in_dir)
+    db = TextureDatabase(tmp_path / 'textures.db')
+    try:
+        first = _sort(in_dir, tmp_path / 'out', db)
+        assert first['processed'] == 3
+        second = _sort(in_dir, tmp_path / 'out', db)
+        assert second['processed'] == 0 and second['unchanged'] == 3
+        assert second['deleted'] == 0
+        assert len(db.get_manifest(in_dir)) == 3
+    finally:
+        db.close()
+
+
+def test_non_recursive_rescan_keeps_subdirectories(tmp_path):
+    """Rows outside a non-recursive scan's scope are not pruned"""
+    in_dir = (tmp_path / 'in').absolute()
+    _make_tree(in_dir)
+    db = TextureDatabase(tmp_path / 'textures.db')
+    try:
+        _sort(in_dir, tmp_path / 'out', db, recursive=True)
+        results = _sort(in_dir, tmp_path / 'out', db, recursive=False)
+        assert results['deleted'] == 0
+        assert str(in_dir / 'sub' / 'b.png') in db.get_manifest(in_dir)
+    finally:
+        db.close()
+
+
+def test_deleted_files_are_pruned(tmp_path):
+    """Only files that are really gone lose their rows"""
+    in_dir = (tmp_path / 'in').absolute()
+    _make_tree(in_dir)
+    db = TextureDatabase(tmp_path / 'textures.db')
+    try:
+        _sort(in_dir, tmp_path / 'out', db)
+        (in_dir / 'sub' / 'b.png').unlink()
+        results = _sort(in_dir, tmp_path / 'out', db)
+        assert results['deleted'] == 1
+        assert sorted(Path(p).name for p in db.get_manifest(in_dir)) == ['a.png', 'c.png']
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✅ {name}")
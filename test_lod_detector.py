@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LODDetector.detect_unnumbered_lods tests on generated power-of-two LOD
+chains: size bucketing, visual grouping and the group key format.
+"""
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from lod_detector import LODDetector  # noqa: E402
+
+
+def _texture(axis, side=256):
+    """A smooth RGB pattern varying along one axis (0: x, 1: y)"""
+    ramp = np.sin(np.linspace(0, 3 * np.pi, side)) * 100 + 128
+    plane = np.tile(ramp, (side, 1)) if axis == 0 else np.tile(ramp[:, None], (1, side))
+    return Image.fromarray(np.stack([plane, plane * 0.5, 255 - plane], axis=-1).astype(np.uint8))
+
+
+def _lod_chain(folder, stem, image, sides):
+    folder.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i, side in enumerate(sides):
+        path = folder / (f'{stem}.png' if i == 0 else f'{stem}_{side}.png')
+        image.resize((side, side), Image.LANCZOS).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_power_of_two_chains_and_aspect_mismatch(tmp_path):
+    """LOD chains group per aspect ratio; a stretched copy stays out"""
+    rock = _lod_chain(tmp_path / 'a', 'rock', _texture(0), (256, 128, 64, 32))
+    # Same stem in another folder, unrelated pattern
+    other = _lod_chain(tmp_path / 'b', 'rock', _texture(1), (128, 64))
+    wide = tmp_path / 'a' / 'rock_wide.png'
+    _texture(0).resize((256, 128), Image.LANCZOS).save(wide)
+    broken = tmp_path / 'a' / 'broken.png'
+    broken.write_bytes(b'not an image')
+
+    files = rock + [wide, broken] + other
+    detector = LODDetector()
+    for workers in (1, 4):
+        groups = detector.detect_unnumbered_lods(files, max_workers=workers)
+        # The second 'rock' group is keyed by its full path
+        assert groups == {'rock': rock, str(other[0]): other}
+
+    # Without size bucketing the stretched copy looks like the same texture
+    unbucketed = detector.detect_unnumbered_lods(files, bucket_by_size=False)
+    assert unbucketed['rock'] == rock + [wide]
+
+
+def test_size_bucket(tmp_path):
+    """Sizes share a bucket exactly when they differ by a power of two per axis"""
+    bucket = LODDetector._size_bucket
+    assert bucket((512, 256)) == bucket((256, 128)) == bucket((64, 32))
+    assert bucket((256, 256)) == bucket((8, 8)) != bucket((256, 128))
+    assert bucket((96, 96)) != bucket((128, 128))
+    assert bucket((96, 48)) == bucket((192, 96))
+
+
+if __name__ == "__main__":
+    import tempfile
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✅ {name}")
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parity tests for the native_ops NumPy fallbacks.
+Each fallback is compared against a line-by-line Python port of the Rust
+function in native/src/lib.rs, and against the compiled texture_ops
+extension itself when it is installed.
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import native_ops  # noqa: E402
+
+
+def _rust_perceptual_hash(image):
+    """Port of perceptual_hash() from native/src/lib.rs"""
+    height, width = image.shape[:2]
+    data = image.reshape(-1).tolist()
+    gray = [0.0] * 64
+    bw, bh = width / 8.0, height / 8.0
+    for by in range(8):
+        for bx in range(8):
+            y0, y1 = int(by * bh), min(int((by + 1) * bh), height)
+            x0, x1 = int(bx * bw), min(int((bx + 1) * bw), width)
+            total, count = 0.0, 0
+            for y in range(y0, y1):
+                for x in range(x0, x1):
+                    off = (y * width + x) * 3
+                    total += 0.299 * data[off] + 0.587 * data[off + 1] + 0.114 * data[off + 2]
+                    count += 1
+            gray[by * 8 + bx] = total / count if count else 0.0
+    mean = 0.0
+    for value in gray:
+        mean += value
+    mean /= 64.0
+    return sum(1 << i for i, value in enumerate(gray) if value > mean)
+
+
+def _rust_color_histogram(image, bins):
+    """Port of color_histogram() from native/src/lib.rs"""
+    data = image.reshape(-1, 3).tolist()
+    hist = [0] * (3 * bins)
+    bin_width = 256.0 / bins
+    for pixel in data:
+        for c in range(3):
+            hist[c * bins + min(int(pixel[c] / bin_width), bins - 1)] += 1
+    return [v / len(data) for v in hist]
+
+
+def _rust_edge_density(image):
+    """Port of edge_density() from native/src/lib.rs"""
+    height, width = image.shape[:2]
+    if width < 3 or height < 3:
+        return 0.0
+    flat = image.reshape(-1, 3).tolist()
+    gray = [0.299 * r + 0.587 * g + 0.114 * b for r, g, b in flat]
+    edges = 0
+    for y in range(1, height - 1):
+        for x in range(1, width - 1):
+            def idx(dy, dx):
+                return gray[(y + dy - 1) * width + (x + dx - 1)]
+            gx = -idx(0, 0) + idx(0, 2) - 2.0 * idx(1, 0) + 2.0 * idx(1, 2) - idx(2, 0) + idx(2, 2)
+            gy = -idx(0, 0) - 2.0 * idx(0, 1) - idx(0, 2) + idx(2, 0) + 2.0 * idx(2, 1) + idx(2, 2)
+            if (gx * gx + gy * gy) ** 0.5 > 30.0:
+                edges += 1
+    return edges / ((height - 2) * (width - 2))
+
+
+def _test_images():
+    """Random, smooth and flat images, including sizes not divisible by 8"""
+    rng = np.random.default_rng(1234)
+    images = []
+    for h, w in [(16, 16), (24, 40), (13, 21), (7, 9), (2, 5), (64, 48)]:
+        images.append(rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8))
+        yy, xx = np.mgrid[0:h, 0:w]
+        gradient = np.stack([xx * 255 // max(w - 1, 1), yy * 255 // max(h - 1, 1),
+                             (xx + yy) % 256], axis=-1)
+        images.append(gradient.astype(np.uint8))
+        images.append(np.full((h, w, 3), rng.integers(0, 256, size=3), dtype=np.uint8))
+    return images
+
+
+def test_perceptual_hash_parity():
+    """NumPy aHash matches the Rust algorithm bit for bit"""
+    for image in _test_images():
+        assert native_ops.perceptual_hash(image) == _rust_perceptual_hash(image), image.shape
+    rgba = np.dstack([_test_images()[0], np.full((16, 16), 255, dtype=np.uint8)])
+    assert native_ops.perceptual_hash(rgba) == _rust_perceptual_hash(rgba[:, :, :3])
+
+
+def test_color_histogram_parity():
+    """bincount histogram matches the Rust per-pixel loop"""
+    for image in _test_images():
+        for bins in (1, 7, 16, 256):
+            assert native_ops.color_histogram(image, bins) == _rust_color_histogram(image, bins)
+
+
+def test_edge_density_parity():
+    """Strip-wise Sobel matches the Rust loop"""
+    for image in _test_images():
+        assert native_ops.edge_density(image) == _rust_edge_density(image), image.shape
+    # Strip boundaries
+    tall = np.random.default_rng(5).integers(0, 256, size=(native_ops._EDGE_STRIP_ROWS + 7, 9, 3),
+                                             dtype=np.uint8)
+    assert native_ops.edge_density(tall) == _rust_edge_density(tall)
+
+
+def test_hamming_parity():
+    """Scalar and vectorized Hamming distances agree"""
+    rng = np.random.default_rng(7)
+    hashes = rng.integers(0, 2 ** 63, size=200, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+    other = int(hashes[3])
+    expected = [bin(int(h) ^ other).count('1') for h in hashes]
+    assert native_ops.hamming_distances(hashes, other).tolist() == expected
+    assert [native_ops.hamming_distance(int(h), other) for h in hashes] == expected
+    assert native_ops.popcount64(np.array([0, 2 ** 64 - 1], dtype=np.uint64)).tolist() == [0, 64]
+
+
+def test_batch_parity():
+    """Stacked, list and single-image calls return the same values"""
+    rng = np.random.default_rng(11)
+    stacked = rng.integers(0, 256, size=(70, 24, 40, 4), dtype=np.uint8)
+    stacked[:5] = rng.integers(0, 256, size=(5, 1, 1, 4), dtype=np.uint8)  # flat: exact path
+    listed = [np.ascontiguousarray(img[:, :, :3]) for img in stacked]
+    expected = [_rust_perceptual_hash(img) for img in listed]
+
+    for batch in (stacked, listed, list(stacked)):
+        hashes = native_ops.batch_perceptual_hash(batch)
+        assert hashes.dtype == np.uint64 and hashes.tolist() == expected
+    assert [native_ops.perceptual_hash(img) for img in stacked] == expected
+
+    histograms = native_ops.batch_color_histogram(stacked, 7)
+    assert histograms.shape == (70, 21)
+    assert histograms.tolist() == [_rust_color_histogram(img, 7) for img in listed]
+    assert native_ops.batch_color_histogram(listed, 7).tolist() == histograms.tolist()
+
+    mixed = _test_images()
+    assert native_ops.batch_perceptual_hash(mixed).tolist() == [_rust_perceptual_hash(i) for i in mixed]
+    assert native_ops.batch_perceptual_hash([]).shape == (0,)
+
+
+def test_native_extension_parity():
+    """Fallbacks return what the compiled extension returns (when installed)"""
+    if not native_ops.NATIVE_AVAILABLE:
+        print("texture_ops not installed; compared against the Rust ports only")
+        return
+    native = native_ops._native
+    for image in _test_images():
+        h, w = image.shape[:2]
+        data = image.tobytes()
+        assert native.perceptual_hash(data, w, h) == _rust_perceptual_hash(image)
+        assert native.color_histogram(data, w, h, 16) == _rust_color_histogram(image, 16)
+        assert native.edge_density(data, w, h) == _rust_edge_density(image)
+    if hasattr(native, 'batch_perceptual_hash_array'):
+        images = _test_images()
+        assert native.batch_perceptual_hash_array(images).tolist() == \
+            [_rust_perceptual_hash(image) for image in images]
+        assert native.batch_color_histogram_array(images, 16).tolist() == \
+            [_rust_color_histogram(image, 16) for image in images]
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PHashIndex tests: both backends are checked against a brute-force Hamming
+scan, then a small texture tree is hashed, queried, cached and saved.
+"""
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from similarity.phash_index import PHashIndex  # noqa: E402
+from utils.analysis_cache import AnalysisCache  # noqa: E402
+
+
+def _random_hashes(n, seed=0):
+    """Clusters of hashes a few bit flips apart, so every radius has hits"""
+    rng = np.random.default_rng(seed)
+    centers = rng.integers(0, 2 ** 63, size=n // 4, dtype=np.int64).astype(np.uint64)
+    hashes = []
+    for center in centers.tolist():
+        hashes.append(center)
+        for _ in range(3):
+            flips = rng.choice(64, size=rng.integers(1, 8), replace=False)
+            hashes.append(center ^ sum(1 << int(b) for b in flips))
+    return hashes
+
+
+def _brute_pairs(hashes, radius):
+    return sorted((a, b, bin(hashes[a] ^ hashes[b]).count("1"))
+                  for a in range(len(hashes)) for b in range(a + 1, len(hashes))
+                  if bin(hashes[a] ^ hashes[b]).count("1") <= radius)
+
+
+def test_backends_match_brute_force(tmp_path):
+    """MIH and BK-tree return exactly the brute-force neighbours"""
+    hashes = _random_hashes(200)
+    paths = [Path(f'tex_{i}.png') for i in range(len(hashes))]
+    for method in PHashIndex.METHODS:
+        index = PHashIndex(method=method)
+        index.add_hashes(hashes, paths)
+        for radius in (0, 4, 8):
+            id_a, id_b, dists = index.find_pair_ids(radius)
+            assert list(zip(id_a.tolist(), id_b.tolist(), dists.tolist())) == \
+                _brute_pairs(hashes, radius), (method, radius)
+        expected = sorted((bin(h ^ hashes[5]).count("1"), i) for i, h in enumerate(hashes)
+                          if bin(h ^ hashes[5]).count("1") <= 6)
+        found = sorted((d, paths.index(p)) for p, d in index.query_hash(hashes[5], radius=6))
+        assert found == expected, method
+
+
+def _make_tree(root):
+    """A texture, an exact and a brightened copy of it, its negative and a broken file"""
+    root.mkdir(parents=True)
+    gradient = np.tile(np.arange(0, 256, 4, dtype=np.uint8), (64, 1))
+    base = np.stack([gradient, gradient.T, np.full_like(gradient, 90)], axis=-1)
+    Image.fromarray(base).save(root / 'wall.png')
+    Image.fromarray(base).save(root / 'wall_copy.png')
+    Image.fromarray(np.clip(base.astype(int) + 6, 0, 255).astype(np.uint8)).save(root / 'wall_bright.png')
+    Image.fromarray(255 - base).save(root / 'other.png')
+    (root / 'broken.png').write_bytes(b'not an image')
+    return sorted(root.iterdir())
+
+
+def test_files_groups_cache_and_save(tmp_path):
+    """add_files hashes a tree once, groups copies and round-trips through save()"""
+    files = _make_tree(tmp_path / 'tex')
+    cache = AnalysisCache(tmp_path / 'cache.db')
+    try:
+        for method in PHashIndex.METHODS:
+            index = PHashIndex(method=method)
+            failed = index.add_files(files, batch_size=2, analysis_cache=cache)
+            assert failed == [tmp_path / 'tex' / 'broken.png']
+            assert len(index) == 4
+
+            groups = index.find_groups(max_distance=4)
+            assert [sorted(p.name for p in g) for g in groups] == \
+                [['wall.png', 'wall_bright.png', 'wall_copy.png']]
+            assert (tmp_path / 'tex' / 'wall_copy.png', 0) in index.query_file(tmp_path / 'tex' / 'wall.png')
+
+            index.save(tmp_path / f'{method}.npz')
+            loaded = PHashIndex.load(tmp_path / f'{method}.npz')
+            assert loaded.method == method and loaded.paths == index.paths
+            assert loaded.hashes.tolist() == index.hashes.tolist()
+            assert loaded.find_pairs(4) == index.find_pairs(4)
+
+        # Second run: every readable file is served from the analysis cache
+        hits = cache.hits
+        rerun = PHashIndex()
+        rerun.add_files(files, analysis_cache=cache)
+        assert cache.hits - hits == 4
+        assert rerun.hashes.tolist() == index.hashes.tolist()
+    finally:
+        cache.close()
+
+if __name__ == "__main__":
+    import tempfile
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✅ {name}")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ImageQualityChecker tests: reports served from the analysis cache equal
+freshly computed ones, and the threaded batch keeps input order.
+"""
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from tools.quality_checker import ImageQualityChecker, QualityCheckOptions  # noqa: E402
+from utils.analysis_cache import AnalysisCache  # noqa: E402
+
+
+def _make_images(root):
+    """Noise textures of varied sizes and formats; the largest come first"""
+    root.mkdir(parents=True)
+    rng = np.random.default_rng(0)
+    paths = []
+    for i, side in enumerate((1024, 64, 768, 32, 512, 16, 256, 128)):
+        pixels = rng.integers(0, 256, (side, side // 2 + 1, 3), dtype=np.uint8)
+        path = root / f'tex_{i}.{"jpg" if i % 3 == 0 else "png"}'
+        Image.fromarray(pixels).save(path, dpi=(72 * (i + 1), 72 * (i + 1)))
+        paths.append(str(path))
+    return paths
+
+
+def test_cached_reports_equal_fresh(tmp_path):
+    """A report rebuilt from the cache is the report a fresh check gives"""
+    paths = _make_images(tmp_path / 'tex')
+    fresh = ImageQualityChecker().check_batch(paths, max_workers=1)
+
+    cache = AnalysisCache(tmp_path / 'cache.db')
+    try:
+        checker = ImageQualityChecker(analysis_cache=cache)
+        assert checker.check_batch(paths, max_workers=1) == fresh
+        assert cache.hits == 0
+        cached = checker.check_batch(paths, max_workers=1)
+        assert cache.hits == len(paths)
+        assert cached == fresh
+
+        # A copy elsewhere is served from the cache under its own path
+        copy = tmp_path / 'copy.png'
+        shutil.copy(paths[1], copy)
+        report = checker.check_quality(str(copy))
+        assert cache.hits == len(paths) + 1
+        assert report.input_path == str(copy)
+        assert report == ImageQualityChecker().check_quality(str(copy))
+
+        # Other options are a different cache entry
+        options = QualityCheckOptions(check_noise=False)
+        assert checker.check_quality(paths[1], options) == \
+            ImageQualityChecker().check_quality(paths[1], options)
+        assert cache.hits == len(paths) + 1
+    finally:
+        cache.close()
+
+
+def test_threaded_batch_keeps_input_order(tmp_path):
+    """The thread pool yields reports and progress in input order, skipping failures"""
+    paths = _make_images(tmp_path / 'tex')
+    broken = tmp_path / 'tex' / 'broken.png'
+    broken.write_bytes(b'not an image')
+    inputs = paths[:3] + [str(broken)] + paths[3:]
+
+    serial = ImageQualityChecker().check_batch(paths, max_workers=1)
+    for workers in (2, 4, 16):
+        progress = []
+        reports = ImageQualityChecker().check_batch(
+            inputs, progress_callback=lambda i, total, name: progress.append((i, name)),
+            max_workers=workers)
+        assert [r.input_path for r in reports] == paths
+        assert reports == serial
+        assert progress == [(i + 1, Path(p).name) for i, p in enumerate(inputs)]
+
+
+if __name__ == "__main__":
+    import tempfile
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✅ {name}")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SimilaritySearch tests: upsert, remove, compact and save/load on small
+random indexes, plus retraining a sharded index. Skipped when FAISS is
+not installed.
+"""
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from similarity.similarity_search import SimilaritySearch, FAISS_AVAILABLE  # noqa: E402
+from similarity.embedding_store import EmbeddingStore  # noqa: E402
+from similarity.sharded_search import ShardedSimilaritySearch  # noqa: E402
+
+pytestmark = pytest.mark.skipif(not FAISS_AVAILABLE, reason="FAISS not installed")
+
+DIM = 16
+
+
+def _vectors(n, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, DIM)).astype(np.float32)
+
+
+def _paths(n, prefix='tex'):
+    return [Path(f'{prefix}_{i}.png') for i in range(n)]
+
+
+def _pq_search(**overrides):
+    return SimilaritySearch(embedding_dim=DIM, index_type='ivfpq', nlist=4, pq_m=4,
+                            pq_bits=4, **overrides)
+
+
+def test_upsert_replaces_by_path(tmp_path):
+    """Re-adding a path replaces its vector instead of duplicating it"""
+    search = SimilaritySearch(embedding_dim=DIM)
+    vectors = _vectors(10)
+    search.upsert(vectors, _paths(10), [{'n': i} for i in range(10)])
+    search.upsert(vectors[:1] * -1, _paths(1), [{'n': 99}])
+    assert len(search) == 10
+    best = search.search(-vectors[0], k=1)[0]
+    assert best['texture_path'] == Path('tex_0.png') and best['metadata'] == {'n': 99}
+
+
+def test_remove_and_compact(tmp_path):
+    """Removed paths never come back and compaction renumbers densely"""
+    search = SimilaritySearch(embedding_dim=DIM, compact_ratio=1.0)
+    vectors = _vectors(10)
+    search.upsert(vectors, _paths(10))
+    assert search.remove(_paths(3)) == 3
+    assert search.get_stats()['tombstones'] == 3
+    assert all(r['texture_path'] not in _paths(3) for r in search.search(vectors[0], k=10))
+    search.compact()
+    assert search.get_stats()['tombstones'] == 0
+    assert search.get_id(Path('tex_3.png')) == 0
+    np.testing.assert_allclose(search.get_embedding(Path('tex_9.png')),
+                               vectors[9] / np.linalg.norm(vectors[9]), rtol=1e-5)
+
+
+def test_save_load_round_trip(tmp_path):
+    """A saved index loads back with the same paths, metadata and results"""
+    search = SimilaritySearch(embedding_dim=DIM)
+    vectors = _vectors(20)
+    search.upsert(vectors, _paths(20), [{'n': i} for i in range(20)])
+    search.remove(_paths(2))
+    search.save(tmp_path / 'index')
+
+    for mmap in (False, True):
+        loaded = SimilaritySearch(embedding_dim=DIM)
+        loaded.load(tmp_path / 'index', mmap=mmap)
+        assert len(loaded) == 18
+        assert loaded.search(vectors[5], k=1)[0]['metadata'] == {'n': 5}
+        loaded.upsert(vectors[:1], _paths(1))
+        assert len(loaded) == 19
+
+
+def test_untrained_upsert_rejects_small_batch(tmp_path):
+    """A batch too small to train on is rejected before anything is added"""
+    search = _pq_search()
+    with pytest.raises(ValueError, match='train'):
+        search.upsert(_vectors(10), _paths(10))
+    assert len(search) == 0 and not search.is_trained
+
+    search.upsert(_vectors(300), _paths(300))
+    assert search.is_trained and len(search) == 300
+
+
+def test_quantized_compact_reencodes_from_store(tmp_path):
+    """IVF-PQ compaction re-encodes the stored originals, not PQ reconstructions"""
+    vectors = _vectors(400)
+    paths = _paths(400)
+    store = EmbeddingStore(tmp_path / 'embeddings.db')
+    try:
+        store.store_batch(paths, vectors, 'clip')
+        search = _pq_search(compact_ratio=1.0)
+        search.train(vectors, recall_k=0)
+        search.upsert(vectors, paths)
+        before = search.get_embedding(paths[-1])
+
+        search.remove(paths[:100])
+        search.compact()
+        assert search.get_stats()['tombstones'] == 100
+
+        search.attach_store(store, 'clip')
+        search.compact()
+        assert search.get_stats()['tombstones'] == 0 and len(search) == 300
+        np.testing.assert_array_equal(search.get_embedding(paths[-1]), before)
+
+        search.save(tmp_path / 'pq')
+        loaded = _pq_search()
+        loaded.load(tmp_path / 'pq')
+        np.testing.assert_array_equal(loaded.get_embedding(paths[-1]), before)
+    finally:
+        store.close()
+
+
+def test_quantized_retrain_needs_store(tmp_path):
+    """Retraining a filled IVF-PQ index without originals fails up front"""
+    vectors = _vectors(300)
+    search = _pq_search()
+    search.train(vectors, recall_k=0)
+    search.upsert(vectors, _paths(300))
+    with pytest.raises(ValueError, match='attach_store'):
+        search.train(_vectors(300, seed=1), recall_k=0)
+    assert len(search) == 300 and search.search(vectors[0], k=1)
+
+
+def test_sharded_retrain_marks_shards_stale(tmp_path):
+    """Retraining unloads shards and re-encodes each from the store on load"""
+    vectors = _vectors(600)
+    paths = _paths(300, 'a') + _paths(300, 'b')
+    store = EmbeddingStore(tmp_path / 'embeddings.db')
+    try:
+        store.store_batch(paths, vectors, 'clip')
+        shards = ShardedSimilaritySearch(tmp_path / 'shards', embedding_dim=DIM, nlist=4, pq_m=4,
+                                         pq_bits=4, embedding_store=store, store_model='clip')
+        shards.train(vectors, recall_k=0)
+        shards.add_embeddings_batch('game_a', vectors[:300], paths[:300])
+        shards.add_embeddings_batch('game_b', vectors[300:], paths[300:])
+        shards.save()
+
+        shards.train(_vectors(600, seed=1), recall_k=0)
+        assert shards.get_stats()['loaded_shards'] == []
+        assert ShardedSimilaritySearch(tmp_path / 'shards')._stale == {'game_a', 'game_b'}
+
+        best = shards.search(vectors[450], k=3)
+        assert len(best) == 3
+        assert {'texture_path': paths[450], 'shard': 'game_b'}.items() <= \
+            next(r for r in best if r['texture_path'] == paths[450]).items()
+        shards.save()
+        assert not ShardedSimilaritySearch(tmp_path / 'shards')._stale
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✅ {name}")
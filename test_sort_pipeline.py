@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SortPipeline tests: a small texture tree is sorted twice into the same
+output directory under each on_existing policy.
+"""
+import os
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from core.sort_pipeline import SortPipeline, PipelineSettings  # noqa: E402
+
+
+def _make_tree(root):
+    root.mkdir(parents=True)
+    for i in range(4):
+        Image.new('RGB', (8, 8), (i * 60, 0, 0)).save(root / f'tex_{i}.png')
+
+
+def _classify(path):
+    return ('armor' if path.stem.endswith(('0', '1')) else 'weapons'), 0.9
+
+
+def _sort(in_dir, out_dir, **overrides):
+    settings = PipelineSettings(use_processes=False, **overrides)
+    return SortPipeline(output_dir=out_dir, classify_func=_classify, settings=settings).run(in_dir)
+
+
+def _outputs(out_dir):
+    return sorted(str(p.relative_to(out_dir)) for p in out_dir.rglob('*') if p.is_file())
+
+
+def test_sorts_into_categories(tmp_path):
+    """Every texture is copied once into its category folder"""
+    _make_tree(tmp_path / 'in')
+    results = _sort(tmp_path / 'in', tmp_path / 'out')
+    assert results['processed'] == 4 and results['failed'] == 0
+    assert _outputs(tmp_path / 'out') == [os.path.join('armor', 'tex_0.png'),
+                                          os.path.join('armor', 'tex_1.png'),
+                                          os.path.join('weapons', 'tex_2.png'),
+                                          os.path.join('weapons', 'tex_3.png')]
+    assert (tmp_path / 'in' / 'tex_0.png').exists()
+
+
+def test_rerun_skip_copies_nothing(tmp_path):
+    """on_existing='skip' (the CLI default) makes a re-run a no-op"""
+    _make_tree(tmp_path / 'in')
+    _sort(tmp_path / 'in', tmp_path / 'out', on_existing='skip')
+    before = _outputs(tmp_path / 'out')
+    results = _sort(tmp_path / 'in', tmp_path / 'out', on_existing='skip')
+    assert results['skipped'] == 4 and results['processed'] == 0
+    assert _outputs(tmp_path / 'out') == before
+
+
+def test_rerun_rename_and_overwrite(tmp_path):
+    """'rename' keeps both copies, 'overwrite' replaces the old ones"""
+    _make_tree(tmp_path / 'in')
+    _sort(tmp_path / 'in', tmp_path / 'out')
+    _sort(tmp_path / 'in', tmp_path / 'out', on_existing='rename')
+    assert os.path.join('armor', 'tex_0_1.png') in _outputs(tmp_path / 'out')
+    assert len(_outputs(tmp_path / 'out')) == 8
+
+    target = tmp_path / 'out' / 'armor' / 'tex_0.png'
+    Image.new('RGB', (2, 2)).save(target)
+    _sort(tmp_path / 'in', tmp_path / 'out', on_existing='overwrite')
+    assert len(_outputs(tmp_path / 'out')) == 8
+    assert Image.open(target).size == (8, 8)
+
+
+if __name__ == "__main__":
+    import tempfile
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✅ {name}")
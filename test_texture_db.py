@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TextureDatabase tests: the trigram filename index (substring search, trigger
+sync on upsert, rename and delete) and keyset paging over equal sort keys.
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from database.texture_db import TextureDatabase  # noqa: E402
+
+
+def _names(rows):
+    return sorted(Path(r['file_path']).name for r in rows)
+
+
+def _fts_rowids(db, text):
+    return sorted(row[0] for row in db.conn.execute(
+        'SELECT rowid FROM textures_fts WHERE textures_fts MATCH ?', (f'"{text}"',)))
+
+
+def test_trigram_substring_search(tmp_path):
+    """Any 3+ character substring of a filename matches, case-insensitively"""
+    with TextureDatabase(tmp_path / 'textures.db') as db:
+        assert db.has_fts
+        root = tmp_path / 'game'
+        db.add_textures_bulk([(root / 'char_hero_diffuse.png', {'category': 'character'}),
+                              (root / 'env_rock_DIFFUSE.dds', {'category': 'environment'}),
+                              (root / 'ui_button.png', {'category': 'ui'})])
+        assert _names(db.query_textures(name='ffus')) == ['char_hero_diffuse.png',
+                                                          'env_rock_DIFFUSE.dds']
+        assert _names(db.query_textures(name='o_dIf')) == ['char_hero_diffuse.png']
+        assert _names(db.query_textures(name='utt', categories=['ui'])) == ['ui_button.png']
+        # Two characters are too short for trigrams and fall back to a scan
+        assert _names(db.query_textures(name='ui')) == ['ui_button.png']
+        assert db.count_textures(name='nothing') == 0
+
+
+def test_fts_triggers_follow_upsert_rename_and_delete(tmp_path):
+    """The FTS table mirrors the textures table through every kind of write"""
+    with TextureDatabase(tmp_path / 'textures.db') as db:
+        root = tmp_path / 'game'
+        db.add_texture(root / 'wall_brick.png', {'category': 'environment'})
+        first_id = db.get_texture(root / 'wall_brick.png')['id']
+
+        # Re-indexing the same path keeps the row id and one FTS entry
+        db.add_texture(root / 'wall_brick.png', {'category': 'building', 'file_size': 10})
+        texture = db.get_texture(root / 'wall_brick.png')
+        assert texture['id'] == first_id and texture['category'] == 'building'
+        assert _fts_rowids(db, 'brick') == [first_id]
+
+        assert db.rename_texture(root / 'wall_brick.png', root / 'wall_stone.png')
+        assert _fts_rowids(db, 'brick') == []
+        assert _fts_rowids(db, 'stone') == [first_id]
+        assert _names(db.query_textures(name='stone')) == ['wall_stone.png']
+
+        assert db.remove_textures([root / 'wall_stone.png']) == 1
+        assert _fts_rowids(db, 'stone') == []
+        assert db.query_textures(name='stone') == []
+        db.conn.execute("INSERT INTO textures_fts(textures_fts) VALUES ('integrity-check')")
+
+
+def test_keyset_paging_with_equal_sort_keys(tmp_path):
+    """Pages over rows sharing every filtered value neither skip nor repeat rows"""
+    with TextureDatabase(tmp_path / 'textures.db') as db:
+        root = tmp_path / 'game'
+        db.add_textures_bulk([(root / f'tex_{i:03d}.png',
+                               {'category': 'ui' if i % 3 else 'character', 'file_size': 64})
+                              for i in range(50)])
+        # Re-indexing rows mid-table (into another category) must not reorder them
+        db.add_textures_bulk([(root / f'tex_{i:03d}.png', {'category': 'ui', 'file_size': 64})
+                              for i in (3, 6, 9)])
+
+        for filters in ({}, {'categories': ['ui']}, {'name': 'tex_0'}, {'min_size': 64}):
+            expected = db.query_textures(limit=-1, **filters)
+            assert expected and len(expected) == db.count_textures(**filters)
+            assert [r['id'] for r in expected] == sorted({r['id'] for r in expected})
+            for page_size in (1, 7, len(expected)):
+                pages, after_id = [], 0
+                while True:
+                    page = db.query_textures(after_id, page_size, columns=['file_path'], **filters)
+                    pages.extend(page)
+                    if len(page) < page_size:
+                        break
+                    after_id = page[-1]['id']
+                assert [r['id'] for r in pages] == [r['id'] for r in expected], (filters, page_size)
+                streamed = list(db.iter_textures(page_size=page_size, **filters))
+                assert [r['id'] for r in streamed] == [r['id'] for r in expected]
+                assert len({r['id'] for r in streamed}) == len(streamed)
+
+        assert db.count_textures(categories=['ui']) == 36
+
+
+if __name__ == "__main__":
+    import tempfile
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✅ {name}")